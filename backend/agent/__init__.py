@@ -1,14 +1,21 @@
 """
 Stock Analysis and Forecasting Agent package.
 This package contains the main agent implementation for stock analysis and forecasting.
+
+The agent (LangChain, LangGraph and the forecasting models) is imported on
+first attribute access, so agent.analysis_jobs and agent.watchlist can be
+imported without loading it.
 """
 
-from .stock_agent import (
-    AgentState,
-    StockAgent
-)
+import importlib
 
 __all__ = [
     'AgentState',
     'StockAgent'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module('.stock_agent', __name__), name)
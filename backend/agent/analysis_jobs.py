@@ -0,0 +1,304 @@
+"""
+Background jobs for /api/analyze.
+
+A job runs the StockAgent pipeline on a bounded thread pool and records a
+progress event per pipeline stage, merging each stage's partial results
+(charts, metrics, summary) into the job's result as soon as they exist.
+Clients poll the job or stream its events over SSE.
+
+The worker that accepted a job runs it and keeps it in memory; every state
+change is also written to the analysis_jobs collection (expired by a TTL
+index), so a status or events request answered by any other server worker
+reads the job from there.
+"""
+
+import copy
+import json
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from mlmodels.analysis_profiles import PIPELINE_STAGES, DEFAULT_PROFILE
+
+# Job pool configuration
+ANALYSIS_JOB_WORKERS = int(os.environ.get("ANALYSIS_JOB_WORKERS", "2"))
+ANALYSIS_JOB_MAX_PENDING = int(os.environ.get("ANALYSIS_JOB_MAX_PENDING", "20"))
+ANALYSIS_JOB_TTL_SECONDS = float(os.environ.get("ANALYSIS_JOB_TTL_SECONDS", "900"))
+# How often a worker that does not own a job re-reads it while streaming events
+ANALYSIS_JOB_POLL_SECONDS = float(os.environ.get("ANALYSIS_JOB_POLL_SECONDS", "1"))
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are queued or running."""
+
+
+class AnalysisJob:
+    """One analysis request and everything reported about it so far."""
+
+    def __init__(self, query: str, mode: str, output: str, profile: str):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.mode = mode
+        self.output = output
+        self.profile = profile
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.result: Dict[str, Any] = {"analysis": None, "charts": {}, "images": {}, "metrics": None, "best_params": None}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        """Copy of the job's state (the caller holds the manager's lock)."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "profile": self.profile,
+            "stage": self.stage,
+            "stages": list(PIPELINE_STAGES),
+            "error": self.error,
+            "events": copy.deepcopy(self.events[since:]),
+            "next_event": len(self.events),
+            "result": copy.deepcopy(self.result),
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+    def document(self, with_events: bool = True) -> Dict[str, Any]:
+        """The job's shared-store document (see JobStore; the caller holds the manager's lock)."""
+        doc = {
+            "_id": self.id,
+            "status": self.status,
+            "profile": self.profile,
+            "stage": self.stage,
+            "error": self.error,
+            "result": _storable(self.result),
+            "createdAt": self.created_at,
+            "finishedAt": self.finished_at,
+        }
+        if with_events:
+            doc["events"] = _storable(self.events)
+        return doc
+
+
+def _storable(value: Any) -> Any:
+    """JSON-safe copy of value (NumPy scalars and arrays, dates) that BSON can encode."""
+    def default(item):
+        if hasattr(item, "tolist"):
+            return item.tolist()
+        if hasattr(item, "isoformat"):
+            return item.isoformat()
+        return str(item)
+    return json.loads(json.dumps(value, default=default))
+
+
+def snapshot_from_document(doc: Dict[str, Any], since: int = 0) -> Dict[str, Any]:
+    """AnalysisJob.snapshot() for a job read from the shared store."""
+    events = doc.get("events") or []
+    return {
+        "job_id": doc["_id"],
+        "status": doc.get("status"),
+        "profile": doc.get("profile"),
+        "stage": doc.get("stage"),
+        "stages": list(PIPELINE_STAGES),
+        "error": doc.get("error"),
+        "events": events[since:],
+        "next_event": len(events),
+        "result": doc.get("result") or {},
+        "elapsed_seconds": round((doc.get("finishedAt") or time.time()) - doc.get("createdAt", time.time()), 3),
+    }
+
+
+class JobStore:
+    """
+    Job state shared by every server worker: one document per job in the
+    analysis_jobs collection, removed by its TTL index after expiresAt.
+
+    Writes that fail (MongoDB down) are logged and skipped; the owning
+    worker keeps serving the job from memory.
+    """
+
+    def __init__(self, ttl_seconds: float = ANALYSIS_JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    def _collection(self):
+        from database import get_database, Collections
+        return get_database()[Collections.ANALYSIS_JOBS]
+
+    def save(self, doc: Dict[str, Any], event: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write a job document (AnalysisJob.document()). With `event`, the
+        stored events are kept and the new one is appended instead of
+        rewriting the whole list.
+        """
+        fields = dict(doc)
+        # Running jobs get a TTL too, so a job whose worker died still expires
+        fields["expiresAt"] = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        job_id = fields.pop("_id")
+        update: Dict[str, Any] = {"$set": fields}
+        if event is not None:
+            fields.pop("events", None)
+            update["$push"] = {"events": event}
+        try:
+            self._collection().update_one({"_id": job_id}, update, upsert=True)
+        except Exception as e:
+            logger.warning(f"Could not store analysis job {job_id}: {str(e)}")
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._collection().find_one({"_id": job_id})
+        except Exception as e:
+            logger.warning(f"Could not read analysis job {job_id}: {str(e)}")
+            return None
+
+    def exists(self, job_id: str) -> bool:
+        try:
+            return self._collection().find_one({"_id": job_id}, {"_id": 1}) is not None
+        except Exception as e:
+            logger.warning(f"Could not read analysis job {job_id}: {str(e)}")
+            return False
+
+
+class AnalysisJobManager:
+    """
+    Runs analysis jobs on a bounded worker pool.
+
+    A condition variable wakes SSE streams whenever any job records an event.
+    Jobs this worker does not own are read from the shared store.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_JOB_WORKERS, max_pending: int = ANALYSIS_JOB_MAX_PENDING,
+                 ttl_seconds: float = ANALYSIS_JOB_TTL_SECONDS, store: Optional[JobStore] = None):
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.store = store if store is not None else JobStore(ttl_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._changed = threading.Condition()
+
+    def submit(self, query: str, mode: str = "prophet", output: str = "data",
+               profile: str = DEFAULT_PROFILE) -> AnalysisJob:
+        """Queue a job; raises JobQueueFull when the pool is saturated."""
+        with self._changed:
+            self._expire()
+            active = sum(1 for job in self._jobs.values() if job.status in (QUEUED, RUNNING))
+            if active >= self.max_pending:
+                raise JobQueueFull(f"{active} analysis jobs already queued or running")
+            job = AnalysisJob(query, mode, output, profile)
+            self._jobs[job.id] = job
+
+        self._save(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def exists(self, job_id: str) -> bool:
+        """Whether any worker knows the job."""
+        with self._changed:
+            if job_id in self._jobs:
+                return True
+        return self.store.exists(job_id)
+
+    def snapshot(self, job_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.snapshot(since)
+        doc = self.store.load(job_id)
+        return snapshot_from_document(doc, since) if doc else None
+
+    def wait_for_events(self, job_id: str, since: int, timeout: float = 15.0) -> Optional[Dict[str, Any]]:
+        """Block until the job has events after `since`, finishes, or timeout passes."""
+        with self._changed:
+            if job_id in self._jobs:
+                self._changed.wait_for(
+                    lambda: job_id not in self._jobs
+                    or len(self._jobs[job_id].events) > since
+                    or self._jobs[job_id].status in (DONE, FAILED),
+                    timeout=timeout,
+                )
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    return job.snapshot(since)
+
+        # Owned by another worker: re-read the shared store until something changes
+        deadline = time.monotonic() + timeout
+        while True:
+            doc = self.store.load(job_id)
+            if doc is None:
+                return None
+            snapshot = snapshot_from_document(doc, since)
+            if snapshot["events"] or snapshot["status"] in (DONE, FAILED) or time.monotonic() >= deadline:
+                return snapshot
+            time.sleep(min(ANALYSIS_JOB_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+
+    def _save(self, job: AnalysisJob, event: Optional[Dict[str, Any]] = None) -> None:
+        """Write the job to the shared store: copied under the lock, written outside it."""
+        with self._changed:
+            doc = job.document(with_events=event is None)
+        self.store.save(doc, _storable(event) if event is not None else None)
+
+    def _record(self, job: AnalysisJob, stage: str, payload: Dict[str, Any]) -> None:
+        event = {"stage": stage, "at": round(time.time() - job.created_at, 3), "data": payload}
+        with self._changed:
+            job.stage = stage
+            job.events.append(event)
+            if payload.get("charts"):
+                job.result["charts"].update(payload["charts"])
+            if payload.get("images"):
+                job.result["images"].update(payload["images"])
+            for key in ("metrics", "best_params", "analysis"):
+                if key in payload:
+                    job.result[key] = payload[key]
+            self._changed.notify_all()
+        self._save(job, event)
+
+    def _run(self, job: AnalysisJob) -> None:
+        with self._changed:
+            job.status = RUNNING
+            self._changed.notify_all()
+        self._save(job)
+
+        try:
+            # Imported by the first job (LangChain, LangGraph and the models are slow to import)
+            from agent.stock_agent import StockAgent
+            agent = StockAgent(mode=job.mode, output=job.output, profile=job.profile)
+            analysis = agent.process_user_input(job.query, on_event=lambda stage, payload: self._record(job, stage, payload))
+            with self._changed:
+                job.result["analysis"] = analysis
+                job.result["render_timings"] = agent.state.get("render_timings", {})
+                job.result["stage_timings"] = agent.state.get("stage_timings", {})
+                job.result["parse_path"] = agent.state.get("parse_path")
+                job.error = agent.state.get("error")
+                job.status = FAILED if job.error else DONE
+        except Exception as e:
+            with self._changed:
+                job.error = str(e)
+                job.status = FAILED
+        finally:
+            with self._changed:
+                job.finished_at = time.time()
+                self._changed.notify_all()
+            self._save(job)
+
+    def _expire(self) -> None:
+        """Drop finished jobs older than the TTL (caller holds the lock)."""
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+# Global job manager
+analysis_jobs = AnalysisJobManager()
@@ -1,7 +1,7 @@
 import os
 import sys
 from pathlib import Path
-from typing import TypedDict, Annotated, Sequence, Dict
+from typing import TypedDict, Annotated, Sequence, Dict, Callable, Optional
 
 # Add project root to path
 project_root = str(Path(__file__).parent.parent)
@@ -9,6 +9,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from dotenv import load_dotenv
+from startup import lazy_resource
+from metrics import timed
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -18,10 +20,15 @@ from langgraph.graph import StateGraph, END
 from mlmodels.stock_data import StockData
 from mlmodels.stock_model_holdout import StockModelHoldout
 from mlmodels.stock_hyperopt import StockHyperopt
+from mlmodels.chart_renderer import chart_renderer
+from mlmodels.stage_graph import Stage, run_stage_graph, fit_holdout, fit_forecast, FORECAST_TRIAL_WORKERS
+from mlmodels.analysis_profiles import (
+    ANALYSIS_PROFILES, ANALYSIS_PROFILE_NAMES, DEFAULT_PROFILE, FORECAST_MODES, CHART_OUTPUTS, PIPELINE_STAGES,
+    get_profile, training_data
+)
 
-import matplotlib
-matplotlib.use('Agg') # Crucial for server-side plotting
 from datetime import datetime, timedelta
+from functools import lru_cache
 import re
 
 # Load environment variables
@@ -37,13 +44,42 @@ class AgentState(TypedDict):
     error: str | None
     # CHANGE: Now stores a dictionary of multiple images
     images: Dict[str, str] 
+    # Chart data (downsampled series / histogram bins) keyed like images
+    charts: Dict[str, dict]
+    # Forecasting mode: "prophet" (Prophet + hyperopt) or "fast" (NumPy models)
+    mode: str
+    # Chart output: "data" (compact series) or "png" (base64 images)
+    output: str
+    # Cost profile name (see mlmodels.analysis_profiles): "fast", "standard" or "deep"
+    profile: str
+    # Seconds spent rendering each PNG chart
+    render_timings: Dict[str, float]
+    # Start/end/seconds of each pipeline stage (relative to the pipeline start)
+    stage_timings: Dict[str, dict]
+    # Optional progress callback: on_event(stage, payload)
+    on_event: Optional[Callable[[str, dict], None]]
+    # How the query was parsed: "local" (ticker maps + date patterns) or "llm"
+    parse_path: str | None
 
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    google_api_key=os.getenv("GEMINI_API_KEY"), 
-    temperature=0.7
-)
+# How each chart is described to the summary LLM
+CHART_DESCRIPTIONS = {
+    "price_history": "Closing Price History (Trend)",
+    "daily_returns": "Daily Returns Distribution (Volatility)",
+    "holdout_pred": "Validation Model (Actual vs Predicted)",
+    "future_forecast": "Future Forecast"
+}
+
+# Initialize LLM on first use: the client holds connections, so a pre-fork
+# master must not create it (see startup.preload)
+@lazy_resource("stock_agent_llm", "Stock agent LLM (gemini-2.0-flash)", fork_safe=False)
+def llm_resource():
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        google_api_key=os.getenv("GEMINI_API_KEY"), 
+        temperature=0.7
+    )
+
+llm = llm_resource.proxy()
 
 # Date parsing utility (Unchanged)
 def parse_relative_date(date_str: str) -> str:
@@ -68,6 +104,105 @@ def parse_relative_date(date_str: str) -> str:
     except ValueError:
         return today.strftime('%Y-%m-%d')
 
+# --- Local query parsing (no LLM call for the common cases) ---
+
+# Explicit symbols: RELIANCE.NS, TCS.BO, ^NSEI
+_SYMBOL_RE = re.compile(r'(?<![\w^])(\^[A-Za-z]{3,}|[A-Za-z0-9&-]+\.(?:NS|BO|ns|bo))(?![\w.])')
+_ISO_DATE_RE = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')
+# "last 5 years", "past 6 months", "for 90 days", "2 years ago"
+_PERIOD_RE = re.compile(r'\b(?:last|past|previous|over|for)\s+(\d+)\s+(year|month|day)s?\b'
+                        r'|\b(\d+)\s+(year|month|day)s?\s+ago\b', re.IGNORECASE)
+_SINCE_YEAR_RE = re.compile(r'\b(?:since|from)\s+((?:19|20)\d{2})\b(?!-)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _known_tickers():
+    """
+    Company name -> ticker map built from the advisor's and the tools' ticker
+    tables (ticker_map.py, plus each bare NSE symbol), and one regex matching
+    any name as a whole phrase, longest names first.
+    """
+    from ticker_map import TICKER_OVERRIDE, INDIAN_STOCK_MAP
+
+    names = dict(INDIAN_STOCK_MAP)
+    names.update(TICKER_OVERRIDE)
+    for ticker in list(names.values()):
+        if ticker.endswith('.NS'):
+            names.setdefault(ticker[:-3].lower(), ticker)
+
+    alternatives = '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return names, re.compile(rf'(?<![\w&]){"(?:" + alternatives + ")"}(?![\w&])', re.IGNORECASE)
+
+
+def _resolve_company(text: str) -> str | None:
+    """
+    The one ticker the text names, or None when it names none or several.
+
+    A name that is also an everyday word ("hero", "persistent") only counts
+    when written as the exact symbol (HERO is not one, PERSISTENT is), so
+    "my hero stock" goes to the LLM instead of resolving to HEROMOTOCO.NS.
+    """
+    from ticker_map import COMMON_WORD_NAMES
+
+    names, pattern = _known_tickers()
+    candidates = set()
+    for match in pattern.finditer(text):
+        name, ticker = match.group(0), names[match.group(0).lower()]
+        if name.lower() in COMMON_WORD_NAMES and name != ticker.split('.')[0]:
+            continue
+        candidates.add(ticker)
+    return candidates.pop() if len(candidates) == 1 else None
+
+
+def parse_query_locally(text: str) -> Dict[str, str] | None:
+    """
+    Resolve ticker and date range from the query without the LLM.
+
+    Tries an explicit symbol first, then the known company names; a name is
+    only used when it is unambiguous (see _resolve_company). Dates come
+    from ISO dates in the text or relative phrases ("last 2 years",
+    "6 months ago", "since 2021"); defaults are 3 years ago .. today.
+
+    Returns:
+        dict with ticker, start_date, end_date (YYYY-MM-DD), or None when no
+        single symbol could be resolved (the caller then asks the LLM)
+    """
+    match = _SYMBOL_RE.search(text)
+    ticker = match.group(1).upper() if match else _resolve_company(text)
+    if not ticker:
+        return None
+
+    start_date, end_date = "3 years ago", "today"
+    dates = _ISO_DATE_RE.findall(text)
+    period = _PERIOD_RE.search(text)
+    since = _SINCE_YEAR_RE.search(text)
+    if dates:
+        start_date = dates[0]
+        if len(dates) > 1:
+            end_date = dates[1]
+    elif period:
+        count = period.group(1) or period.group(3)
+        unit = (period.group(2) or period.group(4)).lower()
+        start_date = f"{count} {unit}s ago"
+    elif since:
+        start_date = f"{since.group(1)}-01-01"
+
+    return {
+        "ticker": ticker,
+        "start_date": parse_relative_date(start_date),
+        "end_date": parse_relative_date(end_date)
+    }
+
+def _emit(state: AgentState, stage: str, **payload) -> None:
+    """Report a finished stage (with any partial results) to the progress callback."""
+    callback = state.get("on_event")
+    if callback is None:
+        return
+    try:
+        callback(stage, payload)
+    except Exception as e:
+        print(f"Progress callback failed at {stage}: {str(e)}")
+
 # --- 2. NODES ---
 
 def extract_stock_info(state: AgentState) -> AgentState:
@@ -79,20 +214,31 @@ def extract_stock_info(state: AgentState) -> AgentState:
         state["images"] = {}
         state["error"] = None
 
-        response = llm.invoke([
-            HumanMessage(content=f"""Extract the stock ticker symbol and date range from: "{last_message}"
+        parsed = parse_query_locally(last_message)
+        if parsed:
+            state["parse_path"] = "local"
+            print(f"Parsed query locally: {parsed}")
+            state["stock_data"] = StockData(parsed["ticker"], parsed["start_date"], parsed["end_date"])
+            with timed("market_data", "download"):
+                state["stock_data"].fetch_closing_prices()
+            return state
+
+        state["parse_path"] = "llm"
+        with timed("llm", "stock_agent_parse"):
+            response = llm.invoke([
+                HumanMessage(content=f"""Extract the stock ticker symbol and date range from: "{last_message}"
             
-            IMPORTANT RULES FOR INDIAN STOCKS:
-            - Convert company names to their NSE ticker symbol ending in '.NS'.
-            - Example: "Reliance" -> "RELIANCE.NS", "Tata Motors" -> "TATAMOTORS.NS".
+                IMPORTANT RULES FOR INDIAN STOCKS:
+                - Convert company names to their NSE ticker symbol ending in '.NS'.
+                - Example: "Reliance" -> "RELIANCE.NS", "Tata Motors" -> "TATAMOTORS.NS".
             
-            Return format:
-            TICKER: [ticker]
-            START_DATE: [start_date]
-            END_DATE: [end_date]
+                Return format:
+                TICKER: [ticker]
+                START_DATE: [start_date]
+                END_DATE: [end_date]
             
-            Defaults: start_date = 3 years ago, end_date = today""")
-        ])
+                Defaults: start_date = 3 years ago, end_date = today""")
+            ])
         
         info = {}
         for line in response.content.split('\n'):
@@ -107,7 +253,8 @@ def extract_stock_info(state: AgentState) -> AgentState:
         if ticker:
             state["stock_data"] = StockData(ticker, start_date, end_date)
             # Fetch data immediately to fail fast if invalid
-            state["stock_data"].fetch_closing_prices()
+            with timed("market_data", "download"):
+                state["stock_data"].fetch_closing_prices()
             
         return state
     except Exception as e:
@@ -117,10 +264,14 @@ def extract_stock_info(state: AgentState) -> AgentState:
 
 def run_full_pipeline(state: AgentState) -> AgentState:
     """
-    Runs the complete analysis pipeline sequentially:
-    1. Historical Analysis (2 Images)
-    2. Holdout Validation (1 Image + Metrics)
-    3. Hyperopt Forecast (1 Image + Best Params)
+    Runs the complete analysis pipeline as a dependency graph:
+    1. Historical Analysis (2 Images)          <- data
+    2. Holdout Validation (1 Image + Metrics)  <- data (fit in a worker process)
+    3. Hyperopt Forecast (1 Image + Best Params) <- data (trials in parallel on the trial pool)
+    The three branches run in parallel; charts render on threads as soon as
+    their fit is done, and everything is merged into the state at the end.
+    The state's profile sets the search budget, interval samples, training
+    resolution, horizon and which charts are produced.
     """
     try:
         if not state["stock_data"] or state["stock_data"].dataframe is None:
@@ -129,33 +280,87 @@ def run_full_pipeline(state: AgentState) -> AgentState:
 
         print(f"Starting pipeline for {state['stock_data'].ticker}...")
 
-        # --- STEP 1: HISTORICAL DATA (2 IMAGES) ---
-        # Image 1: Price History
-        state["images"]["price_history"] = state["stock_data"].get_price_plot()
-        # Image 2: Daily Returns
-        state["images"]["daily_returns"] = state["stock_data"].get_returns_plot()
-        
-        # --- STEP 2: HOLDOUT VALIDATION (1 IMAGE) ---
-        holdout = StockModelHoldout(state["stock_data"])
-        metrics = holdout.run_analysis() # Train/Test split analysis
+        stock_data = state["stock_data"]
+        png_output = state.get("output") == "png"
+        fast_mode = state.get("mode") == "fast"
+        profile = get_profile(state.get("profile"))
+        state["charts"] = {}
+
+        # Prophet trains on weekly closes for long ranges; charts keep the daily data
+        fit_data = stock_data if fast_mode else training_data(stock_data, profile)
+
+        def history_charts():
+            wanted = [name for name in ("price_history", "daily_returns") if name in profile.charts]
+            if png_output:
+                specs = {
+                    "price_history": stock_data.price_chart_spec,
+                    "daily_returns": stock_data.returns_chart_spec
+                }
+                return chart_renderer.render_many({name: specs[name]() for name in wanted})
+            series = {
+                "price_history": stock_data.get_price_series,
+                "daily_returns": stock_data.get_returns_histogram
+            }
+            return {name: series[name]() for name in wanted}, {}
+
+        def model_chart(name):
+            def build(model):
+                if name not in profile.charts:
+                    return {}, {}
+                if png_output:
+                    return chart_renderer.render_many({name: model.forecast_chart_spec()})
+                return {name: model.forecast_series()}, {}
+            return build
+
+        # NumPy fits take milliseconds; only Prophet fits are worth a process hop
+        fit_kind = "thread" if fast_mode else "process"
+        # The holdout fit only feeds the holdout chart and its metrics; profiles without that chart skip it
+        run_holdout = "holdout_pred" in profile.charts
+        stages = {"history": Stage(history_charts)}
+        if run_holdout:
+            stages["holdout_fit"] = Stage(fit_holdout, kind=fit_kind, args=(fit_data, fast_mode, profile))
+        # Search skipped if the registry has this data; its trials fan out to the trial pool from a thread
+        stages["forecast_fit"] = Stage(fit_forecast, args=(fit_data, fast_mode, profile.max_evals, profile, FORECAST_TRIAL_WORKERS))
+        if run_holdout:
+            stages["holdout_chart"] = Stage(model_chart("holdout_pred"), deps=("holdout_fit",))
+        stages["forecast_chart"] = Stage(model_chart("future_forecast"), deps=("forecast_fit",))
+
+        def merge(name, result, results):
+            # Runs in this thread as each stage finishes
+            if name.endswith("_fit"):
+                return
+            charts, timings = result
+            (state["images"] if png_output else state["charts"]).update(charts)
+            state["render_timings"].update(timings)
+            partial = {"images": dict(charts)} if png_output else {"charts": dict(charts)}
+            if name == "history":
+                _emit(state, "fetched", ticker=stock_data.ticker, rows=len(stock_data.dataframe),
+                      training_rows=len(fit_data.dataframe), resolution=fit_data.resolution, **partial)
+                if not run_holdout:
+                    _emit(state, "holdout_done", metrics=None, skipped=True)
+            elif name == "holdout_chart":
+                metrics = results["holdout_fit"].metrics
+                _emit(state, "holdout_done", metrics={k: float(v) for k, v in metrics.items()}, **partial)
+            elif name == "forecast_chart":
+                _emit(state, "forecast_done", best_params=results["forecast_fit"].best_params, **partial)
+
+        results, stage_timings = run_stage_graph(stages, on_done=merge)
+
+        holdout = results.get("holdout_fit")
+        hyperopt = results["forecast_fit"]
+        metrics = holdout.metrics if holdout is not None else {}
+        best_params = hyperopt.best_params
         state["holdout_model"] = holdout
-        # Image 3: Actual vs Predicted
-        state["images"]["holdout_pred"] = holdout.visualize_forecast()
-        
-        # --- STEP 3: HYPEROPT FORECAST (1 IMAGE) ---
-        hyperopt = StockHyperopt(state["stock_data"])
-        # Run optimization (max_evals=10 for speed on web)
-        best_params = hyperopt.run_analysis(max_evals=10) 
         state["hyperopt_model"] = hyperopt
-        # Image 4: Future Forecast
-        state["images"]["future_forecast"] = hyperopt.visualize_forecast()
+        state["stage_timings"] = stage_timings
 
         # Save technical details for the LLM to summarize
-        metrics_str = ", ".join([f"{k}: {v:.4f}" for k, v in metrics.items()])
+        metrics_str = ", ".join([f"{k}: {v:.4f}" for k, v in metrics.items()]) or f"not run ({profile.name} profile)"
         state["last_action"] = (
-            f"Successfully generated 4 charts.\n"
+            f"Successfully generated {len(profile.charts)} charts ({profile.name} profile).\n"
             f"Validation Metrics: {metrics_str}\n"
-            f"Optimized Params: {best_params}"
+            f"Optimized Params: {best_params}\n"
+            f"Forecast Horizon: {profile.horizon_days} days ({fit_data.resolution} training data)"
         )
         print("Pipeline completed successfully.")
         
@@ -175,15 +380,21 @@ def generate_summary(state: AgentState) -> AgentState:
             response_text = f"I encountered an error during the analysis: {state['error']}. Please check the ticker symbol and try again."
         else:
             ticker = state["stock_data"].ticker
+            profile = get_profile(state.get("profile"))
+            chart_list = "\n            ".join(
+                f"{i}. {CHART_DESCRIPTIONS[name]}" for i, name in enumerate(profile.charts, 1)
+            )
+            validation_point = (
+                "2. Explains the validation metrics (RMSE/MAE) - is the model trustworthy?"
+                if state.get("holdout_model") is not None
+                else "2. Notes that this quick analysis skipped holdout validation, so accuracy is unmeasured."
+            )
             # Rich context for the LLM
             context = f"""
             You have successfully analyzed {ticker} for the Indian Market.
             
-            The system has generated 4 visual charts for the user:
-            1. Closing Price History (Trend)
-            2. Daily Returns Distribution (Volatility)
-            3. Validation Model (Actual vs Predicted)
-            4. Future Forecast (Next Year Prediction)
+            The system has generated {len(profile.charts)} visual charts for the user:
+            {chart_list}
             
             Technical Data:
             {state['last_action']}
@@ -192,18 +403,21 @@ def generate_summary(state: AgentState) -> AgentState:
             
             Please provide a structured summary (plain text, no markdown) that:
             1. Summarizes the historical trend and volatility.
-            2. Explains the validation metrics (RMSE/MAE) - is the model trustworthy?
+            {validation_point}
             3. Interprets the future forecast direction.
             4. Ends with a neutral disclaimer that this is AI-generated analysis, not financial advice.
             """
             
-            response = llm.invoke([HumanMessage(content=context)])
+            with timed("llm", "stock_agent_summary"):
+                response = llm.invoke([HumanMessage(content=context)])
             response_text = response.content
 
         state["messages"].append(AIMessage(content=response_text))
+        _emit(state, "summary_done", analysis=response_text)
         return state
     except Exception as e:
         state["messages"].append(AIMessage(content=f"Error generating summary: {str(e)}"))
+        _emit(state, "summary_done", analysis=state["messages"][-1].content)
         return state
 
 # --- 3. GRAPH SETUP (LINEAR PIPELINE) ---
@@ -224,7 +438,12 @@ workflow.set_entry_point("extract_info")
 app = workflow.compile()
 
 class StockAgent:
-    def __init__(self):
+    def __init__(self, mode="prophet", output="data", profile=DEFAULT_PROFILE):
+        if mode not in FORECAST_MODES:
+            raise ValueError(f"Unknown forecasting mode '{mode}'. Use one of: {', '.join(FORECAST_MODES)}")
+        if output not in CHART_OUTPUTS:
+            raise ValueError(f"Unknown chart output '{output}'. Use one of: {', '.join(CHART_OUTPUTS)}")
+        get_profile(profile)
         self.state = {
             "messages": [],
             "stock_data": None,
@@ -232,12 +451,29 @@ class StockAgent:
             "hyperopt_model": None,
             "last_action": None,
             "error": None,
-            "images": {} # Initialize empty dict for images
+            "images": {}, # Initialize empty dict for images
+            "charts": {},
+            "mode": mode,
+            "output": output,
+            "profile": profile,
+            "render_timings": {},
+            "stage_timings": {},
+            "on_event": None,
+            "parse_path": None
         }
         
-    def process_user_input(self, user_input: str) -> str:
+    def process_user_input(self, user_input: str, on_event=None) -> str:
+        """
+        Run the full pipeline for one query.
+
+        Args:
+            user_input: Natural-language request ("Forecast Reliance")
+            on_event: Optional callback(stage, payload) called as each of
+                PIPELINE_STAGES finishes, with that stage's partial results
+        """
         try:
             self.state["messages"] = [HumanMessage(content=user_input)]
+            self.state["on_event"] = on_event
             # Invoke the graph
             result_state = app.invoke(self.state)
             
@@ -254,4 +490,4 @@ if __name__ == "__main__":
     print("Running test...")
     response = agent.process_user_input("Forecast Reliance")
     print("\nResponse:", response)
-    print("\nImages generated:", list(agent.state["images"].keys()))
\ No newline at end of file
+    print("\nCharts generated:", list(agent.state["charts"].keys()))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Watchlist (multi-ticker) analysis.
+
+One batched price download, fits spread across the pipeline process pool,
+a compact per-ticker table and a single LLM summary for the whole list.
+"""
+
+import time
+from typing import Any, Dict, List
+
+from metrics import timed
+from mlmodels.analysis_profiles import FORECAST_MODES
+
+# Upper bound on symbols per request
+MAX_WATCHLIST_SYMBOLS = 50
+
+
+def _table_text(rows: List[Dict[str, Any]]) -> str:
+    """Plain-text table for the LLM prompt."""
+    lines = []
+    for row in rows:
+        forecast = ", ".join(f"{p['days']}d: {p['yhat']} ({p['change_pct']:+.2f}%)" for p in row["forecast"])
+        lines.append(
+            f"{row['ticker']}: last close {row['last_close']} on {row['last_date']}; "
+            f"validation RMSE {row['metrics'].get('RMSE')}, R2 {row['metrics'].get('R2')}; forecast {forecast}"
+        )
+    return "\n".join(lines)
+
+
+def summarize_watchlist(rows: List[Dict[str, Any]]) -> str:
+    """One LLM summary covering every ticker in the table."""
+    from langchain_core.messages import HumanMessage
+    from agent.stock_agent import llm
+
+    context = f"""
+    You have analyzed a watchlist of {len(rows)} stocks for the Indian Market.
+
+    Per-ticker results (validation metrics and model forecasts):
+    {_table_text(rows)}
+
+    Please provide a structured summary (plain text, no markdown) that:
+    1. Compares the forecast direction and size of move across the watchlist.
+    2. Flags tickers whose validation metrics make the forecast less trustworthy.
+    3. Ends with a neutral disclaimer that this is AI-generated analysis, not financial advice.
+    """
+    with timed("llm", "watchlist_summary"):
+        response = llm.invoke([HumanMessage(content=context)])
+    return response.content
+
+
+def analyze_watchlist(symbols: List[str], start_date: str = "3 years ago", end_date: str = "today",
+                      mode: str = "fast", summarize: bool = True, max_evals: int = 10) -> Dict[str, Any]:
+    """
+    Analyze several tickers in one pass.
+
+    Args:
+        symbols: Ticker symbols (bare NSE symbols get '.NS' if needed)
+        start_date / end_date: YYYY-MM-DD or relative ("3 years ago", "today")
+        mode: "fast" (NumPy models) or "prophet"
+        summarize: Add one LLM summary for the whole table
+        max_evals: Hyperopt budget per ticker in prophet mode
+
+    Returns:
+        dict: {table, failed, summary, timings}
+    """
+    if mode not in FORECAST_MODES:
+        raise ValueError(f"Unknown forecasting mode '{mode}'. Use one of: {', '.join(FORECAST_MODES)}")
+    if not symbols or len(symbols) > MAX_WATCHLIST_SYMBOLS:
+        raise ValueError(f"Provide between 1 and {MAX_WATCHLIST_SYMBOLS} symbols")
+
+    from agent.stock_agent import parse_relative_date
+    from mlmodels.stock_data import StockData
+    from mlmodels.batch_forecast import forecast_watchlist
+
+    timings = {}
+    start = time.perf_counter()
+    with timed("market_data", "download_batch"):
+        stocks, failed = StockData.fetch_many(symbols, parse_relative_date(start_date), parse_relative_date(end_date))
+    timings["download"] = round(time.perf_counter() - start, 3)
+
+    rows, fit_failed, fit_seconds = forecast_watchlist(stocks, mode=mode, max_evals=max_evals)
+    failed.update(fit_failed)
+    timings["fit"] = round(fit_seconds, 3)
+
+    # Keep the caller's order
+    table = [rows[t] for t in dict.fromkeys(s.upper().strip() for s in symbols) if t in rows]
+
+    summary = None
+    if summarize and table:
+        start = time.perf_counter()
+        try:
+            summary = summarize_watchlist(table)
+        except Exception as e:
+            print(f"Watchlist summary failed: {str(e)}")
+        timings["summary"] = round(time.perf_counter() - start, 3)
+
+    return {"table": table, "failed": failed, "summary": summary, "timings": timings}
@@ -27,58 +27,69 @@ from datetime import datetime
 # NEW IMPORTS FOR ENHANCED FUNCTIONALITY & FALLBACKS
 # =========================================================
 
-# new: yfinance for real-time price fetching and Flask JSON helper (used by app.py later)
-import yfinance as yf
+# new: Flask JSON helper (used by app.py later); yfinance is imported by fetch_stock_price_by_symbol
 import re
 from flask import jsonify  # only imported here so app.py code snippet can call helper if needed
 
 # =========================================================
 # Third-party imports
 from dotenv import load_dotenv
+from startup import lazy_resource
+from metrics import timed
 
 # ---------- LangChain imports (updated for 1.x) ----------
 # We attempt to import the modern 1.x APIs first, and gracefully fallback when necessary.
+# Deferred to the first agent build (_import_agent_api): LangChain takes seconds to import.
 create_tool_calling_agent = None
-try:
-    # Preferred in many 1.x setups
-    from langchain.agents import create_tool_calling_agent  # type: ignore
-    # if import succeeded, keep it
-    create_tool_calling_agent = create_tool_calling_agent
-except Exception:
-    # Some installations might provide slightly different helpers or have them in experimental modules
+AgentExecutor = None
+ChatPromptTemplate = None
+
+
+def _import_agent_api():
+    """Import the LangChain agent helpers into the module globals (first call only)."""
+    global create_tool_calling_agent, AgentExecutor, ChatPromptTemplate
+    if ChatPromptTemplate is not None:
+        return
+
     try:
-        from langchain.agents import ToolCallingAgent, create_tool_calling_agent  # type: ignore
+        # Preferred in many 1.x setups
+        from langchain.agents import create_tool_calling_agent  # type: ignore
+        # if import succeeded, keep it
         create_tool_calling_agent = create_tool_calling_agent
     except Exception:
+        # Some installations might provide slightly different helpers or have them in experimental modules
         try:
-            # older transitional location
-            from langchain_experimental.agents import create_tool_calling_agent  # type: ignore
+            from langchain.agents import ToolCallingAgent, create_tool_calling_agent  # type: ignore
             create_tool_calling_agent = create_tool_calling_agent
         except Exception:
-            # final fallback: None (we'll handle agent creation failure later)
-            create_tool_calling_agent = None
-
-# AgentExecutor from langchain_core.agents is present in your environment per logs
-try:
-    from langchain_core.agents import AgentExecutor  # type: ignore
-except Exception:
-    # fallback to langchain.agents (rare)
+            try:
+                # older transitional location
+                from langchain_experimental.agents import create_tool_calling_agent  # type: ignore
+                create_tool_calling_agent = create_tool_calling_agent
+            except Exception:
+                # final fallback: None (we'll handle agent creation failure later)
+                create_tool_calling_agent = None
+
+    # AgentExecutor from langchain_core.agents is present in your environment per logs
     try:
-        from langchain.agents import AgentExecutor  # type: ignore
+        from langchain_core.agents import AgentExecutor  # type: ignore
     except Exception:
-        AgentExecutor = None  # will handle later
+        # fallback to langchain.agents (rare)
+        try:
+            from langchain.agents import AgentExecutor  # type: ignore
+        except Exception:
+            AgentExecutor = None  # will handle later
 
-# For prompt building in 1.x
-ChatPromptTemplate = None
-try:
-    from langchain_core.prompts import ChatPromptTemplate  # type: ignore
-    ChatPromptTemplate = ChatPromptTemplate
-except Exception:
+    # For prompt building in 1.x
     try:
-        from langchain.prompts import ChatPromptTemplate  # type: ignore
+        from langchain_core.prompts import ChatPromptTemplate  # type: ignore
         ChatPromptTemplate = ChatPromptTemplate
     except Exception:
-        ChatPromptTemplate = None
+        try:
+            from langchain.prompts import ChatPromptTemplate  # type: ignore
+            ChatPromptTemplate = ChatPromptTemplate
+        except Exception:
+            ChatPromptTemplate = None
 
 # Suppress warnings (LEGACY)
 warnings.filterwarnings("ignore")
@@ -90,26 +101,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import ChatGroq for Groq integration
-try:
-    from langchain_groq import ChatGroq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
-    logger.warning("langchain_groq not available")
-
-# Import HuggingFace for fallback
-try:
-    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
-    HF_AVAILABLE = True
-except ImportError:
+# LLM provider integrations, imported by the first initialize_llm_with_fallback() call
+ChatGroq = None
+ChatHuggingFace = None
+HuggingFaceEndpoint = None
+GROQ_AVAILABLE = None
+HF_AVAILABLE = None
+
+
+def _import_providers():
+    """Import the Groq and HuggingFace LangChain integrations (first call only)."""
+    global ChatGroq, ChatHuggingFace, HuggingFaceEndpoint, GROQ_AVAILABLE, HF_AVAILABLE
+    if GROQ_AVAILABLE is not None:
+        return
+
+    # Import ChatGroq for Groq integration
     try:
-        from langchain_community.chat_models.huggingface import ChatHuggingFace
-        from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+        from langchain_groq import ChatGroq
+        GROQ_AVAILABLE = True
+    except ImportError:
+        GROQ_AVAILABLE = False
+        logger.warning("langchain_groq not available")
+
+    # Import HuggingFace for fallback
+    try:
+        from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
         HF_AVAILABLE = True
     except ImportError:
-        logger.warning("langchain_huggingface not available")
-        HF_AVAILABLE = False
+        try:
+            from langchain_community.chat_models.huggingface import ChatHuggingFace
+            from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+            HF_AVAILABLE = True
+        except ImportError:
+            logger.warning("langchain_huggingface not available")
+            HF_AVAILABLE = False
 
 # Load environment variables (LEGACY)
 load_dotenv()
@@ -142,6 +167,7 @@ def initialize_llm_with_fallback(temperature: float = 1, max_tokens: int = 2048,
     Automatically maps Groq model names to HuggingFace equivalents.
     """
     global ACTIVE_LLM_PROVIDER, ACTIVE_API_KEY, ACTIVE_KEY_INDEX
+    _import_providers()
 
     # MODEL MAPPING: Groq name → HuggingFace name
     groq_to_hf_model_map = {
@@ -235,18 +261,23 @@ def get_active_provider_info() -> Dict[str, Any]:
 
 # ==================== CONFIGURATION ====================
 
-# Initialize LLMs with fallback logic
-try:
+# Chat LLM with fallback logic, initialized on first use (the provider probe
+# makes a live call, so it must not run at import)
+@lazy_resource("advisor_chat_llm", "Advisor chat LLM (llama-3.3-70b, provider probe)", fork_safe=False)
+def chat_llm_resource():
     logger.info("Initializing chat LLM with fallback logic...")
-    groq_chat_llm = initialize_llm_with_fallback(
+    llm = initialize_llm_with_fallback(
         temperature=1, 
         max_tokens=2048, 
         model_override="llama-3.3-70b-versatile"  # Optimized for financial advice
     )
     logger.info(f"Chat LLM configured successfully using {ACTIVE_LLM_PROVIDER} (key #{ACTIVE_KEY_INDEX})")
-except Exception as e:
-    logger.error(f"Failed to configure any LLM provider: {e}")
-    raise
+    return llm
+
+
+def get_chat_llm():
+    """The advisor chat LLM (raises if no provider can be initialized)."""
+    return chat_llm_resource.get()
 
 # ==================== FINANCIAL ADVISOR CONFIGURATION ====================
 
@@ -543,174 +574,8 @@ def initialize_tools():
 # STOCK PRICE / TICKER HELPERS - NEW FUNCTION ADDED TO SHOW REAL-TIME PRICE FETCHING
 # =====================================================================================
 
-# Minimal company name -> ticker mapping. Extend this in production.
-# Comprehensive company name -> ticker mapping for Indian market
-_TICKER_OVERRIDE = {
-    # Major Indices
-    "nifty": "^NSEI",
-    "nifty 50": "^NSEI",
-    "sensex": "^BSESN",
-    "bse sensex": "^BSESN",
-    "bank nifty": "^NSEBANK",
-    "nifty bank": "^NSEBANK",
-    "nifty it": "^CNXIT",
-    "nifty pharma": "^CNXPHARMA",
-    "nifty auto": "^CNXAUTO",
-    
-    # Top 10 by Market Cap
-    "reliance": "RELIANCE.NS",
-    "reliance industries": "RELIANCE.NS",
-    "tcs": "TCS.NS",
-    "tata consultancy services": "TCS.NS",
-    "hdfc bank": "HDFCBANK.NS",
-    "hdfcbank": "HDFCBANK.NS",
-    "icici bank": "ICICIBANK.NS",
-    "icicibank": "ICICIBANK.NS",
-    "infosys": "INFY.NS",
-    "infy": "INFY.NS",
-    "bharti airtel": "BHARTIARTL.NS",
-    "airtel": "BHARTIARTL.NS",
-    "itc": "ITC.NS",
-    "sbi": "SBIN.NS",
-    "state bank": "SBIN.NS",
-    "state bank of india": "SBIN.NS",
-    "hindustan unilever": "HINDUNILVR.NS",
-    "hul": "HINDUNILVR.NS",
-    "larsen": "LT.NS",
-    "l&t": "LT.NS",
-    "larsen and toubro": "LT.NS",
-    
-    # Adani Group
-    "adani green": "ADANIGREEN.NS",
-    "adani green energy": "ADANIGREEN.NS",
-    "adani enterprises": "ADANIENT.NS",
-    "adani ports": "ADANIPORTS.NS",
-    "adani power": "ADANIPOWER.NS",
-    "adani transmission": "ADANITRANS.NS",
-    "adani total gas": "ATGL.NS",
-    
-    # Tata Group
-    "tata steel": "TATASTEEL.NS",
-    "tata motors": "TATAMOTORS.NS",
-    "tata power": "TATAPOWER.NS",
-    "tcs": "TCS.NS",
-    "titan": "TITAN.NS",
-    "titan company": "TITAN.NS",
-    "tata consumer": "TATACONSUM.NS",
-    
-    # IT Sector
-    "wipro": "WIPRO.NS",
-    "hcl tech": "HCLTECH.NS",
-    "hcl technologies": "HCLTECH.NS",
-    "tech mahindra": "TECHM.NS",
-    "ltimindtree": "LTIM.NS",
-    "persistent": "PERSISTENT.NS",
-    "coforge": "COFORGE.NS",
-    
-    # Banking & Finance
-    "axis bank": "AXISBANK.NS",
-    "kotak bank": "KOTAKBANK.NS",
-    "kotak mahindra": "KOTAKBANK.NS",
-    "indusind bank": "INDUSINDBK.NS",
-    "yes bank": "YESBANK.NS",
-    "idfc first bank": "IDFCFIRSTB.NS",
-    "bandhan bank": "BANDHANBNK.NS",
-    "bajaj finance": "BAJFINANCE.NS",
-    "bajaj finserv": "BAJAJFINSV.NS",
-    "sbi life": "SBILIFE.NS",
-    "hdfc life": "HDFCLIFE.NS",
-    "icici lombard": "ICICIGI.NS",
-    "icici prudential": "ICICIPRULI.NS",
-    
-    # Automobile
-    "maruti": "MARUTI.NS",
-    "maruti suzuki": "MARUTI.NS",
-    "mahindra": "M&M.NS",
-    "m&m": "M&M.NS",
-    "mahindra and mahindra": "M&M.NS",
-    "bajaj auto": "BAJAJ-AUTO.NS",
-    "hero motocorp": "HEROMOTOCO.NS",
-    "hero": "HEROMOTOCO.NS",
-    "tata motors": "TATAMOTORS.NS",
-    "eicher motors": "EICHERMOT.NS",
-    "tvs motor": "TVSMOTOR.NS",
-    
-    # Pharma
-    "sun pharma": "SUNPHARMA.NS",
-    "sun pharmaceutical": "SUNPHARMA.NS",
-    "dr reddy": "DRREDDY.NS",
-    "dr reddys": "DRREDDY.NS",
-    "cipla": "CIPLA.NS",
-    "divi's lab": "DIVISLAB.NS",
-    "divis laboratories": "DIVISLAB.NS",
-    "biocon": "BIOCON.NS",
-    "lupin": "LUPIN.NS",
-    "aurobindo pharma": "AUROPHARMA.NS",
-    "torrent pharma": "TORNTPHARM.NS",
-    
-    # FMCG & Consumer
-    "britannia": "BRITANNIA.NS",
-    "nestle": "NESTLEIND.NS",
-    "nestle india": "NESTLEIND.NS",
-    "dabur": "DABUR.NS",
-    "godrej consumer": "GODREJCP.NS",
-    "marico": "MARICO.NS",
-    "colgate": "COLPAL.NS",
-    "colgate palmolive": "COLPAL.NS",
-    
-    # Metals & Mining
-    "hindalco": "HINDALCO.NS",
-    "vedanta": "VEDL.NS",
-    "jindal steel": "JINDALSTEL.NS",
-    "jsw steel": "JSWSTEEL.NS",
-    "coal india": "COALINDIA.NS",
-    "nmdc": "NMDC.NS",
-    
-    # Energy & Power
-    "ntpc": "NTPC.NS",
-    "power grid": "POWERGRID.NS",
-    "ongc": "ONGC.NS",
-    "oil and natural gas": "ONGC.NS",
-    "ioc": "IOC.NS",
-    "indian oil": "IOC.NS",
-    "bpcl": "BPCL.NS",
-    "bharat petroleum": "BPCL.NS",
-    "gail": "GAIL.NS",
-    
-    # Telecom & Tech
-    "bharti airtel": "BHARTIARTL.NS",
-    "vodafone idea": "IDEA.NS",
-    "vi": "IDEA.NS",
-    
-    # Retail & E-commerce
-    "dmart": "DMART.NS",
-    "avenue supermarts": "DMART.NS",
-    "trent": "TRENT.NS",
-    
-    # Cement
-    "ultratech cement": "ULTRACEMCO.NS",
-    "ultratech": "ULTRACEMCO.NS",
-    "ambuja cement": "AMBUJACEM.NS",
-    "acc cement": "ACC.NS",
-    "shree cement": "SHREECEM.NS",
-    
-    # Paints
-    "asian paints": "ASIANPAINT.NS",
-    "berger paints": "BERGEPAINT.NS",
-    
-    # Real Estate
-    "dlf": "DLF.NS",
-    "godrej properties": "GODREJPROP.NS",
-    "oberoi realty": "OBEROIRLTY.NS",
-    
-    # Others
-    "pidilite": "PIDILITIND.NS",
-    "pidilite industries": "PIDILITIND.NS",
-    "siemens": "SIEMENS.NS",
-    "bosch": "BOSCHLTD.NS",
-    "havells": "HAVELLS.NS",
-    "voltas": "VOLTAS.NS",
-}
+# Company name -> ticker mapping for the Indian market (ticker_map.py)
+from ticker_map import TICKER_OVERRIDE as _TICKER_OVERRIDE
 
 
 def resolve_ticker(query: str) -> str:
@@ -768,6 +633,7 @@ def is_compound_query(query: str) -> bool:
     return False
 
 
+@timed("market_data", "quote")
 def fetch_stock_price_by_symbol(symbol: str) -> Dict[str, Any]:
     """
     Use yfinance to fetch the latest price and some metadata for a given symbol.
@@ -777,6 +643,7 @@ def fetch_stock_price_by_symbol(symbol: str) -> Dict[str, Any]:
         if not symbol:
             raise ValueError("Empty symbol")
 
+        import yfinance as yf
         t = yf.Ticker(symbol)
         # Try to get realtime-ish market price
         info = {}
@@ -833,21 +700,6 @@ def fetch_stock_price_by_symbol(symbol: str) -> Dict[str, Any]:
 
 
 
-# Initialize LLM for ReAct agent with fallback (UPDATED)
-try:
-    logger.info("Initializing ReAct agent LLM with fallback logic...")
-    react_llm = initialize_llm_with_fallback(
-        temperature=0, 
-        max_tokens=1024,
-        model_override="llama-3.1-8b-instant"  # Fast model for tool execution
-    )
-    logger.info(f"ReAct LLM configured successfully using {ACTIVE_LLM_PROVIDER}")
-except Exception as e:
-    logger.error(f"Failed to configure ReAct LLM: {e}")
-    react_llm = None
-
-# Initialize tools (LEGACY)
-tools = initialize_tools()
 # ---------------------------
 # Register / wrap get_current_price tool (D + B)
 # ---------------------------
@@ -906,7 +758,7 @@ tools = initialize_tools()
 # The tool is now properly defined in mytools.py with @tool decorator
 # No need for wrapper - just ensure it's imported correctly
 
-def validate_tools_loaded():
+def validate_tools_loaded(tools):
     """Validate that critical financial tools are loaded"""
     tool_names = []
     for t in tools or []:
@@ -928,11 +780,6 @@ def validate_tools_loaded():
     logger.info(f"✅ All critical financial tools loaded: {tool_names}")
     return True
 
-# Validate tool loading
-if tools:
-    validate_tools_loaded()
-else:
-    logger.error("❌ No tools loaded! Agent will not function properly.")
 
 
 
@@ -943,392 +790,456 @@ else:
 # ===============================================================================================================================
 
 # Create ReAct / Tool-calling agent (robust & backward-compatible)
-agent_executor = None
-
-if react_llm:
-    try:
-        prompt_template = get_react_prompt_template()
+def _build_agent_executor(react_llm, tools):
+    """
+    Build the research agent for react_llm and tools: a LangChain agent
+    when a factory works in this LangChain version, otherwise the
+    MinimalToolAgent adapter. Returns None if no agent can be built.
+    """
+    agent_executor = None
+    _import_agent_api()
 
-        # Build ChatPromptTemplate if available
-        if ChatPromptTemplate is not None:
-            try:
-                prompt_text = prompt_template.template if hasattr(prompt_template, "template") else str(prompt_template)
-            except Exception:
-                prompt_text = str(prompt_template)
+    if react_llm:
+        try:
+            prompt_template = get_react_prompt_template()
 
-            try:
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", prompt_text),
-                    ("user", "{input}"),
-                    ("placeholder", "{agent_scratchpad}")
-                ])
-            except Exception:
-                # If ChatPromptTemplate.from_messages signature differs, fallback to raw prompt text
-                prompt = prompt_text
-        else:
-            prompt = prompt_template
+            # Build ChatPromptTemplate if available
+            if ChatPromptTemplate is not None:
+                try:
+                    prompt_text = prompt_template.template if hasattr(prompt_template, "template") else str(prompt_template)
+                except Exception:
+                    prompt_text = str(prompt_template)
 
-        react_agent = None
-        created_by = None
+                try:
+                    prompt = ChatPromptTemplate.from_messages([
+                        ("system", prompt_text),
+                        ("user", "{input}"),
+                        ("placeholder", "{agent_scratchpad}")
+                    ])
+                except Exception:
+                    # If ChatPromptTemplate.from_messages signature differs, fallback to raw prompt text
+                    prompt = prompt_text
+            else:
+                prompt = prompt_template
 
-        # --- Attempt 1: initialize_agent from common locations ---
-        initialize_agent_fn = None
-        for mod_path in ("langchain.agents", "langchain_core.agents", "langchain.agents.agent"):
-            try:
-                mod = __import__(mod_path, fromlist=["initialize_agent"])
-                initialize_agent_fn = getattr(mod, "initialize_agent")
-                if initialize_agent_fn:
-                    created_by = f"{mod_path}.initialize_agent"
-                    break
-            except Exception:
-                continue
+            react_agent = None
+            created_by = None
 
-        if initialize_agent_fn:
-            try:
-                # prefer AgentType from whichever module provides it
-                AgentTypeObj = None
-                for mod_path in ("langchain.agents", "langchain_core.agents", "langchain.agents.agent"):
-                    try:
-                        mod = __import__(mod_path, fromlist=["AgentType"])
-                        AgentTypeObj = getattr(mod, "AgentType")
+            # --- Attempt 1: initialize_agent from common locations ---
+            initialize_agent_fn = None
+            for mod_path in ("langchain.agents", "langchain_core.agents", "langchain.agents.agent"):
+                try:
+                    mod = __import__(mod_path, fromlist=["initialize_agent"])
+                    initialize_agent_fn = getattr(mod, "initialize_agent")
+                    if initialize_agent_fn:
+                        created_by = f"{mod_path}.initialize_agent"
                         break
-                    except Exception:
-                        continue
+                except Exception:
+                    continue
 
-                if AgentTypeObj is not None:
-                    react_agent = initialize_agent_fn(
-                        tools=tools,
-                        llm=react_llm,
-                        agent=AgentTypeObj.ZERO_SHOT_REACT_DESCRIPTION,
-                        verbose=True,
-                        handle_parsing_errors=True,
-                        max_iterations=5,
-                        early_stopping_method="generate",
-                        agent_kwargs={"system_message": prompt} if isinstance(prompt, str) else {"system_message": str(prompt)}
-                    )
-                else:
-                    # If AgentType not found, call initialize_agent with common kwargs and hope for the best
-                    react_agent = initialize_agent_fn(
-                        tools=tools,
-                        llm=react_llm,
-                        verbose=True,
-                        handle_parsing_errors=True,
-                        max_iterations=5,
-                    )
-                logger.info(f"✅ Created ReAct agent using {created_by}")
-            except Exception as e:
-                logger.warning(f"{created_by} call failed: {e}")
-                react_agent = None
-
-        # --- Attempt 2: try legacy or alternate helpers (many names in different versions) ---
-        if react_agent is None:
-            for try_name in ("create_react_agent", "create_tool_calling_agent", "create_structured_chat_agent"):
+            if initialize_agent_fn:
                 try:
-                    for mod_path in ("langchain.agents", "langchain_experimental.agents", "langchain.agents.agent", "langchain.experimental.agents"):
+                    # prefer AgentType from whichever module provides it
+                    AgentTypeObj = None
+                    for mod_path in ("langchain.agents", "langchain_core.agents", "langchain.agents.agent"):
                         try:
-                            mod = __import__(mod_path, fromlist=[try_name])
-                            fn = getattr(mod, try_name)
-                            # try both keyword and positional call variants
-                            try:
-                                react_agent = fn(llm=react_llm, tools=tools, prompt=prompt)
-                            except TypeError:
-                                react_agent = fn(react_llm, tools, prompt)
-                            created_by = f"{mod_path}.{try_name}"
-                            logger.info(f"✅ Created ReAct agent using {created_by}")
+                            mod = __import__(mod_path, fromlist=["AgentType"])
+                            AgentTypeObj = getattr(mod, "AgentType")
                             break
                         except Exception:
                             continue
-                    if react_agent:
-                        break
-                except Exception:
-                    continue
 
-        # --- If a react_agent object was created, try to wrap / adapt it to be an executor ---
-        if react_agent is not None:
-            # Many LC versions return an AgentExecutor-like object directly; use it as-is.
-            agent_executor = react_agent
-            logger.info("✅ Tool-calling agent initialized successfully (using detected agent object)")
-        else:
-            # --- FINAL FALLBACK: Build a small, safe tool-calling adapter that won't crash the app ---
-            # This fallback provides minimal tool-calling by matching tool names in the user query.
-            logger.warning("All agent factories failed. Falling back to minimal tool-calling adapter.")
+                    if AgentTypeObj is not None:
+                        react_agent = initialize_agent_fn(
+                            tools=tools,
+                            llm=react_llm,
+                            agent=AgentTypeObj.ZERO_SHOT_REACT_DESCRIPTION,
+                            verbose=True,
+                            handle_parsing_errors=True,
+                            max_iterations=5,
+                            early_stopping_method="generate",
+                            agent_kwargs={"system_message": prompt} if isinstance(prompt, str) else {"system_message": str(prompt)}
+                        )
+                    else:
+                        # If AgentType not found, call initialize_agent with common kwargs and hope for the best
+                        react_agent = initialize_agent_fn(
+                            tools=tools,
+                            llm=react_llm,
+                            verbose=True,
+                            handle_parsing_errors=True,
+                            max_iterations=5,
+                        )
+                    logger.info(f"✅ Created ReAct agent using {created_by}")
+                except Exception as e:
+                    logger.warning(f"{created_by} call failed: {e}")
+                    react_agent = None
 
-            # Build a name -> callable mapping from tools (they might be bare functions or Tool-like)
-            tool_map = {}
-            for t in tools or []:
-                try:
-                    # If it's a LangChain Tool object with .name and .run
-                    name = getattr(t, "name", None) or getattr(t, "__name__", None) or str(t)
-                    call_fn = getattr(t, "run", None) or t
-                    tool_map[name.lower()] = call_fn
-                except Exception:
-                    continue
+            # --- Attempt 2: try legacy or alternate helpers (many names in different versions) ---
+            if react_agent is None:
+                for try_name in ("create_react_agent", "create_tool_calling_agent", "create_structured_chat_agent"):
+                    try:
+                        for mod_path in ("langchain.agents", "langchain_experimental.agents", "langchain.agents.agent", "langchain.experimental.agents"):
+                            try:
+                                mod = __import__(mod_path, fromlist=[try_name])
+                                fn = getattr(mod, try_name)
+                                # try both keyword and positional call variants
+                                try:
+                                    react_agent = fn(llm=react_llm, tools=tools, prompt=prompt)
+                                except TypeError:
+                                    react_agent = fn(react_llm, tools, prompt)
+                                created_by = f"{mod_path}.{try_name}"
+                                logger.info(f"✅ Created ReAct agent using {created_by}")
+                                break
+                            except Exception:
+                                continue
+                        if react_agent:
+                            break
+                    except Exception:
+                        continue
+
+            # --- If a react_agent object was created, try to wrap / adapt it to be an executor ---
+            if react_agent is not None:
+                # Many LC versions return an AgentExecutor-like object directly; use it as-is.
+                agent_executor = react_agent
+                logger.info("✅ Tool-calling agent initialized successfully (using detected agent object)")
+            else:
+                # --- FINAL FALLBACK: Build a small, safe tool-calling adapter that won't crash the app ---
+                # This fallback provides minimal tool-calling by matching tool names in the user query.
+                logger.warning("All agent factories failed. Falling back to minimal tool-calling adapter.")
+
+                # Build a name -> callable mapping from tools (they might be bare functions or Tool-like)
+                tool_map = {}
+                for t in tools or []:
+                    try:
+                        # If it's a LangChain Tool object with .name and .run
+                        name = getattr(t, "name", None) or getattr(t, "__name__", None) or str(t)
+                        call_fn = getattr(t, "run", None) or t
+                        tool_map[name.lower()] = call_fn
+                    except Exception:
+                        continue
 
-            class MinimalToolAgent:
-                """
-                A minimal adapter that implements .invoke and .run so existing call-sites work.
-                Heuristic behavior:
-                - If query mentions a tool name, call that tool with the whole query (or extracted argument).
-                - Otherwise, ask the LLM (react_llm) to answer directly (no tools).
-                """
-                def __init__(self, llm, tools_map, default_prompt=None):
-                    self.llm = llm
-                    self.tools_map = tools_map
-                    self.default_prompt = default_prompt
-
-                # def _find_tool_for_query(self, query_text: str):
-                #     q = query_text.lower()
-                #     # exact name match or contained name (prefers longer names)
-                #     best = None
-                #     for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
-                #         if name in q:
-                #             best = name
-                #             break
-                #     return best
-
-                # =============================================================
-                # ENHANCED TOOL FINDING WITH HEURISTICS
-                # =============================================================
-
-                # def _find_tool_for_query(self, query_text: str):
-                #     q = query_text.lower()
-                #     # exact name match or contained name (prefers longer names)
-                #     best = None
-                #     for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
-                #         if name in q:
-                #             best = name
-                #             break
-                #     # Additional heuristic: if user asks about 'price', 'current price', 'trading at', map to get_current_price
-                #     if not best:
-                #         if re.search(r'\b(price|current price|trading at|cmp|share price|stock price)\b', q):
-                #             # prefer tool named like get_current_price if available
-                #             for candidate in ("get_current_price", "current_price", "price", "price_lookup"):
-                #                 if candidate in self.tools_map:
-                #                     best = candidate
-                #                     break
-                #             # final fallback: if wrapper function added without specific name, attempt to find a callable that returns dict with 'price'
-                #             if not best:
-                #                 for nm, fn in self.tools_map.items():
-                #                     try:
-                #                         # quick probe: don't actually call, but match name heuristics
-                #                         if "price" in nm:
-                #                             best = nm
-                #                             break
-                #                     except Exception:
-                #                         continue
-                #     return best
-
-
-
-
-                # ==============================================================================================================================================================================
-                # CHANGING THAT FUNCTION AGAIN 
-                # ==============================================================================================================================================================================
-                def _find_tool_for_query(self, query_text: str):
-                    """Enhanced tool matching with better heuristics"""
-                    q = query_text.lower()
+                class MinimalToolAgent:
+                    """
+                    A minimal adapter that implements .invoke and .run so existing call-sites work.
+                    Heuristic behavior:
+                    - If query mentions a tool name, call that tool with the whole query (or extracted argument).
+                    - Otherwise, ask the LLM (react_llm) to answer directly (no tools).
+                    """
+                    def __init__(self, llm, tools_map, default_prompt=None):
+                        self.llm = llm
+                        self.tools_map = tools_map
+                        self.default_prompt = default_prompt
+
+                    # def _find_tool_for_query(self, query_text: str):
+                    #     q = query_text.lower()
+                    #     # exact name match or contained name (prefers longer names)
+                    #     best = None
+                    #     for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
+                    #         if name in q:
+                    #             best = name
+                    #             break
+                    #     return best
+
+                    # =============================================================
+                    # ENHANCED TOOL FINDING WITH HEURISTICS
+                    # =============================================================
+
+                    # def _find_tool_for_query(self, query_text: str):
+                    #     q = query_text.lower()
+                    #     # exact name match or contained name (prefers longer names)
+                    #     best = None
+                    #     for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
+                    #         if name in q:
+                    #             best = name
+                    #             break
+                    #     # Additional heuristic: if user asks about 'price', 'current price', 'trading at', map to get_current_price
+                    #     if not best:
+                    #         if re.search(r'\b(price|current price|trading at|cmp|share price|stock price)\b', q):
+                    #             # prefer tool named like get_current_price if available
+                    #             for candidate in ("get_current_price", "current_price", "price", "price_lookup"):
+                    #                 if candidate in self.tools_map:
+                    #                     best = candidate
+                    #                     break
+                    #             # final fallback: if wrapper function added without specific name, attempt to find a callable that returns dict with 'price'
+                    #             if not best:
+                    #                 for nm, fn in self.tools_map.items():
+                    #                     try:
+                    #                         # quick probe: don't actually call, but match name heuristics
+                    #                         if "price" in nm:
+                    #                             best = nm
+                    #                             break
+                    #                     except Exception:
+                    #                         continue
+                    #     return best
+
+
+
+
+                    # ==============================================================================================================================================================================
+                    # CHANGING THAT FUNCTION AGAIN 
+                    # ==============================================================================================================================================================================
+                    def _find_tool_for_query(self, query_text: str):
+                        """Enhanced tool matching with better heuristics"""
+                        q = query_text.lower()
     
-                    # Priority 1: Exact or substring match
-                    for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
-                        if name in q:
-                            return name
+                        # Priority 1: Exact or substring match
+                        for name in sorted(self.tools_map.keys(), key=lambda x: -len(x)):
+                            if name in q:
+                                return name
     
-                    # Priority 2: Keyword-based heuristics for price queries
-                    price_keywords = [
-                    r'\b(current price|price|trading at|cmp|share price|stock price|trading price)\b',
-                    r'\b(sensex|nifty|index)\b',
-                    r'\b(how much|what.*price|price.*of)\b'
-                    ]
+                        # Priority 2: Keyword-based heuristics for price queries
+                        price_keywords = [
+                        r'\b(current price|price|trading at|cmp|share price|stock price|trading price)\b',
+                        r'\b(sensex|nifty|index)\b',
+                        r'\b(how much|what.*price|price.*of)\b'
+                        ]
     
-                    import re
-                    for pattern in price_keywords:
-                        if re.search(pattern, q):
-                            for candidate in ["get_current_price", "current_price", "get_price"]:
+                        import re
+                        for pattern in price_keywords:
+                            if re.search(pattern, q):
+                                for candidate in ["get_current_price", "current_price", "get_price"]:
+                                    if candidate in self.tools_map:
+                                        logger.info(f"Matched '{candidate}' tool via keyword pattern: {pattern}")
+                                        return candidate
+    
+                        # Priority 3: Historical data queries
+                        if re.search(r'\b(historical|history|past|previous|last.*days)\b', q):
+                            for candidate in ["get_historical_price", "historical_price"]:
                                 if candidate in self.tools_map:
-                                    logger.info(f"Matched '{candidate}' tool via keyword pattern: {pattern}")
                                     return candidate
     
-                    # Priority 3: Historical data queries
-                    if re.search(r'\b(historical|history|past|previous|last.*days)\b', q):
-                        for candidate in ["get_historical_price", "historical_price"]:
-                            if candidate in self.tools_map:
-                                return candidate
-    
-                    # Priority 4: Company info queries
-                    if re.search(r'\b(info|information|details|about.*company)\b', q):
-                        for candidate in ["get_company_info", "company_info"]:
-                            if candidate in self.tools_map:
-                                return candidate
+                        # Priority 4: Company info queries
+                        if re.search(r'\b(info|information|details|about.*company)\b', q):
+                            for candidate in ["get_company_info", "company_info"]:
+                                if candidate in self.tools_map:
+                                    return candidate
     
-                    return None
-
-                # ===================================================================================================================================================
-                # NEW METHOD ADDED HERE TO IMPROVE TOOL MATCHING
-                # ===================================================================================================================================================
-                def _extract_financial_entity(self, query_text: str) -> str:
-                    """
-                    Extract company/index name from natural language query (English + Hinglish)
-                    Enhanced with better cleanup and edge case handling
-                    """
-                    import re
+                        return None
+
+                    # ===================================================================================================================================================
+                    # NEW METHOD ADDED HERE TO IMPROVE TOOL MATCHING
+                    # ===================================================================================================================================================
+                    def _extract_financial_entity(self, query_text: str) -> str:
+                        """
+                        Extract company/index name from natural language query (English + Hinglish)
+                        Enhanced with better cleanup and edge case handling
+                        """
+                        import re
     
-                    query = query_text.lower().strip()
+                        query = query_text.lower().strip()
     
-                    # Handle empty/very short queries
-                    if not query or len(query) < 3:
-                        return query_text.strip()
+                        # Handle empty/very short queries
+                        if not query or len(query) < 3:
+                            return query_text.strip()
     
-                    entity = None
+                        entity = None
     
-                    # Pattern 1: "price of X" or "price for X"
-                    match = re.search(r'price\s+(?:of|for)\s+(.+?)(?:\?|$)', query, re.IGNORECASE)
-                    if match:
-                        entity = match.group(1).strip()
-                        if entity and len(entity) > 2:
-                            return entity
+                        # Pattern 1: "price of X" or "price for X"
+                        match = re.search(r'price\s+(?:of|for)\s+(.+?)(?:\?|$)', query, re.IGNORECASE)
+                        if match:
+                            entity = match.group(1).strip()
+                            if entity and len(entity) > 2:
+                                return entity
     
-                    # Pattern 2 ENHANCED: "X stock price" with cleanup
-                    match = re.search(r'(.+?)\s+(?:stock|share)\s+price', query, re.IGNORECASE)
-                    if match:
-                        entity = match.group(1).strip()
-                        # Remove common question/command words from the start
-                        entity = re.sub(r'^(what is|tell me|get me|show me|give me|batao|bataiye)\s+', '', entity, flags=re.IGNORECASE).strip()
-                        if entity and len(entity) > 2:
-                            return entity
+                        # Pattern 2 ENHANCED: "X stock price" with cleanup
+                        match = re.search(r'(.+?)\s+(?:stock|share)\s+price', query, re.IGNORECASE)
+                        if match:
+                            entity = match.group(1).strip()
+                            # Remove common question/command words from the start
+                            entity = re.sub(r'^(what is|tell me|get me|show me|give me|batao|bataiye)\s+', '', entity, flags=re.IGNORECASE).strip()
+                            if entity and len(entity) > 2:
+                                return entity
     
-                    # Pattern 3: "sensex value" or "nifty points" (explicit financial terms)
-                    match = re.search(r'(sensex|nifty\s*\d*|nifty bank|bank nifty)\s+(?:value|points?|level|trading)', query, re.IGNORECASE)
-                    if match:
-                        return match.group(1).strip()
+                        # Pattern 3: "sensex value" or "nifty points" (explicit financial terms)
+                        match = re.search(r'(sensex|nifty\s*\d*|nifty bank|bank nifty)\s+(?:value|points?|level|trading)', query, re.IGNORECASE)
+                        if match:
+                            return match.group(1).strip()
     
-                    # Pattern 4 STRICT: Sensex/Nifty with price-intent check
-                    sensex_nifty_match = re.search(r'\b(sensex|nifty\s*\d*|bank\s*nifty|nifty\s*bank)\b', query, re.IGNORECASE)
-                    if sensex_nifty_match:
-                        index_name = sensex_nifty_match.group(1).strip()
+                        # Pattern 4 STRICT: Sensex/Nifty with price-intent check
+                        sensex_nifty_match = re.search(r'\b(sensex|nifty\s*\d*|bank\s*nifty|nifty\s*bank)\b', query, re.IGNORECASE)
+                        if sensex_nifty_match:
+                            index_name = sensex_nifty_match.group(1).strip()
         
-                        price_intent_keywords = [
-                            r'\b(today|current|now|latest|aaj|abhi)\b',
-                            r'\b(kitna|kitne|how much|what is|kya hai)\b',
-                            r'\b(tell me|give me|show me|batao|dikha|bataiye)\b',
-                            r'\b(at|trading|right now|currently)\b'
-                        ]
+                            price_intent_keywords = [
+                                r'\b(today|current|now|latest|aaj|abhi)\b',
+                                r'\b(kitna|kitne|how much|what is|kya hai)\b',
+                                r'\b(tell me|give me|show me|batao|dikha|bataiye)\b',
+                                r'\b(at|trading|right now|currently)\b'
+                            ]
         
-                        has_price_intent = any(re.search(pattern, query, re.IGNORECASE) for pattern in price_intent_keywords)
+                            has_price_intent = any(re.search(pattern, query, re.IGNORECASE) for pattern in price_intent_keywords)
         
-                        if has_price_intent:
-                            return index_name
+                            if has_price_intent:
+                                return index_name
     
-                    # # Pattern 5: Hinglish "X ka price" etc.
-                    # match = re.search(r'(.+?)\s+(?:ka|ki|ke)\s+(?:price|share|stock|value)', query, re.IGNORECASE)
-                    # if match:
-                    #     entity = match.group(1).strip()
-                    #     entity = re.sub(r'\b(kya|hai|batao|bataiye|dijiye|mujhe|aaj|abhi|current|please)\b', '', entity, flags=re.IGNORECASE).strip()
-                    #     if entity and len(entity) > 2:
-                    #         return entity
-                    # Pattern 5 EXPANDED: Hinglish "X ka price/rating/etc."
-                    match = re.search(r'(.+?)\s+(?:ka|ki|ke)\s+(?:price|share|stock|value|rating|performance|analysis)', query, re.IGNORECASE)
-                    if match:
-                        entity = match.group(1).strip()
-                        entity = re.sub(r'\b(kya|hai|batao|bataiye|dijiye|mujhe|aaj|abhi|current|please|bhi|de)\b', '', entity, flags=re.IGNORECASE).strip()
-                        if entity and len(entity) > 2:
-                            return entity
+                        # # Pattern 5: Hinglish "X ka price" etc.
+                        # match = re.search(r'(.+?)\s+(?:ka|ki|ke)\s+(?:price|share|stock|value)', query, re.IGNORECASE)
+                        # if match:
+                        #     entity = match.group(1).strip()
+                        #     entity = re.sub(r'\b(kya|hai|batao|bataiye|dijiye|mujhe|aaj|abhi|current|please)\b', '', entity, flags=re.IGNORECASE).strip()
+                        #     if entity and len(entity) > 2:
+                        #         return entity
+                        # Pattern 5 EXPANDED: Hinglish "X ka price/rating/etc."
+                        match = re.search(r'(.+?)\s+(?:ka|ki|ke)\s+(?:price|share|stock|value|rating|performance|analysis)', query, re.IGNORECASE)
+                        if match:
+                            entity = match.group(1).strip()
+                            entity = re.sub(r'\b(kya|hai|batao|bataiye|dijiye|mujhe|aaj|abhi|current|please|bhi|de)\b', '', entity, flags=re.IGNORECASE).strip()
+                            if entity and len(entity) > 2:
+                                return entity
 
     
-                    # Pattern 6: Hinglish "X kitna hai"
-                    match = re.search(r'(.+?)\s+(?:kitna|kitne)\s+(?:hai|points?|par hai)', query, re.IGNORECASE)
-                    if match:
-                        entity = match.group(1).strip()
-                        entity = re.sub(r'\b(aaj|abhi|current|kya|today)\b', '', entity, flags=re.IGNORECASE).strip()
-                        if entity and len(entity) > 2:
-                            return entity
+                        # Pattern 6: Hinglish "X kitna hai"
+                        match = re.search(r'(.+?)\s+(?:kitna|kitne)\s+(?:hai|points?|par hai)', query, re.IGNORECASE)
+                        if match:
+                            entity = match.group(1).strip()
+                            entity = re.sub(r'\b(aaj|abhi|current|kya|today)\b', '', entity, flags=re.IGNORECASE).strip()
+                            if entity and len(entity) > 2:
+                                return entity
     
-                    # Pattern 7 NEW: "X trading at" or "X is trading"
-                    match = re.search(r'(.+?)\s+(?:is\s+)?trading\s+(?:at|for)', query, re.IGNORECASE)
-                    if match:
-                        entity = match.group(1).strip()
-                        entity = re.sub(r'^(how much|what|is|the)\s+', '', entity, flags=re.IGNORECASE).strip()
-                        if entity and len(entity) > 2:
-                            return entity
+                        # Pattern 7 NEW: "X trading at" or "X is trading"
+                        match = re.search(r'(.+?)\s+(?:is\s+)?trading\s+(?:at|for)', query, re.IGNORECASE)
+                        if match:
+                            entity = match.group(1).strip()
+                            entity = re.sub(r'^(how much|what|is|the)\s+', '', entity, flags=re.IGNORECASE).strip()
+                            if entity and len(entity) > 2:
+                                return entity
     
-                    # Pattern 8: General cleanup (last resort)
-                    entity = re.sub(r'\b(what|is|the|current|stock|share|price|of|for|today\'?s?|value|today|tell me|give me|show me|get me|how much)\b', 
-                                    '', query, flags=re.IGNORECASE).strip()
-                    entity = re.sub(r'\?', '', entity).strip()
+                        # Pattern 8: General cleanup (last resort)
+                        entity = re.sub(r'\b(what|is|the|current|stock|share|price|of|for|today\'?s?|value|today|tell me|give me|show me|get me|how much)\b', 
+                                        '', query, flags=re.IGNORECASE).strip()
+                        entity = re.sub(r'\?', '', entity).strip()
     
-                    # Final cleanup: remove extra spaces
-                    entity = re.sub(r'\s+', ' ', entity).strip()
+                        # Final cleanup: remove extra spaces
+                        entity = re.sub(r'\s+', ' ', entity).strip()
     
-                    if entity and len(entity) > 2:
-                        return entity
+                        if entity and len(entity) > 2:
+                            return entity
     
-                    # Ultimate fallback
-                    return query_text.strip()
+                        # Ultimate fallback
+                        return query_text.strip()
 
-                def invoke(self, payload):
-                    # accept {'input': "..."} or a list of messages (compat)
-                    try:
-                        if isinstance(payload, dict) and "input" in payload:
-                            query_text = payload["input"]
-                        elif isinstance(payload, (list, tuple)):
-                            # try to convert list messages to a single text
-                            query_text = " ".join([m.content if hasattr(m, "content") else str(m) for m in payload])
-                        else:
-                            query_text = str(payload)
-                    except Exception:
-                        query_text = str(payload)
-
-                    # tool_name = self._find_tool_for_query(query_text)
-                    # if tool_name:
-                    #     fn = self.tools_map.get(tool_name)
-                    #     try:
-                    #         # Call tool function; many tools accept a single string argument
-                    #         result = fn(query_text)
-
-                    # ============================================================================================================
-                    # REPLACED THIS TOO
-                    # ============================================================================================================
-
-                    tool_name = self._find_tool_for_query(query_text)
-                    if tool_name:
-                        fn = self.tools_map.get(tool_name)
+                    def invoke(self, payload):
+                        # accept {'input': "..."} or a list of messages (compat)
                         try:
-                            # ✅ Extract entity for price/financial tools
-                            if tool_name in ["get_current_price", "get_company_info"]:
-                                entity = self._extract_financial_entity(query_text)
-                                logger.info(f"Calling {tool_name} with extracted entity: '{entity}'")
-                                result = fn(entity)
+                            if isinstance(payload, dict) and "input" in payload:
+                                query_text = payload["input"]
+                            elif isinstance(payload, (list, tuple)):
+                                # try to convert list messages to a single text
+                                query_text = " ".join([m.content if hasattr(m, "content") else str(m) for m in payload])
                             else:
-                                # For other tools, pass full query
-                                result = fn(query_text)
+                                query_text = str(payload)
+                        except Exception:
+                            query_text = str(payload)
+
+                        # tool_name = self._find_tool_for_query(query_text)
+                        # if tool_name:
+                        #     fn = self.tools_map.get(tool_name)
+                        #     try:
+                        #         # Call tool function; many tools accept a single string argument
+                        #         result = fn(query_text)
 
-                        except TypeError:
+                        # ============================================================================================================
+                        # REPLACED THIS TOO
+                        # ============================================================================================================
+
+                        tool_name = self._find_tool_for_query(query_text)
+                        if tool_name:
+                            fn = self.tools_map.get(tool_name)
                             try:
-                                result = fn(query_text, None)
+                                # ✅ Extract entity for price/financial tools
+                                if tool_name in ["get_current_price", "get_company_info"]:
+                                    entity = self._extract_financial_entity(query_text)
+                                    logger.info(f"Calling {tool_name} with extracted entity: '{entity}'")
+                                    result = fn(entity)
+                                else:
+                                    # For other tools, pass full query
+                                    result = fn(query_text)
+
+                            except TypeError:
+                                try:
+                                    result = fn(query_text, None)
+                                except Exception as e:
+                                    result = f"Tool call failed: {e}"
+                            return {"output": str(result), "intermediate_steps": [(tool_name, str(result))]}
+                        else:
+                            # fallback: ask the LLM
+                            try:
+                                from langchain_core.messages import HumanMessage
+                                resp = self.llm.invoke([HumanMessage(content=query_text)])
+                                text = getattr(resp, "content", str(resp))
+                                return {"output": str(text), "intermediate_steps": []}
                             except Exception as e:
-                                result = f"Tool call failed: {e}"
-                        return {"output": str(result), "intermediate_steps": [(tool_name, str(result))]}
-                    else:
-                        # fallback: ask the LLM
-                        try:
-                            from langchain_core.messages import HumanMessage
-                            resp = self.llm.invoke([HumanMessage(content=query_text)])
-                            text = getattr(resp, "content", str(resp))
-                            return {"output": str(text), "intermediate_steps": []}
-                        except Exception as e:
-                            return {"output": f"LLM fallback failed: {e}", "intermediate_steps": []}
+                                return {"output": f"LLM fallback failed: {e}", "intermediate_steps": []}
+
+                    def run(self, query_text: str):
+                        return self.invoke({"input": query_text}).get("output", "")
+
+                agent_executor = MinimalToolAgent(react_llm, tool_map, default_prompt=prompt)
+                logger.info("✅ Minimal tool-calling adapter initialized as agent_executor (fallback)")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize tool-calling/ReAct agent: {e}")
+            logger.info("Agent features will be disabled (agent_executor = None) but chat remains available.")
+            agent_executor = None
+    else:
+        logger.warning("ReAct LLM not available, agent will not be initialized")
+    return agent_executor
+
+
+# LangChain integrations and tools hold no connections, so the pre-fork master
+# builds them once for every worker (startup.preload)
+@lazy_resource("langchain_integrations", "LangChain provider and agent modules (import only)")
+def langchain_integrations_resource():
+    _import_providers()
+    _import_agent_api()
+    return {"groq": GROQ_AVAILABLE, "huggingface": HF_AVAILABLE}
 
-                def run(self, query_text: str):
-                    return self.invoke({"input": query_text}).get("output", "")
 
-            agent_executor = MinimalToolAgent(react_llm, tool_map, default_prompt=prompt)
-            logger.info("✅ Minimal tool-calling adapter initialized as agent_executor (fallback)")
+@lazy_resource("advisor_tools", "Research agent tools (tools/mytools.py)")
+def advisor_tools_resource():
+    tools = initialize_tools()
+    if not tools:
+        # Raised so the import is retried (LazyResource retry window) instead of caching no tools
+        raise RuntimeError("No tools could be imported from tools/mytools.py")
+    validate_tools_loaded(tools)
+    return tools
 
+
+@lazy_resource("advisor_agent", "Research agent: ReAct LLM (llama-3.1-8b, provider probe), executor", fork_safe=False)
+def agent_executor_resource():
+    # Initialize LLM for ReAct agent with fallback (UPDATED)
+    logger.info("Initializing ReAct agent LLM with fallback logic...")
+    react_llm = initialize_llm_with_fallback(
+        temperature=0, 
+        max_tokens=1024,
+        model_override="llama-3.1-8b-instant"  # Fast model for tool execution
+    )
+    logger.info(f"ReAct LLM configured successfully using {ACTIVE_LLM_PROVIDER}")
+
+    try:
+        tools = advisor_tools_resource.get()
+    except Exception:
+        logger.error("❌ No tools loaded! Agent will not function properly.")
+        tools = []
+    return _build_agent_executor(react_llm, tools)
+
+
+def get_agent_executor():
+    """The research agent, or None while it cannot be initialized (research is then skipped)."""
+    try:
+        return agent_executor_resource.get()
     except Exception as e:
-        logger.error(f"Failed to initialize tool-calling/ReAct agent: {e}")
-        logger.info("Agent features will be disabled (agent_executor = None) but chat remains available.")
-        agent_executor = None
-else:
-    logger.warning("ReAct LLM not available, agent will not be initialized")
+        logger.error(f"Failed to configure ReAct LLM: {e}")
+        return None
+
+
+def __getattr__(name):
+    # Module attributes that used to be built at import time
+    if name == "groq_chat_llm":
+        return get_chat_llm()
+    if name == "agent_executor":
+        return get_agent_executor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ==================== CORE ADVISOR FUNCTIONS (ENHANCED) ====================
 
@@ -1341,7 +1252,8 @@ def _invoke_agent_executor(agent_exec, user_query: str) -> Dict[str, Any]:
         # Preferred: agent_executor.invoke accepts a dict input in new API
         if hasattr(agent_exec, "invoke"):
             # Some AgentExecutors return structured objects; normalize to dict
-            raw = agent_exec.invoke({"input": user_query})
+            with timed("llm", "advisor_agent"):
+                raw = agent_exec.invoke({"input": user_query})
             # If raw is a string, normalize
             if isinstance(raw, str):
                 return {"output": raw, "intermediate_steps": []}
@@ -1373,6 +1285,7 @@ def get_agent_research(user_query: str, session_id: str = 'default') -> Dict[str
     """
     Use ReAct agent to research the query using available tools.
     """
+    agent_executor = get_agent_executor()
     if not agent_executor:
         logger.warning("ReAct / tool-calling agent not available, skipping research")
         return {
@@ -1484,7 +1397,8 @@ Please provide a comprehensive financial advisory response based on the research
         messages.append(HumanMessage(content=message))
 
         # Send to active LLM (Groq or HuggingFace)
-        response = groq_chat_llm.invoke(messages)
+        with timed("llm", "advisor_chat"):
+            response = get_chat_llm().invoke(messages)
 
         if not response or not hasattr(response, 'content') or not response.content:
             raise ValueError("Empty or invalid response from LLM")
@@ -1518,7 +1432,8 @@ Please provide a comprehensive financial advisory response based on the research
                 HumanMessage(content=message)
             ]
             
-            response = groq_chat_llm.invoke(messages)
+            with timed("llm", "advisor_chat"):
+                response = get_chat_llm().invoke(messages)
 
             if not response or not hasattr(response, 'content') or not response.content:
                 raise ValueError("Empty or invalid response from LLM on retry")
@@ -1583,7 +1498,8 @@ Respond in this EXACT JSON format (no extra text):
         )
 
         from langchain_core.messages import HumanMessage
-        response = classifier_llm.invoke([HumanMessage(content=classification_prompt)])
+        with timed("llm", "query_classifier"):
+            response = classifier_llm.invoke([HumanMessage(content=classification_prompt)])
 
         # Parse JSON response
         import json
@@ -1628,7 +1544,7 @@ def get_comprehensive_financial_advice(
     research_context = ""
     research_results = {}
 
-    if should_use_research and agent_executor:
+    if should_use_research and get_agent_executor():
         logger.info(f"[{session_id}] Phase 1: Conducting research")
         research_results = get_agent_research(user_query, session_id)
 
@@ -1685,6 +1601,7 @@ def get_agent_response(user_input: str) -> str:
     """
     LEGACY FUNCTION - Maintained for backward compatibility with agent.py
     """
+    agent_executor = get_agent_executor()
     if not agent_executor:
         return "Agent not available. Please check configuration."
 
@@ -10,7 +10,7 @@ import subprocess
 import sys
 import time
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS  # 1. Import CORS
 from datetime import datetime, timedelta  # ✅ ADD timedelta
 import logging
@@ -24,9 +24,13 @@ import sys
 import types
 
 # Universal compatibility shim for LangChain modules expecting `langchain_core.pydantic_v1`
-try:
-    import langchain_core.pydantic_v1
-except ImportError:
+# (looked up on disk without importing langchain_core, which would cost seconds at startup)
+import importlib.machinery
+import importlib.util
+_langchain_core_spec = importlib.util.find_spec("langchain_core")
+_has_pydantic_v1 = _langchain_core_spec is not None and importlib.machinery.PathFinder.find_spec(
+    "langchain_core.pydantic_v1", _langchain_core_spec.submodule_search_locations) is not None
+if not _has_pydantic_v1:
     import pydantic as _pydantic
 
     # Map all commonly used v1 symbols to their v2 equivalents
@@ -46,18 +50,28 @@ except ImportError:
 
 load_dotenv()
 
+# NEW - ADDED: Timed startup steps, lazy resources and optional warm-up
+from startup import startup_step, warm_up_from_env, startup_report, log_startup_report
+
 # NEW - ADDED: MongoDB imports for user data management
-from database import get_database, close_database_connection, Collections, test_connection
+from database import get_database, close_database_connection, Collections, test_connection, run_index_migration, upsert_with_retry, RECOMMENDATION_TTL
 from models import (
     UserProfileSchema, IncomeSchema, ExpenseSchema, 
-    AssetSchema, LiabilitySchema, serialize_document,
+    AssetSchema, LiabilitySchema, FinancialPathHistorySchema,
+    serialize_document, serialize_documents,
     calculate_net_worth, calculate_monthly_cash_flow
 )
+from profile_cache import get_user_bundle, invalidate_user, profile_cache
+from market_snapshot import market_snapshot, MARKET_INDICES, NIFTY_SYMBOLS, MARKET_SNAPSHOT_WAIT_SECONDS
+from metrics import init_metrics, render_metrics, timed
+from json_provider import FinEdgeJSONProvider
 from bson import ObjectId
 # ADD this import near other imports
-from recommendations import get_personalized_recommendations
+with startup_step("import recommendations"):
+    from recommendations import get_personalized_recommendations
 # at top of app.py imports
-from ai_financial_advisor import resolve_ticker, fetch_stock_price_by_symbol
+with startup_step("import ai_financial_advisor"):
+    from ai_financial_advisor import resolve_ticker, fetch_stock_price_by_symbol
 
 
 # ✅ ADD THESE TWO LINES TO SILENCE YFINANCE
@@ -67,8 +81,8 @@ yf_logger.setLevel(logging.CRITICAL)
 # Third-party imports
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import yfinance as yf
-import pandas as pd
+# yfinance (and the pandas it loads) is imported inside the market-data views:
+# it takes about a second to import and most requests never touch it
 
 # NEW - ADDED: Reduce werkzeug (Flask) logging verbosity
 logging.getLogger('werkzeug').setLevel(logging.WARNING)
@@ -119,12 +133,15 @@ except ImportError as e:
 
 # Initialize Flask application
 app = Flask(__name__)
+app.json = FinEdgeJSONProvider(app)  # NEW - ADDED: BSON-aware, orjson-backed when available
 CORS(app)
+init_metrics(app)  # NEW - ADDED: Request timing, Server-Timing header, /metrics
 
 # Import and register learning routes
 try:
-    from learning_routes import learning_bp
-    app.register_blueprint(learning_bp)
+    with startup_step("register learning routes"):
+        from learning_routes import learning_bp
+        app.register_blueprint(learning_bp)
     logger.info("Learning routes registered successfully")
 except ImportError as e:
     logger.warning(f"Could not import learning routes: {e}")
@@ -136,6 +153,8 @@ def init_app():
         try:
             # UPDATED - Single clean message
             test_connection()
+            # NEW - ADDED: Idempotent index bootstrap (python database.py migrate for CLI)
+            run_index_migration()
             logger.info("🚀 FinEdge Backend Ready")
         except Exception:
             logger.warning("⚠️ MongoDB will connect on first request")
@@ -146,8 +165,9 @@ def init_app():
 #     """Close database connection when app shuts down"""
 #     close_database_connection()
 
-from routes.stock_routes import stock_bp
-app.register_blueprint(stock_bp)
+with startup_step("register stock routes"):
+    from routes.stock_routes import stock_bp
+    app.register_blueprint(stock_bp)
 
 # ⭐ CRITICAL FIX FOR CORS ⭐
 # CORS(stock_bp, resources={r"*": {"origins": "https://finedge-ai.vercel.app"}})
@@ -376,6 +396,7 @@ def AutoMFData():
 @app.route('/api/stock-price', methods=['POST'])
 def get_stock_price():
     """Get current stock prices for multiple tickers"""
+    import yfinance as yf
     try:
         data = request.get_json()
         tickers = data.get('tickers', [])
@@ -383,11 +404,23 @@ def get_stock_price():
         if not tickers:
             return jsonify({'error': 'No tickers provided'}), 400
         
+        # Symbols in the shared snapshot are served from it; others are fetched live
+        quotes = market_snapshot.read()
         prices = []
         for ticker in tickers:
             try:
+                quote = quotes.get(ticker)
+                if quote is not None:
+                    prices.append({
+                        'symbol': ticker,
+                        'price': round(quote['price'], 2),
+                        'timestamp': quote['timestamp']
+                    })
+                    continue
+
                 stock = yf.Ticker(ticker)
-                hist = stock.history(period='1d')
+                with timed("market_data", "history"):
+                    hist = stock.history(period='1d')
                 if not hist.empty:
                     current_price = hist['Close'].iloc[-1]
                     prices.append({
@@ -416,37 +449,22 @@ def get_stock_price():
 
 @app.route('/api/nifty-gainers', methods=['GET'])
 def get_nifty_gainers():
-    """Get top NIFTY gainers"""
+    """Get top NIFTY gainers (from the shared market snapshot)"""
     try:
         count = request.args.get('count', 10, type=int)
         
-        # NIFTY 50 symbols (major ones)
-        nifty_symbols = [
-            'RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS', 'HINDUNILVR.NS',
-            'ICICIBANK.NS', 'KOTAKBANK.NS', 'SBIN.NS', 'BHARTIARTL.NS', 'ITC.NS',
-            'ASIANPAINT.NS', 'LT.NS', 'AXISBANK.NS', 'MARUTI.NS', 'NESTLEIND.NS',
-            'HCLTECH.NS', 'WIPRO.NS', 'ULTRACEMCO.NS', 'TATAMOTORS.NS', 'POWERGRID.NS'
-        ]
-        
+        quotes = market_snapshot.read(wait=MARKET_SNAPSHOT_WAIT_SECONDS)
         gainers = []
-        for symbol in nifty_symbols[:count]:
-            try:
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period='2d')
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2]
-                    per_change = ((current_price - prev_price) / prev_price) * 100
-                    
-                    gainers.append({
-                        'symbol': symbol.replace('.NS', ''),
-                        'ltp': round(float(current_price), 2),
-                        'netChng': round(float(current_price - prev_price), 2),
-                        'perChange': round(float(per_change), 2)
-                    })
-            except Exception as e:
-                logger.error(f"Error fetching data for {symbol}: {e}")
+        for symbol in NIFTY_SYMBOLS[:count]:
+            quote = quotes.get(symbol)
+            if quote is None or quote['change'] is None:
                 continue
+            gainers.append({
+                'symbol': symbol.replace('.NS', ''),
+                'ltp': round(quote['price'], 2),
+                'netChng': round(quote['change'], 2),
+                'perChange': round(quote['perChange'], 2)
+            })
         
         # Sort by percentage change (gainers first)
         gainers.sort(key=lambda x: x['perChange'], reverse=True)
@@ -460,6 +478,7 @@ def get_nifty_gainers():
 @app.route('/api/portfolio-analysis', methods=['POST'])
 def get_portfolio_analysis():
     """Analyze portfolio profit/loss"""
+    import yfinance as yf
     try:
         data = request.get_json()
         stocks = data.get('stocks', [])
@@ -467,6 +486,8 @@ def get_portfolio_analysis():
         if not stocks:
             return jsonify({'error': 'No stocks provided'}), 400
         
+        # Symbols in the shared snapshot are priced from it; others are fetched live
+        quotes = market_snapshot.read()
         portfolio_analysis = []
         total_profit_loss = 0
         
@@ -476,11 +497,15 @@ def get_portfolio_analysis():
             quantity = int(stock.get('quantity', 0))
             
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='1d')
+                quote = quotes.get(symbol)
+                if quote is not None:
+                    current_price = quote['price']
+                else:
+                    with timed("market_data", "history"):
+                        hist = yf.Ticker(symbol).history(period='1d')
+                    current_price = float(hist['Close'].iloc[-1]) if not hist.empty else None
                 
-                if not hist.empty:
-                    current_price = float(hist['Close'].iloc[-1])
+                if current_price is not None:
                     profit_loss = (current_price - bought_price) * quantity
                     total_profit_loss += profit_loss
                     
@@ -537,118 +562,31 @@ def get_market_category(index_name):
 def get_market_summary():
     """Get comprehensive market indices summary - 25+ major indices for marquee display"""
     try:
-        # Indian-focused market data with major Indian brands and select international indices
-        indices = {
-            # Major Indian Indices (Priority)
-            'NIFTY 50': '^NSEI',
-            'SENSEX': '^BSESN',
-            'BANK NIFTY': '^NSEBANK',
-            'NIFTY IT': '^CNXIT',
-            'NIFTY AUTO': '^CNXAUTO',
-            'NIFTY PHARMA': '^CNXPHARMA',
-            'NIFTY FMCG': '^CNXFMCG',
-            'NIFTY METAL': '^CNXMETAL',
-            'NIFTY ENERGY': '^CNXENERGY',
-            'NIFTY REALTY': '^CNXREALTY',
-            'NIFTY MEDIA': '^CNXMEDIA',
-            'NIFTY MIDCAP': '^NSEMDCP50',
-            'NIFTY SMALLCAP': '^NSESMLCP250',
-            'NIFTY NEXT 50': '^NSMIDCP',
-            'NIFTY PSU BANK': '^CNXPSUBANK',
-            'NIFTY PRIVATE BANK': '^CNXPVTBANK',
-            'NIFTY FINANCE': '^CNXFINANCE',
-            'NIFTY INFRA': '^CNXINFRA',
-            
-            # Top Indian Companies (Individual Stocks)
-            'RELIANCE': 'RELIANCE.NS',
-            'TCS': 'TCS.NS',
-            'HDFC BANK': 'HDFCBANK.NS',
-            'INFOSYS': 'INFY.NS',
-            'ICICI BANK': 'ICICIBANK.NS',
-            'BHARTI AIRTEL': 'BHARTIARTL.NS',
-            'SBI': 'SBIN.NS',
-            'LT': 'LT.NS',
-            'ITC': 'ITC.NS',
-            'HCLTECH': 'HCLTECH.NS',
-            'WIPRO': 'WIPRO.NS',
-            'MARUTI SUZUKI': 'MARUTI.NS',
-            'ASIAN PAINTS': 'ASIANPAINT.NS',
-            'BAJAJ FINANCE': 'BAJFINANCE.NS',
-            'TITAN': 'TITAN.NS',
-            
-            # Select International (Limited)
-            'S&P 500': '^GSPC',
-            'NASDAQ': '^IXIC',
-            'NIKKEI': '^N225',
-            
-            # Essential Commodities & Currency
-            'USD/INR': 'USDINR=X',
-            'GOLD': 'GC=F',
-            'CRUDE OIL': 'CL=F'
-        }
+        # Served from the shared market snapshot (market_snapshot.py), refreshed by one worker for all
+        quotes = market_snapshot.read(wait=MARKET_SNAPSHOT_WAIT_SECONDS)
         
         market_data = {}
-        successful_fetches = 0
-        
-        for index_name, symbol in indices.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
-                
-                if len(hist) >= 2:
-                    current_value = hist['Close'].iloc[-1]
-                    prev_value = hist['Close'].iloc[-2]
-                    change = current_value - prev_value
-                    per_change = (change / prev_value) * 100
-                    
-                    # Format values based on type
-                    if 'USD/INR' in index_name:
-                        formatted_value = round(float(current_value), 4)
-                    elif index_name in ['GOLD', 'CRUDE OIL', 'BITCOIN']:
-                        formatted_value = round(float(current_value), 2)
-                    else:
-                        formatted_value = round(float(current_value), 2)
-                    
-                    market_data[index_name] = {
-                        'value': formatted_value,
-                        'change': round(float(change), 2),
-                        'perChange': round(float(per_change), 2),
-                        'timestamp': datetime.now().isoformat(),
-                        'symbol': symbol,
-                        'category': get_market_category(index_name)
-                    }
-                    successful_fetches += 1
-                    
-                elif len(hist) >= 1:
-                    # If only 1 day of data, show without change
-                    current_value = hist['Close'].iloc[-1]
-                    
-                    if 'USD/INR' in index_name:
-                        formatted_value = round(float(current_value), 4)
-                    elif index_name in ['GOLD', 'CRUDE OIL', 'BITCOIN']:
-                        formatted_value = round(float(current_value), 2)
-                    else:
-                        formatted_value = round(float(current_value), 2)
-                    
-                    market_data[index_name] = {
-                        'value': formatted_value,
-                        'change': 0,
-                        'perChange': 0,
-                        'timestamp': datetime.now().isoformat(),
-                        'symbol': symbol,
-                        'category': get_market_category(index_name)
-                    }
-                    successful_fetches += 1
-                    
-            except Exception as e:
-                logger.error(f"Error fetching {index_name} ({symbol}): {e}")
+        for index_name, symbol in MARKET_INDICES.items():
+            quote = quotes.get(symbol)
+            if quote is None:
                 continue
+            
+            market_data[index_name] = {
+                # Format values based on type
+                'value': round(quote['price'], 4 if 'USD/INR' in index_name else 2),
+                # If only 1 day of data, show without change
+                'change': round(quote['change'], 2) if quote['change'] is not None else 0,
+                'perChange': round(quote['perChange'], 2) if quote['perChange'] is not None else 0,
+                'timestamp': quote['timestamp'],
+                'symbol': symbol,
+                'category': get_market_category(index_name)
+            }
         
-        logger.info(f"Successfully fetched {successful_fetches}/{len(indices)} market indices")
         return jsonify({
             'indices': market_data,
-            'totalIndices': successful_fetches,
-            'lastUpdated': datetime.now().isoformat()
+            'totalIndices': len(market_data),
+            'lastUpdated': quotes.last_updated or datetime.now().isoformat(),
+            'snapshotVersion': quotes.version
         })
     
     except Exception as e:
@@ -786,8 +724,7 @@ def get_onboarding_status():
         if not clerk_user_id:
             return jsonify({'error': 'clerkUserId is required'}), 400
         
-        db = get_database()
-        user_profile = db[Collections.USER_PROFILES].find_one({"clerkUserId": clerk_user_id})
+        user_profile = get_user_bundle(clerk_user_id)['profile']
         
         if user_profile:
             return jsonify({
@@ -798,8 +735,9 @@ def get_onboarding_status():
         else:
             # User doesn't exist yet - create default profile
             default_profile = UserProfileSchema.create_default(clerk_user_id)
-            result = db[Collections.USER_PROFILES].insert_one(default_profile)
+            result = get_database()[Collections.USER_PROFILES].insert_one(default_profile)
             default_profile['_id'] = result.inserted_id
+            invalidate_user(clerk_user_id)
             
             return jsonify({
                 'onboardingCompleted': False,
@@ -968,6 +906,7 @@ def complete_onboarding():
                     notes=entry.get('notes')
                 )
                 db[Collections.LIABILITIES].insert_one(liability_doc)
+        invalidate_user(clerk_user_id)
         logger.info(f"✅ Onboarding completed for user: {clerk_user_id}")
         return jsonify({
             'success': True,
@@ -975,6 +914,8 @@ def complete_onboarding():
             'profileId': str(result.upserted_id) if result.upserted_id else None
         })
     except Exception as e:
+        # Partial writes may have happened - never serve the pre-onboarding profile
+        invalidate_user((request.get_json(silent=True) or {}).get('clerkUserId'))
         logger.error(f"Error completing onboarding: {e}. Payload: {request.json}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
@@ -1009,18 +950,18 @@ def get_user_profile():
         if not clerk_user_id:
             return jsonify({'error': 'clerkUserId is required'}), 400
         
-        db = get_database()
+        bundle = get_user_bundle(clerk_user_id)
         
         # Get user profile
-        user_profile = db[Collections.USER_PROFILES].find_one({"clerkUserId": clerk_user_id})
+        user_profile = bundle['profile']
         if not user_profile:
             return jsonify({'error': 'User profile not found'}), 404
         
         # Get all financial entries
-        income = list(db[Collections.INCOME].find({"clerkUserId": clerk_user_id}))
-        expenses = list(db[Collections.EXPENSES].find({"clerkUserId": clerk_user_id}))
-        assets = list(db[Collections.ASSETS].find({"clerkUserId": clerk_user_id}))
-        liabilities = list(db[Collections.LIABILITIES].find({"clerkUserId": clerk_user_id}))
+        income = bundle['income']
+        expenses = bundle['expenses']
+        assets = bundle['assets']
+        liabilities = bundle['liabilities']
         
         # Calculate summary statistics
         total_income = sum(entry['amount'] for entry in income)
@@ -1031,10 +972,10 @@ def get_user_profile():
         
         return jsonify({
             'profile': serialize_document(user_profile),
-            'income': [serialize_document(doc) for doc in income],
-            'expenses': [serialize_document(doc) for doc in expenses],
-            'assets': [serialize_document(doc) for doc in assets],
-            'liabilities': [serialize_document(doc) for doc in liabilities],
+            'income': serialize_documents(income),
+            'expenses': serialize_documents(expenses),
+            'assets': serialize_documents(assets),
+            'liabilities': serialize_documents(liabilities),
             'summary': {
                 'totalIncome': total_income,
                 'totalExpenses': total_expenses,
@@ -1058,14 +999,11 @@ def get_asset_growth_projection():
         if not clerk_user_id:
             return jsonify({'error': 'clerkUserId is required'}), 400
 
-        db = get_database()
-        assets = list(db[Collections.ASSETS].find({"clerkUserId": clerk_user_id}))
-        incomes = list(db[Collections.INCOME].find({"clerkUserId": clerk_user_id}))
-        expenses = list(db[Collections.EXPENSES].find({"clerkUserId": clerk_user_id}))
-        profile = db[Collections.USER_PROFILES].find_one(
-            {"clerkUserId": clerk_user_id},
-            {"calculatorPreferences": 1},
-        )
+        bundle = get_user_bundle(clerk_user_id)
+        assets = bundle['assets']
+        incomes = bundle['income']
+        expenses = bundle['expenses']
+        profile = bundle['profile']
         calculator_preferences = profile.get("calculatorPreferences") if profile else None
 
         if not assets:
@@ -1117,8 +1055,8 @@ def manage_income():
         
         if request.method == 'GET':
             # Get all income entries
-            income = list(db[Collections.INCOME].find({"clerkUserId": clerk_user_id}))
-            return jsonify({'income': [serialize_document(doc) for doc in income]})
+            income = get_user_bundle(clerk_user_id)['income']
+            return jsonify({'income': serialize_documents(income)})
         
         elif request.method == 'POST':
             # Add new income entry
@@ -1133,6 +1071,7 @@ def manage_income():
             )
             result = db[Collections.INCOME].insert_one(income_doc)
             income_doc['_id'] = result.inserted_id
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'income': serialize_document(income_doc)}), 201
         
         elif request.method == 'PUT':
@@ -1149,6 +1088,7 @@ def manage_income():
                 {"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id},
                 {"$set": update_data}
             )
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Income updated'})
         
         elif request.method == 'DELETE':
@@ -1158,6 +1098,7 @@ def manage_income():
                 return jsonify({'error': 'entryId is required'}), 400
             
             db[Collections.INCOME].delete_one({"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id})
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Income deleted'})
             
     except Exception as e:
@@ -1177,8 +1118,8 @@ def manage_expenses():
         db = get_database()
         
         if request.method == 'GET':
-            expenses = list(db[Collections.EXPENSES].find({"clerkUserId": clerk_user_id}))
-            return jsonify({'expenses': [serialize_document(doc) for doc in expenses]})
+            expenses = get_user_bundle(clerk_user_id)['expenses']
+            return jsonify({'expenses': serialize_documents(expenses)})
         
         elif request.method == 'POST':
             data = request.json
@@ -1193,6 +1134,7 @@ def manage_expenses():
             )
             result = db[Collections.EXPENSES].insert_one(expense_doc)
             expense_doc['_id'] = result.inserted_id
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'expense': serialize_document(expense_doc)}), 201
         
         elif request.method == 'PUT':
@@ -1208,6 +1150,7 @@ def manage_expenses():
                 {"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id},
                 {"$set": update_data}
             )
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Expense updated'})
         
         elif request.method == 'DELETE':
@@ -1216,6 +1159,7 @@ def manage_expenses():
                 return jsonify({'error': 'entryId is required'}), 400
             
             db[Collections.EXPENSES].delete_one({"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id})
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Expense deleted'})
             
     except Exception as e:
@@ -1240,8 +1184,8 @@ def manage_assets():
         db = get_database()
         
         if request.method == 'GET':
-            assets = list(db[Collections.ASSETS].find({"clerkUserId": clerk_user_id}))
-            return jsonify({'assets': [serialize_document(doc) for doc in assets]})
+            assets = get_user_bundle(clerk_user_id)['assets']
+            return jsonify({'assets': serialize_documents(assets)})
         
         elif request.method == 'POST':
             if not data:
@@ -1262,6 +1206,7 @@ def manage_assets():
             try:
                 result = db[Collections.ASSETS].insert_one(asset_doc)
                 asset_doc['_id'] = result.inserted_id
+                invalidate_user(clerk_user_id)
                 return jsonify({'success': True, 'asset': serialize_document(asset_doc)}), 201
             except Exception as e:
                 logger.error(f"MongoDB insert_one failed: {e}. Asset doc: {asset_doc}")
@@ -1283,6 +1228,7 @@ def manage_assets():
                 {"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id},
                 {"$set": update_data}
             )
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Asset updated'})
         
         elif request.method == 'DELETE':
@@ -1291,6 +1237,7 @@ def manage_assets():
                 return jsonify({'error': 'entryId is required'}), 400
             
             db[Collections.ASSETS].delete_one({"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id})
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Asset deleted'})
             
     except Exception as e:
@@ -1315,8 +1262,8 @@ def manage_liabilities():
         db = get_database()
         
         if request.method == 'GET':
-            liabilities = list(db[Collections.LIABILITIES].find({"clerkUserId": clerk_user_id}))
-            return jsonify({'liabilities': [serialize_document(doc) for doc in liabilities]})
+            liabilities = get_user_bundle(clerk_user_id)['liabilities']
+            return jsonify({'liabilities': serialize_documents(liabilities)})
         
         elif request.method == 'POST':
             if not data:
@@ -1333,6 +1280,7 @@ def manage_liabilities():
             )
             result = db[Collections.LIABILITIES].insert_one(liability_doc)
             liability_doc['_id'] = result.inserted_id
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'liability': serialize_document(liability_doc)}), 201
         
         elif request.method == 'PUT':
@@ -1348,6 +1296,7 @@ def manage_liabilities():
                 {"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id},
                 {"$set": update_data}
             )
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Liability updated'})
         
         elif request.method == 'DELETE':
@@ -1356,6 +1305,7 @@ def manage_liabilities():
                 return jsonify({'error': 'entryId is required'}), 400
             
             db[Collections.LIABILITIES].delete_one({"_id": ObjectId(entry_id), "clerkUserId": clerk_user_id})
+            invalidate_user(clerk_user_id)
             return jsonify({'success': True, 'message': 'Liability deleted'})
             
     except Exception as e:
@@ -1374,15 +1324,8 @@ def get_goals():
         if not clerk_user_id:
             return jsonify({'error': 'clerkUserId is required'}), 400
 
-        db = get_database()
-        # Find user profile in USER_PROFILES collection
-        user_profile = db[Collections.USER_PROFILES].find_one({'clerkUserId': clerk_user_id})
-        
-        if not user_profile:
-            return jsonify({'goals': []}), 200
-        
         # Goals are stored as an array inside user_profile document
-        goals = user_profile.get('goals', [])
+        goals = get_user_bundle(clerk_user_id)['goals']
         return jsonify({'goals': goals}), 200
 
     except Exception as e:
@@ -1419,6 +1362,7 @@ def add_goal():
             },
             upsert=True
         )
+        invalidate_user(clerk_user_id)
 
         return jsonify({
             'message': 'Goal added successfully',
@@ -1457,6 +1401,7 @@ def update_goal(goal_id):
                 }
             }
         )
+        invalidate_user(clerk_user_id)
 
         if result.modified_count == 0:
             return jsonify({'error': 'Goal not found'}), 404
@@ -1486,6 +1431,7 @@ def delete_goal(goal_id):
                 '$set': {'updatedAt': datetime.utcnow()}
             }
         )
+        invalidate_user(clerk_user_id)
 
         if result.modified_count == 0:
             return jsonify({'error': 'Goal not found'}), 404
@@ -1501,6 +1447,19 @@ def delete_goal(goal_id):
 #                              AI ADVISOR CHAT HISTORY API
 # ===========================================================================================================
 
+# Keep only the newest N messages per user to prevent huge documents
+MAX_CHAT_MESSAGES = 100
+DEFAULT_CHAT_PAGE_SIZE = 30
+
+
+def _assign_message_ids(messages):
+    """Give every message a stable, time-ordered id (used as the pagination cursor)."""
+    for message in messages:
+        if isinstance(message, dict) and not message.get('id'):
+            message['id'] = str(ObjectId())
+    return messages
+
+
 @app.route('/api/chat/ai-advisor/history', methods=['GET', 'POST', 'DELETE'])
 def manage_ai_chat_history():
     """
@@ -1561,9 +1520,10 @@ def manage_ai_chat_history():
                 return jsonify({'error': 'messages must be an array'}), 400
             
             # Limit to last 100 messages to prevent huge documents
-            if len(messages) > 100:
-                logger.warning(f"⚠️ Trimming messages from {len(messages)} to 100")
-                messages = messages[-100:]
+            if len(messages) > MAX_CHAT_MESSAGES:
+                logger.warning(f"⚠️ Trimming messages from {len(messages)} to {MAX_CHAT_MESSAGES}")
+                messages = messages[-MAX_CHAT_MESSAGES:]
+            _assign_message_ids(messages)
             
             logger.info(f"💾 Saving {len(messages)} messages for user: {clerk_user_id}")
             
@@ -1632,6 +1592,131 @@ def manage_ai_chat_history():
 
 
 
+@app.route('/api/chat/ai-advisor/history/messages', methods=['GET', 'POST'])
+def manage_ai_chat_messages():
+    """
+    Append-only AI Advisor chat history with cursor pagination
+    
+    GET: Page through messages (newest page by default)
+        Query Params: clerkUserId, before (message id), after (message id), limit
+    POST: Append only the new messages ($push + $slice keeps the newest 100)
+        Body: { clerkUserId, messages }
+    """
+    try:
+        data = (request.get_json(silent=True) or {}) if request.method == 'POST' else {}
+        clerk_user_id = request.args.get('clerkUserId') or data.get('clerkUserId')
+        
+        if not clerk_user_id:
+            return jsonify({'error': 'clerkUserId is required'}), 400
+        
+        db = get_database()
+        chat_collection = db[Collections.AI_CHAT_HISTORY]
+        
+        # ========== POST: Append new messages ==========
+        if request.method == 'POST':
+            messages = data.get('messages', [])
+            
+            if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+                return jsonify({'error': 'messages must be an array of objects'}), 400
+            if not messages:
+                return jsonify({'success': True, 'appended': 0, 'ids': []}), 200
+            
+            messages = _assign_message_ids(messages[-MAX_CHAT_MESSAGES:])
+            
+            chat_collection.update_one(
+                {'clerkUserId': clerk_user_id},
+                {
+                    '$push': {'messages': {'$each': messages, '$slice': -MAX_CHAT_MESSAGES}},
+                    '$set': {'updatedAt': datetime.utcnow()},
+                    '$unset': {'messageCount': ''},
+                    '$setOnInsert': {'createdAt': datetime.utcnow()}
+                },
+                upsert=True
+            )
+            
+            logger.info(f"💾 Appended {len(messages)} message(s) for user: {clerk_user_id}")
+            
+            return jsonify({
+                'success': True,
+                'appended': len(messages),
+                'ids': [m['id'] for m in messages]
+            }), 200
+        
+        # ========== GET: One page of messages ==========
+        before = request.args.get('before')
+        after = request.args.get('after')
+        limit = request.args.get('limit', DEFAULT_CHAT_PAGE_SIZE, type=int)
+        limit = min(max(limit, 1), MAX_CHAT_MESSAGES)
+        
+        if before and after:
+            return jsonify({'error': 'Use either before or after, not both'}), 400
+        
+        # Page bounds are computed server-side so only the page leaves MongoDB
+        total = {'$size': {'$ifNull': ['$messages', []]}}
+        if before:
+            cursor_idx = {'$indexOfArray': ['$messages.id', before]}
+            end = {'$max': [cursor_idx, 0]}
+            start = {'$max': [{'$subtract': [end, limit]}, 0]}
+        elif after:
+            cursor_idx = {'$indexOfArray': ['$messages.id', after]}
+            start = {'$cond': [{'$lt': [cursor_idx, 0]}, total, {'$add': [cursor_idx, 1]}]}
+            end = {'$min': [{'$add': [start, limit]}, total]}
+        else:
+            end = total
+            start = {'$max': [{'$subtract': [total, limit]}, 0]}
+        
+        pipeline = [
+            {'$match': {'clerkUserId': clerk_user_id}},
+            {'$project': {'_id': 0, 'messages': 1, 'updatedAt': 1, 'total': total, 'start': start, 'end': end}},
+            {'$project': {
+                'updatedAt': 1,
+                'total': 1,
+                'start': 1,
+                'end': 1,
+                'messages': {'$cond': [
+                    {'$gt': ['$end', '$start']},
+                    {'$slice': ['$messages', '$start', {'$max': [{'$subtract': ['$end', '$start']}, 1]}]},
+                    []
+                ]}
+            }}
+        ]
+        page = next(chat_collection.aggregate(pipeline), None)
+        
+        if not page:
+            return jsonify({
+                'success': True,
+                'messages': [],
+                'cursors': {'before': None, 'after': None},
+                'hasOlder': False,
+                'hasNewer': False,
+                'total': 0,
+                'lastUpdated': ''
+            }), 200
+        
+        messages = page['messages']
+        updated_at = page.get('updatedAt')
+        
+        return jsonify({
+            'success': True,
+            'messages': messages,
+            'cursors': {
+                'before': messages[0].get('id') if messages else None,
+                'after': messages[-1].get('id') if messages else None
+            },
+            'hasOlder': page['start'] > 0,
+            'hasNewer': page['end'] < page['total'],
+            'total': page['total'],
+            'lastUpdated': updated_at.isoformat() if isinstance(updated_at, datetime) else ''
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"❌ Error managing AI chat messages: {e}")
+        return jsonify({
+            'error': 'Failed to manage chat messages',
+            'details': str(e)
+        }), 500
+
+
 # ===========================================================================================================
 #                         FINANCIAL PATH HISTORY MANAGEMENT API
 # ===========================================================================================================
@@ -1666,11 +1751,12 @@ def manage_financial_path_history():
         if request.method == 'GET':
             logger.info(f"📥 Fetching financial path history for user: {clerk_user_id}")
             
-            # Get most recent result
-            path_doc = path_collection.find_one(
-                {'clerkUserId': clerk_user_id},
-                sort=[('createdAt', -1)]  # Sort by newest first
+            # Entries are kept newest first, so only the head of the array is needed
+            bucket = path_collection.find_one(
+                FinancialPathHistorySchema.bucket_filter(clerk_user_id),
+                {'entries': {'$slice': 1}}
             )
+            path_doc = bucket['entries'][0] if bucket and bucket.get('entries') else None
             
             if path_doc:
                 logger.info(f"✅ Found financial path result for user: {clerk_user_id}")
@@ -1693,32 +1779,20 @@ def manage_financial_path_history():
             
             logger.info(f"💾 Saving financial path result for user: {clerk_user_id}")
             
-            # Prepare document
-            path_doc = {
-                'clerkUserId': clerk_user_id,
-                'riskProfile': data.get('riskProfile', ''),
-                'userQuery': data.get('userQuery', ''),
-                'serverData': data.get('serverData', {}),
-                'fetchedUserData': data.get('fetchedUserData', {}),
-                'createdAt': datetime.utcnow(),
-                'updatedAt': datetime.utcnow()
-            }
-            
-            # Keep only last 5 results per user (to save space)
-            existing_count = path_collection.count_documents({'clerkUserId': clerk_user_id})
-            if existing_count >= 5:
-                # Delete oldest result
-                oldest = path_collection.find_one(
-                    {'clerkUserId': clerk_user_id},
-                    sort=[('createdAt', 1)]  # Sort by oldest first
-                )
-                if oldest:
-                    path_collection.delete_one({'_id': oldest['_id']})
-                    logger.info(f"🗑️ Deleted oldest financial path result for user: {clerk_user_id}")
+            path_doc = FinancialPathHistorySchema.create_entry(
+                clerk_user_id=clerk_user_id,
+                risk_profile=data.get('riskProfile', ''),
+                user_query=data.get('userQuery', ''),
+                server_data=data.get('serverData', {}),
+                fetched_user_data=data.get('fetchedUserData', {})
+            )
             
-            # Insert new result
-            result = path_collection.insert_one(path_doc)
-            path_doc['_id'] = result.inserted_id
+            # Single atomic round trip: push newest, keep only the last 5 per user
+            upsert_with_retry(
+                path_collection,
+                FinancialPathHistorySchema.bucket_filter(clerk_user_id),
+                FinancialPathHistorySchema.push_update([path_doc])
+            )
             
             logger.info(f"✅ Saved financial path result for user: {clerk_user_id}")
             
@@ -1732,14 +1806,18 @@ def manage_financial_path_history():
         elif request.method == 'DELETE':
             logger.info(f"🗑️ Clearing financial path history for user: {clerk_user_id}")
             
-            result = path_collection.delete_many({'clerkUserId': clerk_user_id})
+            bucket = path_collection.find_one_and_delete(
+                FinancialPathHistorySchema.bucket_filter(clerk_user_id),
+                projection={'entries._id': 1}
+            )
+            deleted_count = len(bucket.get('entries', [])) if bucket else 0
             
-            logger.info(f"✅ Deleted {result.deleted_count} financial path result(s) for user: {clerk_user_id}")
+            logger.info(f"✅ Deleted {deleted_count} financial path result(s) for user: {clerk_user_id}")
             
             return jsonify({
                 'success': True,
                 'message': 'Financial path history cleared successfully',
-                'deletedCount': result.deleted_count
+                'deletedCount': deleted_count
             }), 200
             
     except Exception as e:
@@ -1825,30 +1903,18 @@ def generate_investment_recommendations():
         logger.info(f"📥 Fetching user profile for: {clerk_user_id}")
         
         try:
-            # Fetch all user data
-            profile_res = requests.get(f"{request.host_url}api/onboarding/status?clerkUserId={clerk_user_id}")
-            income_res = requests.get(f"{request.host_url}api/user-profile/income?clerkUserId={clerk_user_id}")
-            expenses_res = requests.get(f"{request.host_url}api/user-profile/expenses?clerkUserId={clerk_user_id}")
-            assets_res = requests.get(f"{request.host_url}api/user-profile/assets?clerkUserId={clerk_user_id}")
-            liabilities_res = requests.get(f"{request.host_url}api/user-profile/liabilities?clerkUserId={clerk_user_id}")
-            goals_res = requests.get(f"{request.host_url}api/user-profile/goals?clerkUserId={clerk_user_id}")
-            
-            # Parse responses
-            profile = profile_res.json() if profile_res.status_code == 200 else {}
-            income = income_res.json() if income_res.status_code == 200 else {}
-            expenses = expenses_res.json() if expenses_res.status_code == 200 else {}
-            assets = assets_res.json() if assets_res.status_code == 200 else {}
-            liabilities = liabilities_res.json() if liabilities_res.status_code == 200 else {}
-            goals = goals_res.json() if goals_res.status_code == 200 else {}
+            # Fetch all user data (read-through cache instead of six HTTP round trips to ourselves)
+            bundle = get_user_bundle(clerk_user_id)
+            profile = {'profile': bundle['profile'] or {}}
             
             # Calculate financial metrics
-            monthly_income = income.get('income', [])
+            monthly_income = bundle['income']
             monthly_income_total = sum(
                 inc['amount'] if inc['frequency'] == 'monthly' else inc['amount'] / 12
                 for inc in monthly_income
             )
             
-            monthly_expenses = expenses.get('expenses', [])
+            monthly_expenses = bundle['expenses']
             monthly_expenses_total = sum(
                 exp['amount'] if exp['frequency'] == 'monthly' 
                 else exp['amount'] / 12 if exp['frequency'] == 'yearly'
@@ -1858,8 +1924,8 @@ def generate_investment_recommendations():
                 for exp in monthly_expenses
             )
             
-            total_assets = sum(asset['value'] for asset in assets.get('assets', []))
-            total_liabilities = sum(liability['amount'] for liability in liabilities.get('liabilities', []))
+            total_assets = sum(asset['value'] for asset in bundle['assets'])
+            total_liabilities = sum(liability['amount'] for liability in bundle['liabilities'])
             
             # Build user profile dict
             user_profile = {
@@ -1871,7 +1937,7 @@ def generate_investment_recommendations():
                 'totalAssets': total_assets,
                 'totalLiabilities': total_liabilities,
                 'netWorth': total_assets - total_liabilities,
-                'financialGoals': [g['name'] for g in goals.get('goals', [])],
+                'financialGoals': [g['name'] for g in bundle['goals']],
                 'age': profile.get('profile', {}).get('age', 30)
             }
             
@@ -1952,19 +2018,10 @@ def generate_investment_recommendations():
                 'userProfile': user_profile,
                 'marketData': market_data,
                 'createdAt': datetime.utcnow(),
-                'expiresAt': datetime.utcnow() + timedelta(hours=24)
+                'expiresAt': datetime.utcnow() + RECOMMENDATION_TTL
             }
             
-            # Keep only last 5 recommendations per user
-            existing_count = recommendations_collection.count_documents({'clerkUserId': clerk_user_id})
-            if existing_count >= 5:
-                oldest = recommendations_collection.find_one(
-                    {'clerkUserId': clerk_user_id},
-                    sort=[('createdAt', 1)]
-                )
-                if oldest:
-                    recommendations_collection.delete_one({'_id': oldest['_id']})
-            
+            # Single insert - the expiresAt TTL index (database.INDEX_SPECS) purges old entries
             recommendations_collection.insert_one(cache_doc)
             logger.info(f"✅ Recommendations cached successfully")
             
@@ -2105,7 +2162,7 @@ def generate_recommendations_endpoint():
             return jsonify({"error": "clerkUserId is required"}), 400
 
         # Load user profile
-        profile = db[Collections.USER_PROFILES].find_one({"clerkUserId": clerk_user_id})
+        profile = get_user_bundle(clerk_user_id)['profile']
         if not profile:
             return jsonify({"error": "User profile not found"}), 404
 
@@ -2124,7 +2181,8 @@ def generate_recommendations_endpoint():
         db[Collections.INVESTMENT_RECOMMENDATIONS].insert_one({
             "clerkUserId": clerk_user_id,
             "recommendations": recs,
-            "createdAt": datetime.utcnow()
+            "createdAt": datetime.utcnow(),
+            "expiresAt": datetime.utcnow() + timedelta(hours=24)
         })
 
         return jsonify(recs)
@@ -2133,6 +2191,24 @@ def generate_recommendations_endpoint():
         logger.error(f"❌ Error generating recommendations: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+
+@app.route('/api/cache/profile-stats', methods=['GET'])
+def get_profile_cache_stats():
+    """Hit rate, invalidation and eviction counters for the per-user profile cache."""
+    return jsonify({'success': True, 'stats': profile_cache.stats()}), 200
+
+
+@app.route('/api/startup-report', methods=['GET'])
+def get_startup_report():
+    """Timed startup steps and which lazy resources are initialized (and how long each took)."""
+    return jsonify({'success': True, 'report': startup_report()}), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics: request latency per endpoint, dependency (MongoDB, market data, LLM) latency per operation."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
     
 @app.route('/api/news', methods=['GET'])
 def get_news():
@@ -2140,6 +2216,7 @@ def get_news():
     Proxy endpoint for fetching financial news from GNews API with yfinance fallback
     Solves CORS issues by making server-side request
     """
+    import yfinance as yf
     try:
         # Get query parameters from frontend
         category = request.args.get('category', 'All')
@@ -2155,7 +2232,8 @@ def get_news():
                 # Make request to GNews API (server-side, no CORS issues)
                 gnews_url = f"https://gnews.io/api/v4/search?q={search_term}&lang=en&country=in&max=10&apikey={gnews_api_key}"
                 
-                response = requests.get(gnews_url, timeout=10)
+                with timed("market_data", "gnews_search"):
+                    response = requests.get(gnews_url, timeout=10)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -2182,7 +2260,8 @@ def get_news():
         for ticker in indian_tickers[:3]:  # Limit to 3 tickers to avoid too many requests
             try:
                 stock = yf.Ticker(ticker)
-                news = stock.news
+                with timed("market_data", "news"):
+                    news = stock.news
                 
                 for item in news[:3]:  # Get 3 articles per stock
                     # Convert yfinance news format to expected format
@@ -2268,6 +2347,12 @@ def api_stock_price():
 
 # ==================== END OF NEW ENDPOINTS ====================
 
+# NEW - ADDED: LLM clients and the learning manager are built on first use;
+# FINEDGE_WARMUP=all (or a comma-separated list of resource names) builds them now
+warm_up_from_env()
+logger.info("Startup report:")
+log_startup_report()
+
 if __name__ == '__main__':
     init_app()
     app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+FinEdge Shared Event Loop
+
+One long-lived asyncio event loop per process, running on a daemon thread.
+Synchronous code (Flask views) hands coroutines to it with run_async(), so
+async clients such as the AsyncMongoClient in database.py are created once
+and stay bound to a single loop instead of a fresh loop per request.
+
+The caller's context variables (Flask's request and app context) are copied
+into the task, so views keep using request/jsonify as usual. A forked worker
+process gets its own loop on first use.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's shared loop, starting its thread on first use."""
+    global _loop, _loop_pid, _loop_thread
+
+    with _lock:
+        # Threads do not survive fork: a worker forked from a process that
+        # already had a loop starts its own
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _loop_thread = threading.Thread(target=run, name="async-runtime", daemon=True)
+            _loop_thread.start()
+            ready.wait()
+            _loop, _loop_pid = loop, os.getpid()
+            logger.info("Shared event loop started")
+        return _loop
+
+
+def in_event_loop_thread() -> bool:
+    """True when called from the shared loop's own thread."""
+    return _loop_thread is not None and threading.current_thread() is _loop_thread and _loop_pid == os.getpid()
+
+
+def run_async(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared loop and block until it finishes.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait (None = no limit)
+
+    Returns:
+        The coroutine's result (its exception is re-raised here)
+    """
+    if in_event_loop_thread():
+        raise RuntimeError("run_async() called from the event loop thread; await the coroutine instead")
+
+    loop = get_event_loop()
+    result: Future = Future()
+
+    def start():
+        try:
+            task = loop.create_task(coro)
+        except BaseException as e:
+            result.set_exception(e)
+            return
+
+        def done(task):
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result())
+
+        task.add_done_callback(done)
+
+    # The task is created inside a copy of the caller's context
+    loop.call_soon_threadsafe(contextvars.copy_context().run, start)
+    return result.result(timeout)
+
+
+def shutdown_event_loop() -> None:
+    """Stop the shared loop (e.g. at process exit)."""
+    global _loop, _loop_pid, _loop_thread
+    with _lock:
+        if _loop is not None and _loop_pid == os.getpid():
+            _loop.call_soon_threadsafe(_loop.stop)
+            _loop_thread.join(timeout=5)
+        _loop, _loop_pid, _loop_thread = None, None, None
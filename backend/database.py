@@ -10,12 +10,17 @@ Version: 1.1.0 (Optimized & Cleaned)
 
 import os
 import logging
-from typing import Optional
+import sys
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple, Any
 from urllib.parse import quote_plus  # NEW - ADDED for password encoding
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import MongoClient, AsyncMongoClient, ASCENDING, DESCENDING
 from pymongo.database import Database
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, ServerSelectionTimeoutError
 from dotenv import load_dotenv
+from metrics import mongo_listener
 
 # Load environment variables
 load_dotenv()
@@ -28,9 +33,64 @@ logger = logging.getLogger(__name__)
 MONGODB_URI = os.environ.get("MONGODB_URI")
 MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "finedge_db")
 
+# Connection pool settings shared by the sync and async clients
+MONGO_CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 10000,
+    "connectTimeoutMS": 20000,
+    "socketTimeoutMS": 20000,
+    "maxPoolSize": 100,
+    "minPoolSize": 10,
+    "maxIdleTimeMS": 45000,
+    "retryWrites": True,
+    "retryReads": True,
+    # Per-command latency for /metrics and the Server-Timing header
+    "event_listeners": [mongo_listener]
+}
+
 # Global database connection
 _db_client: Optional[MongoClient] = None
 _database: Optional[Database] = None
+_db_pid: Optional[int] = None
+
+# Global async connection (bound to the shared event loop, see async_runtime.py)
+_async_client: Optional[AsyncMongoClient] = None
+_async_database: Optional[AsyncDatabase] = None
+_async_pid: Optional[int] = None
+
+
+def _connection_uri() -> str:
+    """
+    MONGODB_URI with the password URL-encoded when it contains special characters.
+
+    Raises:
+        ValueError: If MONGODB_URI is not set in environment
+    """
+    if not MONGODB_URI:
+        raise ValueError("MONGODB_URI not set in environment")
+
+    connection_uri = MONGODB_URI
+
+    # ENHANCED - Auto-encode password with special characters
+    if "mongodb+srv://" in connection_uri:
+        try:
+            # Extract username and password from URI
+            parts = connection_uri.replace("mongodb+srv://", "").split("@")
+            if len(parts) > 1:
+                credentials = parts[0]
+                if ":" in credentials:
+                    username, password = credentials.split(":", 1)
+
+                    # Check if password needs encoding
+                    special_chars = ['@', '#', '$', '%', '^', '&', '+', '=', ':', '/', '?', ' ', '!']
+                    if any(char in password for char in special_chars):
+                        encoded_password = quote_plus(password)
+                        connection_uri = connection_uri.replace(f":{password}@", f":{encoded_password}@")
+                        # Silent encoding - no log spam
+        except Exception:
+            # If parsing fails, continue with original URI
+            pass
+
+    return connection_uri
 
 
 def get_database() -> Database:
@@ -40,7 +100,9 @@ def get_database() -> Database:
     UPDATED - Cleaner logging and automatic password encoding
     
     Creates a new connection if none exists, otherwise returns existing connection.
-    Uses connection pooling for efficient resource management.
+    Uses connection pooling for efficient resource management. A forked
+    worker process (pre-fork server) creates its own client instead of
+    using the pool inherited from its parent.
     
     Returns:
         Database: MongoDB database instance
@@ -49,10 +111,10 @@ def get_database() -> Database:
         ValueError: If MONGODB_URI is not set in environment
         ConnectionFailure: If unable to connect to MongoDB
     """
-    global _db_client, _database
+    global _db_client, _database, _db_pid
     
     # Return existing connection if available (LEGACY)
-    if _database is not None:
+    if _database is not None and _db_pid == os.getpid():
         return _database
     
     # Validate MongoDB URI (LEGACY)
@@ -63,27 +125,7 @@ def get_database() -> Database:
         # UPDATED - Cleaner log message
         logger.info("📊 Connecting to MongoDB Atlas...")
         
-        connection_uri = MONGODB_URI
-        
-        # ENHANCED - Auto-encode password with special characters
-        if "mongodb+srv://" in connection_uri:
-            try:
-                # Extract username and password from URI
-                parts = connection_uri.replace("mongodb+srv://", "").split("@")
-                if len(parts) > 1:
-                    credentials = parts[0]
-                    if ":" in credentials:
-                        username, password = credentials.split(":", 1)
-                        
-                        # Check if password needs encoding
-                        special_chars = ['@', '#', '$', '%', '^', '&', '+', '=', ':', '/', '?', ' ', '!']
-                        if any(char in password for char in special_chars):
-                            encoded_password = quote_plus(password)
-                            connection_uri = connection_uri.replace(f":{password}@", f":{encoded_password}@")
-                            # Silent encoding - no log spam
-            except Exception:
-                # If parsing fails, continue with original URI
-                pass
+        connection_uri = _connection_uri()
         
         # Create MongoDB client with connection pooling (LEGACY)
         # _db_client = MongoClient(
@@ -92,23 +134,14 @@ def get_database() -> Database:
         #     connectTimeoutMS=10000,
         #     maxPoolSize=50
         # )
-        _db_client = MongoClient(
-            connection_uri,
-            serverSelectionTimeoutMS=10000,
-            connectTimeoutMS=20000,
-            socketTimeoutMS=20000,
-            maxPoolSize=100,
-            minPoolSize=10,
-            maxIdleTimeMS=45000,
-            retryWrites=True,
-            retryReads=True
-        )
+        _db_client = MongoClient(connection_uri, **MONGO_CLIENT_OPTIONS)
         
         # Verify connection by pinging the database (LEGACY)
         _db_client.admin.command('ping')
         
         # Get database instance (LEGACY)
         _database = _db_client[MONGODB_DB_NAME]
+        _db_pid = os.getpid()
         
         # UPDATED - Cleaner success message
         logger.info(f"✅ MongoDB connected: {MONGODB_DB_NAME}")
@@ -128,6 +161,32 @@ def get_database() -> Database:
         raise
 
 
+def get_async_database() -> AsyncDatabase:
+    """
+    Get the async MongoDB database instance (pymongo's AsyncMongoClient).
+
+    Only use it from coroutines running on the shared event loop
+    (async_runtime.run_async); the client belongs to that loop. A forked
+    worker process creates its own client on first use.
+
+    Returns:
+        AsyncDatabase: Async MongoDB database instance
+
+    Raises:
+        ValueError: If MONGODB_URI is not set in environment
+    """
+    global _async_client, _async_database, _async_pid
+
+    if _async_database is not None and _async_pid == os.getpid():
+        return _async_database
+
+    _async_client = AsyncMongoClient(_connection_uri(), **MONGO_CLIENT_OPTIONS)
+    _async_database = _async_client[MONGODB_DB_NAME]
+    _async_pid = os.getpid()
+    logger.info(f"✅ Async MongoDB client ready: {MONGODB_DB_NAME}")
+    return _async_database
+
+
 def close_database_connection():
     """
     Close the MongoDB connection.
@@ -197,6 +256,383 @@ class Collections:
 
     INVESTMENT_RECOMMENDATIONS = "investment_recommendations"  # ✅ ADD THIS
 
+    # Learning subsystem (managed by learning_progress.py)
+    LEARNING_PROGRESS = "learning_progress"
+
+    # One marker document per completed one-off data migration
+    MIGRATIONS = "migrations"
+
+    # Async /api/analyze job state shared by the server workers (agent/analysis_jobs.py)
+    ANALYSIS_JOBS = "analysis_jobs"
+
+
+# ==================== INDEX SPECIFICATION ====================
+
+# NEW - ADDED: Declarative index spec per collection.
+# Each entry is (keys, options). Names are fixed so the migration stays idempotent
+# and can report exactly which indexes it had to create.
+INDEX_SPECS: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    Collections.USER_PROFILES: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.INCOME: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.EXPENSES: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.ASSETS: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.LIABILITIES: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.GOALS: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.RISK_TOLERANCE: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.SESSIONS: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.AI_CHAT_HISTORY: [
+        ([("clerkUserId", ASCENDING)], {"name": "clerkUserId_1"}),
+    ],
+    Collections.FINANCIAL_PATH_HISTORY: [
+        ([("clerkUserId", ASCENDING), ("createdAt", DESCENDING)], {"name": "clerkUserId_1_createdAt_-1"}),
+        # One capped history bucket per user (legacy per-result docs are excluded)
+        ([("clerkUserId", ASCENDING)], {
+            "name": "clerkUserId_1_bucket",
+            "unique": True,
+            "partialFilterExpression": {"entries": {"$exists": True}},
+        }),
+    ],
+    Collections.INVESTMENT_RECOMMENDATIONS: [
+        ([("clerkUserId", ASCENDING), ("createdAt", DESCENDING)], {"name": "clerkUserId_1_createdAt_-1"}),
+        # TTL - Mongo purges recommendations once expiresAt has passed
+        ([("expiresAt", ASCENDING)], {"name": "expiresAt_ttl", "expireAfterSeconds": 0}),
+    ],
+    Collections.ANALYSIS_JOBS: [
+        # TTL: MongoDB removes each job once its expiresAt has passed
+        ([("expiresAt", ASCENDING)], {"name": "expiresAt_ttl", "expireAfterSeconds": 0}),
+    ],
+    Collections.LEARNING_PROGRESS: [
+        ([("user_id", ASCENDING)], {"name": "user_id_1", "unique": True}),
+        ([("total_points", ASCENDING)], {"name": "total_points_1"}),
+        ([("total_points", DESCENDING), ("courses_completed", DESCENDING)], {"name": "total_points_-1_courses_completed_-1"}),
+        ([("updated_at", ASCENDING)], {"name": "updated_at_1"}),
+    ],
+}
+
+# Hot-path queries that must never fall back to a collection scan.
+# Each entry is (collection, filter, sort), planned against a scratch copy of the collection.
+PROBE_USER_ID = "__index_probe__"
+PROBE_GOAL_ID = "__index_probe_goal__"
+PLAN_CHECK_PREFIX = "__plan_check__"
+
+# Marker _ids in Collections.MIGRATIONS
+FINANCIAL_PATH_BUCKETS_MIGRATION = "financial_path_history_buckets"
+CHAT_MESSAGE_IDS_MIGRATION = "ai_chat_message_ids"
+RECOMMENDATIONS_TTL_MIGRATION = "investment_recommendations_ttl"
+
+# How long a cached investment recommendation lives (its expiresAt)
+RECOMMENDATION_TTL = timedelta(hours=24)
+
+HOT_PATH_QUERIES: List[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    (Collections.USER_PROFILES, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.INCOME, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.EXPENSES, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.ASSETS, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.LIABILITIES, {"clerkUserId": PROBE_USER_ID}, None),
+    # Goals live in the profile document (update/delete match on goals.id); the legacy collection by user
+    (Collections.USER_PROFILES, {"clerkUserId": PROBE_USER_ID, "goals.id": PROBE_GOAL_ID}, None),
+    (Collections.GOALS, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.AI_CHAT_HISTORY, {"clerkUserId": PROBE_USER_ID}, None),
+    (Collections.FINANCIAL_PATH_HISTORY, {"clerkUserId": PROBE_USER_ID, "entries": {"$exists": True}}, None),
+    (Collections.INVESTMENT_RECOMMENDATIONS, {"clerkUserId": PROBE_USER_ID}, [("createdAt", DESCENDING)]),
+]
+
+
+def ensure_indexes(db: Optional[Database] = None) -> Dict[str, List[str]]:
+    """
+    Apply INDEX_SPECS to the database.
+    
+    Idempotent: indexes that already exist (by name) are left untouched.
+    
+    Args:
+        db: Database instance (defaults to get_database())
+        
+    Returns:
+        dict: collection name -> list of index names created by this run
+    """
+    db = db if db is not None else get_database()
+    created: Dict[str, List[str]] = {}
+    
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        existing = set(collection.index_information().keys())
+        
+        for keys, options in specs:
+            if options["name"] in existing:
+                continue
+            collection.create_index(keys, **options)
+            created.setdefault(collection_name, []).append(options["name"])
+    
+    return created
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Collect every stage name in a (possibly nested) explain plan."""
+    stages = []
+    if not isinstance(plan, dict):
+        return stages
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+def check_hot_path_plans(db: Optional[Database] = None) -> Dict[str, List[str]]:
+    """
+    Explain every HOT_PATH_QUERIES entry and fail if any plan uses COLLSCAN.
+    
+    Live collections are never written to: each query is planned against a
+    scratch collection (PLAN_CHECK_PREFIX + name) with the same INDEX_SPECS
+    and one seeded probe document, dropped again afterwards. CLI only
+    (python database.py migrate --check-plans).
+    
+    Args:
+        db: Database instance (defaults to get_database())
+        
+    Returns:
+        dict: "collection {filter fields}" -> winning plan stages
+        
+    Raises:
+        RuntimeError: If any hot-path query plan reports COLLSCAN
+    """
+    db = db if db is not None else get_database()
+    plans: Dict[str, List[str]] = {}
+    offenders = []
+    
+    queries_by_collection: Dict[str, List[Tuple[Dict[str, Any], Optional[List[Tuple[str, int]]]]]] = {}
+    for collection_name, query, sort in HOT_PATH_QUERIES:
+        queries_by_collection.setdefault(collection_name, []).append((query, sort))
+    
+    for collection_name, queries in queries_by_collection.items():
+        scratch = db[f"{PLAN_CHECK_PREFIX}{collection_name}"]
+        scratch.drop()
+        try:
+            for keys, options in INDEX_SPECS.get(collection_name, []):
+                scratch.create_index(keys, **options)
+            scratch.insert_one({
+                "clerkUserId": PROBE_USER_ID,
+                "createdAt": datetime.utcnow(),
+                "goals": [{"id": PROBE_GOAL_ID}],
+                "entries": []
+            })
+            
+            for query, sort in queries:
+                cursor = scratch.find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                explain = cursor.explain()
+                
+                label = f"{collection_name} {{{', '.join(query)}}}"
+                stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+                plans[label] = stages
+                if "COLLSCAN" in stages:
+                    offenders.append(label)
+        finally:
+            scratch.drop()
+    
+    if offenders:
+        raise RuntimeError(f"COLLSCAN on hot-path queries: {', '.join(offenders)}")
+    
+    return plans
+
+
+def upsert_with_retry(collection, filter: Dict[str, Any], update: Dict[str, Any]):
+    """
+    update_one(filter, update, upsert=True), retried once on DuplicateKeyError.
+    
+    Two concurrent upserts can both miss and both insert; the loser hits the
+    unique index and, retried, now matches the winner's document.
+    """
+    try:
+        return collection.update_one(filter, update, upsert=True)
+    except DuplicateKeyError:
+        return collection.update_one(filter, update, upsert=True)
+
+
+def migrate_financial_path_history(db: Optional[Database] = None) -> int:
+    """
+    Fold legacy one-document-per-result financial path history into the
+    per-user capped bucket documents (see models.FinancialPathHistorySchema).
+    
+    Runs once: completion is recorded in the migrations collection and later
+    calls return without scanning.
+    
+    Args:
+        db: Database instance (defaults to get_database())
+        
+    Returns:
+        int: Number of legacy documents folded into buckets
+    """
+    from models import FinancialPathHistorySchema
+
+    db = db if db is not None else get_database()
+    if db[Collections.MIGRATIONS].find_one({"_id": FINANCIAL_PATH_BUCKETS_MIGRATION}, {"_id": 1}):
+        return 0
+    collection = db[Collections.FINANCIAL_PATH_HISTORY]
+    
+    legacy_by_user: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in collection.find({"entries": {"$exists": False}}):
+        legacy_by_user.setdefault(doc.get("clerkUserId"), []).append(doc)
+    
+    migrated = 0
+    for clerk_user_id, docs in legacy_by_user.items():
+        if not clerk_user_id:
+            continue
+        upsert_with_retry(
+            collection,
+            FinancialPathHistorySchema.bucket_filter(clerk_user_id),
+            FinancialPathHistorySchema.push_update(docs)
+        )
+        collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        migrated += len(docs)
+    
+    db[Collections.MIGRATIONS].update_one(
+        {"_id": FINANCIAL_PATH_BUCKETS_MIGRATION},
+        {"$set": {"completedAt": datetime.utcnow(), "migrated": migrated}},
+        upsert=True
+    )
+    if migrated:
+        logger.info(f"🗂️ Folded {migrated} legacy financial path result(s) into capped history")
+    return migrated
+
+
+def migrate_chat_message_ids(db: Optional[Database] = None) -> int:
+    """
+    Give every stored AI chat message an id.
+    
+    Paging (GET /api/chat/ai-advisor/history/messages) finds its cursor with
+    $indexOfArray over messages.id, which skips messages without one, so
+    history saved before ids were assigned would page from the wrong
+    position. Each document is rewritten only if it is unchanged since it
+    was read; a concurrent append makes it re-read and try again.
+    
+    Runs once: completion is recorded in the migrations collection.
+    
+    Args:
+        db: Database instance (defaults to get_database())
+        
+    Returns:
+        int: Number of messages that were given an id
+    """
+    db = db if db is not None else get_database()
+    if db[Collections.MIGRATIONS].find_one({"_id": CHAT_MESSAGE_IDS_MIGRATION}, {"_id": 1}):
+        return 0
+    collection = db[Collections.AI_CHAT_HISTORY]
+    missing_id = {"messages": {"$elemMatch": {"id": {"$in": [None, ""]}}}}
+    
+    backfilled = 0
+    for doc in collection.find(missing_id, {"_id": 1}):
+        for _ in range(3):
+            current = collection.find_one({"_id": doc["_id"]}, {"messages": 1})
+            if current is None:
+                break
+            stored = current.get("messages") or []
+            messages = [dict(m, id=str(ObjectId())) if isinstance(m, dict) and not m.get("id") else m
+                        for m in stored]
+            result = collection.update_one({"_id": doc["_id"], "messages": stored}, {"$set": {"messages": messages}})
+            if result.matched_count:
+                backfilled += sum(1 for old, new in zip(stored, messages) if old is not new)
+                break
+    
+    db[Collections.MIGRATIONS].update_one(
+        {"_id": CHAT_MESSAGE_IDS_MIGRATION},
+        {"$set": {"completedAt": datetime.utcnow(), "migrated": backfilled}},
+        upsert=True
+    )
+    if backfilled:
+        logger.info(f"🗂️ Gave {backfilled} stored chat message(s) a pagination id")
+    return backfilled
+
+
+def migrate_recommendation_expiry(db: Optional[Database] = None) -> int:
+    """
+    Give cached investment recommendations saved before the expiresAt TTL
+    index an expiresAt, so MongoDB purges them too: createdAt +
+    RECOMMENDATION_TTL, or RECOMMENDATION_TTL from now for documents without
+    a createdAt date.
+    
+    Runs once: completion is recorded in the migrations collection.
+    
+    Args:
+        db: Database instance (defaults to get_database())
+        
+    Returns:
+        int: Number of recommendations given an expiresAt
+    """
+    db = db if db is not None else get_database()
+    if db[Collections.MIGRATIONS].find_one({"_id": RECOMMENDATIONS_TTL_MIGRATION}, {"_id": 1}):
+        return 0
+    collection = db[Collections.INVESTMENT_RECOMMENDATIONS]
+    
+    dated = collection.update_many(
+        {"expiresAt": {"$exists": False}, "createdAt": {"$type": "date"}},
+        [{"$set": {"expiresAt": {"$add": ["$createdAt", int(RECOMMENDATION_TTL.total_seconds() * 1000)]}}}]
+    )
+    undated = collection.update_many(
+        {"expiresAt": {"$exists": False}},
+        {"$set": {"expiresAt": datetime.utcnow() + RECOMMENDATION_TTL}}
+    )
+    backfilled = dated.modified_count + undated.modified_count
+    
+    db[Collections.MIGRATIONS].update_one(
+        {"_id": RECOMMENDATIONS_TTL_MIGRATION},
+        {"$set": {"completedAt": datetime.utcnow(), "migrated": backfilled}},
+        upsert=True
+    )
+    if backfilled:
+        logger.info(f"🗂️ Gave {backfilled} cached recommendation(s) an expiresAt")
+    return backfilled
+
+
+def run_index_migration(check_plans: bool = False) -> Dict[str, Any]:
+    """
+    Create missing indexes, run the one-off data migrations (financial path
+    history buckets, chat message ids, recommendation expiry), and
+    optionally verify hot-path query plans.
+    
+    Used by the CLI (python database.py migrate) and app startup.
+    
+    Args:
+        check_plans: Also run check_hot_path_plans after creating indexes
+        
+    Returns:
+        dict: {"created": {...}, "plans": {...} or None}
+    """
+    db = get_database()
+    created = ensure_indexes(db)
+    migrate_financial_path_history(db)
+    migrate_chat_message_ids(db)
+    migrate_recommendation_expiry(db)
+    
+    if created:
+        for collection_name, names in created.items():
+            logger.info(f"🗂️ Created indexes on {collection_name}: {', '.join(names)}")
+    else:
+        logger.info("🗂️ All indexes already present")
+    
+    plans = check_hot_path_plans(db) if check_plans else None
+    return {"created": created, "plans": plans}
+
 
 
 
@@ -204,6 +640,30 @@ class Collections:
 # Database will connect lazily on first actual request
 # This prevents double-connection logs and startup errors
 
+if __name__ == "__main__":
+    # Usage: python database.py migrate [--check-plans]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FinEdge database maintenance")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--check-plans", action="store_true",
+                        help="fail if a hot-path query plan uses COLLSCAN")
+    args = parser.parse_args()
+
+    try:
+        report = run_index_migration(check_plans=args.check_plans)
+    except RuntimeError as e:
+        logger.error(f"❌ Index migration check failed: {e}")
+        sys.exit(1)
+
+    created_count = sum(len(names) for names in report["created"].values())
+    print(f"Created {created_count} index(es)")
+    for collection_name, names in report["created"].items():
+        print(f"  {collection_name}: {', '.join(names)}")
+    if report["plans"] is not None:
+        for collection_name, stages in report["plans"].items():
+            print(f"  plan {collection_name}: {' -> '.join(stages)}")
+
 # End of backend/database.py
 
 
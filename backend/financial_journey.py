@@ -11,30 +11,47 @@ import json
 import logging
 from dotenv import load_dotenv
 
+from startup import lazy_resource
+from metrics import timed
+
 # Configure logging FIRST
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import Groq for primary LLM
-try:
-    from langchain_groq import ChatGroq
-    GROQ_AVAILABLE = True
-except ImportError:
-    logger.warning("langchain_groq not available")
-    GROQ_AVAILABLE = False
-
-# Import HuggingFace for fallback
-try:
-    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
-    HF_AVAILABLE = True
-except ImportError:
+# LLM provider integrations, imported by the first initialize_llm_with_fallback() call
+ChatGroq = None
+ChatHuggingFace = None
+HuggingFaceEndpoint = None
+GROQ_AVAILABLE = None
+HF_AVAILABLE = None
+
+
+def _import_providers():
+    """Import the Groq and HuggingFace LangChain integrations (first call only)."""
+    global ChatGroq, ChatHuggingFace, HuggingFaceEndpoint, GROQ_AVAILABLE, HF_AVAILABLE
+    if GROQ_AVAILABLE is not None:
+        return
+
+    # Import Groq for primary LLM
+    try:
+        from langchain_groq import ChatGroq
+        GROQ_AVAILABLE = True
+    except ImportError:
+        logger.warning("langchain_groq not available")
+        GROQ_AVAILABLE = False
+
+    # Import HuggingFace for fallback
     try:
-        from langchain_community.chat_models.huggingface import ChatHuggingFace
-        from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+        from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
         HF_AVAILABLE = True
     except ImportError:
-        logger.warning("langchain_huggingface not available")
-        HF_AVAILABLE = False
+        try:
+            from langchain_community.chat_models.huggingface import ChatHuggingFace
+            from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+            HF_AVAILABLE = True
+        except ImportError:
+            logger.warning("langchain_huggingface not available")
+            HF_AVAILABLE = False
 
 # Load API key
 load_dotenv()
@@ -66,6 +83,7 @@ def initialize_llm_with_fallback(temperature: float = 0.7, max_tokens: int = 163
     Tries Groq keys first (1, 2, 3), then HuggingFace tokens (1, 2, 3).
     """
     global ACTIVE_LLM_PROVIDER, ACTIVE_API_KEY, ACTIVE_KEY_INDEX
+    _import_providers()
 
     # Try Groq keys first
     if GROQ_AVAILABLE:
@@ -209,13 +227,28 @@ IMPORTANT GUIDELINES:
 Do NOT return any text outside of this JSON object.
 """
 
-# Initialize model with fallback
-try:
-    model = initialize_llm_with_fallback(temperature=0.7, max_tokens=16384)
+# Initialize model with fallback on first use (the provider probe makes a live call)
+@lazy_resource("financial_journey_llm", "Financial path LLM (llama-3.3-70b, provider probe)", fork_safe=False)
+def model_resource():
+    llm = initialize_llm_with_fallback(temperature=0.7, max_tokens=16384)
     logger.info(f"✅ Model initialized successfully using {ACTIVE_LLM_PROVIDER} (key #{ACTIVE_KEY_INDEX})")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize model: {e}")
-    model = None
+    return llm
+
+
+def get_model():
+    """The financial path LLM, or None while no provider can be initialized."""
+    try:
+        return model_resource.get()
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize model: {e}")
+        return None
+
+
+def __getattr__(name):
+    # model used to be built at import time
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_gemini_response(user_input: str, risk: str, user_data: dict = None) -> str:
@@ -227,6 +260,7 @@ def get_gemini_response(user_input: str, risk: str, user_data: dict = None) -> s
         risk: Risk profile (conservative/moderate/aggressive)
         user_data: Additional user data fetched automatically (optional)
     """
+    model = get_model()
     if model is None:
         error_response = {
             "nodes": [
@@ -291,7 +325,8 @@ Based on the above information, create a comprehensive investment analysis with
             HumanMessage(content=prompt)
         ]
         
-        response = model.invoke(messages)
+        with timed("llm", "financial_journey"):
+            response = model.invoke(messages)
         
         # Extract response text
         response_text = response.content.strip()
@@ -0,0 +1,119 @@
+"""
+FinEdge Gunicorn Configuration (pre-fork server)
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+The master imports wsgi.py once (preload_app), which warms the read-only
+state, and then forks the workers, which share it copy-on-write. Workers
+are recycled gracefully after GUNICORN_MAX_REQUESTS requests (with jitter
+so they do not all restart together) or once their RSS passes
+GUNICORN_MAX_WORKER_RSS_MB, which bounds memory growth.
+
+The workers share one market snapshot segment created by the master
+(market_snapshot.py); each queues to be its refresher when it boots.
+
+Every worker logs its boot time (fork to ready) and memory; the same
+numbers are served per worker by /api/startup-report, and
+`python startup.py workers --compare` measures them with preload on and off.
+
+The master exports its pid as METRICS_SERVER_PID, so the workers share
+one metrics directory (metrics.py) with preload on or off; the master
+removes it on exit.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import os
+import threading
+import time
+
+# Server socket
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Workers: processes x threads (views block on MongoDB, yfinance and LLM calls)
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+wsgi_app = "wsgi:application"
+
+# Load the app (and the preloaded state) once in the master
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1").lower() not in ("0", "false", "no")
+
+# Recycling: restart a worker after this many requests (+ up to the jitter),
+# or after a request that leaves it above this RSS (0 = no RSS limit)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+max_worker_rss_mb = float(os.environ.get("GUNICORN_MAX_WORKER_RSS_MB", "0"))
+
+# Stock analyses run for tens of seconds; recycled workers get this long to finish
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "60"))
+
+# Logging
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# RSS is checked every this many requests (one /proc read)
+RSS_CHECK_INTERVAL = 20
+
+
+def _rss_mb():
+    """Resident set size of this process in MB (/proc/self/statm; 0 where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return 0.0
+
+
+def on_starting(server):
+    # Workers name their shared metrics directory after the master (metrics.py);
+    # set here because --daemon forks the master after this file is read
+    os.environ["METRICS_SERVER_PID"] = str(os.getpid())
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+    worker.requests_seen = 0
+    import startup
+    startup.after_fork()
+
+
+def post_worker_init(worker):
+    import startup
+    seconds = time.perf_counter() - worker.forked_at
+    startup.record_boot(seconds)
+    memory = startup.process_memory()
+    worker.log.info(f"Worker {worker.pid} booted in {seconds:.3f}s ("
+                    + ", ".join(f"{key[:-2]} {value} MB" for key, value in memory.items()) + ")")
+    # Queue for the market snapshot refresher role (one worker holds it at a time)
+    from market_snapshot import market_snapshot
+    market_snapshot.ensure_refresher()
+    # Connect the learning resources in the background, so the first learning request finds them built
+    from learning_routes import LEARNING_RESOURCES
+    threading.Thread(target=startup.warm_up, args=([r.name for r in LEARNING_RESOURCES],),
+                     name="learning-warm-up", daemon=True).start()
+
+
+def post_request(worker, req, environ, resp):
+    if max_worker_rss_mb <= 0:
+        return
+    worker.requests_seen += 1
+    if worker.requests_seen % RSS_CHECK_INTERVAL:
+        return
+    rss = _rss_mb()
+    if rss > max_worker_rss_mb and worker.alive:
+        # Finish the in-flight requests, then exit; the master forks a fresh worker
+        worker.log.info(f"Worker {worker.pid} RSS {rss:.0f} MB > {max_worker_rss_mb:.0f} MB, recycling")
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    server.log.info(f"Worker {worker.pid} exiting (RSS {_rss_mb():.1f} MB)")
+
+
+def on_exit(server):
+    import metrics
+    metrics.remove_metrics_dir()
@@ -0,0 +1,118 @@
+"""
+FinEdge Flask JSON Provider
+
+Plugs the one-pass BSON-aware serializer (models.to_json_safe) into Flask so
+jsonify() handles ObjectId at any depth. Uses orjson when it is installed
+(compiled encoder) and falls back to the standard library encoder otherwise.
+Dates keep Flask's default HTTP-date format so existing responses are unchanged.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Union
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+from models import to_json_safe
+
+logger = logging.getLogger(__name__)
+
+# Optional compiled encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Fallback hook for types the encoder does not know natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # Dates, decimals, UUIDs, dataclasses - same handling as Flask's default provider
+    return DefaultJSONProvider.default(value)
+
+
+class FinEdgeJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for the Flask app.
+
+    Keeps Flask's defaults (sorted keys, HTTP dates) so responses match the
+    stock provider apart from whitespace.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Flask's response() only ever passes compact separators or indent=2
+        if ORJSON_AVAILABLE and set(kwargs) <= {"separators", "indent"}:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get("indent"):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def _benchmark(doc_count: int = 1000, rounds: int = 20) -> None:
+    """Micro-benchmark: serialize + encode a 1k-document response."""
+    import copy
+    import time
+
+    docs = [
+        {
+            "_id": ObjectId(),
+            "clerkUserId": "user_bench",
+            "name": f"Entry {i}",
+            "amount": float(i),
+            "category": "other",
+            "createdAt": datetime.utcnow(),
+            "updatedAt": datetime.utcnow(),
+            "goals": [{"id": str(j), "target": j * 1000, "at": datetime.utcnow()} for j in range(3)],
+        }
+        for i in range(doc_count)
+    ]
+
+    def legacy_serialize(doc):
+        # Previous serialize_document: top-level only, in place
+        doc["_id"] = str(doc["_id"])
+        doc.setdefault("id", doc["_id"])
+        for key, value in doc.items():
+            if isinstance(value, datetime):
+                doc[key] = value.isoformat()
+        return doc
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        print(f"{label:<40} {elapsed:8.2f} ms")
+
+    provider = FinEdgeJSONProvider.__new__(FinEdgeJSONProvider)
+    print(f"{doc_count} documents, {rounds} rounds, orjson={'yes' if ORJSON_AVAILABLE else 'no'}")
+    timed("legacy serialize (deepcopy) + json", lambda: json.dumps(
+        [legacy_serialize(d) for d in copy.deepcopy(docs)], default=str))
+    timed("to_json_safe + json", lambda: json.dumps(to_json_safe(docs)))
+    timed("provider.dumps (raw BSON docs)", lambda: provider.dumps(docs, separators=(",", ":")))
+    timed("to_json_safe + provider.dumps", lambda: provider.dumps(to_json_safe(docs), separators=(",", ":")))
+
+
+if __name__ == "__main__":
+    _benchmark()
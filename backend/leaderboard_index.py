@@ -0,0 +1,313 @@
+"""
+FinEdge Learning Leaderboard Index
+
+In-memory order-statistic index of the learners who take part in the
+leaderboard. Entries are kept in a sorted array of
+(-total_points, -courses_completed, user_id) keys, so rank, top-N and
+"users around me" lookups are a bisect plus a slice and never touch MongoDB.
+
+The index is loaded once from the learning_progress collection and then
+updated by LearningProgressManager on every write that changes points,
+courses or participation. Each server process holds its own copy, so the
+index is also reloaded in the background every
+LEADERBOARD_REFRESH_SECONDS to pick up writes made by other processes.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import os
+import threading
+import time
+import logging
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Index configuration
+LEADERBOARD_REFRESH_SECONDS = float(os.environ.get("LEADERBOARD_REFRESH_SECONDS", "300"))
+
+# Fields of a learning profile the leaderboard shows
+LEADERBOARD_PROJECTION = {
+    "user_id": 1,
+    "username": 1,
+    "total_points": 1,
+    "courses_completed": 1,
+    "level": 1,
+    "learning_streak.current_streak": 1,
+    "badges_earned": 1,
+    "leaderboard_participation": 1
+}
+
+
+def _sort_key(entry: Dict[str, Any]) -> Tuple[int, int, str]:
+    """Ascending key order == leaderboard order (points, then courses, descending)."""
+    return (-int(entry.get("total_points", 0)), -int(entry.get("courses_completed", 0)), entry["user_id"])
+
+
+class LeaderboardIndex:
+    """
+    Thread-safe sorted-array leaderboard.
+
+    Lookups are O(log n) (plus the size of the returned slice). An update is
+    a bisect plus one list insert/delete, i.e. a memmove of the key array,
+    which stays well under a millisecond for hundreds of thousands of users.
+    """
+
+    def __init__(self, refresh_seconds: float = LEADERBOARD_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._keys: List[Tuple[int, int, str]] = []
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._collection = None
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # User ids updated in memory while a load() scans the collection (None when no load runs)
+        self._touched: Optional[set] = None
+        self._updates = 0
+        self._reloads = 0
+
+    # ----- loading -----
+
+    def load(self, collection) -> int:
+        """
+        (Re)build the index from the learning_progress collection.
+
+        Users upserted or removed while the collection is scanned keep their
+        in-memory entry, so a write made during a reload is not rolled back
+        to the older snapshot.
+
+        Returns:
+            int: Number of participating users indexed
+        """
+        self._collection = collection
+        with self._lock:
+            self._touched = set()
+        entries = {}
+        for doc in collection.find({"leaderboard_participation": True}, LEADERBOARD_PROJECTION):
+            entry = self._entry_from_doc(doc)
+            entries[entry["user_id"]] = entry
+        keys = sorted(_sort_key(entry) for entry in entries.values())
+
+        with self._lock:
+            for user_id in self._touched:
+                old = entries.pop(user_id, None)
+                if old is not None:
+                    del keys[bisect_left(keys, _sort_key(old))]
+                current = self._entries.get(user_id)
+                if current is not None:
+                    entries[user_id] = current
+                    insort(keys, _sort_key(current))
+            self._touched = None
+            self._entries = entries
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+            self._reloads += 1
+        logger.info(f"Leaderboard index loaded with {len(keys)} users")
+        return len(keys)
+
+    def _maybe_refresh(self) -> None:
+        """Reload in a background thread once the index is older than refresh_seconds."""
+        if self._collection is None or self.refresh_seconds <= 0:
+            return
+        with self._lock:
+            stale = self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds
+            if not stale or self._refreshing:
+                return
+            self._refreshing = True
+
+        def reload():
+            try:
+                self.load(self._collection)
+            except Exception as e:
+                logger.warning(f"Leaderboard index refresh failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=reload, name="leaderboard-refresh", daemon=True).start()
+
+    @staticmethod
+    def _entry_from_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+        streak = doc.get("learning_streak") or {}
+        return {
+            "_id": doc.get("_id"),
+            "user_id": doc["user_id"],
+            "username": doc.get("username"),
+            "total_points": int(doc.get("total_points", 0)),
+            "courses_completed": int(doc.get("courses_completed", 0)),
+            "level": doc.get("level"),
+            "learning_streak": {"current_streak": streak.get("current_streak", 0)},
+            "badges_earned": list(doc.get("badges_earned") or [])
+        }
+
+    # ----- updates -----
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """
+        Insert or move a user after a write. doc is the user's learning
+        profile, or user_id plus the changed fields (the rest is kept from the
+        existing entry); users who opted out of the leaderboard are removed.
+        """
+        if not doc.get("leaderboard_participation", True):
+            self.remove(doc["user_id"])
+            return
+
+        with self._lock:
+            old = self._entries.get(doc["user_id"])
+            entry = self._entry_from_doc({**old, **doc} if old is not None else doc)
+            if old is not None:
+                old_key = _sort_key(old)
+                if old_key != _sort_key(entry):
+                    del self._keys[bisect_left(self._keys, old_key)]
+                    insort(self._keys, _sort_key(entry))
+            else:
+                insort(self._keys, _sort_key(entry))
+            self._entries[entry["user_id"]] = entry
+            self._touch(entry["user_id"])
+            self._updates += 1
+
+    def add_badge(self, user_id: str, badge_id: str) -> None:
+        """Record a badge on an indexed user (display only; the order is unchanged)."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and badge_id not in entry["badges_earned"]:
+                entry["badges_earned"].append(badge_id)
+                self._touch(user_id)
+                self._updates += 1
+
+    def remove(self, user_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            self._touch(user_id)
+            if entry is not None:
+                del self._keys[bisect_left(self._keys, _sort_key(entry))]
+                self._updates += 1
+
+    def _touch(self, user_id: str) -> None:
+        """Note an in-memory update for a load() in progress (caller holds the lock)."""
+        if self._touched is not None:
+            self._touched.add(user_id)
+
+    # ----- queries -----
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def rank_for_points(self, total_points: int) -> int:
+        """1 + number of participating users with more points (ties share a rank)."""
+        self._maybe_refresh()
+        with self._lock:
+            return bisect_left(self._keys, (-int(total_points),)) + 1
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """Rank of an indexed user, or None if the user is not on the leaderboard."""
+        self._maybe_refresh()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            return bisect_left(self._keys, (-entry["total_points"],)) + 1
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """The first `limit` users in leaderboard order."""
+        self._maybe_refresh()
+        with self._lock:
+            return self._rows(0, limit)
+
+    def around(self, user_id: str, window: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        The user plus up to `window` users directly above and below.
+
+        Returns:
+            dict: {rank, position, entries} or None if the user is not indexed
+        """
+        self._maybe_refresh()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            position = bisect_left(self._keys, _sort_key(entry))
+            start = max(0, position - window)
+            return {
+                "rank": bisect_left(self._keys, (-entry["total_points"],)) + 1,
+                "position": position + 1,
+                "entries": self._rows(start, position + window + 1 - start)
+            }
+
+    def _rows(self, start: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Leaderboard rows (same fields as the old aggregation plus position and
+        rank) for keys[start:start + count]. Caller holds the lock.
+        """
+        rows = []
+        rank, points = None, None
+        for i, key in enumerate(self._keys[start:start + count]):
+            if key[0] != points:
+                # One bisect for the first row; after that rank only changes where points do
+                rank = bisect_left(self._keys, (key[0],)) + 1 if rank is None else start + i + 1
+                points = key[0]
+            entry = self._entries[key[2]]
+            row = {field: value for field, value in entry.items() if field != "user_id"}
+            row["learning_streak"] = dict(entry["learning_streak"])
+            row["badges_earned"] = list(entry["badges_earned"])
+            row["position"] = start + i + 1
+            row["rank"] = rank
+            rows.append(row)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'users': len(self._keys),
+                'updates': self._updates,
+                'reloads': self._reloads,
+                'ageSeconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+                'refreshSeconds': self.refresh_seconds
+            }
+
+
+# Global index instance
+leaderboard_index = LeaderboardIndex()
+
+
+if __name__ == "__main__":
+    # Micro-benchmark against synthetic users (no MongoDB needed)
+    import random
+
+    class _FakeCollection:
+        def __init__(self, docs):
+            self.docs = docs
+
+        def find(self, query, projection=None):
+            return iter(self.docs)
+
+    rng = random.Random(0)
+    n_users = 200_000
+    docs = [{
+        "_id": i, "user_id": f"user_{i}", "username": f"user {i}",
+        "total_points": rng.randrange(0, 50) * 300, "courses_completed": rng.randrange(0, 50),
+        "level": "Beginner", "learning_streak": {"current_streak": 0}, "badges_earned": [],
+        "leaderboard_participation": True
+    } for i in range(n_users)]
+
+    index = LeaderboardIndex(refresh_seconds=0)
+    start = time.perf_counter()
+    index.load(_FakeCollection(docs))
+    print(f"load {n_users} users: {time.perf_counter() - start:.3f}s")
+
+    for label, fn in [
+        ("rank", lambda: index.rank(f"user_{rng.randrange(n_users)}")),
+        ("top 50", lambda: index.top(50)),
+        ("around (5)", lambda: index.around(f"user_{rng.randrange(n_users)}", 5)),
+        ("points update", lambda: index.upsert({**docs[rng.randrange(n_users)], "total_points": rng.randrange(0, 50) * 300})),
+    ]:
+        runs = 10_000
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        print(f"{label:>14}: {(time.perf_counter() - start) / runs * 1e6:.1f} us/op")
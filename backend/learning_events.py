@@ -0,0 +1,392 @@
+"""
+FinEdge Learning Activity Log
+
+Append-only log of learning events (learning_events) plus daily and weekly
+per-user rollups (learning_rollups) that analytics read instead of the raw
+events.
+
+Events use a compact schema:
+    u    user_id
+    t    event time (UTC)
+    k    kind: "p" progress update, "c" course completed, "b" badge, "r" reset
+    c    course or badge id (when there is one)
+    pct  progress percentage (progress / completion)
+    pts  points awarded (completion)
+
+record() only appends to an in-process buffer. A background thread inserts
+the buffer with insert_many every LEARNING_EVENT_FLUSH_SECONDS (sooner when
+it reaches LEARNING_EVENT_BATCH_SIZE). Every LEARNING_ROLLUP_SECONDS the same
+thread runs the compactor. The compactor regroups the raw events of the days
+since its last run into daily rollups, then sums the daily rollups of the
+affected weeks into weekly rollups. A recomputed day replaces its rollup, so
+events flushed late still land in the right bucket. Only one process claims
+each compaction.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import os
+import atexit
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pymongo
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from database import get_database, get_async_database
+from learning_stats import week_start
+from startup import lazy_resource
+
+logger = logging.getLogger(__name__)
+
+# Log configuration
+LEARNING_EVENT_BATCH_SIZE = int(os.environ.get("LEARNING_EVENT_BATCH_SIZE", "200"))
+LEARNING_EVENT_FLUSH_SECONDS = float(os.environ.get("LEARNING_EVENT_FLUSH_SECONDS", "2"))
+LEARNING_ROLLUP_SECONDS = float(os.environ.get("LEARNING_ROLLUP_SECONDS", "60"))
+
+# Event kinds
+EVENT_PROGRESS = "p"
+EVENT_COMPLETION = "c"
+EVENT_BADGE = "b"
+EVENT_RESET = "r"
+
+# Rollup granularities
+DAILY = "d"
+WEEKLY = "w"
+
+# Unflushed events kept across failed inserts, in batches
+MAX_BUFFERED_BATCHES = 50
+
+_COMPACTOR_ID = "compactor"
+_ROLLUP_FIELDS = ("events", "progress_updates", "courses_completed", "points", "badges")
+
+
+class LearningEventLog:
+    """
+    Batched writer for learning events, compactor for their rollups, and
+    the rollup reads used by analytics.
+    """
+
+    def __init__(self, collection_name: str = "learning_events", rollup_collection_name: str = "learning_rollups",
+                 batch_size: int = LEARNING_EVENT_BATCH_SIZE, flush_seconds: float = LEARNING_EVENT_FLUSH_SECONDS,
+                 rollup_seconds: float = LEARNING_ROLLUP_SECONDS):
+        self.db = get_database()
+        self.collection_name = collection_name
+        self.rollup_collection_name = rollup_collection_name
+        self.collection = self.db[collection_name]
+        self.rollups = self.db[rollup_collection_name]
+
+        self.collection.create_index("t")
+        self.rollups.create_index([("u", 1), ("g", 1), ("s", -1)])
+        # Weekly compaction reads every user's daily rollups of the touched weeks
+        self.rollups.create_index([("g", 1), ("w", 1)])
+
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rollup_seconds = rollup_seconds
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._last_compaction = 0.0
+        self._flushed = 0
+        self._dropped = 0
+        atexit.register(self.flush)
+
+    @property
+    def async_rollups(self):
+        return get_async_database()[self.rollup_collection_name]
+
+    # ----- writing -----
+
+    def record(self, user_id: str, kind: str, at: Optional[datetime] = None, ref: Optional[str] = None,
+               progress: Optional[int] = None, points: int = 0) -> None:
+        """Queue one event (no I/O; written with the next batch)."""
+        event = {"u": user_id, "t": at or datetime.utcnow(), "k": kind}
+        if ref is not None:
+            event["c"] = ref
+        if progress is not None:
+            event["pct"] = progress
+        if points:
+            event["pts"] = points
+
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_worker()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Insert everything buffered. On failure the events go back to the
+        buffer (up to MAX_BUFFERED_BATCHES batches) for the next flush.
+
+        Returns:
+            int: Number of events inserted
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+
+        try:
+            self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates are events a failed earlier attempt had already inserted
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                self._requeue(batch, e)
+                return 0
+        except Exception as e:
+            self._requeue(batch, e)
+            return 0
+
+        self._flushed += len(batch)
+        return len(batch)
+
+    def _requeue(self, batch: List[Dict[str, Any]], error: Exception) -> None:
+        with self._lock:
+            self._buffer = batch + self._buffer
+            overflow = len(self._buffer) - MAX_BUFFERED_BATCHES * self.batch_size
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._dropped += overflow
+        logger.warning(f"Learning event flush failed ({len(batch)} events kept for retry): {str(error)}")
+
+    def _ensure_worker(self) -> None:
+        """Start the flush / compaction thread (again in a forked child)."""
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker = threading.Thread(target=self._run, name="learning-events", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self.rollup_seconds > 0 and time.monotonic() - self._last_compaction >= self.rollup_seconds:
+                    self._last_compaction = time.monotonic()
+                    self.compact()
+            except Exception as e:
+                logger.warning(f"Learning event worker error: {str(e)}")
+
+    # ----- compaction -----
+
+    def _claim(self, now: datetime, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Claim this compaction run for this process.
+
+        Returns:
+            dict: The compactor state ({} on the very first run), or None if
+            another process ran it within the last rollup interval
+        """
+        query = {"_id": _COMPACTOR_ID}
+        if not force:
+            query["$or"] = [
+                {"claimed_at": {"$exists": False}},
+                {"claimed_at": {"$lt": now - timedelta(seconds=self.rollup_seconds * 0.9)}}
+            ]
+        try:
+            state = self.rollups.find_one_and_update(query, {"$set": {"claimed_at": now}}, upsert=True)
+        except DuplicateKeyError:
+            return None
+        return state or {}
+
+    def compact(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild the daily rollups of every day since the last run (from the
+        day before, to pick up late batches) and the weekly rollups of
+        their weeks.
+
+        Args:
+            force: Run even if another process compacted recently
+
+        Returns:
+            dict: {days, weeks, daily, weekly, seconds} or {} if not claimed
+        """
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        state = self._claim(now, force)
+        if state is None:
+            return {}
+
+        today = datetime(now.year, now.month, now.day)
+        since = state.get("through")
+        if since is None:
+            first = self.collection.find_one({}, {"t": 1}, sort=[("t", pymongo.ASCENDING)])
+            if first is None:
+                return {}
+            since = first["t"]
+        since = min(datetime(since.year, since.month, since.day), today) - timedelta(days=1)
+
+        daily = list(self.collection.aggregate(self._daily_pipeline(since)))
+        if daily:
+            self.rollups.bulk_write([self._daily_rollup(row) for row in daily], ordered=False)
+
+        weeks = sorted({week_start(datetime.strptime(row["_id"]["d"], "%Y-%m-%d")) for row in daily})
+        weekly = list(self.rollups.aggregate(self._weekly_pipeline(weeks))) if weeks else []
+        if weekly:
+            self.rollups.bulk_write([self._weekly_rollup(row) for row in weekly], ordered=False)
+
+        self.rollups.update_one({"_id": _COMPACTOR_ID}, {"$set": {"through": today, "compacted_at": now}})
+        result = {
+            "days": (today - since).days + 1,
+            "weeks": len(weeks),
+            "daily": len(daily),
+            "weekly": len(weekly),
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+        logger.info(f"Learning rollups compacted: {result}")
+        return result
+
+    @staticmethod
+    def _daily_pipeline(since: datetime) -> List[Dict]:
+        """Raw events from `since` on, grouped per user and day."""
+        is_kind = lambda *kinds: {"$cond": [{"$in": ["$k", list(kinds)]}, 1, 0]}
+        return [
+            {"$match": {"t": {"$gte": since}}},
+            {"$group": {
+                "_id": {"u": "$u", "d": {"$dateToString": {"format": "%Y-%m-%d", "date": "$t"}}},
+                "events": {"$sum": 1},
+                "progress_updates": {"$sum": is_kind(EVENT_PROGRESS, EVENT_COMPLETION)},
+                "courses_completed": {"$sum": is_kind(EVENT_COMPLETION)},
+                "points": {"$sum": {"$ifNull": ["$pts", 0]}},
+                "badges": {"$sum": is_kind(EVENT_BADGE)}
+            }}
+        ]
+
+    @staticmethod
+    def _weekly_pipeline(weeks: List[datetime]) -> List[Dict]:
+        """Daily rollups of the given weeks, summed per user and week."""
+        return [
+            {"$match": {"g": DAILY, "w": {"$in": weeks}}},
+            {"$group": {
+                "_id": {"u": "$u", "w": "$w"},
+                **{field: {"$sum": f"${field}"} for field in _ROLLUP_FIELDS},
+                "active_days": {"$sum": 1}
+            }}
+        ]
+
+    @staticmethod
+    def _daily_rollup(row: Dict[str, Any]) -> ReplaceOne:
+        day = datetime.strptime(row["_id"]["d"], "%Y-%m-%d")
+        user_id = row["_id"]["u"]
+        return ReplaceOne(
+            {"_id": f"{user_id}|{DAILY}|{row['_id']['d']}"},
+            {"u": user_id, "g": DAILY, "s": day, "w": week_start(day),
+             **{field: row[field] for field in _ROLLUP_FIELDS}},
+            upsert=True
+        )
+
+    @staticmethod
+    def _weekly_rollup(row: Dict[str, Any]) -> ReplaceOne:
+        user_id, week = row["_id"]["u"], row["_id"]["w"]
+        return ReplaceOne(
+            {"_id": f"{user_id}|{WEEKLY}|{week:%Y-%m-%d}"},
+            {"u": user_id, "g": WEEKLY, "s": week,
+             **{field: row[field] for field in _ROLLUP_FIELDS}, "active_days": row["active_days"]},
+            upsert=True
+        )
+
+    # ----- reads -----
+
+    async def weekly_progress(self, user_id: str, weeks: int = 4) -> List[Dict[str, Any]]:
+        """
+        Points and completed courses for each of the user's last `weeks`
+        weeks (oldest first, the current week last), from at most `weeks`
+        weekly rollups.
+        """
+        first = week_start(datetime.utcnow()) - timedelta(weeks=weeks - 1)
+        cursor = self.async_rollups.find({"u": user_id, "g": WEEKLY, "s": {"$gte": first}})
+        docs = {doc["s"]: doc for doc in await cursor.to_list(length=weeks)}
+
+        progress = []
+        for i in range(weeks):
+            start = first + timedelta(weeks=i)
+            doc = docs.get(start, {})
+            progress.append({
+                "week": f"Week {i + 1}",
+                "start": start.strftime("%Y-%m-%d"),
+                "points": doc.get("points", 0),
+                "courses": doc.get("courses_completed", 0),
+                "active_days": doc.get("active_days", 0)
+            })
+        return progress
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'buffered': len(self._buffer),
+                'flushed': self._flushed,
+                'dropped': self._dropped,
+                'batchSize': self.batch_size,
+                'flushSeconds': self.flush_seconds,
+                'rollupSeconds': self.rollup_seconds
+            }
+
+
+# Global event log instance, created on first use (creates its indexes)
+@lazy_resource("learning_events", "Learning event log: MongoDB indexes, batch writer", fork_safe=False)
+def learning_events_resource():
+    return LearningEventLog()
+
+learning_events = learning_events_resource.proxy()
+
+
+if __name__ == "__main__":
+    # Benchmark on scratch collections: batched ingest, compaction, and a
+    # user's weekly progress from rollups vs. grouping their raw events
+    import random
+    from async_runtime import run_async
+
+    log = LearningEventLog("learning_events_bench", "learning_rollups_bench", rollup_seconds=0)
+    rng = random.Random(0)
+    users, n_events, days = 500, 50_000, 56
+    now = datetime.utcnow()
+
+    try:
+        start = time.perf_counter()
+        for _ in range(n_events):
+            kind = rng.choices([EVENT_PROGRESS, EVENT_COMPLETION, EVENT_BADGE], [85, 12, 3])[0]
+            log.record(f"user_{rng.randrange(users)}", kind,
+                       at=now - timedelta(seconds=rng.randrange(days * 86400)),
+                       ref=f"course-{rng.randrange(40)}", progress=100 if kind == EVENT_COMPLETION else None,
+                       points=300 if kind == EVENT_COMPLETION else 0)
+        log.flush()
+        print(f"ingest {n_events} events: {time.perf_counter() - start:.2f}s")
+
+        print(f"compact: {log.compact(force=True)}")
+
+        user_id = "user_0"
+        first = week_start(now) - timedelta(weeks=3)
+        runs = 50
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_async(log.weekly_progress(user_id))
+        rollup_ms = (time.perf_counter() - start) / runs * 1000
+
+        raw = [
+            {"$match": {"u": user_id, "t": {"$gte": first}}},
+            {"$group": {"_id": {"$dateToString": {"format": "%G-%V", "date": "$t"}},
+                        "points": {"$sum": {"$ifNull": ["$pts", 0]}}}}
+        ]
+        start = time.perf_counter()
+        for _ in range(runs):
+            list(log.collection.aggregate(raw))
+        raw_ms = (time.perf_counter() - start) / runs * 1000
+        print(f"weekly progress: rollups {rollup_ms:.2f} ms, raw events {raw_ms:.2f} ms")
+    finally:
+        log.collection.drop()
+        log.rollups.drop()
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
@@ -6,7 +7,18 @@ from pydantic import GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
 
 import pymongo
-from database import get_database
+from pymongo import ReturnDocument
+from database import get_database, get_async_database
+from leaderboard_index import leaderboard_index, LeaderboardIndex, LEADERBOARD_PROJECTION
+from learning_stats import learning_stats, GlobalLearningStats, TOTAL_COURSES_AVAILABLE
+from learning_events import learning_events, LearningEventLog, EVENT_PROGRESS, EVENT_COMPLETION, EVENT_BADGE, EVENT_RESET
+from startup import lazy_resource
+
+# Points awarded per completed course
+COURSE_COMPLETION_POINTS = 300
+
+# (courses completed, level), highest first
+LEVEL_THRESHOLDS = [(15, "Expert"), (8, "Advanced"), (3, "Intermediate")]
 
 class PyObjectId(ObjectId):
     @classmethod
@@ -94,9 +106,11 @@ class UserLearningProfile(BaseModel):
         json_encoders = {ObjectId: str}
 
 class LearningProgressManager:
-    def __init__(self):
+    def __init__(self, collection_name: str = "learning_progress", leaderboard: Optional[LeaderboardIndex] = None,
+                 stats: Optional[GlobalLearningStats] = None, events: Optional[LearningEventLog] = None):
         self.db = get_database()
-        self.collection = self.db.learning_progress
+        self.collection_name = collection_name
+        self.collection = self.db[collection_name]
         
         # Create indexes for better performance
         self.collection.create_index("user_id", unique=True)
@@ -104,6 +118,24 @@ class LearningProgressManager:
         self.collection.create_index([("total_points", -1), ("courses_completed", -1)])
         self.collection.create_index("updated_at")
 
+        # Rank / leaderboard lookups are served from memory
+        self.leaderboard = leaderboard if leaderboard is not None else leaderboard_index
+        self.leaderboard.load(self.collection)
+
+        # Platform-wide stats are kept current with increments on every write
+        self.stats = stats if stats is not None else learning_stats
+
+        # Activity history for analytics (batched, rolled up in the background)
+        self.events = events if events is not None else learning_events
+
+    @property
+    def async_collection(self):
+        """
+        The same collection through the async client. Request-path methods
+        use this and must run on the shared event loop (async_runtime.run_async).
+        """
+        return get_async_database()[self.collection_name]
+
     async def create_user_profile(self, user_id: str, username: str, email: str) -> UserLearningProfile:
         """Create a new learning profile for a user."""
         profile = UserLearningProfile(
@@ -113,8 +145,10 @@ class LearningProgressManager:
         )
         
         try:
-            result = self.collection.insert_one(profile.dict(by_alias=True))
+            result = await self.async_collection.insert_one(profile.dict(by_alias=True))
             profile.id = result.inserted_id
+            self.leaderboard.upsert(profile.dict(by_alias=True))
+            await self.stats.record_new_learner()
             return profile
         except pymongo.errors.DuplicateKeyError:
             # User already exists, return existing profile
@@ -122,13 +156,170 @@ class LearningProgressManager:
 
     async def get_user_profile(self, user_id: str) -> Optional[UserLearningProfile]:
         """Get user's learning profile."""
-        doc = self.collection.find_one({"user_id": user_id})
+        doc = await self.async_collection.find_one({"user_id": user_id})
         if doc:
             return UserLearningProfile(**doc)
         return None
 
     async def update_course_progress(self, user_id: str, course_id: str, progress_data: Dict) -> bool:
-        """Update progress for a specific course."""
+        """
+        Update progress for a specific course.
+
+        One atomic pipeline update: the course entry is added or updated in
+        place, and completion (points, completed courses, certificate), level
+        and streak are all derived from the stored document on the server, so
+        concurrent updates cannot overwrite each other.
+        """
+        doc = await self.async_collection.find_one_and_update(
+            {"user_id": user_id},
+            self._progress_update_pipeline(course_id, progress_data, datetime.utcnow()),
+            projection={**LEADERBOARD_PROJECTION, "last_progress_event": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            return False
+
+        self.leaderboard.upsert(doc)
+        event = doc.get("last_progress_event")
+        await self.stats.record_progress_event(event, doc["learning_streak"]["current_streak"])
+        if event:
+            completed = event.get("completed_course")
+            self.events.record(user_id, EVENT_COMPLETION if completed else EVENT_PROGRESS, at=event["at"],
+                               ref=course_id, progress=progress_data.get('progress_percentage'),
+                               points=COURSE_COMPLETION_POINTS if completed else 0)
+        return True
+
+    @staticmethod
+    def _progress_update_pipeline(course_id: str, progress_data: Dict, now: datetime) -> List[Dict]:
+        """
+        Update pipeline for update_course_progress (same rules as the
+        read-modify-write path below: 300 points and a certificate the first
+        time a course reaches 100%, level from completed courses, streak from
+        the day difference to the last activity).
+
+        The outcome (whether this update completed the course, and the
+        previous activity date) is recorded as last_progress_event for the
+        global stats.
+        """
+        progress = progress_data.get('progress_percentage')
+        completing = progress == 100
+
+        new_course = CourseProgress(
+            course_id=course_id,
+            title=progress_data.get('title', ''),
+            provider=progress_data.get('provider', ''),
+            progress_percentage=progress if progress is not None else 0,
+            last_accessed=now
+        ).dict()
+        if completing:
+            new_course.update(completed=True, completion_date=now, certificate_earned=True)
+
+        course_changes = {"last_accessed": now}
+        if progress is not None:
+            course_changes["progress_percentage"] = progress
+
+        # A course id starting with "$" would otherwise be read as a field path
+        literal_id = {"$literal": course_id}
+        course_missing = {"$eq": [{"$type": "$_course"}, "missing"]}
+        streak = "$learning_streak.current_streak"
+
+        return [
+            # Current entry for the course (missing if new), the last activity and days since then
+            {"$set": {
+                "_course": {"$arrayElemAt": [
+                    {"$filter": {
+                        "input": {"$ifNull": ["$course_progress", []]},
+                        "as": "c",
+                        "cond": {"$eq": ["$$c.course_id", literal_id]}
+                    }},
+                    0
+                ]},
+                "_days": {"$cond": [
+                    {"$ifNull": ["$learning_streak.last_activity_date", False]},
+                    {"$floor": {"$divide": [{"$subtract": [now, "$learning_streak.last_activity_date"]}, 86400000]}},
+                    None
+                ]},
+                "_previous_activity": {"$ifNull": ["$learning_streak.last_activity_date", None]}
+            }},
+            # Completion only counts the first time the course reaches 100%
+            {"$set": {
+                "_completes": {"$not": [{"$ifNull": ["$_course.completed", False]}]} if completing else False
+            }},
+            {"$set": {
+                "course_progress": {"$cond": [
+                    course_missing,
+                    {"$concatArrays": [{"$ifNull": ["$course_progress", []]}, [{"$literal": new_course}]]},
+                    {"$map": {
+                        "input": "$course_progress",
+                        "as": "c",
+                        "in": {"$cond": [
+                            {"$eq": ["$$c.course_id", literal_id]},
+                            {"$mergeObjects": [
+                                "$$c",
+                                {"$literal": course_changes},
+                                {"$cond": [
+                                    "$_completes",
+                                    {"completed": True, "completion_date": now, "certificate_earned": True},
+                                    {}
+                                ]}
+                            ]},
+                            "$$c"
+                        ]}
+                    }}
+                ]},
+                "courses_completed": {"$add": [
+                    {"$ifNull": ["$courses_completed", 0]},
+                    {"$cond": ["$_completes", 1, 0]}
+                ]},
+                "total_points": {"$add": [
+                    {"$ifNull": ["$total_points", 0]},
+                    {"$cond": ["$_completes", COURSE_COMPLETION_POINTS, 0]}
+                ]},
+                "completed_courses": {"$cond": [
+                    {"$and": ["$_completes", {"$not": [{"$in": [literal_id, {"$ifNull": ["$completed_courses", []]}]}]}]},
+                    {"$concatArrays": [{"$ifNull": ["$completed_courses", []]}, [literal_id]]},
+                    {"$ifNull": ["$completed_courses", []]}
+                ]},
+                "learning_streak.current_streak": {"$switch": {
+                    "branches": [
+                        {"case": {"$eq": ["$_days", None]}, "then": 1},
+                        {"case": {"$eq": ["$_days", 1]}, "then": {"$add": [{"$ifNull": [streak, 0]}, 1]}},
+                        {"case": {"$gt": ["$_days", 1]}, "then": 1}
+                    ],
+                    "default": {"$ifNull": [streak, 0]}
+                }},
+                "learning_streak.last_activity_date": now,
+                "updated_at": now,
+                "last_progress_event": {
+                    "course_id": literal_id,
+                    "title": {"$ifNull": ["$_course.title", {"$literal": new_course["title"]}]},
+                    "at": now,
+                    "completed_course": "$_completes",
+                    "previous_activity_date": "$_previous_activity"
+                }
+            }},
+            {"$set": {
+                "level": {"$switch": {
+                    "branches": [
+                        {"case": {"$gte": ["$courses_completed", threshold]}, "then": level}
+                        for threshold, level in LEVEL_THRESHOLDS
+                    ],
+                    "default": "Beginner"
+                }},
+                "learning_streak.longest_streak": {"$max": [
+                    {"$ifNull": ["$learning_streak.longest_streak", 0]},
+                    streak
+                ]}
+            }},
+            {"$unset": ["_course", "_days", "_previous_activity", "_completes"]}
+        ]
+
+    async def _update_course_progress_rmw(self, user_id: str, course_id: str, progress_data: Dict) -> bool:
+        """
+        Previous read-modify-write implementation of update_course_progress
+        (load, mutate in Python, $set the whole document back). Kept only as
+        the baseline for the concurrency / latency check in __main__.
+        """
         user_profile = await self.get_user_profile(user_id)
         if not user_profile:
             return False
@@ -163,7 +354,7 @@ class LearningProgressManager:
             
             # Update user stats
             user_profile.courses_completed += 1
-            user_profile.total_points += 300  # 300 points per completed course
+            user_profile.total_points += COURSE_COMPLETION_POINTS
             
             # Add to completed courses if not already there
             if course_id not in user_profile.completed_courses:
@@ -178,10 +369,12 @@ class LearningProgressManager:
         user_profile.updated_at = datetime.utcnow()
 
         # Save to database
-        result = self.collection.update_one(
+        result = await self.async_collection.update_one(
             {"user_id": user_id},
             {"$set": user_profile.dict(by_alias=True, exclude={"id"})}
         )
+        if result.modified_count > 0:
+            self.leaderboard.upsert(user_profile.dict(by_alias=True))
         
         return result.modified_count > 0
 
@@ -189,14 +382,7 @@ class LearningProgressManager:
         """Update user level based on completed courses."""
         completed = profile.courses_completed
         
-        if completed >= 15:
-            profile.level = "Expert"
-        elif completed >= 8:
-            profile.level = "Advanced"
-        elif completed >= 3:
-            profile.level = "Intermediate"
-        else:
-            profile.level = "Beginner"
+        profile.level = next((level for threshold, level in LEVEL_THRESHOLDS if completed >= threshold), "Beginner")
 
     def _update_learning_streak(self, profile: UserLearningProfile):
         """Update learning streak based on activity."""
@@ -224,36 +410,24 @@ class LearningProgressManager:
         profile.learning_streak.last_activity_date = now
 
     async def get_leaderboard(self, limit: int = 10) -> List[Dict]:
-        """Get top users for leaderboard."""
-        pipeline = [
-            {"$match": {"leaderboard_participation": True}},
-            {"$sort": {"total_points": -1, "courses_completed": -1}},
-            {"$limit": limit},
-            {"$project": {
-                "username": 1,
-                "total_points": 1,
-                "courses_completed": 1,
-                "level": 1,
-                "learning_streak.current_streak": 1,
-                "badges_earned": 1
-            }}
-        ]
-        
-        return list(self.collection.aggregate(pipeline))
+        """Get top users for leaderboard (from the in-memory index)."""
+        return self.leaderboard.top(limit)
 
     async def get_user_rank(self, user_id: str) -> Optional[int]:
         """Get user's rank in the leaderboard."""
-        user_profile = await self.get_user_profile(user_id)
-        if not user_profile:
+        rank = self.leaderboard.rank(user_id)
+        if rank is not None:
+            return rank
+
+        # Not on the leaderboard (opted out or unknown): rank by the user's points
+        doc = await self.async_collection.find_one({"user_id": user_id}, {"total_points": 1})
+        if not doc:
             return None
-        
-        # Count users with higher points
-        higher_count = self.collection.count_documents({
-            "total_points": {"$gt": user_profile.total_points},
-            "leaderboard_participation": True
-        })
-        
-        return higher_count + 1
+        return self.leaderboard.rank_for_points(doc.get("total_points", 0))
+
+    async def get_users_around(self, user_id: str, window: int = 5) -> Optional[Dict]:
+        """The user's leaderboard neighbourhood: `window` users above and below."""
+        return self.leaderboard.around(user_id, window)
 
     async def reset_user_progress(self, user_id: str) -> bool:
         """Reset all progress for a user."""
@@ -270,16 +444,39 @@ class LearningProgressManager:
             "updated_at": datetime.utcnow()
         }
         
-        result = self.collection.update_one(
+        # The profile as it was is needed to take its share out of the global stats
+        before = await self.async_collection.find_one_and_update(
             {"user_id": user_id},
-            {"$set": reset_data}
+            {"$set": reset_data},
+            projection={
+                "courses_completed": 1,
+                "total_time_spent": 1,
+                "course_progress.course_id": 1,
+                "course_progress.completed": 1,
+                "course_progress.certificate_earned": 1
+            },
+            return_document=ReturnDocument.BEFORE
         )
+        if before is None:
+            return False
+
+        await self.stats.record_reset(before)
+        self.events.record(user_id, EVENT_RESET)
+        if user_id in self.leaderboard:
+            self.leaderboard.upsert({
+                "user_id": user_id,
+                "total_points": 0,
+                "courses_completed": 0,
+                "level": "Beginner",
+                "learning_streak": {"current_streak": 0},
+                "badges_earned": []
+            })
         
-        return result.modified_count > 0
+        return True
 
     async def award_badge(self, user_id: str, badge_id: str, badge_name: str) -> bool:
         """Award a badge to a user."""
-        result = self.collection.update_one(
+        result = await self.async_collection.update_one(
             {"user_id": user_id},
             {
                 "$addToSet": {"badges_earned": badge_id},
@@ -294,27 +491,29 @@ class LearningProgressManager:
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
+        if result.modified_count > 0:
+            self.leaderboard.add_badge(user_id, badge_id)
+            self.events.record(user_id, EVENT_BADGE, ref=badge_id)
         
         return result.modified_count > 0
 
+    async def get_global_stats(self) -> Dict:
+        """Platform-wide learning statistics (one point read)."""
+        return await self.stats.read()
+
     async def get_learning_analytics(self, user_id: str) -> Dict:
         """Get comprehensive learning analytics for a user."""
-        profile = await self.get_user_profile(user_id)
+        profile, weekly_progress = await asyncio.gather(
+            self.get_user_profile(user_id),
+            self.events.weekly_progress(user_id)
+        )
         if not profile:
             return {}
         
         # Calculate analytics
-        total_courses_available = 50  # This would be dynamic based on available courses
+        total_courses_available = TOTAL_COURSES_AVAILABLE
         completion_rate = (profile.courses_completed / total_courses_available) * 100 if total_courses_available > 0 else 0
         
-        # Weekly progress (mock data - would be calculated from actual activity)
-        weekly_progress = [
-            {"week": "Week 1", "points": 150, "courses": 1},
-            {"week": "Week 2", "points": 300, "courses": 1},
-            {"week": "Week 3", "points": 450, "courses": 2},
-            {"week": "Week 4", "points": 200, "courses": 1},
-        ]
-        
         return {
             "total_points": profile.total_points,
             "courses_completed": profile.courses_completed,
@@ -352,5 +551,83 @@ class LearningProgressManager:
         
         return {"title": "All Milestones Achieved!", "message": "You're a learning champion!"}
 
-# Initialize the learning progress manager
-learning_manager = LearningProgressManager()
\ No newline at end of file
+# Initialize the learning progress manager on first use (connects to MongoDB,
+# creates indexes and loads the leaderboard)
+@lazy_resource("learning_manager", "Learning progress: MongoDB connection, indexes, leaderboard load", fork_safe=False)
+def learning_manager_resource():
+    return LearningProgressManager()
+
+learning_manager = learning_manager_resource.proxy()
+
+if __name__ == "__main__":
+    # Concurrency check and latency benchmark: atomic pipeline vs the old
+    # read-modify-write path, on a scratch collection of the configured database.
+    import random
+    import time
+    import uuid
+    from concurrent.futures import ThreadPoolExecutor
+    from async_runtime import run_async
+
+    bench = LearningProgressManager(collection_name="learning_progress_bench",
+                                    leaderboard=LeaderboardIndex(refresh_seconds=0),
+                                    stats=GlobalLearningStats("learning_stats_bench", "learning_progress_bench"),
+                                    events=LearningEventLog("learning_events_bench", "learning_rollups_bench",
+                                                            rollup_seconds=0))
+    paths = [
+        ("read-modify-write", bench._update_course_progress_rmw),
+        ("atomic pipeline", bench.update_course_progress),
+    ]
+
+    def new_user() -> str:
+        user_id = f"bench-{uuid.uuid4().hex}"
+        run_async(bench.create_user_profile(user_id, "bench", f"{user_id}@example.com"))
+        return user_id
+
+    def concurrency_check(label, update, courses=40, workers=8):
+        # Every course is completed by two racing writers: each must be credited exactly once
+        user_id = new_user()
+        jobs = [f"course-{i}" for i in range(courses)] * 2
+        random.shuffle(jobs)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda course_id: run_async(update(user_id, course_id, {
+                "progress_percentage": 100, "title": course_id, "provider": "bench"
+            })), jobs))
+
+        doc = bench.collection.find_one({"user_id": user_id})
+        ok = (
+            len(doc["course_progress"]) == courses
+            and doc["courses_completed"] == courses
+            and doc["total_points"] == courses * COURSE_COMPLETION_POINTS
+            and sorted(doc["completed_courses"]) == sorted(set(jobs))
+        )
+        print(f"{label:>18}: {len(doc['course_progress'])}/{courses} course entries, "
+              f"courses_completed {doc['courses_completed']}, points {doc['total_points']} "
+              f"-> {'no lost updates' if ok else 'LOST OR DOUBLE-COUNTED UPDATES'}")
+
+    def latency(label, update, courses=50, runs=200):
+        # Partial-progress updates on a profile that already has `courses` courses
+        user_id = new_user()
+        for i in range(courses):
+            run_async(update(user_id, f"course-{i}", {"progress_percentage": 10, "title": f"course-{i}", "provider": "bench"}))
+        timings = []
+        for _ in range(runs):
+            course_id = f"course-{random.randrange(courses)}"
+            start = time.perf_counter()
+            run_async(update(user_id, course_id, {"progress_percentage": random.randrange(11, 99)}))
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{label:>18}: p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms ({courses} courses on the profile)")
+
+    try:
+        print("Concurrency check")
+        for label, update in paths:
+            concurrency_check(label, update)
+        print("Latency")
+        for label, update in paths:
+            latency(label, update)
+    finally:
+        bench.collection.drop()
+        bench.stats.collection.drop()
+        bench.events.collection.drop()
+        bench.events.rollups.drop()
@@ -1,22 +1,49 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
-from learning_progress import learning_manager, UserLearningProfile
+from learning_progress import learning_manager, learning_manager_resource, UserLearningProfile
+from learning_stats import learning_stats_resource
+from learning_events import learning_events_resource
+from async_runtime import run_async
 import asyncio
 from functools import wraps
 
 # Create blueprint for learning routes
 learning_bp = Blueprint('learning', __name__, url_prefix='/api/learning')
 
+# Lazy resources the views use; building them makes blocking MongoDB calls
+# (index creation, the leaderboard load)
+LEARNING_RESOURCES = (learning_manager_resource, learning_stats_resource, learning_events_resource)
+
+
+def ensure_learning_resources():
+    """
+    Build the learning resources in the calling thread if they are not built yet.
+
+    Called before a view is handed to the shared event loop: built inside a
+    view they would block the loop's thread, and with it every learning
+    request in this process, until the blocking setup finished. A failure is
+    left for the view to report (the resource re-raises it there without
+    retrying).
+    """
+    for resource in LEARNING_RESOURCES:
+        if not resource.initialized:
+            try:
+                resource.get()
+            except Exception:
+                pass
+
+
 def async_route(f):
-    """Decorator to handle async routes in Flask."""
+    """
+    Decorator to handle async routes in Flask.
+    Runs the view on the process's shared event loop (see async_runtime.py),
+    where the async Mongo client lives, instead of a new loop per request.
+    The learning resources are built first, in the request's own thread.
+    """
     @wraps(f)
     def wrapper(*args, **kwargs):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(f(*args, **kwargs))
-        finally:
-            loop.close()
+        ensure_learning_resources()
+        return run_async(f(*args, **kwargs))
     return wrapper
 
 @learning_bp.route('/profile/<user_id>', methods=['GET'])
@@ -25,7 +52,11 @@ def async_route(f):
 async def get_user_learning_profile(user_id):
     """Get user's learning profile with progress and stats."""
     try:
-        profile = await learning_manager.get_user_profile(user_id)
+        # Fetch the profile and the rank concurrently
+        profile, rank = await asyncio.gather(
+            learning_manager.get_user_profile(user_id),
+            learning_manager.get_user_rank(user_id)
+        )
         
         if not profile:
             return jsonify({
@@ -33,9 +64,6 @@ async def get_user_learning_profile(user_id):
                 'error': 'User profile not found'
             }), 404
         
-        # Get user's rank
-        rank = await learning_manager.get_user_rank(user_id)
-        
         # Convert to dict and add rank
         profile_data = profile.dict()
         profile_data['rank'] = rank
@@ -162,6 +190,34 @@ async def get_leaderboard():
             'error': f'Failed to get leaderboard: {str(e)}'
         }), 500
 
+@learning_bp.route('/leaderboard/around/<user_id>', methods=['GET'])
+@cross_origin()
+@async_route
+async def get_leaderboard_around(user_id):
+    """Get the users ranked directly above and below a user."""
+    try:
+        window = request.args.get('window', 5, type=int)
+        window = min(max(window, 0), 25)  # Ensure window is between 0 and 25
+        
+        neighbourhood = await learning_manager.get_users_around(user_id, window)
+        
+        if neighbourhood is None:
+            return jsonify({
+                'success': False,
+                'error': 'User not on the leaderboard'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': neighbourhood
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get leaderboard: {str(e)}'
+        }), 500
+
 @learning_bp.route('/rank/<user_id>', methods=['GET'])
 @cross_origin()
 @async_route
@@ -322,17 +378,7 @@ async def get_courses_progress(user_id):
 async def get_global_stats():
     """Get global learning statistics."""
     try:
-        # These would be calculated from the database in a real implementation
-        stats = {
-            'total_users': 15420,
-            'total_courses_completed': 45678,
-            'total_certificates_earned': 23456,
-            'average_completion_rate': 68.5,
-            'most_popular_course': 'Financial Markets - Yale University',
-            'top_learning_streak': 127,
-            'total_learning_time': 234567,  # in minutes
-            'active_learners_this_week': 2341
-        }
+        stats = await learning_manager.get_global_stats()
         
         return jsonify({
             'success': True,
@@ -0,0 +1,358 @@
+"""
+FinEdge Global Learning Statistics
+
+One document (learning_stats, _id "global") holds the platform-wide
+learning numbers served by /api/learning/stats/global, so the endpoint is a
+single point read on _id instead of a scan over every learning profile.
+
+LearningProgressManager keeps the document current with $inc/$max as
+learners sign up, complete courses (each completion also earns a
+certificate) and are active in a new week. Those increments are separate
+writes from the profile update, so they can drift (a crash in between, a
+reset racing an update); reconcile() recomputes the exact values with one
+aggregation over learning_progress. Each process that serves learning
+stats runs a background thread that re-reads the document every
+LEARNING_STATS_REFRESH_SECONDS and starts a reconciliation once it is older
+than LEARNING_STATS_RECONCILE_SECONDS (a read that finds it stale does the
+same); only one process claims each run. `python learning_stats.py`
+reconciles immediately.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import os
+import asyncio
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from database import get_database, get_async_database
+from startup import lazy_resource
+
+logger = logging.getLogger(__name__)
+
+# Stats configuration
+LEARNING_STATS_RECONCILE_SECONDS = float(os.environ.get("LEARNING_STATS_RECONCILE_SECONDS", "3600"))
+# How often each process re-reads the document (its top-streak bound) and checks whether a reconciliation is due
+LEARNING_STATS_REFRESH_SECONDS = float(os.environ.get("LEARNING_STATS_REFRESH_SECONDS", "60"))
+STATS_DOCUMENT_ID = "global"
+
+# Size of the course catalogue (completion rates are relative to it)
+TOTAL_COURSES_AVAILABLE = 50
+
+
+def course_key(course_id: str) -> str:
+    """course_id made safe for use as a field name ('.' and a leading '$' are not allowed)."""
+    return course_id.replace(".", "_").lstrip("$") or "_"
+
+
+def week_key(when: datetime) -> str:
+    """ISO week of a timestamp, e.g. '2025-W07'."""
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_start(when: datetime) -> datetime:
+    """Monday 00:00 of the timestamp's week."""
+    return datetime(when.year, when.month, when.day) - timedelta(days=when.weekday())
+
+
+class GlobalLearningStats:
+    """
+    Incrementally maintained platform statistics plus the reconciliation
+    job that recomputes them exactly.
+    """
+
+    def __init__(self, collection_name: str = "learning_stats",
+                 source_collection_name: str = "learning_progress",
+                 reconcile_seconds: float = LEARNING_STATS_RECONCILE_SECONDS,
+                 refresh_seconds: float = LEARNING_STATS_REFRESH_SECONDS):
+        self.db = get_database()
+        self.collection_name = collection_name
+        self.collection = self.db[collection_name]
+        self.source = self.db[source_collection_name]
+        self.reconcile_seconds = reconcile_seconds
+        self.refresh_seconds = refresh_seconds
+
+        # The stored top streak as last seen ($max only needs sending above it);
+        # reset from the document on every read, since reconcile() can lower it
+        self._top_streak = 0
+        self._reconciling = False
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+
+    @property
+    def async_collection(self):
+        return get_async_database()[self.collection_name]
+
+    # ----- incremental updates -----
+
+    async def _apply(self, update: Dict[str, Any]) -> None:
+        await self.async_collection.update_one({"_id": STATS_DOCUMENT_ID}, update, upsert=True)
+
+    async def record_new_learner(self) -> None:
+        """A learning profile was created."""
+        await self._apply({"$inc": {"total_users": 1}, "$set": {"updated_at": datetime.utcnow()}})
+
+    async def record_progress_event(self, event: Optional[Dict[str, Any]], current_streak: int) -> bool:
+        """
+        Apply one course-progress update.
+
+        Args:
+            event: The profile's last_progress_event written by the update
+                (course_id, title, at, completed_course, previous_activity_date)
+            current_streak: The learner's streak after the update
+
+        Returns:
+            bool: True if the stats document was written
+        """
+        if not event:
+            return False
+        self._ensure_worker()
+
+        at = event["at"]
+        inc, fields = {}, {}
+        if event.get("completed_course"):
+            key = course_key(event["course_id"])
+            inc.update({
+                "total_courses_completed": 1,
+                "total_certificates_earned": 1,
+                f"course_completions.{key}": 1
+            })
+            if event.get("title"):
+                fields[f"course_titles.{key}"] = event["title"]
+
+        previous = event.get("previous_activity_date")
+        if previous is None or previous < week_start(at):
+            inc[f"active_learners.{week_key(at)}"] = 1
+
+        raise_streak = current_streak > self._top_streak
+        if not inc and not raise_streak:
+            return False
+
+        update = {"$set": {**fields, "updated_at": at}}
+        if inc:
+            update["$inc"] = inc
+        if raise_streak:
+            update["$max"] = {"top_learning_streak": current_streak}
+            self._top_streak = current_streak
+        await self._apply(update)
+        return True
+
+    async def record_reset(self, before: Optional[Dict[str, Any]]) -> bool:
+        """
+        Take back a learner's contribution when their progress is reset.
+
+        Args:
+            before: The profile as it was before the reset
+
+        Returns:
+            bool: True if the stats document was written
+        """
+        if not before:
+            return False
+
+        inc = {}
+        completed = [c for c in before.get("course_progress") or [] if c.get("completed")]
+        for course in completed:
+            key = f"course_completions.{course_key(course['course_id'])}"
+            inc[key] = inc.get(key, 0) - 1
+        certificates = sum(1 for c in before.get("course_progress") or [] if c.get("certificate_earned"))
+        for field, value in [
+            ("total_courses_completed", before.get("courses_completed", 0)),
+            ("total_certificates_earned", certificates),
+            ("total_learning_time", before.get("total_time_spent", 0))
+        ]:
+            if value:
+                inc[field] = -value
+
+        if not inc:
+            return False
+        await self._apply({"$inc": inc, "$set": {"updated_at": datetime.utcnow()}})
+        return True
+
+    # ----- reads -----
+
+    async def read(self) -> Dict[str, Any]:
+        """Current stats: one point read on _id (reconciled inline only if the document does not exist yet)."""
+        self._ensure_worker()
+        doc = await self.async_collection.find_one({"_id": STATS_DOCUMENT_ID})
+        if doc is None:
+            doc = await asyncio.to_thread(self.reconcile)
+        else:
+            self._maybe_reconcile(doc)
+
+        self._top_streak = doc.get("top_learning_streak", 0)
+        return self._format(doc, datetime.utcnow())
+
+    @staticmethod
+    def _format(doc: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        users = doc.get("total_users", 0)
+        completed = doc.get("total_courses_completed", 0)
+        completions = {k: v for k, v in (doc.get("course_completions") or {}).items() if v > 0}
+        popular = max(completions, key=completions.get, default=None)
+
+        return {
+            'total_users': users,
+            'total_courses_completed': completed,
+            'total_certificates_earned': doc.get("total_certificates_earned", 0),
+            # Mean of the per-learner completion rate from get_learning_analytics
+            'average_completion_rate': round(completed / (users * TOTAL_COURSES_AVAILABLE) * 100, 2) if users else 0,
+            'most_popular_course': (doc.get("course_titles") or {}).get(popular) or popular,
+            'top_learning_streak': doc.get("top_learning_streak", 0),
+            'total_learning_time': doc.get("total_learning_time", 0),  # in minutes
+            'active_learners_this_week': (doc.get("active_learners") or {}).get(week_key(now), 0),
+            'updated_at': doc.get("updated_at"),
+            'reconciled_at': doc.get("reconciled_at")
+        }
+
+    # ----- reconciliation -----
+
+    def _ensure_worker(self) -> None:
+        """Start the refresh / reconciliation thread (again in a forked child)."""
+        if self.refresh_seconds <= 0 or (self._worker is not None and self._worker_pid == os.getpid()):
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker = threading.Thread(target=self._run, name="learning-stats", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.refresh_seconds)
+            try:
+                doc = self.collection.find_one({"_id": STATS_DOCUMENT_ID})
+                if doc is not None:
+                    self._top_streak = doc.get("top_learning_streak", 0)
+                    self._maybe_reconcile(doc)
+            except Exception as e:
+                logger.warning(f"Learning stats refresh failed: {str(e)}")
+
+    def _maybe_reconcile(self, doc: Dict[str, Any]) -> None:
+        """Start a background reconciliation when the document is older than reconcile_seconds."""
+        if self.reconcile_seconds <= 0:
+            return
+        reconciled_at = doc.get("reconciled_at")
+        if reconciled_at and datetime.utcnow() - reconciled_at < timedelta(seconds=self.reconcile_seconds):
+            return
+        with self._lock:
+            if self._reconciling:
+                return
+            self._reconciling = True
+
+        def run():
+            try:
+                # Every process sees the same stale document; only the one that claims it reconciles
+                cutoff = datetime.utcnow() - timedelta(seconds=self.reconcile_seconds)
+                claimed = self.collection.find_one_and_update(
+                    {"_id": STATS_DOCUMENT_ID, "$or": [
+                        {"reconcile_claimed_at": {"$exists": False}},
+                        {"reconcile_claimed_at": {"$lt": cutoff}}
+                    ]},
+                    {"$set": {"reconcile_claimed_at": datetime.utcnow()}},
+                    projection={"_id": 1}
+                )
+                if claimed is not None:
+                    self.reconcile()
+            except Exception as e:
+                logger.warning(f"Learning stats reconciliation failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._reconciling = False
+
+        threading.Thread(target=run, name="learning-stats-reconcile", daemon=True).start()
+
+    @staticmethod
+    def _reconcile_pipeline(since: datetime) -> list:
+        """Aggregation over learning_progress computing every stat exactly."""
+        certificates = {"$size": {"$filter": {
+            "input": {"$ifNull": ["$course_progress", []]},
+            "as": "c",
+            "cond": {"$eq": ["$$c.certificate_earned", True]}
+        }}}
+        return [
+            {"$facet": {
+                "totals": [{"$group": {
+                    "_id": None,
+                    "total_users": {"$sum": 1},
+                    "total_courses_completed": {"$sum": {"$ifNull": ["$courses_completed", 0]}},
+                    "total_certificates_earned": {"$sum": certificates},
+                    "total_learning_time": {"$sum": {"$ifNull": ["$total_time_spent", 0]}},
+                    "top_learning_streak": {"$max": "$learning_streak.longest_streak"},
+                    "active_learners": {"$sum": {"$cond": [
+                        {"$gte": ["$learning_streak.last_activity_date", since]}, 1, 0
+                    ]}}
+                }}],
+                "courses": [
+                    {"$unwind": "$course_progress"},
+                    {"$match": {"course_progress.completed": True}},
+                    {"$group": {
+                        "_id": "$course_progress.course_id",
+                        "completions": {"$sum": 1},
+                        "title": {"$first": "$course_progress.title"}
+                    }}
+                ]
+            }}
+        ]
+
+    def reconcile(self) -> Dict[str, Any]:
+        """
+        Recompute the stats exactly and overwrite the document (increments
+        landing while the aggregation runs are picked up by the next run).
+
+        Returns:
+            dict: The reconciled stats document
+        """
+        now = datetime.utcnow()
+        result = next(self.source.aggregate(self._reconcile_pipeline(week_start(now))), {})
+        totals = (result.get("totals") or [{}])[0]
+        courses = result.get("courses") or []
+
+        doc = self.collection.find_one_and_update(
+            {"_id": STATS_DOCUMENT_ID},
+            {"$set": {
+                "total_users": totals.get("total_users", 0),
+                "total_courses_completed": totals.get("total_courses_completed", 0),
+                "total_certificates_earned": totals.get("total_certificates_earned", 0),
+                "total_learning_time": totals.get("total_learning_time", 0),
+                "top_learning_streak": totals.get("top_learning_streak") or 0,
+                "course_completions": {course_key(c["_id"]): c["completions"] for c in courses},
+                "course_titles": {course_key(c["_id"]): c["title"] for c in courses if c.get("title")},
+                # Older weeks are dropped here
+                "active_learners": {week_key(now): totals.get("active_learners", 0)},
+                "updated_at": now,
+                "reconciled_at": now,
+                "reconcile_claimed_at": now
+            }},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._top_streak = doc.get("top_learning_streak", 0)
+        logger.info(f"Learning stats reconciled in {(datetime.utcnow() - now).total_seconds():.2f}s "
+                    f"({doc['total_users']} users)")
+        return doc
+
+
+# Global stats instance, created on first use
+@lazy_resource("learning_stats", "Global learning stats document", fork_safe=False)
+def learning_stats_resource():
+    return GlobalLearningStats()
+
+learning_stats = learning_stats_resource.proxy()
+
+
+if __name__ == "__main__":
+    # Reconcile now (e.g. from cron) and report how far the incremental values had drifted
+    before = learning_stats.collection.find_one({"_id": STATS_DOCUMENT_ID}) or {}
+    after = learning_stats.reconcile()
+    for field in ["total_users", "total_courses_completed", "total_certificates_earned",
+                  "total_learning_time", "top_learning_streak"]:
+        drift = after.get(field, 0) - before.get(field, 0)
+        print(f"{field:>26}: {after.get(field, 0)} (drift {drift:+d})")
@@ -0,0 +1,410 @@
+"""
+FinEdge Shared Market Snapshot
+
+Latest quotes for a fixed set of symbols (the /api/market-summary indices,
+the NIFTY stocks behind /api/nifty-gainers and MARKET_SNAPSHOT_EXTRA_SYMBOLS),
+kept in one multiprocessing.shared_memory segment that every gunicorn
+worker reads in place instead of fetching and holding its own copy.
+
+Layout: a 64-byte header (seqlock sequence, published_at, record count,
+layout version) followed by a NumPy record array with one row per symbol in
+SNAPSHOT_SYMBOLS order: symbol index, price, change, percent change and the
+time the row was last fetched. price is NaN until the symbol is first
+fetched; change and per_change are NaN when only one close was available.
+
+One refresher writes it. Every process starts a refresher thread and the
+threads queue on an flock, so exactly one (in whichever worker got there
+first) fetches all symbols in one yf.download every
+MARKET_SNAPSHOT_REFRESH_SECONDS; when that worker exits or is recycled the
+next one in the queue takes over. Publishing follows a seqlock: the sequence
+is odd while the rows change and even once they are consistent again
+(version = sequence // 2), and readers copy the rows until the sequence is
+the same even number before and after the copy.
+
+With the pre-fork server the master creates the segment while preloading
+(the market_snapshot resource) and the workers inherit the mapping. A
+process that did not inherit one (python app.py, GUNICORN_PRELOAD=0)
+creates its own and is its own refresher.
+
+    python market_snapshot.py          # one refresh, then print the snapshot
+    python market_snapshot.py check    # forked readers vs a writer: torn reads and read latency
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import atexit
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import logging
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from startup import lazy_resource
+from metrics import timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: no fork, so every process refreshes its own segment anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshot configuration
+MARKET_SNAPSHOT_REFRESH_SECONDS = float(os.environ.get("MARKET_SNAPSHOT_REFRESH_SECONDS", "60"))
+# How long a market-summary read waits for the first publish after startup
+MARKET_SNAPSHOT_WAIT_SECONDS = float(os.environ.get("MARKET_SNAPSHOT_WAIT_SECONDS", "20"))
+MARKET_SNAPSHOT_EXTRA_SYMBOLS = [
+    s.strip().upper() for s in os.environ.get("MARKET_SNAPSHOT_EXTRA_SYMBOLS", "").split(",") if s.strip()
+]
+
+# Indian-focused market data with major Indian brands and select international indices
+MARKET_INDICES = {
+    # Major Indian Indices (Priority)
+    'NIFTY 50': '^NSEI',
+    'SENSEX': '^BSESN',
+    'BANK NIFTY': '^NSEBANK',
+    'NIFTY IT': '^CNXIT',
+    'NIFTY AUTO': '^CNXAUTO',
+    'NIFTY PHARMA': '^CNXPHARMA',
+    'NIFTY FMCG': '^CNXFMCG',
+    'NIFTY METAL': '^CNXMETAL',
+    'NIFTY ENERGY': '^CNXENERGY',
+    'NIFTY REALTY': '^CNXREALTY',
+    'NIFTY MEDIA': '^CNXMEDIA',
+    'NIFTY MIDCAP': '^NSEMDCP50',
+    'NIFTY SMALLCAP': '^NSESMLCP250',
+    'NIFTY NEXT 50': '^NSMIDCP',
+    'NIFTY PSU BANK': '^CNXPSUBANK',
+    'NIFTY PRIVATE BANK': '^CNXPVTBANK',
+    'NIFTY FINANCE': '^CNXFINANCE',
+    'NIFTY INFRA': '^CNXINFRA',
+
+    # Top Indian Companies (Individual Stocks)
+    'RELIANCE': 'RELIANCE.NS',
+    'TCS': 'TCS.NS',
+    'HDFC BANK': 'HDFCBANK.NS',
+    'INFOSYS': 'INFY.NS',
+    'ICICI BANK': 'ICICIBANK.NS',
+    'BHARTI AIRTEL': 'BHARTIARTL.NS',
+    'SBI': 'SBIN.NS',
+    'LT': 'LT.NS',
+    'ITC': 'ITC.NS',
+    'HCLTECH': 'HCLTECH.NS',
+    'WIPRO': 'WIPRO.NS',
+    'MARUTI SUZUKI': 'MARUTI.NS',
+    'ASIAN PAINTS': 'ASIANPAINT.NS',
+    'BAJAJ FINANCE': 'BAJFINANCE.NS',
+    'TITAN': 'TITAN.NS',
+
+    # Select International (Limited)
+    'S&P 500': '^GSPC',
+    'NASDAQ': '^IXIC',
+    'NIKKEI': '^N225',
+
+    # Essential Commodities & Currency
+    'USD/INR': 'USDINR=X',
+    'GOLD': 'GC=F',
+    'CRUDE OIL': 'CL=F'
+}
+
+# NIFTY 50 symbols (major ones)
+NIFTY_SYMBOLS = [
+    'RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS', 'HINDUNILVR.NS',
+    'ICICIBANK.NS', 'KOTAKBANK.NS', 'SBIN.NS', 'BHARTIARTL.NS', 'ITC.NS',
+    'ASIANPAINT.NS', 'LT.NS', 'AXISBANK.NS', 'MARUTI.NS', 'NESTLEIND.NS',
+    'HCLTECH.NS', 'WIPRO.NS', 'ULTRACEMCO.NS', 'TATAMOTORS.NS', 'POWERGRID.NS'
+]
+
+# Row order of the record array (fixed for the segment's lifetime)
+SNAPSHOT_SYMBOLS = tuple(dict.fromkeys([*MARKET_INDICES.values(), *NIFTY_SYMBOLS, *MARKET_SNAPSHOT_EXTRA_SYMBOLS]))
+
+# Segment layout
+LAYOUT_VERSION = 1
+HEADER_BYTES = 64
+HEADER_DTYPE = np.dtype([
+    ('sequence', '<u8'),       # seqlock: odd while a publish is in progress
+    ('published_at', '<f8'),   # epoch seconds of the last publish
+    ('count', '<u4'),
+    ('layout', '<u4')
+])
+RECORD_DTYPE = np.dtype([
+    ('symbol', '<i4'),         # index into SNAPSHOT_SYMBOLS
+    ('price', '<f8'),
+    ('change', '<f8'),
+    ('per_change', '<f8'),
+    ('timestamp', '<f8')       # epoch seconds this row was fetched
+], align=True)
+
+# A publish takes microseconds; a reader gives up after this long
+READ_RETRY_SECONDS = 1.0
+
+
+def _iso(epoch: float) -> Optional[str]:
+    return datetime.fromtimestamp(epoch).isoformat() if epoch > 0 else None
+
+
+class MarketQuotes:
+    """A consistent copy of the snapshot rows (MarketSnapshot.read())."""
+
+    def __init__(self, index: Dict[str, int], version: int, published_at: float, rows: np.ndarray):
+        self.index = index
+        self.version = version
+        self.published_at = published_at
+        self.rows = rows
+
+    @property
+    def last_updated(self) -> Optional[str]:
+        """ISO time of the last publish (None before the first one)."""
+        return _iso(self.published_at)
+
+    def get(self, symbol: Any) -> Optional[Dict[str, Any]]:
+        """
+        Quote for one symbol, or None if it is not in the snapshot or has
+        not been fetched yet. change/perChange are None when only one close
+        was available.
+        """
+        i = self.index.get(symbol.upper() if isinstance(symbol, str) else symbol)
+        if i is None:
+            return None
+        row = self.rows[i]
+        if math.isnan(row['price']):
+            return None
+        has_change = not math.isnan(row['change'])
+        return {
+            'symbol': symbol,
+            'price': float(row['price']),
+            'change': float(row['change']) if has_change else None,
+            'perChange': float(row['per_change']) if has_change else None,
+            'timestamp': _iso(float(row['timestamp']))
+        }
+
+
+class MarketSnapshot:
+    """
+    Shared-memory quote table: one writer (the elected refresher),
+    lock-free readers in every process that inherited the segment.
+    """
+
+    def __init__(self, symbols: Iterable[str] = SNAPSHOT_SYMBOLS,
+                 refresh_seconds: float = MARKET_SNAPSHOT_REFRESH_SECONDS):
+        self.symbols = tuple(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.refresh_seconds = refresh_seconds
+
+        self.shm = shared_memory.SharedMemory(
+            name=f"finedge_market_{os.getpid()}", create=True,
+            size=HEADER_BYTES + RECORD_DTYPE.itemsize * len(self.symbols)
+        )
+        self.lock_path = os.path.join(tempfile.gettempdir(), f"{self.shm.name}.lock")
+        self._owner_pid = os.getpid()
+
+        # Views straight onto the segment
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        self.records = np.ndarray((len(self.symbols),), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES)
+        self._sequence = self.header['sequence']
+
+        self.header['count'] = len(self.symbols)
+        self.header['layout'] = LAYOUT_VERSION
+        self.records['symbol'] = np.arange(len(self.symbols))
+        self.records[['price', 'change', 'per_change']] = np.nan
+
+        self._write_lock = threading.Lock()
+        self._refresher_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+        logger.info(f"Market snapshot segment {self.shm.name}: {len(self.symbols)} symbols, {self.shm.size} bytes")
+
+    # ----- seqlock -----
+
+    def publish(self, rows: Dict[str, Tuple[float, float, float, float]]) -> int:
+        """
+        Write fetched rows (symbol -> (price, change, per_change, timestamp));
+        symbols missing from `rows` keep their last value.
+
+        Returns:
+            int: The new version
+        """
+        update = self.records.copy()
+        for symbol, (price, change, per_change, timestamp) in rows.items():
+            i = self.index.get(symbol)
+            if i is not None:
+                update[i] = (i, price, change, per_change, timestamp)
+
+        with self._write_lock:
+            # Odd while writing (also recovers a sequence left odd by a writer that died mid-publish)
+            sequence = int(self._sequence[0]) | 1
+            self._sequence[0] = sequence
+            self.records[:] = update
+            self.header['published_at'] = time.time()
+            self._sequence[0] = sequence + 1
+        return (sequence + 1) // 2
+
+    def read(self, wait: float = 0) -> MarketQuotes:
+        """
+        Consistent copy of the rows.
+
+        Args:
+            wait: Seconds to wait for the first publish if there has not been one yet
+
+        Returns:
+            MarketQuotes: version 0 if nothing has been published
+        """
+        self.ensure_refresher()
+        deadline = time.monotonic() + wait
+        while True:
+            quotes = self._read_consistent()
+            if quotes.version or time.monotonic() >= deadline:
+                return quotes
+            time.sleep(0.05)
+
+    def _read_consistent(self) -> MarketQuotes:
+        give_up = time.monotonic() + READ_RETRY_SECONDS
+        while True:
+            before = int(self._sequence[0])
+            if not before & 1:
+                rows = self.records.copy()
+                published_at = float(self.header['published_at'][0])
+                if int(self._sequence[0]) == before:
+                    return MarketQuotes(self.index, before // 2, published_at, rows)
+            if time.monotonic() > give_up:
+                raise RuntimeError(f"Market snapshot {self.shm.name} stayed mid-publish for {READ_RETRY_SECONDS}s")
+            time.sleep(0)
+
+    # ----- refresher -----
+
+    def ensure_refresher(self) -> None:
+        """Start this process's refresher thread (it waits its turn on the flock)."""
+        if self._refresher_pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive fork: every worker starts its own
+            if self._refresher_pid != os.getpid():
+                threading.Thread(target=self._refresh_loop, name="market-snapshot", daemon=True).start()
+                self._refresher_pid = os.getpid()
+
+    def _refresh_loop(self) -> None:
+        if fcntl is not None:
+            # Opened here, not inherited, so each process holds its own lock; released when the process exits
+            lock_file = open(self.lock_path, "a")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        logger.info(f"Market snapshot refresher running in process {os.getpid()}")
+        while True:
+            started = time.monotonic()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Market snapshot refresh failed: {str(e)}")
+            time.sleep(max(1.0, self.refresh_seconds - (time.monotonic() - started)))
+
+    def refresh(self) -> int:
+        """
+        Fetch the last two closes of every symbol in one yf.download and publish.
+
+        Returns:
+            int: The new version
+        """
+        import yfinance as yf
+        started = time.time()
+        with timed("market_data", "download"):
+            data = yf.download(list(self.symbols), period='5d', progress=False, group_by='column')
+
+        rows = {}
+        if data is not None and not data.empty:
+            closes = data['Close']
+            if closes.ndim == 1:
+                closes = closes.to_frame(self.symbols[0])
+            for symbol in closes.columns:
+                series = closes[symbol].dropna()
+                if series.empty:
+                    continue
+                price = float(series.iloc[-1])
+                change = per_change = math.nan
+                if len(series) >= 2:
+                    previous = float(series.iloc[-2])
+                    change = price - previous
+                    per_change = (change / previous) * 100
+                rows[str(symbol)] = (price, change, per_change, started)
+
+        version = self.publish(rows)
+        logger.info(f"Market snapshot v{version}: fetched {len(rows)}/{len(self.symbols)} symbols "
+                    f"in {time.time() - started:.2f}s")
+        return version
+
+    def close(self) -> None:
+        """Unmap and remove the segment (only in the process that created it)."""
+        if os.getpid() != self._owner_pid or self.records is None:
+            return
+        self.header = self.records = self._sequence = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+
+# Created by the pre-fork master (or on first use) and inherited by the workers
+@lazy_resource("market_snapshot", "Shared-memory market snapshot (indices and NIFTY quotes)")
+def market_snapshot_resource():
+    return MarketSnapshot()
+
+market_snapshot = market_snapshot_resource.proxy()
+
+
+def _check_torn_reads(readers: int = 4, seconds: float = 3.0) -> None:
+    """Forked readers copy rows while this process publishes rows that all carry the version as price."""
+    snapshot = MarketSnapshot(refresh_seconds=0)
+    snapshot._refresher_pid = os.getpid()  # publish by hand, no fetching
+    version = snapshot.publish({s: (1.0, 0.0, 0.0, time.time()) for s in snapshot.symbols})
+
+    started = time.perf_counter()
+    for _ in range(10000):
+        snapshot._read_consistent()
+    print(f"uncontended: {(time.perf_counter() - started) / 10000 * 1e6:.1f} us/read")
+
+    children = []
+    for _ in range(readers):
+        pid = os.fork()
+        if pid == 0:
+            reads = torn = 0
+            end = time.monotonic() + seconds
+            started = time.perf_counter()
+            while time.monotonic() < end:
+                quotes = snapshot._read_consistent()
+                if np.unique(quotes.rows['price']).size != 1 or quotes.rows['price'][0] != quotes.version:
+                    torn += 1
+                reads += 1
+            elapsed = time.perf_counter() - started
+            print(f"reader {os.getpid()}: {reads} reads, {torn} torn, {elapsed / reads * 1e6:.1f} us/read", flush=True)
+            os._exit(1 if torn else 0)
+        children.append(pid)
+
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        version = snapshot.publish({s: (float(version + 1), 0.0, 0.0, time.time()) for s in snapshot.symbols})
+    failed = sum(os.waitpid(pid, 0)[1] != 0 for pid in children)
+    print(f"writer: published up to v{version}; {failed} reader(s) saw a torn read")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:2] == ["check"]:
+        _check_torn_reads()
+    else:
+        snapshot = MarketSnapshot()
+        snapshot._refresher_pid = os.getpid()
+        snapshot.refresh()
+        quotes = snapshot.read()
+        for symbol in snapshot.symbols:
+            quote = quotes.get(symbol)
+            print(f"{symbol:>14}: " + (f"{quote['price']:.2f} ({quote['perChange'] or 0:+.2f}%)" if quote else "no data"))
+        snapshot.close()
@@ -0,0 +1,418 @@
+"""
+FinEdge Request Metrics
+
+Where request time goes. init_metrics(app) times every request, and the
+dependencies a request waits on record spans into it:
+
+- mongo: every command on both MongoDB clients (mongo_listener, passed to
+  the clients in database.py), labelled with the command name
+- market_data: yfinance downloads and history calls (timed())
+- llm: model invocations (timed()); the advisor agent's span includes the
+  tool calls it makes, which record their own market_data spans
+
+Every response carries a Server-Timing header with the request total and
+the time spent per dependency (`mongo;dur=12.4;desc="3 calls"`), and
+/metrics serves latency histograms per endpoint and per dependency and
+operation in the Prometheus text format.
+
+Each process keeps its own registry. A worker of the pre-fork server also
+writes it to METRICS_DIR/<pid>.json every METRICS_FLUSH_SECONDS, and at
+exit folds it into METRICS_DIR/exited.json and removes its own file (a
+worker that was killed is folded by the next scrape). /metrics merges
+those files, so a scrape sees the whole server, running and exited
+workers, whichever worker answers it, and the directory holds one file
+per running worker plus one.
+
+METRICS_DIR is named after the server's master pid: gunicorn.conf.py
+exports it as METRICS_SERVER_PID, so workers share the directory whether
+or not the app is preloaded in the master.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import atexit
+import contextvars
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Metrics configuration
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "1").lower() not in ("0", "false", "no")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+# The pre-fork master (set by gunicorn.conf.py); without it, the process that imported this module
+METRICS_SERVER_PID = int(os.environ.get("METRICS_SERVER_PID") or os.getpid())
+# Shared by the workers of one server
+METRICS_DIR = os.environ.get("METRICS_DIR") or os.path.join(tempfile.gettempdir(), f"finedge_metrics_{METRICS_SERVER_PID}")
+# Registries of exited workers, folded into one file
+EXITED_FILE = "exited.json"
+
+# Histogram buckets in seconds (LLM calls and stock analyses run for tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REQUEST_DURATION = "finedge_http_request_duration_seconds"
+REQUESTS_TOTAL = "finedge_http_requests_total"
+DEPENDENCY_DURATION = "finedge_dependency_duration_seconds"
+DEPENDENCY_ERRORS = "finedge_dependency_errors_total"
+
+METRIC_HELP = {
+    REQUEST_DURATION: ("histogram", "Request latency by endpoint"),
+    REQUESTS_TOTAL: ("counter", "Requests by endpoint and status"),
+    DEPENDENCY_DURATION: ("histogram", "Latency of MongoDB, market-data and LLM calls"),
+    DEPENDENCY_ERRORS: ("counter", "Failed MongoDB, market-data and LLM calls")
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and counters keyed by (metric name, labels)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # name -> labels -> [per-bucket counts..., +Inf count, sum]
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _check_pid(self) -> None:
+        # A forked worker starts empty: what the master recorded before the fork is not its traffic
+        if self._pid != os.getpid():
+            self._histograms, self._counters, self._pid = {}, {}, os.getpid()
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        i = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            self._check_pid()
+            values = self._histograms.setdefault(name, {}).get(key)
+            if values is None:
+                values = self._histograms[name][key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[i] += 1
+            values[-1] += seconds
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._check_pid()
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def dump(self) -> Dict[str, Any]:
+        """JSON-serializable copy (the per-worker file format)."""
+        with self._lock:
+            self._check_pid()
+            return {
+                "buckets": list(self.buckets),
+                "histograms": {name: [[dict(k), list(v)] for k, v in series.items()]
+                               for name, series in self._histograms.items()},
+                "counters": {name: [[dict(k), v] for k, v in series.items()]
+                             for name, series in self._counters.items()}
+            }
+
+    def merge(self, dump: Dict[str, Any]) -> None:
+        """Add another registry's dump() into this one (same buckets only)."""
+        if tuple(dump.get("buckets", ())) != self.buckets:
+            return
+        with self._lock:
+            for name, series in dump.get("histograms", {}).items():
+                for labels, values in series:
+                    key = tuple(sorted(labels.items()))
+                    current = self._histograms.setdefault(name, {}).setdefault(key, [0] * len(values))
+                    for i, value in enumerate(values):
+                        current[i] += value
+            for name, series in dump.get("counters", {}).items():
+                current = self._counters.setdefault(name, {})
+                for labels, value in series:
+                    key = tuple(sorted(labels.items()))
+                    current[key] = current.get(key, 0) + value
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        def fmt(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = [f'{k}="{_escape(v)}"' for k, v in labels + extra]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            for name in sorted(set(self._histograms) | set(self._counters)):
+                kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for labels, values in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{fmt(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(labels)} {values[-1]:.6f}")
+                    lines.append(f"{name}_count{fmt(labels)} {cumulative}")
+                for labels, value in sorted(self._counters.get(name, {}).items()):
+                    lines.append(f"{name}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class RequestTiming:
+    """Spans of one request: dependency -> [seconds, calls]."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, dependency: str, seconds: float) -> None:
+        span = self.spans.setdefault(dependency, [0.0, 0])
+        span[0] += seconds
+        span[1] += 1
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value (durations in milliseconds)."""
+        entries = [f"total;dur={total * 1000:.1f}"]
+        for dependency, (seconds, calls) in sorted(self.spans.items()):
+            entries.append(f'{dependency};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+        return ", ".join(entries)
+
+
+registry = MetricsRegistry()
+
+# The request being served; copied into the shared event loop's tasks (async_runtime), so async views record too
+_current: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar("finedge_request_timing", default=None)
+
+_flush_pid: Optional[int] = None
+_flush_lock = threading.Lock()
+# Held while writing this process's file; once retired it is never written again
+_file_lock = threading.Lock()
+_retired_pid: Optional[int] = None
+
+
+# ----- dependency spans -----
+
+def observe(dependency: str, operation: str, seconds: float, error: bool = False) -> None:
+    """Record one dependency call in the histograms and the current request's spans."""
+    registry.observe(DEPENDENCY_DURATION, seconds, dependency=dependency, operation=operation)
+    if error:
+        registry.inc(DEPENDENCY_ERRORS, dependency=dependency, operation=operation)
+    timing = _current.get()
+    if timing is not None:
+        timing.add(dependency, seconds)
+    _ensure_flusher()
+
+
+@contextmanager
+def timed(dependency: str, operation: str):
+    """
+    Time a dependency call (also usable as a decorator):
+
+        with timed("market_data", "history"):
+            hist = yf.Ticker(symbol).history(period='1d')
+    """
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        observe(dependency, operation, time.perf_counter() - started, error)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener: one mongo span per command."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        observe("mongo", event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        observe("mongo", event.command_name, event.duration_micros / 1e6, error=True)
+
+
+mongo_listener = MongoCommandTimer()
+
+
+# ----- request middleware -----
+
+def init_metrics(app) -> None:
+    """Time every request of `app` and add the Server-Timing header."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timing():
+        g.request_timing_token = _current.set(RequestTiming())
+
+    @app.after_request
+    def _record_request_timing(response):
+        timing = _current.get()
+        if timing is None:
+            return response
+        total = time.perf_counter() - timing.started
+        endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        registry.observe(REQUEST_DURATION, total, method=request.method, endpoint=endpoint)
+        registry.inc(REQUESTS_TOTAL, method=request.method, endpoint=endpoint, status=str(response.status_code))
+        if SERVER_TIMING_HEADER:
+            response.headers["Server-Timing"] = timing.server_timing(total)
+        _ensure_flusher()
+        return response
+
+    @app.teardown_request
+    def _end_request_timing(exception=None):
+        token = g.pop("request_timing_token", None)
+        if token is not None:
+            _current.reset(token)
+
+
+# ----- cross-worker aggregation -----
+
+def _is_forked_worker() -> bool:
+    return os.getpid() != METRICS_SERVER_PID
+
+
+def _ensure_flusher() -> None:
+    """In a worker, start the thread that writes this process's registry to METRICS_DIR."""
+    global _flush_pid
+    if _flush_pid == os.getpid() or not _is_forked_worker():
+        return
+    with _flush_lock:
+        if _flush_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                flush()
+
+        threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+        atexit.register(retire)
+        _flush_pid = os.getpid()
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+
+@contextmanager
+def _dir_lock():
+    """Exclusive lock on METRICS_DIR across processes (folding and reading the files)."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, ".lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def flush() -> None:
+    """Write this process's registry to METRICS_DIR/<pid>.json (atomically)."""
+    with _file_lock:
+        if _retired_pid == os.getpid():
+            return
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            _write_json(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), registry.dump())
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write metrics: {str(e)}")
+
+
+def _fold(exited: Dict[str, Any], pid_files: List[str]) -> None:
+    """Add `exited` (a registry) to EXITED_FILE and remove the per-pid files it came from (caller holds _dir_lock)."""
+    path = os.path.join(METRICS_DIR, EXITED_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            exited.merge(json.load(f))
+    _write_json(path, exited.dump())
+    for name in pid_files:
+        os.remove(os.path.join(METRICS_DIR, name))
+
+
+def retire() -> None:
+    """At worker exit: fold this process's registry into EXITED_FILE and remove its own file."""
+    global _retired_pid
+    with _file_lock:
+        if _retired_pid == os.getpid():
+            return
+        _retired_pid = os.getpid()
+        try:
+            with _dir_lock():
+                own_file = f"{os.getpid()}.json"
+                exited = MetricsRegistry(registry.buckets)
+                exited.merge(registry.dump())
+                _fold(exited, [own_file] if os.path.exists(os.path.join(METRICS_DIR, own_file)) else [])
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write metrics: {str(e)}")
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def render_metrics() -> str:
+    """Prometheus text for this process plus every other worker's last flush and the exited workers."""
+    if not _is_forked_worker():
+        return registry.render()
+
+    merged = MetricsRegistry(registry.buckets)
+    merged.merge(registry.dump())
+    own_file = f"{os.getpid()}.json"
+    try:
+        with _dir_lock():
+            # Workers that died without retiring (killed) are folded here
+            dead = MetricsRegistry(registry.buckets)
+            dead_files = []
+            for name in os.listdir(METRICS_DIR):
+                if not name.endswith(".json") or name == own_file:
+                    continue
+                try:
+                    with open(os.path.join(METRICS_DIR, name)) as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping metrics file {name}: {str(e)}")
+                    continue
+                merged.merge(data)
+                pid = name[:-len(".json")]
+                if pid.isdigit() and not _is_running(int(pid)):
+                    dead.merge(data)
+                    dead_files.append(name)
+            if dead_files:
+                _fold(dead, dead_files)
+    except OSError as e:
+        logger.warning(f"Could not read metrics: {str(e)}")
+    return merged.render()
+
+
+def remove_metrics_dir() -> None:
+    """Remove METRICS_DIR (the server's master, at exit) unless it was configured explicitly."""
+    if "METRICS_DIR" not in os.environ:
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+@atexit.register
+def _remove_metrics_dir() -> None:
+    # The pre-fork master owns the directory; its workers' files go with it
+    if not _is_forked_worker():
+        remove_metrics_dir()
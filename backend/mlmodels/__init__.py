@@ -1,9 +1,30 @@
-from .stock_data import StockData
-from .stock_hyperopt import StockHyperopt
-from .stock_model_holdout import StockModelHoldout
-
-__all__ = [
-    'StockData',
-    'StockHyperopt',
-    'StockModelHoldout'
-]
\ No newline at end of file
+"""
+Stock data, forecasting models and chart rendering.
+
+Submodules are imported on first attribute access (PEP 562), so importing
+mlmodels.analysis_profiles or the package itself does not pull in pandas,
+Prophet, hyperopt, scikit-learn or matplotlib.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'StockData': '.stock_data',
+    'StockHyperopt': '.stock_hyperopt',
+    'StockModelHoldout': '.stock_model_holdout',
+    'ModelRegistry': '.model_registry',
+    'model_registry': '.model_registry',
+    'FastHoldout': '.fast_forecast',
+    'FastForecaster': '.fast_forecast',
+    'AnalysisProfile': '.analysis_profiles',
+    'ANALYSIS_PROFILES': '.analysis_profiles',
+    'get_profile': '.analysis_profiles'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
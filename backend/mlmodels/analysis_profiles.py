@@ -0,0 +1,130 @@
+import time
+from collections import namedtuple
+
+# Every chart the pipeline can produce
+ALL_CHARTS = ('price_history', 'daily_returns', 'holdout_pred', 'future_forecast')
+
+# Cost settings for one /api/analyze run
+AnalysisProfile = namedtuple('AnalysisProfile', [
+    'name',
+    'max_evals',            # hyperopt trials (Prophet mode)
+    'time_budget',          # seconds before no new trial batch starts (None = no limit)
+    'patience',             # stop after this many trials without improvement (None = never)
+    'uncertainty_samples',  # Prophet samples for the forecast / holdout intervals
+    'resample_after_days',  # train Prophet on weekly closes when the range is longer (None = always daily)
+    'horizon_days',         # calendar days forecast
+    'charts'                # subset of ALL_CHARTS to produce (no 'holdout_pred' = no holdout fit)
+])
+
+ANALYSIS_PROFILES = {
+    'fast': AnalysisProfile(
+        name='fast', max_evals=3, time_budget=15, patience=None, uncertainty_samples=100,
+        resample_after_days=365, horizon_days=90, charts=('price_history', 'future_forecast')
+    ),
+    # The pipeline's settings from before profiles existed, used when a request names none
+    'standard': AnalysisProfile(
+        name='standard', max_evals=10, time_budget=None, patience=None, uncertainty_samples=1000,
+        resample_after_days=None, horizon_days=365, charts=ALL_CHARTS
+    ),
+    'deep': AnalysisProfile(
+        name='deep', max_evals=30, time_budget=None, patience=10, uncertainty_samples=1000,
+        resample_after_days=None, horizon_days=365, charts=ALL_CHARTS
+    ),
+}
+
+DEFAULT_PROFILE = 'standard'
+ANALYSIS_PROFILE_NAMES = tuple(ANALYSIS_PROFILES)
+
+# Request options of /api/analyze, kept here (no pandas/Prophet/LangChain
+# imports) so the routes can validate without loading the agent
+FORECAST_MODES = ("prophet", "fast")
+CHART_OUTPUTS = ("data", "png")
+
+# Pipeline stages the agent reports through on_event, in order
+PIPELINE_STAGES = ("fetched", "holdout_done", "forecast_done", "summary_done")
+
+
+def get_profile(name=None):
+    """
+    Look up a profile by name (None -> DEFAULT_PROFILE).
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in ANALYSIS_PROFILES:
+        raise ValueError(f"Unknown analysis profile '{name}'. Use one of: {', '.join(ANALYSIS_PROFILES)}")
+    return ANALYSIS_PROFILES[name]
+
+
+def training_data(stock_data, profile):
+    """
+    StockData the Prophet fits should train on: weekly closes when the range
+    is longer than the profile's resample_after_days, otherwise stock_data itself.
+    """
+    if profile.resample_after_days is None:
+        return stock_data
+    dates = stock_data.dataframe['Date']
+    if (dates.iloc[-1] - dates.iloc[0]).days <= profile.resample_after_days:
+        return stock_data
+    return stock_data.resample_weekly()
+
+
+def benchmark_profiles(years=5, seed=0):
+    """
+    Time each profile's stages on a synthetic daily series (no registry, fits
+    run inline) and print the costs.
+
+    Returns:
+        dict: {profile: {stage: seconds}}
+    """
+    import numpy as np
+    import pandas as pd
+    from .stock_data import StockData
+    from .stock_hyperopt import StockHyperopt
+    from .stock_model_holdout import StockModelHoldout
+    from .chart_renderer import chart_renderer
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=years * 252)
+    stock = StockData('SYNTH', dates[0].strftime('%Y-%m-%d'), dates[-1].strftime('%Y-%m-%d'))
+    stock.dataframe = pd.DataFrame({'Date': dates, 'Close': 100 + np.cumsum(rng.normal(0, 1, len(dates)))})
+
+    costs = {}
+    for name, profile in ANALYSIS_PROFILES.items():
+        stage = {}
+        start = time.perf_counter()
+        data = training_data(stock, profile)
+        stage['resample'] = time.perf_counter() - start
+
+        holdout = None
+        if 'holdout_pred' in profile.charts:
+            start = time.perf_counter()
+            holdout = StockModelHoldout(data, uncertainty_samples=profile.uncertainty_samples)
+            holdout.run_analysis()
+            stage['holdout_fit'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forecaster = StockHyperopt(data, uncertainty_samples=profile.uncertainty_samples,
+                                   horizon_days=profile.horizon_days)
+        forecaster.run_analysis(max_evals=profile.max_evals, time_budget=profile.time_budget,
+                                patience=profile.patience)
+        stage['forecast_fit'] = time.perf_counter() - start
+
+        specs = {
+            'price_history': stock.price_chart_spec,
+            'daily_returns': stock.returns_chart_spec,
+            'holdout_pred': holdout.forecast_chart_spec if holdout is not None else None,
+            'future_forecast': forecaster.forecast_chart_spec
+        }
+        _, timings = chart_renderer.render_many({k: specs[k]() for k in profile.charts})
+        stage['charts_png'] = sum(timings.values())
+        stage['total'] = sum(stage.values())
+        costs[name] = stage
+
+        print(f"{name:>8}: rows {len(data.dataframe):>5} ({data.resolution}), "
+              + ", ".join(f"{k} {v:.2f}s" for k, v in stage.items()))
+    return costs
+
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    benchmark_profiles()
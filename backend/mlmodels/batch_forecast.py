@@ -0,0 +1,167 @@
+import time
+
+import numpy as np
+import pandas as pd
+from .stage_graph import fit_holdout, fit_forecast, _get_process_pool
+from .fast_forecast import fit_fast_models, forecast_fast_models, select_fast_method, _future_trading_days
+
+# Calendar-day horizons reported per ticker
+WATCHLIST_HORIZONS = (30, 90, 365)
+
+
+def _round(value, digits=4):
+    return round(float(value), digits)
+
+
+def summarize_fit(stock_data, holdout, forecaster, horizons=WATCHLIST_HORIZONS):
+    """
+    Compact table row for one ticker: last close, validation metrics and
+    the forecast (with interval) at each horizon.
+    """
+    history = forecaster.df
+    last_date = history['ds'].iloc[-1]
+    last_close = float(history['y'].iloc[-1])
+    future = forecaster.forecast[forecaster.forecast['ds'] > last_date]
+
+    points = []
+    for days in horizons:
+        upto = future[future['ds'] <= last_date + pd.Timedelta(days=days)]
+        if upto.empty:
+            continue
+        row = upto.iloc[-1]
+        points.append({
+            'days': days,
+            'date': row['ds'].strftime('%Y-%m-%d'),
+            'yhat': _round(row['yhat']),
+            'lower': _round(row['yhat_lower']),
+            'upper': _round(row['yhat_upper']),
+            'change_pct': _round((row['yhat'] / last_close - 1) * 100, 2)
+        })
+
+    return {
+        'ticker': stock_data.ticker,
+        'rows': len(history),
+        'last_date': last_date.strftime('%Y-%m-%d'),
+        'last_close': _round(last_close),
+        'model': forecaster.best_params,
+        'metrics': {k: _round(v) for k, v in holdout.metrics.items()},
+        'forecast': points
+    }
+
+
+def fit_ticker(stock_data, fast=False, max_evals=10, horizons=WATCHLIST_HORIZONS):
+    """
+    Holdout + forecast for one ticker, reduced to its table row
+    (module-level so it can run in a worker process). Tickers already fit
+    in parallel across the pool, so each search runs its trials serially.
+    """
+    holdout = fit_holdout(stock_data, fast)
+    forecaster = fit_forecast(stock_data, fast, max_evals, n_workers=1)
+    return summarize_fit(stock_data, holdout, forecaster, horizons)
+
+
+def _fast_rows(stocks, horizons=WATCHLIST_HORIZONS, test_size=0.2):
+    """
+    Fast-mode rows for many tickers at once: series of equal length are
+    stacked into one matrix and fitted together. Same split, models and
+    metrics as FastHoldout / FastForecaster, without per-ticker frames.
+    """
+    groups = {}
+    for ticker, stock in stocks.items():
+        frame = stock.dataframe.sort_values('Date')
+        groups.setdefault(len(frame), []).append((ticker, stock, frame))
+
+    rows = {}
+    for length, members in groups.items():
+        Y = np.vstack([frame['Close'].values.astype(float) for _, _, frame in members])
+
+        # Holdout validation
+        split = int(length * (1 - test_size))
+        holdout_fit = fit_fast_models(Y[:, :split])
+        pred, _, _ = forecast_fast_models(holdout_fit, select_fast_method(holdout_fit), length - split)
+        actual = Y[:, split:]
+        err = actual - pred
+        mse = (err ** 2).mean(axis=1)
+        ss_tot = ((actual - actual.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+        r2 = 1 - (err ** 2).sum(axis=1) / np.where(ss_tot == 0, np.nan, ss_tot)
+
+        # Forecast over the trading days of the longest horizon
+        fit = fit_fast_models(Y)
+        methods = select_fast_method(fit)
+        last_dates = [pd.Timestamp(frame['Date'].iloc[-1]) for _, _, frame in members]
+        calendars = [_future_trading_days(d, days=max(horizons)) for d in last_dates]
+        yhat, lower, upper = forecast_fast_models(fit, methods, max(len(c) for c in calendars))
+
+        for i, (ticker, stock, frame) in enumerate(members):
+            last_date, days = last_dates[i], calendars[i]
+            last_close = float(Y[i, -1])
+            points = []
+            for horizon in horizons:
+                step = int(np.searchsorted(days, last_date + pd.Timedelta(days=horizon), side='right')) - 1
+                if step < 0:
+                    continue
+                points.append({
+                    'days': horizon,
+                    'date': days[step].strftime('%Y-%m-%d'),
+                    'yhat': _round(yhat[i, step]),
+                    'lower': _round(lower[i, step]),
+                    'upper': _round(upper[i, step]),
+                    'change_pct': _round((yhat[i, step] / last_close - 1) * 100, 2)
+                })
+
+            model = {'method': str(methods[i])}
+            if methods[i] == 'ses':
+                model['alpha'] = float(fit['ses']['alpha'][i])
+            model['sigma'] = float(fit[methods[i]]['sigma'][i])
+
+            rows[ticker] = {
+                'ticker': stock.ticker,
+                'rows': length,
+                'last_date': last_date.strftime('%Y-%m-%d'),
+                'last_close': _round(last_close),
+                'model': model,
+                'metrics': {
+                    'MAE': _round(np.abs(err[i]).mean()),
+                    'MSE': _round(mse[i]),
+                    'RMSE': _round(np.sqrt(mse[i])),
+                    'R2': _round(r2[i]) if np.isfinite(r2[i]) else None
+                },
+                'forecast': points
+            }
+    return rows
+
+
+def forecast_watchlist(stocks, mode='fast', max_evals=10, horizons=WATCHLIST_HORIZONS):
+    """
+    Fit every ticker of a watchlist.
+
+    Prophet fits are spread across the shared process pool; fast-mode fits
+    are vectorized across tickers and run inline.
+
+    Args:
+        stocks (dict): {requested ticker: StockData with data}
+        mode (str): 'fast' or 'prophet'
+        max_evals (int): Hyperopt budget per ticker (prophet mode)
+        horizons (tuple): Calendar-day horizons for the table
+
+    Returns:
+        tuple: ({requested ticker: row}, {requested ticker: error message}, seconds)
+    """
+    start = time.perf_counter()
+    fast = mode == 'fast'
+    rows, failed = {}, {}
+
+    if fast:
+        usable = {t: s for t, s in stocks.items() if len(s.dataframe) >= 50}
+        failed.update({t: "Not enough price history for a forecast" for t in stocks if t not in usable})
+        rows = _fast_rows(usable, horizons)
+    else:
+        pool = _get_process_pool()
+        futures = {ticker: pool.submit(fit_ticker, stock, False, max_evals, horizons) for ticker, stock in stocks.items()}
+        for ticker, future in futures.items():
+            try:
+                rows[ticker] = future.result()
+            except Exception as e:
+                failed[ticker] = str(e)
+
+    return rows, failed, time.perf_counter() - start
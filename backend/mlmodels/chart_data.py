@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# Default number of points per downsampled series
+CHART_MAX_POINTS = 500
+
+# Decimal places kept in chart payloads
+CHART_PRECISION = 4
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, so peaks and troughs survive.
+
+    Args:
+        x (ndarray): Monotonic x values (e.g. dates as numbers)
+        y (ndarray): y values
+        n_out (int): Target number of points
+
+    Returns:
+        ndarray: Sorted indices of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    kept = np.empty(n_out, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def _dates(values):
+    return pd.to_datetime(values).strftime('%Y-%m-%d').tolist()
+
+
+def _round(values):
+    return np.round(np.asarray(values, dtype=float), CHART_PRECISION).tolist()
+
+
+def _date_numbers(values):
+    return pd.to_datetime(values).values.astype('datetime64[s]').astype(np.int64)
+
+
+def line_series(dates, values, max_points=CHART_MAX_POINTS):
+    """
+    Downsampled line chart payload.
+
+    Returns:
+        dict: {'type': 'line', 'x': [YYYY-MM-DD], 'y': [...], 'points': original length}
+    """
+    values = np.asarray(values, dtype=float)
+    idx = lttb_indices(_date_numbers(dates), values, max_points)
+    return {
+        'type': 'line',
+        'x': _dates(np.asarray(dates)[idx]),
+        'y': _round(values[idx]),
+        'points': len(values)
+    }
+
+
+def band_series(dates, yhat, lower, upper, actual=None, max_points=CHART_MAX_POINTS):
+    """
+    Downsampled forecast payload: point forecast plus interval band (and actuals if given).
+    Points are picked by LTTB on the actuals when present, else on yhat, and
+    the same indices are used for every array so they stay aligned.
+
+    Returns:
+        dict: {'type': 'forecast', 'x', 'yhat', 'lower', 'upper'[, 'actual'], 'points'}
+    """
+    yhat = np.asarray(yhat, dtype=float)
+    guide = yhat if actual is None else np.asarray(actual, dtype=float)
+    idx = lttb_indices(_date_numbers(dates), guide, max_points)
+
+    payload = {
+        'type': 'forecast',
+        'x': _dates(np.asarray(dates)[idx]),
+        'yhat': _round(yhat[idx]),
+        'lower': _round(np.asarray(lower)[idx]),
+        'upper': _round(np.asarray(upper)[idx]),
+        'points': len(yhat)
+    }
+    if actual is not None:
+        payload['actual'] = _round(guide[idx])
+    return payload
+
+
+def histogram(values, bins=50):
+    """
+    Histogram payload.
+
+    Returns:
+        dict: {'type': 'histogram', 'edges': [bins + 1], 'counts': [bins], 'mean', 'std'}
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        'type': 'histogram',
+        'edges': _round(edges),
+        'counts': counts.tolist(),
+        'mean': round(float(values.mean()), CHART_PRECISION) if len(values) else None,
+        'std': round(float(values.std()), CHART_PRECISION) if len(values) else None
+    }
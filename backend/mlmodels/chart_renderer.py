@@ -0,0 +1,208 @@
+import io
+import time
+import queue
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+# Style applied once when matplotlib is loaded; nothing changes rcParams per call afterwards
+CHART_STYLE = 'seaborn-v0_8'
+
+# matplotlib and seaborn take seconds to import and the data output never
+# needs them, so they are loaded by the first figure (see _load_matplotlib)
+Figure = None
+FigureCanvasAgg = None
+sns = None
+
+# Subplot margins of a fresh figure under the chart style (set by _load_matplotlib)
+SUBPLOT_DEFAULTS = None
+
+_matplotlib_lock = threading.Lock()
+
+# Figure size per chart kind
+CHART_SIZES = {
+    'price': (10, 6),
+    'returns': (10, 6),
+    'forecast': (12, 6)
+}
+
+
+def _load_matplotlib():
+    """Import matplotlib (Agg backend, chart style) and seaborn once per process."""
+    global Figure, FigureCanvasAgg, sns, SUBPLOT_DEFAULTS
+    if SUBPLOT_DEFAULTS is not None:
+        return
+    with _matplotlib_lock:
+        if SUBPLOT_DEFAULTS is not None:
+            return
+        import matplotlib
+        matplotlib.use('Agg')  # Crucial for running on a web server (no GUI)
+        from matplotlib.figure import Figure as _Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as _FigureCanvasAgg
+        import seaborn as _sns
+
+        matplotlib.style.use(CHART_STYLE)
+        Figure, FigureCanvasAgg, sns = _Figure, _FigureCanvasAgg, _sns
+        SUBPLOT_DEFAULTS = {
+            key: matplotlib.rcParams[f'figure.subplot.{key}']
+            for key in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+        }
+
+
+class ChartRenderer:
+    def __init__(self, pool_size=2, dpi=100):
+        """
+        Renders the analysis charts with the object-oriented Figure/Agg API.
+
+        Keeps a small pool of pre-styled figures per chart kind; a render
+        borrows one, clears and redraws its axes, and returns it. No pyplot
+        state is touched, so renders in different threads do not interfere.
+
+        Args:
+            pool_size (int): Figures kept per chart kind
+            dpi (int): Output resolution
+        """
+        self.dpi = dpi
+        self.pool_size = pool_size
+        self._pools = {kind: queue.LifoQueue() for kind in CHART_SIZES}
+        self._created = {kind: 0 for kind in CHART_SIZES}
+        self._lock = threading.Lock()
+
+    def _new_figure(self, kind):
+        _load_matplotlib()
+        fig = Figure(figsize=CHART_SIZES[kind], dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        fig.add_subplot(111)
+        return fig
+
+    def _acquire(self, kind):
+        try:
+            return self._pools[kind].get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._created[kind] += 1
+            return self._new_figure(kind)
+
+    def _release(self, kind, fig):
+        if self._pools[kind].qsize() < self.pool_size:
+            self._pools[kind].put(fig)
+
+    def warm_up(self):
+        """Pre-create pool_size figures per chart kind."""
+        for kind in CHART_SIZES:
+            while self._pools[kind].qsize() < self.pool_size:
+                self._pools[kind].put(self._new_figure(kind))
+
+    @staticmethod
+    def _draw_price(ax, spec):
+        ax.plot(spec['x'], spec['y'], color='blue')
+        ax.set_title(spec['title'])
+        ax.set_xlabel('Date')
+        ax.set_ylabel(spec.get('ylabel', 'Price (INR)'))
+
+    @staticmethod
+    def _draw_returns(ax, spec):
+        values = np.asarray(spec['values'], dtype=float)
+        sns.histplot(x=values[np.isfinite(values)], bins=50, color='purple', kde=True, ax=ax)
+        ax.set_title(spec['title'])
+        ax.set_xlabel('Daily Return')
+        ax.set_ylabel('Frequency')
+
+    @staticmethod
+    def _draw_forecast(ax, spec):
+        ax.plot(spec['actual_x'], spec['actual_y'], label=spec.get('actual_label', 'Actual'), color='blue', linewidth=2)
+        ax.plot(spec['x'], spec['yhat'], label=spec.get('forecast_label', 'Predicted'),
+                color='red', linestyle='--', linewidth=2)
+        ax.fill_between(spec['x'], spec['lower'], spec['upper'],
+                        color='gray', alpha=0.2, label='Confidence Interval')
+        ax.set_title(spec['title'])
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Price')
+        ax.legend()
+        ax.tick_params(axis='x', labelrotation=45)
+
+    def render(self, kind, spec, save_path=None):
+        """
+        Render one chart.
+
+        Args:
+            kind (str): 'price', 'returns' or 'forecast'
+            spec (dict): Plain data for the chart (see the _draw_* methods)
+            save_path (str): Write the PNG to this path instead of returning base64
+
+        Returns:
+            tuple: (base64 PNG or None, render seconds)
+        """
+        start = time.perf_counter()
+        fig = self._acquire(kind)
+        try:
+            ax = fig.axes[0]
+            ax.clear()
+            # Undo the previous render's tight_layout so output does not depend on reuse
+            fig.subplots_adjust(**SUBPLOT_DEFAULTS)
+            getattr(self, f'_draw_{kind}')(ax, spec)
+            ax.grid(True)
+            fig.tight_layout()
+
+            if save_path:
+                fig.savefig(save_path, format='png', bbox_inches='tight')
+                print(f"Visualization saved to {save_path}")
+                image_base64 = None
+            else:
+                buf = io.BytesIO()
+                fig.savefig(buf, format='png', bbox_inches='tight')
+                image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+        finally:
+            self._release(kind, fig)
+        return image_base64, time.perf_counter() - start
+
+    def render_many(self, jobs, max_workers=4, use_processes=False):
+        """
+        Render several charts concurrently.
+
+        Args:
+            jobs (dict): {name: (kind, spec)}; entries with a None spec are skipped
+            max_workers (int): Concurrent renders
+            use_processes (bool): Render in worker processes instead of threads
+
+        Returns:
+            tuple: ({name: base64 PNG or None}, {name: render seconds})
+        """
+        jobs = {name: job for name, job in jobs.items() if job and job[1] is not None}
+        images, timings = {}, {}
+        if not jobs:
+            return images, timings
+
+        if use_processes:
+            executor = ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)))
+            submit = lambda kind, spec: executor.submit(_render_in_worker, kind, spec)
+        else:
+            executor = ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)))
+            submit = lambda kind, spec: executor.submit(self.render, kind, spec)
+
+        with executor:
+            futures = {name: submit(kind, spec) for name, (kind, spec) in jobs.items()}
+            for name, future in futures.items():
+                try:
+                    images[name], timings[name] = future.result()
+                except Exception as e:
+                    print(f"Error rendering {name}: {str(e)}")
+                    images[name], timings[name] = None, None
+        return images, timings
+
+    def stats(self):
+        """Figures created and currently pooled per chart kind."""
+        return {
+            kind: {'created': self._created[kind], 'pooled': self._pools[kind].qsize()}
+            for kind in CHART_SIZES
+        }
+
+
+# Shared renderer (one per process)
+chart_renderer = ChartRenderer()
+
+
+def _render_in_worker(kind, spec):
+    return chart_renderer.render(kind, spec)
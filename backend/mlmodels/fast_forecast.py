@@ -0,0 +1,325 @@
+import time
+
+import numpy as np
+import pandas as pd
+from .stock_data import StockData
+from .stock_model_holdout import StockModelHoldout
+from .stock_hyperopt import StockHyperopt
+
+# Candidate smoothing parameters for simple exponential smoothing
+SES_ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.99])
+
+# Trading days per week (season length of the seasonal-naive model)
+SEASON_LENGTH = 5
+
+# Fast methods, in the order used to break ties
+FAST_METHODS = ('ses', 'drift', 'seasonal_naive')
+
+# z-score of the central interval; Prophet's default interval_width is 0.8
+INTERVAL_Z = 1.2816
+
+
+def fit_fast_models(Y, season_length=SEASON_LENGTH):
+    """
+    Fit SES, drift and seasonal-naive models to every row of Y at once.
+
+    Args:
+        Y (ndarray): Array of shape (n_series, T), oldest observation first
+        season_length (int): Season length for the seasonal-naive model
+
+    Returns:
+        dict: Per method, arrays over series: 'sigma' (one-step residual std),
+              'fitted' (n, T one-step fitted values) and method parameters
+    """
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[None, :]
+    n, T = Y.shape
+    if T < season_length + 2:
+        raise ValueError(f"Need at least {season_length + 2} observations, got {T}")
+
+    # Simple exponential smoothing: grid over alpha, all series and alphas in one pass
+    level = np.repeat(Y[:, :1], len(SES_ALPHAS), axis=1)
+    sse = np.zeros((n, len(SES_ALPHAS)))
+    for t in range(1, T):
+        err = Y[:, t:t + 1] - level
+        sse += err ** 2
+        level += SES_ALPHAS * err
+    best = np.argmin(sse, axis=1)
+    alpha = SES_ALPHAS[best]
+    rows = np.arange(n)
+
+    ses_fitted = np.empty_like(Y)
+    ses_fitted[:, 0] = Y[:, 0]
+    lvl = Y[:, 0].copy()
+    for t in range(1, T):
+        ses_fitted[:, t] = lvl
+        lvl += alpha * (Y[:, t] - lvl)
+    ses = {
+        'alpha': alpha,
+        'level': level[rows, best],
+        'sigma': np.sqrt(sse[rows, best] / (T - 1)),
+        'fitted': ses_fitted
+    }
+
+    # Random walk with drift
+    diffs = np.diff(Y, axis=1)
+    slope = diffs.mean(axis=1)
+    drift_fitted = np.empty_like(Y)
+    drift_fitted[:, 0] = Y[:, 0]
+    drift_fitted[:, 1:] = Y[:, :-1] + slope[:, None]
+    drift = {
+        'slope': slope,
+        'last': Y[:, -1],
+        'sigma': (diffs - slope[:, None]).std(axis=1, ddof=1),
+        'fitted': drift_fitted
+    }
+
+    # Seasonal naive (same weekday last week)
+    m = season_length
+    snaive_fitted = np.empty_like(Y)
+    snaive_fitted[:, :m] = Y[:, :m]
+    snaive_fitted[:, m:] = Y[:, :-m]
+    seasonal_naive = {
+        'last_season': Y[:, -m:],
+        'sigma': np.sqrt(np.mean((Y[:, m:] - Y[:, :-m]) ** 2, axis=1)),
+        'fitted': snaive_fitted
+    }
+
+    return {'T': T, 'ses': ses, 'drift': drift, 'seasonal_naive': seasonal_naive}
+
+
+def forecast_fast_models(fit, method, horizon, z=INTERVAL_Z):
+    """
+    Point forecasts and analytic prediction intervals for every series.
+
+    Args:
+        fit (dict): Output of fit_fast_models
+        method (str or ndarray): One method name, or one name per series
+        horizon (int): Number of steps ahead
+        z (float): Normal quantile for the interval half-width
+
+    Returns:
+        tuple: (yhat, lower, upper), each of shape (n_series, horizon)
+    """
+    T = fit['T']
+    h = np.arange(1, horizon + 1, dtype=float)
+    n = len(fit['drift']['last'])
+    methods = np.broadcast_to(np.asarray(method), (n,))
+
+    yhat = np.empty((n, horizon))
+    sigma_h = np.empty((n, horizon))
+
+    ses = fit['ses']
+    mask = methods == 'ses'
+    yhat[mask] = ses['level'][mask, None]
+    sigma_h[mask] = ses['sigma'][mask, None] * np.sqrt(1 + ses['alpha'][mask, None] ** 2 * (h - 1))
+
+    drift = fit['drift']
+    mask = methods == 'drift'
+    yhat[mask] = drift['last'][mask, None] + drift['slope'][mask, None] * h
+    sigma_h[mask] = drift['sigma'][mask, None] * np.sqrt(h * (1 + h / (T - 1)))
+
+    snaive = fit['seasonal_naive']
+    mask = methods == 'seasonal_naive'
+    m = snaive['last_season'].shape[1]
+    idx = (np.arange(horizon) % m)
+    yhat[mask] = snaive['last_season'][mask][:, idx]
+    sigma_h[mask] = snaive['sigma'][mask, None] * np.sqrt(np.floor((h - 1) / m) + 1)
+
+    return yhat, yhat - z * sigma_h, yhat + z * sigma_h
+
+
+def select_fast_method(fit):
+    """
+    Per-series method with the lowest one-step residual error.
+    """
+    sigmas = np.vstack([fit[name]['sigma'] for name in FAST_METHODS])
+    return np.array(FAST_METHODS)[np.argmin(sigmas, axis=0)]
+
+
+def fast_forecast_batch(closes, horizon=30, method='auto'):
+    """
+    Forecast many tickers at once.
+
+    Series are aligned on their most recent observations (truncated to the
+    shortest series) so they can be fitted as one matrix.
+
+    Args:
+        closes (dict): {ticker: 1-D array-like of closing prices, oldest first}
+        horizon (int): Steps ahead to forecast
+        method (str): 'auto' (per-series selection) or one of FAST_METHODS
+
+    Returns:
+        dict: {ticker: {'method', 'yhat', 'yhat_lower', 'yhat_upper'}}
+    """
+    tickers = list(closes)
+    length = min(len(closes[t]) for t in tickers)
+    Y = np.vstack([np.asarray(closes[t], dtype=float)[-length:] for t in tickers])
+
+    fit = fit_fast_models(Y)
+    methods = select_fast_method(fit) if method == 'auto' else np.array([method] * len(tickers))
+    yhat, lower, upper = forecast_fast_models(fit, methods, horizon)
+
+    return {
+        ticker: {
+            'method': str(methods[i]),
+            'yhat': yhat[i],
+            'yhat_lower': lower[i],
+            'yhat_upper': upper[i]
+        }
+        for i, ticker in enumerate(tickers)
+    }
+
+
+def _future_trading_days(last_date, periods=None, days=None):
+    """Business days after last_date: a fixed count, or those within `days` calendar days."""
+    start = pd.Timestamp(last_date) + pd.offsets.BDay(1)
+    if periods is not None:
+        return pd.bdate_range(start, periods=periods)
+    return pd.bdate_range(start, pd.Timestamp(last_date) + pd.Timedelta(days=days))
+
+
+class FastHoldout(StockModelHoldout):
+    def __init__(self, stock_data, method='auto'):
+        """
+        Holdout validation with the NumPy models instead of Prophet.
+
+        Args:
+            stock_data (StockData): StockData object containing the stock data
+            method (str): 'auto' or one of FAST_METHODS
+        """
+        super().__init__(stock_data)
+        self.method = method
+        self.fit = None
+
+    def train_model(self):
+        """
+        Fit the fast models on the training data.
+        """
+        if self.train_data is None:
+            raise ValueError("No training data available. Please split data first.")
+
+        self.fit = fit_fast_models(self.train_data['y'].values)
+        self.model = str(select_fast_method(self.fit)[0]) if self.method == 'auto' else self.method
+
+    def make_forecast(self):
+        """
+        Make forecasts on the test data.
+        """
+        if self.model is None:
+            raise ValueError("No trained model available. Please train the model first.")
+
+        yhat, lower, upper = forecast_fast_models(self.fit, self.model, len(self.test_data))
+        self.forecast = pd.DataFrame({
+            'ds': self.test_data['ds'].values,
+            'yhat': yhat[0],
+            'yhat_lower': lower[0],
+            'yhat_upper': upper[0]
+        })
+
+
+class FastForecaster(StockHyperopt):
+    def __init__(self, stock_data, method='auto', horizon_days=365):
+        """
+        Next-year forecast with the NumPy models instead of Prophet + hyperopt.
+
+        Args:
+            stock_data (StockData): StockData object containing the stock data
+            method (str): 'auto' or one of FAST_METHODS
+            horizon_days (int): Calendar days to forecast
+        """
+        super().__init__(stock_data, horizon_days=horizon_days)
+        self.method = method
+        self.fit = None
+
+    def optimize_hyperparameters(self, max_evals=None, **search_options):
+        """
+        Fit all fast models and keep the one with the lowest one-step error.
+        max_evals and search options are accepted for interface parity and ignored.
+        """
+        if self.df is None:
+            self.prepare_data()
+
+        self.fit = fit_fast_models(self.df['y'].values)
+        method = str(select_fast_method(self.fit)[0]) if self.method == 'auto' else self.method
+        self.best_params = {'method': method}
+        if method == 'ses':
+            self.best_params['alpha'] = float(self.fit['ses']['alpha'][0])
+        self.best_params['sigma'] = float(self.fit[method]['sigma'][0])
+        self.search_stats = {'evaluated': len(FAST_METHODS), 'stopped_reason': 'fast_mode'}
+
+    def train_best_model(self):
+        """
+        The fast models are fitted during selection; just record the chosen method.
+        """
+        if self.best_params is None:
+            raise ValueError("No optimized parameters available. Please run optimize_hyperparameters first.")
+
+        self.model = self.best_params['method']
+
+    def forecast_next_year(self):
+        """
+        Forecast stock prices for the trading days of the next horizon_days.
+        Like Prophet's predict, the frame also carries fitted values for the history.
+        """
+        if self.model is None:
+            raise ValueError("No trained model available. Please train the model first.")
+
+        future = _future_trading_days(self.df['ds'].iloc[-1], days=self.horizon_days)
+        yhat, lower, upper = forecast_fast_models(self.fit, self.model, len(future))
+
+        fitted = self.fit[self.model]['fitted'][0]
+        band = INTERVAL_Z * self.fit[self.model]['sigma'][0]
+        history = pd.DataFrame({
+            'ds': self.df['ds'].values,
+            'yhat': fitted,
+            'yhat_lower': fitted - band,
+            'yhat_upper': fitted + band
+        })
+        upcoming = pd.DataFrame({'ds': future, 'yhat': yhat[0], 'yhat_lower': lower[0], 'yhat_upper': upper[0]})
+        self.forecast = pd.concat([history, upcoming], ignore_index=True)
+
+
+def benchmark_against_prophet(n_series=50, length=750, prophet_series=5, seed=0):
+    """
+    Latency of the fast batch path and holdout accuracy of fast vs Prophet
+    on synthetic random walks with drift and a weekly pattern.
+
+    Returns:
+        dict: Timings (seconds) and mean holdout RMSE per mode
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=length)
+    weekly = np.tile([0.3, -0.1, 0.0, 0.2, -0.4], length // 5 + 1)[:length]
+    closes = {
+        f'SYN{i}': 100 + np.cumsum(rng.normal(rng.normal(0, 0.05), 1, length)) + weekly
+        for i in range(n_series)
+    }
+
+    start = time.perf_counter()
+    fast_forecast_batch(closes, horizon=30)
+    batch_time = time.perf_counter() - start
+    print(f"fast batch: {n_series} tickers x {length} rows in {batch_time * 1000:.1f} ms")
+
+    results = {'batch_seconds': batch_time, 'fast': [], 'prophet': [], 'fast_seconds': 0.0, 'prophet_seconds': 0.0}
+    for i, ticker in enumerate(list(closes)[:prophet_series]):
+        stock = StockData(ticker, '2022-01-03', '2025-12-31')
+        stock.dataframe = pd.DataFrame({'Date': dates, 'Close': closes[ticker]})
+        for mode, cls in (('fast', FastHoldout), ('prophet', StockModelHoldout)):
+            start = time.perf_counter()
+            metrics = cls(stock).run_analysis()
+            results[f'{mode}_seconds'] += time.perf_counter() - start
+            results[mode].append(metrics['RMSE'])
+
+    for mode in ('fast', 'prophet'):
+        print(f"{mode:<8} holdout: mean RMSE {np.mean(results[mode]):8.3f}  "
+              f"avg {results[f'{mode}_seconds'] / prophet_series * 1000:8.1f} ms/ticker")
+    return results
+
+
+# Example usage
+if __name__ == "__main__":
+    import logging
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    benchmark_against_prophet()
@@ -0,0 +1,176 @@
+import os
+import re
+import pickle
+import hashlib
+import threading
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+# Where registry records are stored (one pickle per ticker)
+DEFAULT_REGISTRY_DIR = os.environ.get(
+    'MODEL_REGISTRY_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.model_registry')
+)
+
+
+class ModelRegistry:
+    # Lookup outcomes
+    EXACT = 'exact'      # same data as the stored fit
+    MINOR = 'minor'      # stored data plus a few new rows, price barely moved
+    STALE = 'stale'      # known ticker, data changed materially
+    MISSING = 'missing'  # ticker never fitted
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR, max_trials=100, tolerance_rows=5, tolerance_pct=0.02):
+        """
+        Per-ticker store of hyperopt results and fitted Prophet parameters.
+
+        Records are keyed by (symbol, data fingerprint); only the latest record
+        per symbol is kept.
+
+        Args:
+            root (str): Directory for the registry files
+            max_trials (int): Number of best prior trials kept for warm starts
+            tolerance_rows (int): New rows that still count as unchanged data
+            tolerance_pct (float): Relative move in the last close that still counts as unchanged
+        """
+        self.root = root
+        self.max_trials = max_trials
+        self.tolerance_rows = tolerance_rows
+        self.tolerance_pct = tolerance_pct
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(df):
+        """
+        Hash of a Prophet frame's dates and closes (rounded to 4 decimals).
+        """
+        digest = hashlib.sha1()
+        digest.update(df['ds'].values.astype('datetime64[ns]').astype(np.int64).tobytes())
+        digest.update(np.round(df['y'].values.astype(float), 4).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, symbol):
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol.upper())
+        return os.path.join(self.root, f'{safe}.pkl')
+
+    def load(self, symbol):
+        """
+        Return the stored record for symbol, or None.
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable registry record {path}: {str(e)}")
+            return None
+
+    def lookup(self, symbol, df):
+        """
+        Compare df against the stored record for symbol.
+
+        Returns:
+            tuple: (record or None, one of EXACT / MINOR / STALE / MISSING)
+        """
+        record = self.load(symbol)
+        if record is None:
+            return None, self.MISSING
+
+        if record['fingerprint'] == self.fingerprint(df):
+            return record, self.EXACT
+
+        # Stored data is a prefix of the new data, and since the last full search
+        # only a few rows were appended and the price barely moved
+        new_rows = len(df) - record['search_rows']
+        if 0 < len(df) - record['rows'] and new_rows <= self.tolerance_rows \
+                and self.fingerprint(df.iloc[:record['rows']]) == record['fingerprint']:
+            last_y = float(df['y'].iloc[-1])
+            if abs(last_y / record['search_last_y'] - 1) <= self.tolerance_pct:
+                return record, self.MINOR
+
+        return record, self.STALE
+
+    def save(self, symbol, df, best_params, trials=None, stan_params=None, previous=None):
+        """
+        Store the latest fit for symbol.
+
+        Args:
+            symbol (str): Ticker symbol
+            df (DataFrame): Prophet frame the model was fitted on
+            best_params (dict): Best hyperparameters
+            trials (Trials): hyperopt trials of this search (None if the search was skipped)
+            stan_params (dict): Fitted Stan parameters usable as a warm-start init
+            previous (dict): Earlier record whose trials (and search baseline) carry over
+                because no new search ran
+        """
+        history = list(previous['trials']) if previous else []
+        if trials is not None:
+            for trial in trials.trials:
+                loss = trial['result'].get('loss')
+                if loss is not None:
+                    point = {k: v[0] for k, v in trial['misc']['vals'].items() if v}
+                    history.append({'point': point, 'loss': float(loss)})
+        history.sort(key=lambda t: t['loss'])
+
+        record = {
+            'symbol': symbol.upper(),
+            'fingerprint': self.fingerprint(df),
+            'rows': len(df),
+            'last_ds': df['ds'].iloc[-1],
+            'last_y': float(df['y'].iloc[-1]),
+            'best_params': dict(best_params),
+            # Data the last full search ran on; MINOR drift is measured against it
+            'search_rows': previous['search_rows'] if previous else len(df),
+            'search_last_y': previous['search_last_y'] if previous else float(df['y'].iloc[-1]),
+            'trials': history[:self.max_trials],
+            'stan_params': stan_params,
+            'updated_at': datetime.utcnow()
+        }
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            # Write to a temp file then rename so readers never see a partial record
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(record, f)
+            os.replace(tmp_path, self._path(symbol))
+
+        return record
+
+    def warm_start_points(self, record, count=5):
+        """
+        Best prior trial points (hyperopt raw format), de-duplicated.
+        """
+        if not record:
+            return []
+        points, seen = [], set()
+        for trial in record['trials']:
+            key = tuple(sorted(trial['point'].items()))
+            if key not in seen:
+                seen.add(key)
+                points.append(trial['point'])
+            if len(points) >= count:
+                break
+        return points
+
+
+def warm_start_params(model):
+    """
+    Fitted Stan parameters of a Prophet model, in the form Prophet.fit(init=...) accepts.
+    """
+    if model is None or not getattr(model, 'params', None):
+        return None
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = float(model.params[name][0][0])
+    for name in ['delta', 'beta']:
+        params[name] = np.array(model.params[name][0])
+    return params
+
+
+# Shared registry used by the stock agent
+model_registry = ModelRegistry()
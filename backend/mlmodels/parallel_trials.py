@@ -0,0 +1,274 @@
+import os
+import sys
+import atexit
+import threading
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from hyperopt import tpe, base, space_eval, STATUS_OK, STATUS_NEW, JOB_STATE_DONE, Trials
+
+logger = logging.getLogger(__name__)
+
+# Process-wide trial pool (see trial_pool)
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+def available_cores():
+    """Number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def evaluate_prophet_params(df, params, init=None):
+    """
+    Fit Prophet with params and return the RMSE on the last 30 known days.
+
+    Module-level so it can be pickled into worker processes. init is an
+    optional Stan warm-start (see model_registry.warm_start_params).
+    Only yhat is scored, so the interval sampling is switched off.
+    """
+    from prophet import Prophet
+
+    model = Prophet(
+        changepoint_prior_scale=params['changepoint_prior_scale'],
+        seasonality_prior_scale=params['seasonality_prior_scale'],
+        holidays_prior_scale=params['holidays_prior_scale'],
+        seasonality_mode=params['seasonality_mode'],
+        uncertainty_samples=0
+    )
+    if init is not None:
+        model.fit(df, init=init)
+    else:
+        model.fit(df)
+
+    future = model.make_future_dataframe(periods=30)
+    forecast = model.predict(future)
+
+    y_true = df['y'].values[-30:]
+    y_pred = forecast['yhat'].values[-30:]
+
+    if len(y_true) != len(y_pred):
+        min_len = min(len(y_true), len(y_pred))
+        y_true = y_true[:min_len]
+        y_pred = y_pred[:min_len]
+
+    return float(np.sqrt(np.mean((y_true - y_pred) ** 2)))
+
+
+def _init_worker():
+    # Pay for the Prophet/Stan import once per pool process, not in the first trial
+    import prophet  # noqa: F401
+
+
+def _evaluate_in_worker(task):
+    df, params, init = task
+    return evaluate_prophet_params(df, params, init)
+
+
+def trial_pool():
+    """
+    The long-lived process pool every search in this process runs its trials on.
+
+    Created on first use in the process that searches (a gunicorn worker,
+    after the fork, never the preloading master) and reused by every later
+    search, so a search no longer starts and tears down its own processes
+    and re-imports Prophet in each. A forked child creates its own. It has
+    one process per available core and is never replaced while in use;
+    concurrent searches share it, each submitting at most its n_workers
+    trials at a time.
+    """
+    global _POOL, _POOL_PID
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = ProcessPoolExecutor(max_workers=available_cores(), initializer=_init_worker)
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def _discard_pool(pool):
+    """Forget a broken pool so the next search starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_pool():
+    if _POOL is not None and _POOL_PID == os.getpid():
+        _POOL.shutdown(wait=True, cancel_futures=True)
+
+
+class ParallelTrialExecutor:
+    def __init__(self, space, n_workers=None, seed=42, time_budget=None, patience=None, min_delta=1e-3):
+        """
+        Batched TPE search whose trials run across the shared process pool (trial_pool).
+
+        Args:
+            space (dict): hyperopt search space
+            n_workers (int): Trials run at once on the shared pool (default: available cores); also the batch size
+            seed (int): Base seed; trial i uses seed + i so runs are reproducible
+            time_budget (float): Wall-clock budget in seconds; no new batch starts after it
+            patience (int): Stop after this many trials without relative improvement > min_delta
+            min_delta (float): Relative loss improvement that counts as progress
+        """
+        self.space = space
+        self.n_workers = max(1, n_workers or available_cores())
+        self.seed = seed
+        self.time_budget = time_budget
+        self.patience = patience
+        self.min_delta = min_delta
+        self.trials = None
+        self.stats = None
+
+    def _suggest_batch(self, domain, trials, size):
+        """Ask TPE for `size` new points (one suggest call per trial id)."""
+        docs = []
+        for tid in trials.new_trial_ids(size):
+            docs.extend(tpe.suggest([tid], domain, trials, self.seed + tid))
+        return docs
+
+    def _point_docs(self, trials, points):
+        """Trial docs for known points (raw format), e.g. prior bests to re-evaluate."""
+        tids = trials.new_trial_ids(len(points))
+        miscs = [
+            {
+                'tid': tid,
+                'cmd': ('domain_attachment', 'FMinIter_Domain'),
+                'workdir': None,
+                'idxs': {k: [tid] for k in point},
+                'vals': {k: [v] for k, v in point.items()}
+            }
+            for tid, point in zip(tids, points)
+        ]
+        return trials.new_trial_docs(tids, [None] * len(tids), [{'status': STATUS_NEW} for _ in tids], miscs)
+
+    def run(self, df, max_evals=10, trials=None, initial_points=None, init=None):
+        """
+        Run the search.
+
+        Args:
+            df (DataFrame): Prophet-ready frame with ds/y columns
+            max_evals (int): Maximum number of trials (including any in `trials`)
+            trials (Trials): Optional prior trials to continue from
+            initial_points (list): Points (raw format) evaluated before any TPE suggestion,
+                e.g. the best trials of an earlier search on older data
+            init (dict): Stan warm-start passed to every Prophet fit
+
+        Returns:
+            dict: Best point in hyperopt's raw format (choice indices), as fmin returns
+        """
+        domain = base.Domain(lambda params: {'loss': 0.0, 'status': STATUS_OK}, self.space)
+        self.trials = trials if trials is not None else Trials()
+
+        start = time.perf_counter()
+        best_loss = min([l for l in self.trials.losses() if l is not None], default=np.inf)
+        since_improvement = 0
+        stopped_reason = 'max_evals'
+        evaluated = 0
+        pending = list(initial_points or [])
+
+        # Each task carries the frame (a few hundred rows; small next to a Prophet fit)
+        pool = trial_pool() if self.n_workers > 1 else None
+
+        try:
+            while len(self.trials.trials) < max_evals:
+                if self.time_budget is not None and time.perf_counter() - start >= self.time_budget:
+                    stopped_reason = 'time_budget'
+                    break
+
+                batch_size = min(self.n_workers, max_evals - len(self.trials.trials))
+                seeded, pending = pending[:batch_size], pending[batch_size:]
+                docs = self._point_docs(self.trials, seeded) if seeded else []
+                if batch_size > len(docs):
+                    # TPE only sees completed trials, so seeded points inform the next batch
+                    docs += self._suggest_batch(domain, self.trials, batch_size - len(docs))
+                points = [
+                    space_eval(self.space, {k: v[0] for k, v in doc['misc']['vals'].items() if v})
+                    for doc in docs
+                ]
+
+                if pool is not None:
+                    losses = list(pool.map(_evaluate_in_worker, [(df, p, init) for p in points]))
+                else:
+                    losses = [evaluate_prophet_params(df, p, init) for p in points]
+
+                for doc, loss in zip(docs, losses):
+                    doc['state'] = JOB_STATE_DONE
+                    doc['result'] = {'loss': loss, 'status': STATUS_OK}
+                self.trials.insert_trial_docs(docs)
+                self.trials.refresh()
+                evaluated += len(docs)
+
+                for loss in losses:
+                    if loss < best_loss * (1 - self.min_delta):
+                        best_loss = loss
+                        since_improvement = 0
+                    else:
+                        since_improvement += 1
+
+                if self.patience is not None and since_improvement >= self.patience:
+                    stopped_reason = 'plateau'
+                    break
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+
+        self.stats = {
+            'evaluated': evaluated,
+            'total_trials': len(self.trials.trials),
+            'workers': self.n_workers,
+            'wall_time': round(time.perf_counter() - start, 3),
+            'best_loss': best_loss,
+            'stopped_reason': stopped_reason
+        }
+        return self.trials.argmin
+
+
+def benchmark_parallel_search(df, max_evals_list=(10, 30), workers_list=(1, 2, 4), seed=42):
+    """
+    Wall time of the search for each (max_evals, workers) pair.
+
+    The pool has available_cores() processes, so worker counts above that
+    run in turns; run it on a machine with at least max(workers_list) cores
+    to see the speed-up.
+    The pool is reused across runs like in the server, so the first run
+    with more than one worker also pays for starting it.
+
+    Returns:
+        list: One stats dict per run
+    """
+    from .stock_hyperopt import StockHyperopt
+
+    results = []
+    for max_evals in max_evals_list:
+        for workers in workers_list:
+            executor = ParallelTrialExecutor(StockHyperopt.search_space(), n_workers=workers, seed=seed)
+            executor.run(df, max_evals=max_evals)
+            stats = dict(executor.stats, max_evals=max_evals)
+            results.append(stats)
+            print(f"max_evals={max_evals:<3} workers={workers}  wall={stats['wall_time']:.2f}s  best_rmse={stats['best_loss']:.4f}")
+    return results
+
+
+# Benchmark on a synthetic random walk (no network needed)
+# Usage: python -m mlmodels.parallel_trials [workers ...]   (default: 1 2 4)
+if __name__ == "__main__":
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2022-01-01', periods=750)
+    frame = pd.DataFrame({'ds': dates, 'y': 100 + np.cumsum(rng.normal(0, 1, len(dates)))})
+    workers_arg = tuple(int(w) for w in sys.argv[1:]) or (1, 2, 4)
+    print(f"Available cores: {available_cores()}")
+    if max(workers_arg) > available_cores():
+        print(f"Note: {max(workers_arg)} workers on {available_cores()} core(s) measures overhead, not speed-up")
+    benchmark_parallel_search(frame, workers_list=workers_arg)
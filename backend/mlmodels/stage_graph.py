@@ -0,0 +1,142 @@
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .stock_model_holdout import StockModelHoldout
+from .stock_hyperopt import StockHyperopt
+from .fast_forecast import FastHoldout, FastForecaster
+from .model_registry import model_registry
+from .parallel_trials import available_cores
+
+# Worker processes shared by all pipelines for model fits
+PIPELINE_PROCESS_WORKERS = int(os.environ.get('PIPELINE_PROCESS_WORKERS', '2'))
+
+# Hyperopt trials a pipeline's forecast search runs at once on the trial pool
+# (one core is left for the holdout fit running alongside it)
+FORECAST_TRIAL_WORKERS = int(os.environ.get('FORECAST_TRIAL_WORKERS', '0')) or max(1, available_cores() - 1)
+
+# Threads per pipeline run for rendering / light stages
+PIPELINE_THREAD_WORKERS = 4
+
+# A stage: fn(*args, *results_of_deps), run on 'thread' or 'process' workers
+Stage = namedtuple('Stage', ['fn', 'deps', 'kind', 'args'], defaults=[(), 'thread', ()])
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """Lazily created process pool shared by every pipeline in this process."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=PIPELINE_PROCESS_WORKERS)
+        return _process_pool
+
+
+def run_stage_graph(stages, on_done=None):
+    """
+    Run stages as soon as their dependencies finish.
+
+    Independent stages run concurrently, so total latency follows the
+    slowest dependency chain rather than the sum of all stages. on_done is
+    called in the caller's thread as each stage completes.
+
+    Args:
+        stages (dict): {name: Stage}
+        on_done (callable): on_done(name, result, results_so_far)
+
+    Returns:
+        tuple: ({name: result}, {name: {'start', 'end', 'seconds'}}) with
+               times in seconds since the graph started
+    """
+    for name, stage in stages.items():
+        missing = [dep for dep in stage.deps if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+
+    results, timings = {}, {}
+    pending = dict(stages)
+    running = {}
+    origin = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=PIPELINE_THREAD_WORKERS) as threads:
+        def launch_ready():
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.deps):
+                    del pending[name]
+                    executor = _get_process_pool() if stage.kind == 'process' else threads
+                    args = tuple(stage.args) + tuple(results[dep] for dep in stage.deps)
+                    timings[name] = {'start': round(time.perf_counter() - origin, 3)}
+                    running[executor.submit(stage.fn, *args)] = name
+
+        launch_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                end = round(time.perf_counter() - origin, 3)
+                timings[name].update(end=end, seconds=round(end - timings[name]['start'], 3))
+                if on_done is not None:
+                    on_done(name, results[name], results)
+            launch_ready()
+
+        if pending:
+            raise ValueError(f"Stages could not run (dependency cycle?): {list(pending)}")
+
+    return results, timings
+
+
+def fit_holdout(stock_data, fast=False, profile=None):
+    """
+    Holdout validation fit (runs in a worker process for Prophet).
+    profile (AnalysisProfile) sets the interval sample count.
+    """
+    if fast:
+        holdout = FastHoldout(stock_data)
+    elif profile is not None:
+        holdout = StockModelHoldout(stock_data, uncertainty_samples=profile.uncertainty_samples)
+    else:
+        holdout = StockModelHoldout(stock_data)
+    holdout.run_analysis()
+    if not fast:
+        # The fitted Prophet object is not needed once the forecast exists; keep the result small
+        holdout.model = None
+    return holdout
+
+
+def fit_forecast(stock_data, fast=False, max_evals=10, profile=None, n_workers=1):
+    """
+    Forecast fit (Prophet + hyperopt).
+    profile (AnalysisProfile) sets the search budget, interval samples and
+    horizon; max_evals is used when no profile is given.
+    n_workers is the hyperopt trial parallelism: a pipeline runs this on a
+    thread with FORECAST_TRIAL_WORKERS trials at a time on the shared trial
+    pool; callers that already fan out per ticker in worker processes pass 1,
+    since a nested pool would oversubscribe the cores.
+    """
+    horizon_days = profile.horizon_days if profile is not None else 365
+    search_options = {'n_workers': n_workers}
+    if fast:
+        forecaster = FastForecaster(stock_data, horizon_days=horizon_days)
+    elif profile is not None:
+        forecaster = StockHyperopt(stock_data, registry=model_registry,
+                                   uncertainty_samples=profile.uncertainty_samples, horizon_days=horizon_days)
+        max_evals = profile.max_evals
+        search_options.update(time_budget=profile.time_budget, patience=profile.patience)
+    else:
+        forecaster = StockHyperopt(stock_data, registry=model_registry)
+    forecaster.run_analysis(max_evals=max_evals, **search_options)
+    if not fast:
+        forecaster.model = None
+        forecaster.registry = None
+        forecaster.trials = None
+    return forecaster
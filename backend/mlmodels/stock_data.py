@@ -1,12 +1,7 @@
-import yfinance as yf
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Crucial for running on a web server (no GUI)
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-import io
-import base64
+from .chart_data import line_series, histogram, CHART_MAX_POINTS
+from .chart_renderer import chart_renderer
 
 class StockData:
     def __init__(self, ticker, start_date, end_date):
@@ -17,6 +12,7 @@ class StockData:
         self.start_date = start_date
         self.end_date = end_date
         self.dataframe = None
+        self.resolution = 'daily'
         
         # Validate date formats immediately
         try:
@@ -58,10 +54,118 @@ class StockData:
         except Exception as e:
             raise ValueError(f"Error fetching stock data: {str(e)}")
 
+    def resample_weekly(self):
+        """
+        Copy of this StockData with one row per week (last close of the week,
+        dated on the week's Friday). Used to train on long ranges cheaply.
+        """
+        if self.dataframe is None or self.dataframe.empty:
+            raise ValueError("No data available. Please fetch data first.")
+
+        weekly = StockData(self.ticker, self.start_date, self.end_date)
+        weekly.dataframe = (
+            self.dataframe.set_index('Date')['Close']
+            .resample('W-FRI').last()
+            .dropna()
+            .reset_index()
+        )
+        weekly.resolution = 'weekly'
+        return weekly
+
+    @classmethod
+    def fetch_many(cls, tickers, start_date, end_date):
+        """
+        Fetch closing prices for several tickers with one batched download
+        (plus one retry batch with '.NS' for bare symbols that came back empty).
+
+        Returns:
+            tuple: ({requested ticker: StockData}, {requested ticker: error message})
+        """
+        requested = list(dict.fromkeys(t.upper().strip() for t in tickers))
+        stocks = {t: cls(t, start_date, end_date) for t in requested}
+        closes = cls._download_closes(requested, start_date, end_date)
+
+        retry = {f"{t}.NS": t for t in requested if t not in closes and '.' not in t}
+        if retry:
+            print(f"No data for {', '.join(retry.values())}, trying .NS ...")
+            for symbol, series in cls._download_closes(list(retry), start_date, end_date).items():
+                closes[retry[symbol]] = series
+                stocks[retry[symbol]].ticker = symbol
+
+        found, failed = {}, {}
+        for ticker, stock in stocks.items():
+            series = closes.get(ticker)
+            if series is None:
+                failed[ticker] = f"No data found for ticker {ticker}. Is the symbol correct?"
+                continue
+            stock.dataframe = series.rename('Close').rename_axis('Date').reset_index()
+            if stock.dataframe['Date'].dt.tz is not None:
+                stock.dataframe['Date'] = stock.dataframe['Date'].dt.tz_localize(None)
+            found[ticker] = stock
+
+        print(f"Successfully fetched {len(found)}/{len(requested)} tickers in a batch")
+        return found, failed
+
+    @staticmethod
+    def _download_closes(symbols, start_date, end_date):
+        """One yf.download call for all symbols -> {symbol: non-empty Close series}"""
+        if not symbols:
+            return {}
+        import yfinance as yf
+        data = yf.download(symbols, start=start_date, end=end_date, progress=False, group_by='column')
+        if data is None or data.empty:
+            return {}
+        closes = data['Close']
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+        result = {}
+        for symbol in closes.columns:
+            series = closes[symbol].dropna()
+            if not series.empty:
+                result[str(symbol).upper()] = series
+        return result
+
     def _download_data(self, symbol):
         """Helper to download data"""
+        import yfinance as yf
         return yf.download(symbol, start=self.start_date, end=self.end_date, progress=False)
 
+    def get_price_series(self, max_points=CHART_MAX_POINTS):
+        """
+        Chart data for Image 1: closing prices downsampled with LTTB
+        """
+        if self.dataframe is None: return None
+        return line_series(self.dataframe['Date'], self.dataframe['Close'], max_points)
+
+    def get_returns_histogram(self, bins=50):
+        """
+        Chart data for Image 2: histogram of daily returns
+        """
+        if self.dataframe is None: return None
+        returns = self.dataframe['Close'].pct_change().dropna()
+        return histogram(returns, bins)
+
+    def price_chart_spec(self):
+        """
+        Chart spec for Image 1 (see ChartRenderer)
+        """
+        if self.dataframe is None: return None
+        return 'price', {
+            'x': self.dataframe['Date'].values,
+            'y': self.dataframe['Close'].values,
+            'title': f'{self.ticker} Closing Price History'
+        }
+
+    def returns_chart_spec(self):
+        """
+        Chart spec for Image 2 (see ChartRenderer)
+        """
+        if self.dataframe is None: return None
+        return 'returns', {
+            'values': self.dataframe['Close'].pct_change().dropna().values,
+            'title': f'{self.ticker} Daily Returns Distribution'
+        }
+
     def get_price_plot(self):
         """
         Generates Image 1: Closing Price History
@@ -69,17 +173,8 @@ class StockData:
         if self.dataframe is None: return None
         
         try:
-            plt.style.use('seaborn-v0_8')
-            plt.figure(figsize=(10, 6))
-            
-            sns.lineplot(data=self.dataframe, x='Date', y='Close', color='blue')
-            plt.title(f'{self.ticker} Closing Price History')
-            plt.xlabel('Date')
-            plt.ylabel('Price (INR)')
-            plt.grid(True)
-            plt.tight_layout()
-            
-            return self._fig_to_base64()
+            image_base64, _ = chart_renderer.render(*self.price_chart_spec())
+            return image_base64
         except Exception as e:
             print(f"Error generating price plot: {e}")
             return None
@@ -91,34 +186,12 @@ class StockData:
         if self.dataframe is None: return None
         
         try:
-            plt.style.use('seaborn-v0_8')
-            plt.figure(figsize=(10, 6))
-            
-            # Calculate returns if not already present
-            if 'Daily_Return' not in self.dataframe.columns:
-                self.dataframe['Daily_Return'] = self.dataframe['Close'].pct_change()
-            
-            sns.histplot(data=self.dataframe.dropna(), x='Daily_Return', bins=50, color='purple', kde=True)
-            plt.title(f'{self.ticker} Daily Returns Distribution')
-            plt.xlabel('Daily Return')
-            plt.ylabel('Frequency')
-            plt.grid(True)
-            plt.tight_layout()
-            
-            return self._fig_to_base64()
+            image_base64, _ = chart_renderer.render(*self.returns_chart_spec())
+            return image_base64
         except Exception as e:
             print(f"Error generating returns plot: {e}")
             return None
 
-    def _fig_to_base64(self):
-        """Helper to convert current plot to base64 string"""
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close()
-        return image_base64
-
 # Example usage for testing
 if __name__ == "__main__":
     try:
@@ -1,21 +1,20 @@
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-from hyperopt import fmin, tpe, hp, STATUS_OK, Trials
-import matplotlib
-matplotlib.use('Agg') # Crucial for web server
-import matplotlib.pyplot as plt
-import io
-import base64
 from .stock_data import StockData
+from .chart_data import line_series, band_series, CHART_MAX_POINTS
+from .chart_renderer import chart_renderer
+from .model_registry import ModelRegistry, warm_start_params
 
 class StockHyperopt:
-    def __init__(self, stock_data):
+    def __init__(self, stock_data, registry=None, uncertainty_samples=1000, horizon_days=365):
         """
         Initialize StockHyperopt with StockData object.
         
         Args:
             stock_data (StockData): StockData object containing the stock data
+            registry (ModelRegistry): Optional registry to warm-start from and save fits to
+            uncertainty_samples (int): Prophet samples for the forecast interval
+            horizon_days (int): Calendar days to forecast
         """
         if not isinstance(stock_data, StockData):
             raise ValueError("Input must be a StockData object")
@@ -25,6 +24,13 @@ class StockHyperopt:
         self.best_params = None
         self.forecast = None
         self.df = None # Initialize df attribute
+        self.trials = None
+        self.search_stats = None
+        self.registry = registry
+        self.registry_record = None
+        self.registry_status = None
+        self.uncertainty_samples = uncertainty_samples
+        self.horizon_days = horizon_days
         
     def prepare_data(self):
         """
@@ -43,65 +49,85 @@ class StockHyperopt:
         if self.df['ds'].dt.tz is not None:
             self.df['ds'] = self.df['ds'].dt.tz_localize(None)
         
+    @property
+    def registry_key(self):
+        """
+        Registry symbol; resampled fits are stored apart from daily ones.
+        """
+        if self.stock_data.resolution == 'daily':
+            return self.stock_data.ticker
+        return f"{self.stock_data.ticker}@{self.stock_data.resolution}"
+
+    @staticmethod
+    def search_space():
+        """
+        Hyperopt search space for the Prophet priors.
+        """
+        from hyperopt import hp
+
+        return {
+            'changepoint_prior_scale': hp.loguniform('changepoint_prior_scale', -5, 0),
+            'seasonality_prior_scale': hp.loguniform('seasonality_prior_scale', -5, 0),
+            'holidays_prior_scale': hp.loguniform('holidays_prior_scale', -5, 0),
+            'seasonality_mode': hp.choice('seasonality_mode', ['additive', 'multiplicative'])
+        }
+
     def objective(self, params):
         """
         Objective function for hyperparameter optimization.
         """
-        # Create Prophet model with current parameters
-        model = Prophet(
-            changepoint_prior_scale=params['changepoint_prior_scale'],
-            seasonality_prior_scale=params['seasonality_prior_scale'],
-            holidays_prior_scale=params['holidays_prior_scale'],
-            seasonality_mode=params['seasonality_mode']
-        )
-        
-        # Fit the model
-        model.fit(self.df)
-        
-        # Make predictions (validation set logic can be improved here, but sticking to your structure)
-        future = model.make_future_dataframe(periods=30)
-        forecast = model.predict(future)
-        
-        # Calculate RMSE on the last 30 days of known data
-        y_true = self.df['y'].values[-30:]
-        y_pred = forecast['yhat'].values[-30:] # Taking the last 30 predictions that match training data
-        
-        # Basic error handling for shape mismatch
-        if len(y_true) != len(y_pred):
-             # Fallback if shapes don't align (e.g. less than 30 days data)
-            min_len = min(len(y_true), len(y_pred))
-            y_true = y_true[:min_len]
-            y_pred = y_pred[:min_len]
+        from hyperopt import STATUS_OK
+        from .parallel_trials import evaluate_prophet_params
 
-        rmse = np.sqrt(np.mean((y_true - y_pred) ** 2))
+        # RMSE on the last 30 days of known data
+        rmse = evaluate_prophet_params(self.df, params)
         
         return {'loss': rmse, 'status': STATUS_OK}
         
-    def optimize_hyperparameters(self, max_evals=10): # Reduced default for faster web response
+    def optimize_hyperparameters(self, max_evals=10, n_workers=None, seed=42, time_budget=None, patience=None): # Reduced default for faster web response
         """
         Optimize hyperparameters using hyperopt.
+
+        TPE suggestions are drawn in batches of n_workers and fitted in parallel
+        worker processes (one per available core by default).
+
+        Args:
+            max_evals (int): Maximum number of trials
+            n_workers (int): Worker processes; 1 runs every fit in this process
+            seed (int): Seed for reproducible suggestions
+            time_budget (float): Wall-clock budget in seconds (None = no limit)
+            patience (int): Stop after this many trials without improvement (None = never)
         """
         if self.df is None:
              self.prepare_data()
 
-        # Define the search space
-        space = {
-            'changepoint_prior_scale': hp.loguniform('changepoint_prior_scale', -5, 0),
-            'seasonality_prior_scale': hp.loguniform('seasonality_prior_scale', -5, 0),
-            'holidays_prior_scale': hp.loguniform('holidays_prior_scale', -5, 0),
-            'seasonality_mode': hp.choice('seasonality_mode', ['additive', 'multiplicative'])
-        }
-        
+        initial_points = []
+        if self.registry is not None:
+            self.registry_record, self.registry_status = self.registry.lookup(self.registry_key, self.df)
+            if self.registry_status in (ModelRegistry.EXACT, ModelRegistry.MINOR):
+                # Data has not materially changed: reuse the stored search result
+                self.best_params = dict(self.registry_record['best_params'])
+                self.trials = None
+                self.search_stats = {'evaluated': 0, 'stopped_reason': 'registry_' + self.registry_status}
+                return
+            # Re-evaluate the best earlier points first so TPE starts from them
+            initial_points = self.registry.warm_start_points(self.registry_record)
+
+        init = self.registry_record['stan_params'] if self.registry_record else None
+
+        from .parallel_trials import ParallelTrialExecutor
+
         # Run optimization
-        trials = Trials()
-        best = fmin(
-            fn=self.objective,
-            space=space,
-            algo=tpe.suggest,
-            max_evals=max_evals,
-            trials=trials,
-            show_progressbar=False
+        executor = ParallelTrialExecutor(
+            self.search_space(),
+            n_workers=n_workers,
+            seed=seed,
+            time_budget=time_budget,
+            patience=patience
         )
+        best = executor.run(self.df, max_evals=max_evals, initial_points=initial_points, init=init)
+        self.trials = executor.trials
+        self.search_stats = executor.stats
         
         # Get the best parameters
         self.best_params = {
@@ -118,30 +144,87 @@ class StockHyperopt:
         if self.best_params is None:
             raise ValueError("No optimized parameters available. Please run optimize_hyperparameters first.")
             
+        from prophet import Prophet
+
         # Create Prophet model with best parameters
         self.model = Prophet(
             changepoint_prior_scale=self.best_params['changepoint_prior_scale'],
             seasonality_prior_scale=self.best_params['seasonality_prior_scale'],
             holidays_prior_scale=self.best_params['holidays_prior_scale'],
-            seasonality_mode=self.best_params['seasonality_mode']
+            seasonality_mode=self.best_params['seasonality_mode'],
+            uncertainty_samples=self.uncertainty_samples
         )
         
-        # Fit the model
-        self.model.fit(self.df)
+        # Fit the model, starting from the previous fit's Stan parameters when known
+        init = self.registry_record['stan_params'] if self.registry_record else None
+        if init is not None:
+            self.model.fit(self.df, init=init)
+        else:
+            self.model.fit(self.df)
+
+        if self.registry is not None:
+            self.registry.save(
+                self.registry_key,
+                self.df,
+                self.best_params,
+                trials=self.trials,
+                stan_params=warm_start_params(self.model),
+                # Keep the stored trial history only when no new search ran
+                previous=self.registry_record if self.trials is None else None
+            )
         
     def forecast_next_year(self):
         """
-        Forecast stock prices for the next year.
+        Forecast stock prices for the next horizon_days (a year by default).
         """
         if self.model is None:
             raise ValueError("No trained model available. Please train the model first.")
             
-        # Create future dataframe for next year
-        future = self.model.make_future_dataframe(periods=365)
+        # Create future dataframe at the training resolution
+        if self.stock_data.resolution == 'weekly':
+            future = self.model.make_future_dataframe(periods=-(-self.horizon_days // 7), freq='W-FRI')
+        else:
+            future = self.model.make_future_dataframe(periods=self.horizon_days)
         
         # Make predictions
         self.forecast = self.model.predict(future)
         
+    def forecast_series(self, max_points=CHART_MAX_POINTS):
+        """
+        Chart data for the forecast: downsampled history plus forecast and interval.
+        """
+        if self.forecast is None:
+            return None
+
+        payload = band_series(
+            self.forecast['ds'],
+            self.forecast['yhat'],
+            self.forecast['yhat_lower'],
+            self.forecast['yhat_upper'],
+            max_points=max_points
+        )
+        payload['history'] = line_series(self.df['ds'], self.df['y'], max_points)
+        return payload
+
+    def forecast_chart_spec(self):
+        """
+        Chart spec for the forecast (see ChartRenderer).
+        """
+        if self.forecast is None:
+            return None
+
+        return 'forecast', {
+            'actual_x': self.df['ds'].values,
+            'actual_y': self.df['y'].values,
+            'actual_label': 'Historical',
+            'x': self.forecast['ds'].values,
+            'yhat': self.forecast['yhat'].values,
+            'lower': self.forecast['yhat_lower'].values,
+            'upper': self.forecast['yhat_upper'].values,
+            'forecast_label': 'Forecast',
+            'title': f'{self.stock_data.ticker} Stock Price Forecast (Optimized)'
+        }
+
     def visualize_forecast(self, save_path=None):
         """
         Visualize the forecast.
@@ -152,58 +235,21 @@ class StockHyperopt:
             return None
             
         try:
-            plt.style.use('seaborn-v0_8')
-            
-            # Create plot
-            fig = plt.figure(figsize=(12, 6))
-            
-            # Plot historical data
-            plt.plot(self.df['ds'], self.df['y'], 
-                    label='Historical', color='blue', linewidth=2)
-            
-            # Plot forecast
-            plt.plot(self.forecast['ds'], self.forecast['yhat'], 
-                    label='Forecast', color='red', linestyle='--', linewidth=2)
-            
-            # Add confidence intervals
-            plt.fill_between(self.forecast['ds'], 
-                           self.forecast['yhat_lower'], 
-                           self.forecast['yhat_upper'],
-                           color='gray', alpha=0.2, label='Confidence Interval')
-            
-            plt.title(f'{self.stock_data.ticker} Stock Price Forecast (Optimized)')
-            plt.xlabel('Date')
-            plt.ylabel('Price')
-            plt.legend()
-            plt.grid(True)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            # --- WEB LOGIC ---
-            if save_path:
-                plt.savefig(save_path)
-                print(f"Visualization saved to {save_path}")
-                plt.close()
-                return None
-            else:
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png')
-                buf.seek(0)
-                image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                plt.close()
-                return image_base64
+            image_base64, _ = chart_renderer.render(*self.forecast_chart_spec(), save_path=save_path)
+            return image_base64
             
         except Exception as e:
             print(f"Error creating visualization: {str(e)}")
             return None
             
-    def run_analysis(self, max_evals=10):
+    def run_analysis(self, max_evals=10, **search_options):
         """
         Run complete pipeline.
         Reduced max_evals default to 10 for faster web response.
+        Extra keyword arguments (n_workers, seed, time_budget, patience) go to optimize_hyperparameters.
         """
         self.prepare_data()
-        self.optimize_hyperparameters(max_evals)
+        self.optimize_hyperparameters(max_evals, **search_options)
         self.train_best_model()
         self.forecast_next_year()
         
@@ -1,21 +1,17 @@
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import matplotlib
-matplotlib.use('Agg') # Crucial for web server environments
-import matplotlib.pyplot as plt
-import io
-import base64
 from .stock_data import StockData
+from .chart_data import band_series, CHART_MAX_POINTS
+from .chart_renderer import chart_renderer
 
 class StockModelHoldout:
-    def __init__(self, stock_data):
+    def __init__(self, stock_data, uncertainty_samples=1000):
         """
         Initialize StockModelHoldout with StockData object.
         
         Args:
             stock_data (StockData): StockData object containing the stock data
+            uncertainty_samples (int): Prophet samples for the prediction interval
         """
         if not isinstance(stock_data, StockData):
             raise ValueError("Input must be a StockData object")
@@ -26,6 +22,7 @@ class StockModelHoldout:
         self.model = None
         self.forecast = None
         self.metrics = None
+        self.uncertainty_samples = uncertainty_samples
         
     def split_data(self, test_size=0.2):
         """
@@ -64,8 +61,10 @@ class StockModelHoldout:
         if self.train_data is None:
             raise ValueError("No training data available. Please split data first.")
             
+        from prophet import Prophet
+
         # Initialize and fit the model
-        self.model = Prophet()
+        self.model = Prophet(uncertainty_samples=self.uncertainty_samples)
         self.model.fit(self.train_data)
         
     def make_forecast(self):
@@ -92,6 +91,8 @@ class StockModelHoldout:
         y_true = self.test_data['y'].values
         y_pred = self.forecast['yhat'].values
         
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
         # Calculate metrics
         self.metrics = {
             'MAE': mean_absolute_error(y_true, y_pred),
@@ -100,6 +101,39 @@ class StockModelHoldout:
             'R2': r2_score(y_true, y_pred)
         }
         
+    def forecast_series(self, max_points=CHART_MAX_POINTS):
+        """
+        Chart data for actual vs predicted: downsampled actuals, forecast and interval.
+        """
+        if self.forecast is None:
+            return None
+
+        return band_series(
+            self.test_data['ds'],
+            self.forecast['yhat'],
+            self.forecast['yhat_lower'],
+            self.forecast['yhat_upper'],
+            actual=self.test_data['y'],
+            max_points=max_points
+        )
+
+    def forecast_chart_spec(self):
+        """
+        Chart spec for actual vs predicted (see ChartRenderer).
+        """
+        if self.forecast is None:
+            return None
+
+        return 'forecast', {
+            'actual_x': self.test_data['ds'].values,
+            'actual_y': self.test_data['y'].values,
+            'x': self.test_data['ds'].values,
+            'yhat': self.forecast['yhat'].values,
+            'lower': self.forecast['yhat_lower'].values,
+            'upper': self.forecast['yhat_upper'].values,
+            'title': f'{self.stock_data.ticker} Stock Price: Actual vs Predicted'
+        }
+
     def visualize_forecast(self, save_path=None):
         """
         Visualize the actual vs predicted values.
@@ -110,51 +144,8 @@ class StockModelHoldout:
             return None
             
         try:
-            plt.style.use('seaborn-v0_8')
-            
-            # Create the plot
-            fig = plt.figure(figsize=(12, 6))
-            
-            # Plot actual values
-            plt.plot(self.test_data['ds'], self.test_data['y'], 
-                    label='Actual', color='blue', linewidth=2)
-            
-            # Plot predicted values
-            plt.plot(self.test_data['ds'], self.forecast['yhat'], 
-                    label='Predicted', color='red', linestyle='--', linewidth=2)
-            
-            # Add confidence intervals
-            plt.fill_between(self.test_data['ds'], 
-                           self.forecast['yhat_lower'], 
-                           self.forecast['yhat_upper'],
-                           color='gray', alpha=0.2, label='Confidence Interval')
-            
-            # Customize the plot
-            plt.title(f'{self.stock_data.ticker} Stock Price: Actual vs Predicted')
-            plt.xlabel('Date')
-            plt.ylabel('Price')
-            plt.legend()
-            plt.grid(True)
-            
-            # Rotate x-axis labels for better readability
-            plt.xticks(rotation=45)
-            
-            # Adjust layout
-            plt.tight_layout()
-            
-            # --- WEB LOGIC ---
-            if save_path:
-                plt.savefig(save_path)
-                print(f"Visualization saved to {save_path}")
-                plt.close()
-                return None
-            else:
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png')
-                buf.seek(0)
-                image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                plt.close()
-                return image_base64
+            image_base64, _ = chart_renderer.render(*self.forecast_chart_spec(), save_path=save_path)
+            return image_base64
             
         except Exception as e:
             print(f"Error creating visualization: {str(e)}")
@@ -8,8 +8,8 @@ Author: FinEdge Team
 Version: 1.0.0
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional, Any
 from bson import ObjectId
 import logging
 
@@ -286,16 +286,153 @@ class LiabilitySchema:
         )
 
 
+class FinancialPathHistorySchema:
+    """
+    Financial Path History Schema
+    
+    One bucket document per user holding the newest MAX_ENTRIES results in
+    an `entries` array, so a save is a single atomic $push/$sort/$slice.
+    """
+    
+    MAX_ENTRIES = 5
+    
+    @staticmethod
+    def bucket_filter(clerk_user_id: str) -> Dict[str, Any]:
+        """Filter matching the user's bucket document (not legacy per-result docs)."""
+        return {"clerkUserId": clerk_user_id, "entries": {"$exists": True}}
+    
+    @staticmethod
+    def create_entry(
+        clerk_user_id: str,
+        risk_profile: str,
+        user_query: str,
+        server_data: Dict[str, Any],
+        fetched_user_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Create a single financial path result entry.
+        
+        Args:
+            clerk_user_id: User's Clerk ID
+            risk_profile: Risk profile used for the query
+            user_query: Original user query
+            server_data: Generated financial path payload
+            fetched_user_data: User data snapshot sent with the query
+            
+        Returns:
+            dict: History entry (with its own _id)
+        """
+        now = datetime.utcnow()
+        return {
+            "_id": ObjectId(),
+            "clerkUserId": clerk_user_id,
+            "riskProfile": risk_profile,
+            "userQuery": user_query,
+            "serverData": server_data,
+            "fetchedUserData": fetched_user_data,
+            "createdAt": now,
+            "updatedAt": now
+        }
+    
+    @classmethod
+    def push_update(cls, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the capped-push update for one or more entries.
+        
+        Keeps entries sorted newest first and trimmed to MAX_ENTRIES.
+        """
+        return {
+            "$push": {
+                "entries": {
+                    "$each": entries,
+                    "$sort": {"createdAt": -1},
+                    "$slice": cls.MAX_ENTRIES
+                }
+            },
+            "$set": {"updatedAt": datetime.utcnow()}
+        }
+
+
 # ==================== HELPER FUNCTIONS ====================
 
-def serialize_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+# Types that are already JSON-safe and returned untouched (checked by exact type for speed)
+_JSON_SCALARS = frozenset([str, int, float, bool, type(None)])
+
+
+def build_projection_tree(fields: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+    """
+    Turn dotted field paths into a nested selection tree.
+    
+    Example: ["name", "goals.target"] -> {"name": True, "goals": {"target": True}}
+    
+    Args:
+        fields: Field paths to keep (None keeps everything)
+        
+    Returns:
+        dict or None: Selection tree used by to_json_safe
+    """
+    if fields is None:
+        return None
+    
+    tree: Dict[str, Any] = {}
+    for path in fields:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                break  # A parent path already selects the whole subtree
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def to_json_safe(value: Any, tree: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Recursively convert a MongoDB value into JSON-serializable data in one pass.
+    
+    ObjectId -> str, datetime/date -> ISO string; dicts and lists are walked
+    (goal arrays, chat messages, nested entries). Never mutates the input.
+    
+    Args:
+        value: Any BSON-derived value
+        tree: Optional selection tree from build_projection_tree
+        
+    Returns:
+        JSON-serializable copy of value
+    """
+    value_type = type(value)
+    if value_type in _JSON_SCALARS:
+        return value
+    if isinstance(value, dict):
+        if tree is None:
+            return {key: to_json_safe(item) for key, item in value.items()}
+        return {
+            key: to_json_safe(value[key], None if sub is True else sub)
+            for key, sub in tree.items()
+            if key in value
+        }
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(item, tree) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def serialize_document(doc: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """
     Convert MongoDB document to JSON-serializable dict.
     
-    Converts ObjectId to string and datetime to ISO format.
+    UPDATED - Returns a new dict (the input is not mutated) and converts
+    ObjectId/datetime values at any depth, not only at the top level.
     
     Args:
         doc: MongoDB document
+        fields: Optional dotted field paths to keep (projection-driven
+                selection); `_id` is always kept
         
     Returns:
         dict: JSON-serializable document
@@ -303,20 +440,41 @@ def serialize_document(doc: Dict[str, Any]) -> Dict[str, Any]:
     if doc is None:
         return None
     
-    # Convert ObjectId to string
-    if "_id" in doc:
-        doc_id = str(doc["_id"])
-        doc["_id"] = doc_id
-        doc.setdefault("id", doc_id)
+    tree = build_projection_tree(fields)
+    if tree is not None and "_id" in doc:
+        tree["_id"] = True
     
-    # Convert datetime objects to ISO format strings
-    for key, value in doc.items():
-        if isinstance(value, datetime):
-            doc[key] = value.isoformat()
-        elif isinstance(value, ObjectId):
-            doc[key] = str(value)
+    result = to_json_safe(doc, tree)
     
-    return doc
+    # Expose the id under both names, as the frontend expects
+    if "_id" in result:
+        result.setdefault("id", result["_id"])
+    
+    return result
+
+
+def serialize_documents(docs: Iterable[Dict[str, Any]], fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Serialize a list of documents, building the projection tree only once.
+    
+    Args:
+        docs: MongoDB documents
+        fields: Optional dotted field paths to keep
+        
+    Returns:
+        list: JSON-serializable documents
+    """
+    tree = build_projection_tree(fields)
+    results = []
+    for doc in docs:
+        doc_tree = tree
+        if tree is not None and "_id" in doc:
+            doc_tree = dict(tree, _id=True)
+        result = to_json_safe(doc, doc_tree)
+        if "_id" in result:
+            result.setdefault("id", result["_id"])
+        results.append(result)
+    return results
 
 
 def calculate_net_worth(
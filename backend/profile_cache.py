@@ -0,0 +1,216 @@
+"""
+FinEdge Per-User Profile Cache
+
+Read-through cache of the assembled user profile (profile document plus
+income, expense, asset and liability entries and goals). Every write path
+in app.py invalidates the user's entry, so reads never outlive a write.
+
+Each process caches on its own, so invalidation goes through per-user
+version counters in shared memory (UserVersions): a write in one gunicorn
+worker bumps the user's version and every worker's next read of that user
+sees the change and reloads. The counters are created when this module is
+imported, so workers forked from a preloading master share them. A process
+that did not inherit them (python app.py, GUNICORN_PRELOAD=0) cannot see
+other processes' writes and keeps entries for at most
+PROFILE_CACHE_UNSHARED_TTL_SECONDS.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import copy
+import multiprocessing
+import os
+import zlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from database import get_database, Collections
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+PROFILE_CACHE_TTL_SECONDS = float(os.environ.get("PROFILE_CACHE_TTL_SECONDS", "300"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get("PROFILE_CACHE_MAX_ENTRIES", "1000"))
+# TTL cap in a process whose versions are not shared with the other workers
+PROFILE_CACHE_UNSHARED_TTL_SECONDS = float(os.environ.get("PROFILE_CACHE_UNSHARED_TTL_SECONDS", "5"))
+# Shared version slots (users hash into them; a collision only costs an extra reload)
+PROFILE_VERSION_SLOTS = int(os.environ.get("PROFILE_VERSION_SLOTS", "65536"))
+
+
+class UserVersions:
+    """
+    Per-user version counters in shared memory, inherited by forked workers.
+
+    Users hash into a fixed number of slots, so the table never grows and
+    never has to be cleared. Bumps take a process-shared lock so concurrent
+    invalidations in different workers are never lost; reads are single
+    aligned 8-byte loads and take no lock.
+    """
+
+    def __init__(self, slots: int = PROFILE_VERSION_SLOTS):
+        self.slots = slots
+        self._versions = multiprocessing.RawArray("Q", slots)
+        self._lock = multiprocessing.Lock()
+        self._owner_pid = os.getpid()
+
+    def _slot(self, key: str) -> int:
+        # crc32 rather than hash(): the same slot in every process regardless of PYTHONHASHSEED
+        return zlib.crc32(key.encode("utf-8")) % self.slots
+
+    @property
+    def shared(self) -> bool:
+        """True in a process forked after the counters were created."""
+        return os.getpid() != self._owner_pid
+
+    def get(self, key: str) -> int:
+        return self._versions[self._slot(key)]
+
+    def bump(self, key: str) -> None:
+        slot = self._slot(key)
+        with self._lock:
+            self._versions[slot] += 1
+
+
+class ProfileCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Every entry remembers the user's version (UserVersions) it was loaded
+    at and is only served while that version is current, so an
+    invalidation in any process that shares the versions evicts it. The
+    same check guards against a slow load re-inserting data that was
+    invalidated while the load was in flight.
+    """
+
+    def __init__(self, ttl_seconds: float = PROFILE_CACHE_TTL_SECONDS, max_entries: int = PROFILE_CACHE_MAX_ENTRIES,
+                 versions: Optional[UserVersions] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.versions = versions if versions is not None else UserVersions()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, version, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str, loader: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the cached value for key, loading it with loader(key) on a miss.
+
+        Args:
+            key: Cache key (Clerk user ID)
+            loader: Function that builds the value from the database
+
+        Returns:
+            dict: A private copy of the cached value (safe to mutate)
+        """
+        now = time.monotonic()
+        version = self.versions.get(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, value = entry
+                if expires_at > now and entry_version == version:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                if entry_version == version:
+                    self._expirations += 1
+                else:
+                    self._invalidations += 1
+            self._misses += 1
+
+        value = loader(key)
+
+        with self._lock:
+            # Only store if nothing (in any process) invalidated this key while we were loading
+            if self.versions.get(key) == version:
+                self._entries[key] = (time.monotonic() + self._effective_ttl(), version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+
+        return copy.deepcopy(value)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the cached value for key in every process (call after every write for that user)."""
+        self.versions.bump(key)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached value in this process."""
+        with self._lock:
+            self._entries.clear()
+
+    def _effective_ttl(self) -> float:
+        if self.versions.shared:
+            return self.ttl_seconds
+        return min(self.ttl_seconds, PROFILE_CACHE_UNSHARED_TTL_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate, invalidation and eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self._effective_ttl(),
+                'sharedVersions': self.versions.shared,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hitRate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self._invalidations,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+
+def load_user_bundle(clerk_user_id: str) -> Dict[str, Any]:
+    """
+    Assemble the user's full profile straight from MongoDB.
+
+    Args:
+        clerk_user_id: User's Clerk ID
+
+    Returns:
+        dict: {profile, income, expenses, assets, liabilities, goals}
+              (profile is None if the user has no profile document yet)
+    """
+    db = get_database()
+    query = {"clerkUserId": clerk_user_id}
+
+    profile = db[Collections.USER_PROFILES].find_one(query)
+
+    return {
+        'profile': profile,
+        'income': list(db[Collections.INCOME].find(query)),
+        'expenses': list(db[Collections.EXPENSES].find(query)),
+        'assets': list(db[Collections.ASSETS].find(query)),
+        'liabilities': list(db[Collections.LIABILITIES].find(query)),
+        'goals': profile.get('goals', []) if profile else []
+    }
+
+
+# Global cache instance
+profile_cache = ProfileCache()
+
+
+def get_user_bundle(clerk_user_id: str) -> Dict[str, Any]:
+    """Read-through access to the assembled user profile."""
+    return profile_cache.get(clerk_user_id, load_user_bundle)
+
+
+def invalidate_user(clerk_user_id: Optional[str]) -> None:
+    """Invalidate the cached profile for a user after a write."""
+    if clerk_user_id:
+        profile_cache.invalidate(clerk_user_id)
@@ -9,28 +9,45 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from startup import lazy_resource
+from metrics import timed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import LLM providers
-try:
-    from langchain_groq import ChatGroq
-    GROQ_AVAILABLE = True
-except:
-    logger.warning("Groq not available")
-    GROQ_AVAILABLE = False
-
-try:
-    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
-    HF_AVAILABLE = True
-except:
+# LLM provider integrations, imported by the first initialize_llm_with_fallback() call
+ChatGroq = None
+ChatHuggingFace = None
+HuggingFaceEndpoint = None
+GROQ_AVAILABLE = None
+HF_AVAILABLE = None
+
+
+def _import_providers():
+    """Import the Groq and HuggingFace LangChain integrations (first call only)."""
+    global ChatGroq, ChatHuggingFace, HuggingFaceEndpoint, GROQ_AVAILABLE, HF_AVAILABLE
+    if GROQ_AVAILABLE is not None:
+        return
+
+    # Import LLM providers
+    try:
+        from langchain_groq import ChatGroq
+        GROQ_AVAILABLE = True
+    except:
+        logger.warning("Groq not available")
+        GROQ_AVAILABLE = False
+
     try:
-        from langchain_community.chat_models.huggingface import ChatHuggingFace
-        from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+        from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
         HF_AVAILABLE = True
     except:
-        logger.warning("HuggingFace not available")
-        HF_AVAILABLE = False
+        try:
+            from langchain_community.chat_models.huggingface import ChatHuggingFace
+            from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
+            HF_AVAILABLE = True
+        except:
+            logger.warning("HuggingFace not available")
+            HF_AVAILABLE = False
 
 # API Configuration
 GROQ_API_KEYS = [
@@ -53,6 +70,7 @@ ACTIVE_KEY_INDEX = None
 def initialize_llm_with_fallback(temperature=0.7, max_tokens=8192, model_override=None):
     """Initialize LLM with automatic fallback between providers"""
     global ACTIVE_LLM_PROVIDER, ACTIVE_API_KEY, ACTIVE_KEY_INDEX
+    _import_providers()
 
     if GROQ_AVAILABLE:
         for idx, api_key in enumerate(GROQ_API_KEYS, start=1):
@@ -645,7 +663,8 @@ Generate the complete JSON now:"""
                 logger.info(f"🤖 Generating recommendations (attempt {attempt}/{max_attempts})")
                 
                 from langchain_core.messages import HumanMessage
-                response = self.model.invoke([HumanMessage(content=prompt)])
+                with timed("llm", "recommendations"):
+                    response = self.model.invoke([HumanMessage(content=prompt)])
                 raw_text = getattr(response, 'content', '') or str(response)
                 
                 logger.info(f"📝 Received {len(raw_text)} characters")
@@ -673,17 +692,33 @@ Generate the complete JSON now:"""
         return self._get_fallback_recommendations(user_profile, market_data)
 
 
-# Global instance
-try:
-    recommendation_engine = RecommendationEngine()
+# Global instance, created on first use (the provider probe makes a live call)
+@lazy_resource("recommendation_engine", "Recommendation LLM (llama-3.3-70b, provider probe)", fork_safe=False)
+def recommendation_engine_resource():
+    engine = RecommendationEngine()
     logger.info("✅ Global recommendation engine initialized")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize global engine: {e}")
-    recommendation_engine = None
+    return engine
+
+
+def get_recommendation_engine() -> Optional[RecommendationEngine]:
+    """The global engine, or None while no provider can be initialized."""
+    try:
+        return recommendation_engine_resource.get()
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize global engine: {e}")
+        return None
+
+
+def __getattr__(name):
+    # recommendation_engine used to be built at import time
+    if name == "recommendation_engine":
+        return get_recommendation_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_personalized_recommendations(user_profile: Dict, market_data: Dict, portfolio_data: Optional[Dict] = None) -> Dict:
     """Public API to generate recommendations"""
+    recommendation_engine = get_recommendation_engine()
     if recommendation_engine is None:
         logger.error("Engine not initialized, creating fallback")
         temp_engine = RecommendationEngine()
@@ -1,8 +1,11 @@
 import os
 import sys
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from flask_cors import CORS
-from agent.stock_agent import StockAgent
+from mlmodels.analysis_profiles import get_profile, FORECAST_MODES, CHART_OUTPUTS, ANALYSIS_PROFILE_NAMES, DEFAULT_PROFILE
+from agent.analysis_jobs import analysis_jobs, JobQueueFull, DONE, FAILED
+from agent.watchlist import analyze_watchlist, MAX_WATCHLIST_SYMBOLS
+from startup import lazy_resource
 
 # Create a Blueprint for the stock routes
 stock_bp = Blueprint('stock_bp', __name__)
@@ -11,11 +14,30 @@ stock_bp = Blueprint('stock_bp', __name__)
 CORS(stock_bp, resources={r"/api/*": {"origins": "https://finedge-ai.vercel.app"}})
 
 
+# The agent module (compiled LangGraph workflow), the forecasting libraries,
+# the ticker maps and the chart figures are read-only after they are built,
+# so the pre-fork master builds them once for every worker (startup.preload)
+@lazy_resource("stock_agent", "Stock agent: LangGraph workflow, Prophet/hyperopt/sklearn, ticker maps, chart figures")
+def stock_agent_resource():
+    import prophet, hyperopt, sklearn.metrics  # noqa: F401 - otherwise imported by the first fit
+    from mlmodels.chart_renderer import chart_renderer
+    chart_renderer.warm_up()
+
+    from agent import stock_agent
+    stock_agent._known_tickers()
+    return stock_agent
+
+
 @stock_bp.route('/api/analyze', methods=['POST'])
 def analyze_stock():
     """
     API Endpoint to analyze a stock based on user query.
-    Expected JSON input: { "query": "Forecast Reliance for next year" }
+    Expected JSON input: { "query": "Forecast Reliance for next year", "mode": "fast" }
+    mode is optional: "prophet" (default) or "fast" (NumPy models, sub-second).
+    output is optional: "data" (default, downsampled chart series) or "png" (base64 images).
+    profile is optional: "fast", "standard" (default: the settings used before
+    profiles existed) or "deep" - search budget, interval samples, training
+    resolution, horizon and chart set.
     """
     try:
         # 1. Get data from the request
@@ -30,31 +52,56 @@ def analyze_stock():
         user_query = data['query']
         print(f"Received Query: {user_query}")  # Debug log
 
-        # 2. Initialize the Stock Agent
-        agent = StockAgent()
+        mode = data.get('mode', 'prophet')
+        if mode not in FORECAST_MODES:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid 'mode'. Use one of: {', '.join(FORECAST_MODES)}"
+            }), 400
+
+        output = data.get('output', 'data')
+        if output not in CHART_OUTPUTS:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid 'output'. Use one of: {', '.join(CHART_OUTPUTS)}"
+            }), 400
+
+        profile = data.get('profile', DEFAULT_PROFILE)
+        if profile not in ANALYSIS_PROFILE_NAMES:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid 'profile'. Use one of: {', '.join(ANALYSIS_PROFILE_NAMES)}"
+            }), 400
+
+        # 2. Initialize the Stock Agent (imported here: LangChain, LangGraph and the models are slow to import)
+        from agent.stock_agent import StockAgent
+        agent = StockAgent(mode=mode, output=output, profile=profile)
 
         # 3. Run the Agent (Pipeline Mode)
         # This now runs Historical -> Holdout -> Hyperopt in sequence
         response_text = agent.process_user_input(user_query)
 
-        # 4. Retrieve the Dictionary of Images
-        # The updated agent stores images in state["images"]
+        # 4. Retrieve the Dictionary of Images (png output) or chart data (data output)
         images = agent.state.get("images", {})
+        charts = agent.state.get("charts", {})
 
-        if not images:
-            print("Warning: No images were generated by the pipeline.")
+        if not images and not charts:
+            print("Warning: No charts were generated by the pipeline.")
 
         # 5. Return JSON response to Frontend
         # We explicitly map the keys to ensure the frontend receives the expected structure
+        chart_keys = ("price_history", "daily_returns", "holdout_pred", "future_forecast")
         return jsonify({
             "success": True,
             "analysis": response_text,  # The text explanation from Gemini
-            "images": {
-                "price_history": images.get("price_history"),
-                "daily_returns": images.get("daily_returns"),
-                "holdout_pred": images.get("holdout_pred"),
-                "future_forecast": images.get("future_forecast")
-            }
+            "mode": mode,
+            "output": output,
+            "profile": get_profile(profile)._asdict(),
+            "images": {key: images.get(key) for key in chart_keys},
+            "charts": {key: charts.get(key) for key in chart_keys},
+            "render_timings": agent.state.get("render_timings", {}),
+            "stage_timings": agent.state.get("stage_timings", {}),
+            "parse_path": agent.state.get("parse_path")
         })
 
     except Exception as e:
@@ -65,6 +112,135 @@ def analyze_stock():
             "details": str(e)
         }), 500
 
+@stock_bp.route('/api/analyze/batch', methods=['POST'])
+def analyze_watchlist_batch():
+    """
+    Forecast a watchlist in one request.
+    Expected JSON input:
+    { "symbols": ["RELIANCE", "TCS.NS"], "mode": "fast", "start_date": "3 years ago",
+      "end_date": "today", "summary": true }
+    Returns a compact per-ticker table (metrics + forecast at 30/90/365 days)
+    and one LLM summary for the whole list.
+    """
+    data = request.get_json(silent=True) or {}
+    symbols = data.get('symbols')
+    if not isinstance(symbols, list) or not symbols or not all(isinstance(s, str) and s.strip() for s in symbols):
+        return jsonify({"success": False, "error": "'symbols' must be a non-empty list of ticker strings"}), 400
+    if len(symbols) > MAX_WATCHLIST_SYMBOLS:
+        return jsonify({"success": False, "error": f"At most {MAX_WATCHLIST_SYMBOLS} symbols per request"}), 400
+
+    mode = data.get('mode', 'fast')
+    if mode not in FORECAST_MODES:
+        return jsonify({"success": False, "error": f"Invalid 'mode'. Use one of: {', '.join(FORECAST_MODES)}"}), 400
+
+    try:
+        result = analyze_watchlist(
+            symbols,
+            start_date=data.get('start_date', '3 years ago'),
+            end_date=data.get('end_date', 'today'),
+            mode=mode,
+            summarize=bool(data.get('summary', True))
+        )
+        return jsonify({"success": True, "mode": mode, **result})
+
+    except Exception as e:
+        print(f"Error processing watchlist analysis: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "Internal Server Error",
+            "details": str(e)
+        }), 500
+
+
+# ========================================
+# ASYNC ANALYSIS JOBS
+# ========================================
+
+@stock_bp.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queue an analysis and return immediately with a job id.
+    Same JSON input as /api/analyze. Follow progress with
+    GET /api/analyze/jobs/<job_id> (polling) or .../events (SSE).
+    """
+    data = request.get_json(silent=True) or {}
+    if 'query' not in data:
+        return jsonify({"success": False, "error": "Missing 'query' in request body"}), 400
+
+    mode = data.get('mode', 'prophet')
+    output = data.get('output', 'data')
+    profile = data.get('profile', DEFAULT_PROFILE)
+    if mode not in FORECAST_MODES:
+        return jsonify({"success": False, "error": f"Invalid 'mode'. Use one of: {', '.join(FORECAST_MODES)}"}), 400
+    if output not in CHART_OUTPUTS:
+        return jsonify({"success": False, "error": f"Invalid 'output'. Use one of: {', '.join(CHART_OUTPUTS)}"}), 400
+    if profile not in ANALYSIS_PROFILE_NAMES:
+        return jsonify({"success": False, "error": f"Invalid 'profile'. Use one of: {', '.join(ANALYSIS_PROFILE_NAMES)}"}), 400
+
+    try:
+        job = analysis_jobs.submit(data['query'], mode=mode, output=output, profile=profile)
+    except JobQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/analyze/jobs/{job.id}",
+        "events_url": f"/api/analyze/jobs/{job.id}/events"
+    }), 202
+
+
+@stock_bp.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """
+    Job status, events after ?since=<n> (default all) and the results so far.
+    """
+    since = request.args.get('since', 0, type=int)
+    snapshot = analysis_jobs.snapshot(job_id, since)
+    if snapshot is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, **snapshot})
+
+
+@stock_bp.route('/api/analyze/jobs/<job_id>/events', methods=['GET'])
+def stream_analysis_job(job_id):
+    """
+    Server-Sent Events stream of the job's stage events, ending with a
+    "done" event carrying the final status and result.
+    Reconnects resume from the Last-Event-ID header.
+    """
+    if not analysis_jobs.exists(job_id):
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    since = request.headers.get('Last-Event-ID', type=int)
+    since = since + 1 if since is not None else request.args.get('since', 0, type=int)
+    dumps = current_app.json.dumps
+
+    def generate():
+        cursor = since
+        while True:
+            snapshot = analysis_jobs.wait_for_events(job_id, cursor)
+            if snapshot is None:
+                yield f"event: error\ndata: {dumps({'error': 'Job not found'})}\n\n"
+                return
+            for offset, event in enumerate(snapshot["events"]):
+                yield f"id: {cursor + offset}\nevent: {event['stage']}\ndata: {dumps(event)}\n\n"
+            cursor = snapshot["next_event"]
+            if snapshot["status"] in (DONE, FAILED):
+                final = {k: snapshot[k] for k in ("job_id", "status", "error", "result", "elapsed_seconds")}
+                yield f"event: done\ndata: {dumps(final)}\n\n"
+                return
+            if not snapshot["events"]:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 # Simple health check route
 @stock_bp.route('/api/health', methods=['GET'])
 def health_check():
@@ -0,0 +1,529 @@
+"""
+FinEdge Startup & Lazy Resources
+
+Expensive process-wide objects (LLM clients that probe their provider on
+creation, the MongoDB-backed learning manager) are registered here as
+LazyResources instead of being built when their module is imported. Each
+one is created on first use, so importing the app is fast and does not
+fail while a provider or the database is down.
+
+warm_up() builds some or all of them ahead of the first request (app.py
+calls it when FINEDGE_WARMUP is set). Every initialization and every
+startup_step() is timed; startup_report() lists what was initialized, by
+whom (warm-up or first use) and how long it took, plus this process's boot
+time and memory (RSS, PSS, private and shared).
+
+Under the pre-fork server (gunicorn.conf.py, wsgi.py), preload() builds the
+fork-safe resources (read-only state: modules, the LangGraph workflow,
+tools, ticker maps) once in the master so every worker shares them
+copy-on-write. Resources holding sockets (LLM clients, MongoDB-backed
+managers) are registered with fork_safe=False; after_fork() drops any the
+master built, and each worker creates its own on first use.
+
+Heavy libraries (pandas, yfinance, Prophet, hyperopt, scikit-learn,
+matplotlib, seaborn, LangChain, LangGraph) are imported inside the code
+paths that use them. `python startup.py importtime` measures a cold import
+of the web app with `python -X importtime` and fails when it exceeds
+IMPORT_BUDGET_SECONDS or loads any of DEFERRED_IMPORTS.
+`python startup.py workers --compare` boots the pre-fork server with and
+without preload and reports each worker's boot time and memory.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import gc
+import os
+import re
+import sys
+import subprocess
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resources to build at startup: "all", or a comma-separated list of names
+FINEDGE_WARMUP = os.environ.get("FINEDGE_WARMUP", "")
+
+# Fork-safe resources the pre-fork master builds: "all" (default), "", or a comma-separated list
+FINEDGE_PRELOAD = os.environ.get("FINEDGE_PRELOAD", "all")
+
+# After a failed initialization, get() re-raises without retrying for this long
+LAZY_RETRY_SECONDS = float(os.environ.get("LAZY_RETRY_SECONDS", "30"))
+
+# Cold-import budget of the web app (python startup.py importtime)
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "1.5"))
+
+# Packages the web app must not import at startup
+DEFERRED_IMPORTS = (
+    "pandas", "yfinance", "prophet", "hyperopt", "sklearn", "matplotlib", "seaborn",
+    "langchain", "langchain_core", "langchain_community", "langchain_groq",
+    "langchain_huggingface", "langchain_google_genai", "langgraph"
+)
+
+_WORKER_BOOTED_LINE = re.compile(r"Worker (\d+) booted in ([\d.]+)s")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+_resources: Dict[str, "LazyResource"] = {}
+_steps: List[Dict[str, Any]] = []
+_warming_up = threading.local()
+
+# This process: role is "main", "master" (after preload) or "worker" (after after_fork)
+_process: Dict[str, Any] = {'role': 'main', 'pid': os.getpid(), 'parentPid': None,
+                            'startedAt': time.time(), 'bootSeconds': None}
+
+
+class LazyResource:
+    """
+    A process-wide object created by `factory` on the first get().
+
+    A failed initialization is recorded and raised; get() raises the same
+    error until retry_seconds have passed and then tries again (so an
+    unavailable provider is not probed on every request). Thread-safe:
+    concurrent first callers wait for one factory call.
+
+    fork_safe=False marks objects that must not be shared with a forked
+    child (open sockets, client pools); after_fork() resets them.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], description: str = "",
+                 retry_seconds: float = LAZY_RETRY_SECONDS, fork_safe: bool = True):
+        self.name = name
+        self.description = description
+        self.retry_seconds = retry_seconds
+        self.fork_safe = fork_safe
+        self._factory = factory
+        self._value = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        self._attempts = 0
+        self._seconds: Optional[float] = None
+        self._error: Optional[str] = None
+        self._failure: Optional[Exception] = None
+        self._failed_at: Optional[float] = None
+        self._initialized_at: Optional[datetime] = None
+        self._trigger: Optional[str] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> Any:
+        if self._initialized:
+            return self._value
+
+        with self._lock:
+            if not self._initialized:
+                if self._failure is not None and time.monotonic() - self._failed_at < self.retry_seconds:
+                    raise self._failure
+                trigger = "warm-up" if getattr(_warming_up, "active", False) else "first use"
+                start = time.perf_counter()
+                self._attempts += 1
+                try:
+                    value = self._factory()
+                except Exception as e:
+                    self._seconds = time.perf_counter() - start
+                    self._error = str(e)
+                    self._failure, self._failed_at = e, time.monotonic()
+                    logger.warning(f"Initializing {self.name} failed after {self._seconds:.2f}s: {e}")
+                    raise
+
+                self._value = value
+                self._initialized = True
+                self._seconds = time.perf_counter() - start
+                self._error = None
+                self._failure = None
+                self._initialized_at = datetime.utcnow()
+                self._trigger = trigger
+                self._pid = os.getpid()
+                logger.info(f"Initialized {self.name} in {self._seconds:.2f}s ({trigger})")
+        return self._value
+
+    def reset(self) -> None:
+        """Drop the instance so the next get() builds a new one."""
+        with self._lock:
+            self._value = None
+            self._initialized = False
+            self._failure = None
+
+    def proxy(self) -> "LazyProxy":
+        """Object forwarding attribute access to get(), for module globals that used to be the instance."""
+        return LazyProxy(self)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'description': self.description,
+            'initialized': self._initialized,
+            'forkSafe': self.fork_safe,
+            # Built by the pre-fork master and shared copy-on-write
+            'inherited': self._initialized and self._pid != os.getpid(),
+            'trigger': self._trigger,
+            'seconds': round(self._seconds, 3) if self._seconds is not None else None,
+            'attempts': self._attempts,
+            'error': self._error,
+            'initializedAt': self._initialized_at.isoformat() if self._initialized_at else None
+        }
+
+
+class LazyProxy:
+    """Stand-in for a LazyResource's object: the first attribute access initializes it."""
+
+    __slots__ = ("_resource",)
+
+    def __init__(self, resource: LazyResource):
+        object.__setattr__(self, "_resource", resource)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resource.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resource.get(), name, value)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self._resource.initialized else "not initialized"
+        return f"<lazy {self._resource.name} ({state})>"
+
+
+def lazy_resource(name: str, description: str = "", retry_seconds: float = LAZY_RETRY_SECONDS,
+                  fork_safe: bool = True) -> Callable[[Callable[[], Any]], LazyResource]:
+    """
+    Decorator registering a factory function as a LazyResource.
+
+    Example:
+        @lazy_resource("chat_llm", "Chat model (provider probe)")
+        def chat_llm_resource():
+            return initialize_llm_with_fallback(...)
+
+        llm = chat_llm_resource.get()
+    """
+    def decorator(factory: Callable[[], Any]) -> LazyResource:
+        # A re-imported module replaces its earlier registration
+        resource = LazyResource(name, factory, description, retry_seconds, fork_safe)
+        _resources[name] = resource
+        return resource
+    return decorator
+
+
+@contextmanager
+def startup_step(name: str):
+    """Time one startup step (an import, a blueprint registration, ...) for the report."""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _steps.append({'name': name, 'seconds': round(time.perf_counter() - start, 3), 'error': error})
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Initialize registered resources now instead of on first use. Failures
+    are logged and reported, not raised (the resource retries on first use).
+
+    Args:
+        names: Resource names to build (None = all registered)
+
+    Returns:
+        dict: startup_report() after the warm-up
+    """
+    selected = list(_resources) if names is None else list(names)
+    unknown = [name for name in selected if name not in _resources]
+    if unknown:
+        logger.warning(f"Unknown warm-up resources ignored: {', '.join(unknown)}")
+
+    _warming_up.active = True
+    try:
+        for name in selected:
+            resource = _resources.get(name)
+            if resource is None:
+                continue
+            with startup_step(f"warm-up: {name}"):
+                try:
+                    resource.get()
+                except Exception:
+                    pass
+    finally:
+        _warming_up.active = False
+    return startup_report()
+
+
+def _resource_names(setting: str) -> Optional[List[str]]:
+    """Parse a FINEDGE_WARMUP-style setting: [] = none, None = all, else the listed names."""
+    setting = setting.strip()
+    if not setting or setting.lower() in ("0", "false", "no"):
+        return []
+    if setting.lower() in ("1", "true", "yes", "all"):
+        return None
+    return [name.strip() for name in setting.split(",") if name.strip()]
+
+
+def warm_up_from_env(setting: str = FINEDGE_WARMUP) -> Optional[Dict[str, Any]]:
+    """warm_up() as configured by FINEDGE_WARMUP ("" = no warm-up, "all", or "name1,name2")."""
+    names = _resource_names(setting)
+    if names == []:
+        return None
+    return warm_up(names)
+
+
+def preload(setting: str = FINEDGE_PRELOAD) -> Dict[str, Any]:
+    """
+    Build shared read-only state in the pre-fork master (wsgi.py).
+
+    Warms the fork-safe resources selected by `setting` (FINEDGE_PRELOAD
+    syntax; non-fork-safe names are skipped), then gc.freeze()s everything
+    allocated so far: frozen objects are never scanned by the collector, so
+    workers do not copy the pages they live on.
+
+    Returns:
+        dict: startup_report() after the preload
+    """
+    names = _resource_names(setting)
+    selected = list(_resources) if names is None else names
+    skipped = [name for name in selected if name in _resources and not _resources[name].fork_safe]
+    if skipped and names is not None:
+        logger.warning(f"Not preloading resources that are not fork-safe: {', '.join(skipped)}")
+
+    with startup_step("preload"):
+        warm_up([name for name in selected if name not in skipped])
+    gc.freeze()
+    # Without preload_app each worker runs this itself and stays a "worker"
+    if _process['role'] == 'main':
+        _process['role'] = 'master'
+        _process['bootSeconds'] = round(time.time() - _process['startedAt'], 3)
+    return startup_report()
+
+
+def after_fork() -> None:
+    """
+    Call in a freshly forked worker (gunicorn post_fork): resets the
+    non-fork-safe resources the master built so the worker creates its own.
+    """
+    _process.update({'role': 'worker', 'parentPid': _process['pid'], 'pid': os.getpid(),
+                     'startedAt': time.time(), 'bootSeconds': None})
+    for resource in _resources.values():
+        if not resource.fork_safe and resource.initialized:
+            resource.reset()
+            logger.info(f"Reset {resource.name} after fork (not fork-safe)")
+
+
+def record_boot(seconds: float) -> None:
+    """Record how long this worker took from fork (or start) to serving."""
+    _process['bootSeconds'] = round(seconds, 3)
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Memory of a process in MB from /proc (Linux only; {} elsewhere): rss,
+    pss (shared pages split between their users), uss (private pages) and
+    shared (pages also mapped by another process, e.g. inherited from the master).
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return {}
+    mb = lambda kb: round(kb / 1024, 1)
+    return {
+        'rssMB': mb(fields.get("Rss", 0)),
+        'pssMB': mb(fields.get("Pss", 0)),
+        'ussMB': mb(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)),
+        'sharedMB': mb(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0))
+    }
+
+
+def startup_report() -> Dict[str, Any]:
+    """Timed startup steps and the state of every lazy resource."""
+    resources = [resource.report() for resource in _resources.values()]
+    return {
+        'process': {**_process, 'memory': process_memory()},
+        'steps': list(_steps),
+        'resources': resources,
+        'stepSeconds': round(sum(step['seconds'] for step in _steps), 3),
+        'initializedSeconds': round(sum(r['seconds'] or 0 for r in resources if r['initialized']), 3)
+    }
+
+
+def log_startup_report(report: Optional[Dict[str, Any]] = None) -> None:
+    report = report or startup_report()
+    process, memory = report['process'], report['process']['memory']
+    logger.info(f"  process {process['role']} pid {process['pid']}: boot {process['bootSeconds']}s, "
+                + ", ".join(f"{key[:-2]} {value} MB" for key, value in memory.items()))
+    for step in report['steps']:
+        logger.info(f"  step {step['name']:<36} {step['seconds']:>7.3f}s" + (f"  ERROR {step['error']}" if step['error'] else ""))
+    for resource in report['resources']:
+        state = f"{resource['seconds']:.3f}s ({resource['trigger']})" if resource['initialized'] else "lazy"
+        if resource['inherited']:
+            state += " inherited"
+        if resource['error']:
+            state += f"  last error: {resource['error']}"
+        logger.info(f"  resource {resource['name']:<32} {state}")
+
+
+def measure_import_time(module: str = "app", runs: int = 3) -> Dict[str, Any]:
+    """
+    Cold-import `module` in fresh interpreters under `python -X importtime`.
+
+    Args:
+        module: Module to import (run from this directory)
+        runs: Interpreters to start; the fastest run is reported
+
+    Returns:
+        dict: {seconds, heaviest: [(direct import, seconds)], deferredLoaded: [package]}
+    """
+    # Modules without a spec are sys.modules stand-ins (app.py's pydantic_v1 shim), not imports
+    code = (f"import sys, {module}; "
+            f"print(' '.join(n for n, m in sys.modules.items() if getattr(m, '__spec__', None)))")
+    # No warm-up: it would be timed as part of the import
+    env = {**os.environ, "FINEDGE_WARMUP": ""}
+    best = None
+    for _ in range(max(1, runs)):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+        # importtime lists children before their parent; depth is the name's indentation
+        children, seconds = [], None
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            cumulative, depth, name = int(match.group(2)) / 1e6, len(match.group(3)) // 2, match.group(4)
+            if depth == 0:
+                if name == module:
+                    seconds = cumulative
+                    break
+                children = []
+            elif depth == 1:
+                children.append((name, cumulative))
+        if seconds is None:
+            raise RuntimeError(f"import {module} not found in the importtime output")
+
+        if best is None or seconds < best["seconds"]:
+            loaded = {name.split(".")[0] for name in result.stdout.split()}
+            best = {
+                "seconds": round(seconds, 3),
+                "heaviest": sorted(children, key=lambda child: -child[1])[:10],
+                "deferredLoaded": sorted(loaded.intersection(DEFERRED_IMPORTS))
+            }
+    return best
+
+
+def check_import_budget(budget: float = IMPORT_BUDGET_SECONDS, module: str = "app", runs: int = 3) -> bool:
+    """Print the cold-import report; True if it is within budget and no deferred package was loaded."""
+    report = measure_import_time(module, runs)
+    print(f"import {module}: {report['seconds']:.3f}s (budget {budget:.3f}s, best of {runs})")
+    for name, seconds in report["heaviest"]:
+        print(f"  {name:<40} {seconds:>7.3f}s")
+
+    ok = report["seconds"] <= budget
+    if not ok:
+        print(f"FAIL: cold import exceeds the budget by {report['seconds'] - budget:.3f}s")
+    if report["deferredLoaded"]:
+        ok = False
+        print(f"FAIL: imported at startup (import them where they are used): {', '.join(report['deferredLoaded'])}")
+    return ok
+
+
+def measure_workers(workers: int = 2, preload_app: bool = True, timeout: float = 180) -> Dict[str, Any]:
+    """
+    Boot the pre-fork server (gunicorn.conf.py) on a free local port, wait
+    until every worker has booted, read the master's and each worker's
+    memory and stop it.
+
+    Returns:
+        dict: {preload, readySeconds, master: memory, workers: [{pid, bootSeconds, **memory}]}
+    """
+    import queue
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "GUNICORN_BIND": f"127.0.0.1:{port}", "WEB_CONCURRENCY": str(workers),
+           "GUNICORN_PRELOAD": "1" if preload_app else "0", "GUNICORN_MAX_REQUESTS": "0"}
+
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    lines: "queue.Queue[str]" = queue.Queue()
+    threading.Thread(target=lambda: [lines.put(line) for line in server.stderr], daemon=True).start()
+
+    booted: Dict[int, float] = {}
+    try:
+        while len(booted) < workers:
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0 or server.poll() is not None:
+                raise RuntimeError(f"{len(booted)}/{workers} workers booted (server exit code {server.poll()})")
+            try:
+                match = _WORKER_BOOTED_LINE.search(lines.get(timeout=min(remaining, 1)))
+            except queue.Empty:
+                continue
+            if match:
+                booted[int(match.group(1))] = float(match.group(2))
+        ready = time.perf_counter() - start
+        time.sleep(1)  # let the workers settle
+        return {
+            'preload': preload_app,
+            'readySeconds': round(ready, 3),
+            'master': process_memory(server.pid),
+            'workers': [{'pid': pid, 'bootSeconds': seconds, **process_memory(pid)} for pid, seconds in booted.items()]
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def print_worker_report(report: Dict[str, Any]) -> None:
+    workers = report['workers']
+    total = lambda key: round(sum(w.get(key, 0) for w in workers), 1)
+    print(f"preload {'on' if report['preload'] else 'off'}: all {len(workers)} workers ready after "
+          f"{report['readySeconds']:.2f}s; master {report['master']}")
+    print(f"  {'pid':>8} {'boot s':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'shared MB':>10}")
+    for w in workers:
+        print(f"  {w['pid']:>8} {w['bootSeconds']:>8.3f} {w.get('rssMB', 0):>8} {w.get('pssMB', 0):>8} "
+              f"{w.get('ussMB', 0):>8} {w.get('sharedMB', 0):>10}")
+    print(f"  {'total':>8} {'':>8} {total('rssMB'):>8} {total('pssMB'):>8} {total('ussMB'):>8} {total('sharedMB'):>10}")
+
+
+if __name__ == "__main__":
+    # Usage:
+    #   python startup.py importtime [--budget SECONDS] [--module app] [--runs 3]
+    #   python startup.py workers [--workers 2] [--no-preload | --compare]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FinEdge startup checks")
+    parser.add_argument("command", choices=["importtime", "workers"])
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_SECONDS,
+                        help="maximum cold-import time in seconds")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--no-preload", action="store_true", help="boot every worker on its own")
+    parser.add_argument("--compare", action="store_true", help="measure without and then with preload")
+    args = parser.parse_args()
+
+    if args.command == "importtime":
+        sys.exit(0 if check_import_budget(args.budget, args.module, args.runs) else 1)
+
+    for preload_app in ([False, True] if args.compare else [not args.no_preload]):
+        print_worker_report(measure_workers(args.workers, preload_app))
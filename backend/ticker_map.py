@@ -0,0 +1,220 @@
+"""
+FinEdge Ticker Maps
+
+Company name -> ticker tables shared by the advisor (resolve_ticker), the
+finance tools (get_ticker_from_company) and the stock agent's local query
+parser. Plain data, so the agent can use them without importing the
+advisor or the tools and their dependencies.
+
+COMMON_WORD_NAMES lists the names that are also everyday English words
+("hero", "persistent"); the local parser does not trust them on their own.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+# Comprehensive company name -> ticker mapping for Indian market (ai_financial_advisor.resolve_ticker)
+TICKER_OVERRIDE = {
+    # Major Indices
+    "nifty": "^NSEI",
+    "nifty 50": "^NSEI",
+    "sensex": "^BSESN",
+    "bse sensex": "^BSESN",
+    "bank nifty": "^NSEBANK",
+    "nifty bank": "^NSEBANK",
+    "nifty it": "^CNXIT",
+    "nifty pharma": "^CNXPHARMA",
+    "nifty auto": "^CNXAUTO",
+    
+    # Top 10 by Market Cap
+    "reliance": "RELIANCE.NS",
+    "reliance industries": "RELIANCE.NS",
+    "tcs": "TCS.NS",
+    "tata consultancy services": "TCS.NS",
+    "hdfc bank": "HDFCBANK.NS",
+    "hdfcbank": "HDFCBANK.NS",
+    "icici bank": "ICICIBANK.NS",
+    "icicibank": "ICICIBANK.NS",
+    "infosys": "INFY.NS",
+    "infy": "INFY.NS",
+    "bharti airtel": "BHARTIARTL.NS",
+    "airtel": "BHARTIARTL.NS",
+    "itc": "ITC.NS",
+    "sbi": "SBIN.NS",
+    "state bank": "SBIN.NS",
+    "state bank of india": "SBIN.NS",
+    "hindustan unilever": "HINDUNILVR.NS",
+    "hul": "HINDUNILVR.NS",
+    "larsen": "LT.NS",
+    "l&t": "LT.NS",
+    "larsen and toubro": "LT.NS",
+    
+    # Adani Group
+    "adani green": "ADANIGREEN.NS",
+    "adani green energy": "ADANIGREEN.NS",
+    "adani enterprises": "ADANIENT.NS",
+    "adani ports": "ADANIPORTS.NS",
+    "adani power": "ADANIPOWER.NS",
+    "adani transmission": "ADANITRANS.NS",
+    "adani total gas": "ATGL.NS",
+    
+    # Tata Group
+    "tata steel": "TATASTEEL.NS",
+    "tata motors": "TATAMOTORS.NS",
+    "tata power": "TATAPOWER.NS",
+    "tcs": "TCS.NS",
+    "titan": "TITAN.NS",
+    "titan company": "TITAN.NS",
+    "tata consumer": "TATACONSUM.NS",
+    
+    # IT Sector
+    "wipro": "WIPRO.NS",
+    "hcl tech": "HCLTECH.NS",
+    "hcl technologies": "HCLTECH.NS",
+    "tech mahindra": "TECHM.NS",
+    "ltimindtree": "LTIM.NS",
+    "persistent": "PERSISTENT.NS",
+    "coforge": "COFORGE.NS",
+    
+    # Banking & Finance
+    "axis bank": "AXISBANK.NS",
+    "kotak bank": "KOTAKBANK.NS",
+    "kotak mahindra": "KOTAKBANK.NS",
+    "indusind bank": "INDUSINDBK.NS",
+    "yes bank": "YESBANK.NS",
+    "idfc first bank": "IDFCFIRSTB.NS",
+    "bandhan bank": "BANDHANBNK.NS",
+    "bajaj finance": "BAJFINANCE.NS",
+    "bajaj finserv": "BAJAJFINSV.NS",
+    "sbi life": "SBILIFE.NS",
+    "hdfc life": "HDFCLIFE.NS",
+    "icici lombard": "ICICIGI.NS",
+    "icici prudential": "ICICIPRULI.NS",
+    
+    # Automobile
+    "maruti": "MARUTI.NS",
+    "maruti suzuki": "MARUTI.NS",
+    "mahindra": "M&M.NS",
+    "m&m": "M&M.NS",
+    "mahindra and mahindra": "M&M.NS",
+    "bajaj auto": "BAJAJ-AUTO.NS",
+    "hero motocorp": "HEROMOTOCO.NS",
+    "hero": "HEROMOTOCO.NS",
+    "tata motors": "TATAMOTORS.NS",
+    "eicher motors": "EICHERMOT.NS",
+    "tvs motor": "TVSMOTOR.NS",
+    
+    # Pharma
+    "sun pharma": "SUNPHARMA.NS",
+    "sun pharmaceutical": "SUNPHARMA.NS",
+    "dr reddy": "DRREDDY.NS",
+    "dr reddys": "DRREDDY.NS",
+    "cipla": "CIPLA.NS",
+    "divi's lab": "DIVISLAB.NS",
+    "divis laboratories": "DIVISLAB.NS",
+    "biocon": "BIOCON.NS",
+    "lupin": "LUPIN.NS",
+    "aurobindo pharma": "AUROPHARMA.NS",
+    "torrent pharma": "TORNTPHARM.NS",
+    
+    # FMCG & Consumer
+    "britannia": "BRITANNIA.NS",
+    "nestle": "NESTLEIND.NS",
+    "nestle india": "NESTLEIND.NS",
+    "dabur": "DABUR.NS",
+    "godrej consumer": "GODREJCP.NS",
+    "marico": "MARICO.NS",
+    "colgate": "COLPAL.NS",
+    "colgate palmolive": "COLPAL.NS",
+    
+    # Metals & Mining
+    "hindalco": "HINDALCO.NS",
+    "vedanta": "VEDL.NS",
+    "jindal steel": "JINDALSTEL.NS",
+    "jsw steel": "JSWSTEEL.NS",
+    "coal india": "COALINDIA.NS",
+    "nmdc": "NMDC.NS",
+    
+    # Energy & Power
+    "ntpc": "NTPC.NS",
+    "power grid": "POWERGRID.NS",
+    "ongc": "ONGC.NS",
+    "oil and natural gas": "ONGC.NS",
+    "ioc": "IOC.NS",
+    "indian oil": "IOC.NS",
+    "bpcl": "BPCL.NS",
+    "bharat petroleum": "BPCL.NS",
+    "gail": "GAIL.NS",
+    
+    # Telecom & Tech
+    "bharti airtel": "BHARTIARTL.NS",
+    "vodafone idea": "IDEA.NS",
+    "vi": "IDEA.NS",
+    
+    # Retail & E-commerce
+    "dmart": "DMART.NS",
+    "avenue supermarts": "DMART.NS",
+    "trent": "TRENT.NS",
+    
+    # Cement
+    "ultratech cement": "ULTRACEMCO.NS",
+    "ultratech": "ULTRACEMCO.NS",
+    "ambuja cement": "AMBUJACEM.NS",
+    "acc cement": "ACC.NS",
+    "shree cement": "SHREECEM.NS",
+    
+    # Paints
+    "asian paints": "ASIANPAINT.NS",
+    "berger paints": "BERGEPAINT.NS",
+    
+    # Real Estate
+    "dlf": "DLF.NS",
+    "godrej properties": "GODREJPROP.NS",
+    "oberoi realty": "OBEROIRLTY.NS",
+    
+    # Others
+    "pidilite": "PIDILITIND.NS",
+    "pidilite industries": "PIDILITIND.NS",
+    "siemens": "SIEMENS.NS",
+    "bosch": "BOSCHLTD.NS",
+    "havells": "HAVELLS.NS",
+    "voltas": "VOLTAS.NS",
+}
+
+
+# Extended mapping for Indian stocks
+INDIAN_STOCK_MAP = {
+    "adani green energy": "ADANIGREEN.NS",
+    "adani green": "ADANIGREEN.NS",
+    "adanigreen": "ADANIGREEN.NS",
+    "reliance": "RELIANCE.NS",
+    "reliance industries": "RELIANCE.NS",
+    "tcs": "TCS.NS",
+    "hdfc bank": "HDFCBANK.NS",
+    "hdfcbank": "HDFCBANK.NS",
+    "infosys": "INFY.NS",
+    "infy": "INFY.NS",
+    "wipro": "WIPRO.NS",
+    "icici bank": "ICICIBANK.NS",
+    "bharti airtel": "BHARTIARTL.NS",
+    "airtel": "BHARTIARTL.NS",
+    "sbi": "SBIN.NS",
+    "state bank": "SBIN.NS",
+    "itc": "ITC.NS",
+    "larsen": "LT.NS",
+    "l&t": "LT.NS",
+    "asian paints": "ASIANPAINT.NS",
+    "maruti": "MARUTI.NS",
+    "bajaj finance": "BAJFINANCE.NS",
+    "titan": "TITAN.NS",
+    "sensex": "^BSESN",
+    "nifty": "^NSEI",
+    "nifty 50": "^NSEI",
+    "bank nifty": "^NSEBANK"
+}
+
+
+# Names above (and bare NSE symbols) that are ordinary words in a sentence
+COMMON_WORD_NAMES = frozenset({
+    "hero", "persistent", "titan", "idea", "vi", "nestle", "lupin", "power grid", "indian oil",
+})
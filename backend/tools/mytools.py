@@ -10,6 +10,8 @@ from dotenv import load_dotenv
 import os
 import logging
 
+from metrics import timed
+
 logger = logging.getLogger(__name__)
 load_dotenv()
 
@@ -67,42 +69,14 @@ import requests
 import json
 from pathlib import Path
 
+# Extended mapping for Indian stocks (ticker_map.py)
+from ticker_map import INDIAN_STOCK_MAP
+
 def get_ticker_from_company(company_name: str) -> str:
     """
     Get the stock ticker symbol for a given company name.
     Enhanced with Indian market support.
     """
-    # Extended mapping for Indian stocks
-    INDIAN_STOCK_MAP = {
-        "adani green energy": "ADANIGREEN.NS",
-        "adani green": "ADANIGREEN.NS",
-        "adanigreen": "ADANIGREEN.NS",
-        "reliance": "RELIANCE.NS",
-        "reliance industries": "RELIANCE.NS",
-        "tcs": "TCS.NS",
-        "hdfc bank": "HDFCBANK.NS",
-        "hdfcbank": "HDFCBANK.NS",
-        "infosys": "INFY.NS",
-        "infy": "INFY.NS",
-        "wipro": "WIPRO.NS",
-        "icici bank": "ICICIBANK.NS",
-        "bharti airtel": "BHARTIARTL.NS",
-        "airtel": "BHARTIARTL.NS",
-        "sbi": "SBIN.NS",
-        "state bank": "SBIN.NS",
-        "itc": "ITC.NS",
-        "larsen": "LT.NS",
-        "l&t": "LT.NS",
-        "asian paints": "ASIANPAINT.NS",
-        "maruti": "MARUTI.NS",
-        "bajaj finance": "BAJFINANCE.NS",
-        "titan": "TITAN.NS",
-        "sensex": "^BSESN",
-        "nifty": "^NSEI",
-        "nifty 50": "^NSEI",
-        "bank nifty": "^NSEBANK"
-    }
-    
     # Check Indian stock map first
     normalized = company_name.strip().lower()
     if normalized in INDIAN_STOCK_MAP:
@@ -148,7 +122,8 @@ def get_historical_price(inputs: str) -> str:
         end_date = dt.datetime.strptime(start_date, "%Y-%m-%d") + dt.timedelta(days=int(duration))
         ticker = get_ticker_from_company(company_name)
         stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date.strftime("%Y-%m-%d"))
+        with timed("market_data", "history"):
+            data = stock.history(start=start_date, end=end_date.strftime("%Y-%m-%d"))
         
         if data.empty:
             return f"No historical data available for {company_name} ({ticker})"
@@ -186,27 +161,28 @@ def get_current_price(company_name: str) -> str:
         # Fetch using yfinance
         stock = yf.Ticker(symbol)
         
-        # Try multiple price sources
-        info = {}
-        try:
-            info = stock.info or {}
-        except Exception as e:
-            logger.warning(f"stock.info failed: {e}")
+        with timed("market_data", "quote"):
+            # Try multiple price sources
             info = {}
+            try:
+                info = stock.info or {}
+            except Exception as e:
+                logger.warning(f"stock.info failed: {e}")
+                info = {}
         
-        # Try to get current price
-        price = info.get("regularMarketPrice") or info.get("currentPrice")
+            # Try to get current price
+            price = info.get("regularMarketPrice") or info.get("currentPrice")
         
-        # Fallback 1: Use recent history
-        if price is None:
-            hist = stock.history(period="1d", interval="1m")
-            if hist is not None and not hist.empty:
-                price = float(hist["Close"].iloc[-1])
-            else:
-                # Fallback 2: Use 5-day history (last close)
-                hist = stock.history(period="5d")
+            # Fallback 1: Use recent history
+            if price is None:
+                hist = stock.history(period="1d", interval="1m")
                 if hist is not None and not hist.empty:
                     price = float(hist["Close"].iloc[-1])
+                else:
+                    # Fallback 2: Use 5-day history (last close)
+                    hist = stock.history(period="5d")
+                    if hist is not None and not hist.empty:
+                        price = float(hist["Close"].iloc[-1])
         
         # Fallback 3: Use previousClose
         if price is None:
@@ -276,7 +252,8 @@ def get_company_info(company_name: str) -> str:
     try:
         ticker = get_ticker_from_company(company_name)
         stock = yf.Ticker(ticker)
-        info = stock.info
+        with timed("market_data", "info"):
+            info = stock.info
         
         # Filter relevant info
         relevant_keys = ['longName', 'sector', 'industry', 'marketCap', 'currency', 
@@ -306,7 +283,8 @@ def evaluate_returns(inputs: str) -> str:
         
         ticker = get_ticker_from_company(company_name)
         stock = yf.Ticker(ticker)
-        data = stock.history(period=duration)
+        with timed("market_data", "history"):
+            data = stock.history(period=duration)
         
         if data.empty:
             return f"No data available for {company_name} for period {duration}"
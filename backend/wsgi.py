@@ -0,0 +1,41 @@
+"""
+FinEdge WSGI Entry Point
+
+Production entry point for the pre-fork server:
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+gunicorn.conf.py loads this module once in the master (preload_app). It
+imports the app, runs the MongoDB connection check and index migration
+once, and preloads the fork-safe resources (startup.preload: the stock
+agent's LangGraph workflow and forecasting libraries, the advisor tools,
+the ticker maps, the LangChain modules, the shared-memory market
+snapshot). The workers forked afterwards share all of it copy-on-write;
+the master's MongoDB client is closed before the first fork so no worker
+inherits its sockets.
+
+Author: FinEdge Team
+Version: 1.0.0
+"""
+
+import logging
+
+from startup import startup_step, preload, log_startup_report
+from app import app, init_app
+from database import close_database_connection
+
+logger = logging.getLogger(__name__)
+
+# Connection check and index migration once, instead of in every worker
+with startup_step("init app"):
+    init_app()
+
+preload()
+
+# Workers connect on their own (database.get_database is per process)
+close_database_connection()
+
+logger.info("Preloaded state:")
+log_startup_report()
+
+application = app
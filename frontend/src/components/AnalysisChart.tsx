@@ -0,0 +1,140 @@
+import React from 'react';
+import {
+  ResponsiveContainer,
+  ComposedChart,
+  LineChart,
+  BarChart,
+  Line,
+  Area,
+  Bar,
+  XAxis,
+  YAxis,
+  CartesianGrid,
+  Tooltip,
+  Legend,
+} from 'recharts';
+
+// --- Chart payloads returned by /api/analyze when output = "data" ---
+export interface LineSeriesData {
+  type: 'line';
+  x: string[];
+  y: number[];
+  points: number;
+}
+
+export interface ForecastSeriesData {
+  type: 'forecast';
+  x: string[];
+  yhat: number[];
+  lower: number[];
+  upper: number[];
+  actual?: number[];
+  history?: LineSeriesData;
+  points: number;
+}
+
+export interface HistogramData {
+  type: 'histogram';
+  edges: number[];
+  counts: number[];
+  mean: number | null;
+  std: number | null;
+}
+
+export type AnalysisChartData = LineSeriesData | ForecastSeriesData | HistogramData;
+
+const axisProps = { tick: { fontSize: 11 }, stroke: '#6B7280' };
+const tooltipStyle = {
+  backgroundColor: 'rgba(255, 255, 255, 0.95)',
+  borderRadius: '8px',
+  border: '1px solid #E5E7EB',
+  padding: '8px 12px',
+};
+
+const formatPrice = (value: number) => value.toFixed(2);
+
+const ForecastChart = ({ data }: { data: ForecastSeriesData }) => {
+  // Merge history (if any) and forecast points on the date axis
+  const rows = new Map<string, Record<string, any>>();
+  data.history?.x.forEach((date, i) => rows.set(date, { date, history: data.history!.y[i] }));
+  data.x.forEach((date, i) => {
+    const row = rows.get(date) || { date };
+    row.yhat = data.yhat[i];
+    row.band = [data.lower[i], data.upper[i]];
+    if (data.actual) row.actual = data.actual[i];
+    rows.set(date, row);
+  });
+  const chartData = Array.from(rows.values()).sort((a, b) => a.date.localeCompare(b.date));
+  const hasActual = Boolean(data.actual || data.history);
+
+  return (
+    <ComposedChart data={chartData} margin={{ top: 5, right: 20, left: 0, bottom: 5 }}>
+      <CartesianGrid strokeDasharray="3 3" stroke="#E5E7EB" opacity={0.5} />
+      <XAxis dataKey="date" minTickGap={40} {...axisProps} />
+      <YAxis domain={['auto', 'auto']} tickFormatter={formatPrice} {...axisProps} />
+      <Tooltip contentStyle={tooltipStyle} />
+      <Legend verticalAlign="bottom" height={28} iconType="circle" />
+      <Area dataKey="band" name="Confidence Interval" stroke="none" fill="#9CA3AF" fillOpacity={0.25} isAnimationActive={false} />
+      {hasActual && (
+        <Line
+          dataKey={data.actual ? 'actual' : 'history'}
+          name={data.actual ? 'Actual' : 'Historical'}
+          stroke="#2563EB"
+          dot={false}
+          strokeWidth={2}
+          isAnimationActive={false}
+        />
+      )}
+      <Line
+        dataKey="yhat"
+        name={data.actual ? 'Predicted' : 'Forecast'}
+        stroke="#DC2626"
+        strokeDasharray="5 5"
+        dot={false}
+        strokeWidth={2}
+        isAnimationActive={false}
+      />
+    </ComposedChart>
+  );
+};
+
+const AnalysisChart = ({ data, color = '#2563EB' }: { data: AnalysisChartData; color?: string }) => {
+  let chart: React.ReactElement;
+
+  if (data.type === 'line') {
+    const chartData = data.x.map((date, i) => ({ date, close: data.y[i] }));
+    chart = (
+      <LineChart data={chartData} margin={{ top: 5, right: 20, left: 0, bottom: 5 }}>
+        <CartesianGrid strokeDasharray="3 3" stroke="#E5E7EB" opacity={0.5} />
+        <XAxis dataKey="date" minTickGap={40} {...axisProps} />
+        <YAxis domain={['auto', 'auto']} tickFormatter={formatPrice} {...axisProps} />
+        <Tooltip contentStyle={tooltipStyle} />
+        <Line dataKey="close" name="Close" stroke={color} dot={false} strokeWidth={2} isAnimationActive={false} />
+      </LineChart>
+    );
+  } else if (data.type === 'histogram') {
+    const chartData = data.counts.map((count, i) => ({
+      bin: ((data.edges[i] + data.edges[i + 1]) / 2).toFixed(3),
+      count,
+    }));
+    chart = (
+      <BarChart data={chartData} margin={{ top: 5, right: 20, left: 0, bottom: 5 }}>
+        <CartesianGrid strokeDasharray="3 3" stroke="#E5E7EB" opacity={0.5} />
+        <XAxis dataKey="bin" minTickGap={30} {...axisProps} />
+        <YAxis {...axisProps} />
+        <Tooltip contentStyle={tooltipStyle} />
+        <Bar dataKey="count" name="Frequency" fill={color} isAnimationActive={false} />
+      </BarChart>
+    );
+  } else {
+    chart = <ForecastChart data={data} />;
+  }
+
+  return (
+    <ResponsiveContainer width="100%" height={300}>
+      {chart}
+    </ResponsiveContainer>
+  );
+};
+
+export default AnalysisChart;
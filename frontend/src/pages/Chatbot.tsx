@@ -7,11 +7,12 @@
  * - Session management
  * - Typing animations
  * - Auto-save with debouncing
+ * - Older history paged in on scroll-up / "Load older messages"
  * 
  * @version 2.0.0 - MongoDB Integration
  */
 
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useLayoutEffect, useRef } from 'react';
 import axios from 'axios';
 import { useUser } from '@clerk/clerk-react'; // ✅ NEW - Import Clerk hook
 import { SERVER_URL } from '../utils/utils';
@@ -28,8 +29,8 @@ import {
 
 // ✅ NEW - Import MongoDB chat functions
 import { 
-  fetchAIChatHistory, 
-  saveAIChatHistory, 
+  fetchAIChatHistoryPage, 
+  appendAIChatMessages, 
   clearAIChatHistory 
 } from '../utils/chatApi';
 
@@ -106,7 +107,10 @@ const clearChatSession = () => {
  */
 const Chatbot = () => {
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const messagesContainerRef = useRef<HTMLDivElement>(null);
+  const prependScrollHeightRef = useRef<number | null>(null); // Scroll height before older messages were prepended
   const saveTimeoutRef = useRef<number>(); // ✅ NEW - For debouncing
+  const syncedCountRef = useRef(0); // Number of settled messages already persisted
   
   // ✅ NEW - Get Clerk user
   const { user, isLoaded } = useUser();
@@ -130,6 +134,9 @@ const Chatbot = () => {
   const [transcript, setTranscript] = useState('');
   const [isSyncing, setIsSyncing] = useState(false); // ✅ NEW - Sync indicator
   const [isLoadingHistory, setIsLoadingHistory] = useState(true); // ✅ NEW - Loading state
+  const [olderCursor, setOlderCursor] = useState<string | null>(null); // Id of the oldest loaded message
+  const [hasOlder, setHasOlder] = useState(false);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   // ============================================================================
   // ✅ NEW - LOAD CHAT HISTORY FROM MONGODB ON MOUNT
@@ -145,7 +152,10 @@ const Chatbot = () => {
       setIsLoadingHistory(true);
 
       try {
-        const history = await fetchAIChatHistory(user.id);
+        // Only the newest page is loaded; older pages are fetched by cursor on demand
+        const { messages: history, beforeCursor, hasOlder: more } = await fetchAIChatHistoryPage(user.id);
+        setOlderCursor(beforeCursor);
+        setHasOlder(more);
         
         if (history && history.length > 0) {
           // Convert timestamp strings back to Date objects
@@ -155,14 +165,17 @@ const Chatbot = () => {
           }));
           
           setMessages(messagesWithDates);
+          syncedCountRef.current = messagesWithDates.length;
           console.log(`✅ Restored ${history.length} messages from MongoDB`);
         } else {
           console.log('ℹ️ No previous chat history found, starting fresh');
           setMessages([welcomeMessage]);
+          syncedCountRef.current = 0;
         }
       } catch (error) {
         console.error('❌ Error loading chat history:', error);
         setMessages([welcomeMessage]);
+        syncedCountRef.current = 0;
       } finally {
         setIsLoadingHistory(false);
       }
@@ -171,6 +184,42 @@ const Chatbot = () => {
     loadHistory();
   }, [isLoaded, user?.id]); // Dependency: load when user is ready
 
+  // ============================================================================
+  // LOAD OLDER HISTORY (ONE PAGE PER SCROLL-UP / CLICK)
+  // ============================================================================
+  const loadOlderMessages = async () => {
+    if (!user?.id || !hasOlder || !olderCursor || isLoadingOlder || isLoadingHistory) {
+      return;
+    }
+
+    setIsLoadingOlder(true);
+    try {
+      const { messages: older, beforeCursor, hasOlder: more } = await fetchAIChatHistoryPage(user.id, olderCursor);
+      if (older.length > 0) {
+        // Keep the viewport on the message the user was reading
+        prependScrollHeightRef.current = messagesContainerRef.current?.scrollHeight ?? null;
+        // Older messages are already persisted; shift the sync offset past them
+        syncedCountRef.current += older.length;
+        setMessages(prev => [
+          ...older.map(msg => ({ ...msg, timestamp: new Date(msg.timestamp) })),
+          ...prev
+        ]);
+      }
+      setOlderCursor(beforeCursor);
+      setHasOlder(more && older.length > 0);
+    } catch (error) {
+      console.error('❌ Error loading older chat history:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = () => {
+    if ((messagesContainerRef.current?.scrollTop ?? 1) <= 0) {
+      loadOlderMessages();
+    }
+  };
+
   // ============================================================================
   // ✅ NEW - AUTO-SAVE TO MONGODB (WITH DEBOUNCING)
   // ============================================================================
@@ -191,10 +240,19 @@ const Chatbot = () => {
 
     // Set new timeout to save after 2 seconds of inactivity
     saveTimeoutRef.current = setTimeout(async () => {
+      // Send only settled messages that have not been persisted yet
+      const settled = messages.filter(msg => !msg.isThinking && !msg.isTyping);
+      const pending = settled.slice(syncedCountRef.current);
+      if (pending.length === 0) return;
+      
       setIsSyncing(true);
-      console.log('💾 Auto-saving chat history to MongoDB...');
+      console.log(`💾 Appending ${pending.length} message(s) to MongoDB...`);
       
-      const success = await saveAIChatHistory(user.id, messages);
+      const success = await appendAIChatMessages(user.id, pending);
+      if (success) {
+        // Add rather than assign: older pages may have been prepended while this save ran
+        syncedCountRef.current += pending.length;
+      }
       
       setIsSyncing(false);
       
@@ -229,7 +287,14 @@ const Chatbot = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
 
-  useEffect(() => {
+  useLayoutEffect(() => {
+    const container = messagesContainerRef.current;
+    if (prependScrollHeightRef.current !== null && container) {
+      // Older page prepended: stay where we were instead of jumping to the bottom
+      container.scrollTop += container.scrollHeight - prependScrollHeightRef.current;
+      prependScrollHeightRef.current = null;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
@@ -306,6 +371,9 @@ const Chatbot = () => {
     
     // Clear frontend
     setMessages([welcomeMessage]);
+    syncedCountRef.current = 0;
+    setOlderCursor(null);
+    setHasOlder(false);
     clearChatSession();
   };
 
@@ -534,7 +602,23 @@ const Chatbot = () => {
         )}
 
         {/* Messages Area */}
-        <div className="flex-1 overflow-y-auto p-6 space-y-4">
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-6 space-y-4"
+        >
+          {hasOlder && (
+            <div className="flex justify-center">
+              <button
+                type="button"
+                onClick={loadOlderMessages}
+                disabled={isLoadingOlder}
+                className="text-sm text-indigo-600 dark:text-indigo-400 hover:underline disabled:opacity-50"
+              >
+                {isLoadingOlder ? 'Loading older messages...' : 'Load older messages'}
+              </button>
+            </div>
+          )}
           {messages.map((message, index) => (
             <ChatMessage
               key={index}
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { Search, Loader2, AlertCircle, TrendingUp, ImageIcon, FileText, ChevronDown, ChevronUp, X, ZoomIn } from 'lucide-react';
 import axios from 'axios';
+import AnalysisChart, { AnalysisChartData } from '../components/AnalysisChart';
 
 // --- INSTRUCTIONS FOR LOCAL PROJECT ---
 // 1. In your local project, uncomment the line below:
@@ -19,30 +20,73 @@ export interface StockAnalysisResponse {
     holdout_pred: string | null;
     future_forecast: string | null;
   };
+  // Downsampled chart data (default "data" output; images are only sent for output = "png")
+  charts?: {
+    price_history: AnalysisChartData | null;
+    daily_returns: AnalysisChartData | null;
+    holdout_pred: AnalysisChartData | null;
+    future_forecast: AnalysisChartData | null;
+  };
   error?: string;
 }
 
-const analyzeStock = async (query: string): Promise<StockAnalysisResponse> => {
+// Pipeline stages reported by the analysis job API, with user-facing labels
+const STAGE_LABELS: Record<string, string> = {
+  queued: 'Queued...',
+  fetched: 'Price history loaded, validating model...',
+  holdout_done: 'Validation done, forecasting...',
+  forecast_done: 'Forecast ready, writing insights...',
+  summary_done: 'Done',
+};
+
+const POLL_INTERVAL_MS = 1500;
+
+const emptyResponse = (error?: string): StockAnalysisResponse => ({
+  success: false,
+  analysis: '',
+  images: {
+    price_history: null,
+    daily_returns: null,
+    holdout_pred: null,
+    future_forecast: null
+  },
+  error
+});
+
+// Submits an analysis job and polls it, reporting partial results per stage
+const analyzeStock = async (
+  query: string,
+  onProgress?: (stage: string, partial: StockAnalysisResponse) => void
+): Promise<StockAnalysisResponse> => {
   // Assuming your Flask backend is running on port 5000
   // const API_URL = 'http://localhost:5000/api'; 
   const API_URL = 'https://finedge-backend.onrender.com'; 
   
   try {
-    const response = await axios.post(`${API_URL}/api/analyze`, { query });
-    return response.data;
+    const { data: job } = await axios.post(`${API_URL}/api/analyze/jobs`, { query });
+    onProgress?.('queued', { ...emptyResponse(), success: true });
+
+    let since = 0;
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+      const { data: status } = await axios.get(`${API_URL}/api/analyze/jobs/${job.job_id}`, { params: { since } });
+      since = status.next_event;
+
+      const partial: StockAnalysisResponse = {
+        ...emptyResponse(),
+        success: status.status !== 'failed',
+        analysis: status.result.analysis || '',
+        images: { ...emptyResponse().images, ...status.result.images },
+        charts: status.result.charts,
+      };
+
+      if (status.status === 'done') return partial;
+      if (status.status === 'failed') return { ...partial, error: status.error || 'Analysis failed' };
+      onProgress?.(status.stage || status.status, partial);
+    }
   } catch (error: any) {
     console.error('Error analyzing stock:', error);
-    return {
-      success: false,
-      analysis: '',
-      images: {
-        price_history: null,
-        daily_returns: null,
-        holdout_pred: null,
-        future_forecast: null
-      },
-      error: error.response?.data?.error || error.message || 'Failed to communicate with analysis server'
-    };
+    return emptyResponse(error.response?.data?.error || error.message || 'Failed to communicate with analysis server');
   }
 };
 // -----------------------------------------------------------------------
@@ -52,6 +96,7 @@ const StockAnalyzer = () => {
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<StockAnalysisResponse | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [stage, setStage] = useState<string | null>(null);
   
   // State for collapsible "Reasoning" section
   const [isInsightsOpen, setIsInsightsOpen] = useState(true);
@@ -69,7 +114,11 @@ const StockAnalyzer = () => {
     setIsInsightsOpen(true); // Auto-open insights on new search
 
     try {
-      const data = await analyzeStock(query);
+      const data = await analyzeStock(query, (currentStage, partial) => {
+        // Show charts as soon as each stage produces them
+        setStage(currentStage);
+        setResult(partial);
+      });
       
       if (data.success) {
         setResult(data);
@@ -80,6 +129,7 @@ const StockAnalyzer = () => {
       setError('Failed to connect to the server. Please ensure the backend is running.');
     } finally {
       setLoading(false);
+      setStage(null);
     }
   };
 
@@ -134,6 +184,14 @@ const StockAnalyzer = () => {
 
           {/* Content Container */}
           <div className="max-w-5xl mx-auto">
+
+            {/* Job Progress */}
+            {loading && stage && (
+              <div className="mb-6 flex items-center gap-2 text-sm text-gray-500 dark:text-gray-400">
+                <Loader2 className="w-4 h-4 animate-spin" />
+                <span>{STAGE_LABELS[stage] || 'Working...'}</span>
+              </div>
+            )}
             
             {/* Error Message */}
             {error && (
@@ -170,56 +228,31 @@ const StockAnalyzer = () => {
                   {isInsightsOpen && (
                     <div className="p-6 animate-in slide-in-from-top-2 duration-200">
                       <div className="prose dark:prose-invert max-w-none whitespace-pre-wrap text-gray-700 dark:text-gray-300 leading-relaxed text-base font-normal">
-                        {result.analysis}
+                        {result.analysis || 'Insights will appear once the forecast is ready...'}
                       </div>
                     </div>
                   )}
                 </div>
 
                 {/* 2. Chart Grid Visualization (2x2 Grid) */}
-                {result.images && (
+                {(result.images || result.charts) && (
                    <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-                      
-                      {/* Image 1: Price History */}
-                      {result.images.price_history && (
-                        <ChartCard 
-                          title="Price History" 
-                          image={result.images.price_history} 
-                          color="text-blue-500" 
-                          onClick={() => setSelectedImage(result.images.price_history)}
-                        />
-                      )}
-
-                      {/* Image 2: Daily Returns */}
-                      {result.images.daily_returns && (
-                        <ChartCard 
-                          title="Daily Returns Distribution" 
-                          image={result.images.daily_returns} 
-                          color="text-purple-500"
-                          onClick={() => setSelectedImage(result.images.daily_returns)}
-                        />
-                      )}
-
-                      {/* Image 3: Validation */}
-                      {result.images.holdout_pred && (
-                        <ChartCard 
-                          title="Model Validation (Actual vs Predicted)" 
-                          image={result.images.holdout_pred} 
-                          color="text-green-500"
-                          onClick={() => setSelectedImage(result.images.holdout_pred)}
-                        />
-                      )}
-
-                      {/* Image 4: Future Forecast */}
-                      {result.images.future_forecast && (
-                        <ChartCard 
-                          title="Future Forecast (Next 1 Year)" 
-                          image={result.images.future_forecast} 
-                          color="text-orange-500"
-                          onClick={() => setSelectedImage(result.images.future_forecast)}
-                        />
-                      )}
-
+                      {CHART_CARDS.map(({ key, title, color, stroke }) => {
+                        const image = result.images?.[key] || null;
+                        const chart = result.charts?.[key] || null;
+                        if (!image && !chart) return null;
+                        return (
+                          <ChartCard
+                            key={key}
+                            title={title}
+                            image={image}
+                            chart={chart}
+                            color={color}
+                            stroke={stroke}
+                            onClick={() => image && setSelectedImage(image)}
+                          />
+                        );
+                      })}
                    </div>
                 )}
               </div>
@@ -274,11 +307,19 @@ const StockAnalyzer = () => {
   );
 };
 
-// Helper Component for Image Cards
-// Now accepts an onClick prop
-const ChartCard = ({ title, image, color, onClick }: { title: string, image: string, color: string, onClick: () => void }) => (
+// Chart cards in display order (Image 1-4)
+const CHART_CARDS: { key: 'price_history' | 'daily_returns' | 'holdout_pred' | 'future_forecast'; title: string; color: string; stroke: string }[] = [
+  { key: 'price_history', title: 'Price History', color: 'text-blue-500', stroke: '#3B82F6' },
+  { key: 'daily_returns', title: 'Daily Returns Distribution', color: 'text-purple-500', stroke: '#A855F7' },
+  { key: 'holdout_pred', title: 'Model Validation (Actual vs Predicted)', color: 'text-green-500', stroke: '#22C55E' },
+  { key: 'future_forecast', title: 'Future Forecast (Next 1 Year)', color: 'text-orange-500', stroke: '#F97316' },
+];
+
+// Helper Component for Chart Cards
+// Renders the chart data when present, otherwise the PNG (click to zoom)
+const ChartCard = ({ title, image, chart, color, stroke, onClick }: { title: string, image: string | null, chart: AnalysisChartData | null, color: string, stroke: string, onClick: () => void }) => (
   <div 
-    className="bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 overflow-hidden hover:shadow-md transition-all duration-300 group cursor-pointer"
+    className={`bg-white dark:bg-gray-800 rounded-xl shadow-sm border border-gray-200 dark:border-gray-700 overflow-hidden hover:shadow-md transition-all duration-300 group ${image ? 'cursor-pointer' : ''}`}
     onClick={onClick}
   >
     <div className="px-6 py-4 border-b border-gray-200 dark:border-gray-700 flex items-center justify-between bg-gray-50/80 dark:bg-gray-800/80 backdrop-blur-sm">
@@ -286,9 +327,12 @@ const ChartCard = ({ title, image, color, onClick }: { title: string, image: str
         <ImageIcon className={`w-4 h-4 ${color}`} />
         <h3 className="font-medium text-gray-700 dark:text-gray-200 text-sm">{title}</h3>
       </div>
-      <ZoomIn className="w-4 h-4 text-gray-400 opacity-0 group-hover:opacity-100 transition-opacity" />
+      {image && <ZoomIn className="w-4 h-4 text-gray-400 opacity-0 group-hover:opacity-100 transition-opacity" />}
     </div>
     <div className="p-4 flex justify-center bg-white dark:bg-gray-900 min-h-[300px] items-center relative">
+      {chart ? (
+        <AnalysisChart data={chart} color={stroke} />
+      ) : image && (
       <div className="relative rounded-lg overflow-hidden w-full">
         <img 
           src={`data:image/png;base64,${image}`} 
@@ -298,6 +342,7 @@ const ChartCard = ({ title, image, color, onClick }: { title: string, image: str
         {/* Hover Overlay hint */}
         <div className="absolute inset-0 bg-black/0 group-hover:bg-black/5 transition-colors flex items-center justify-center"></div>
       </div>
+      )}
     </div>
   </div>
 );
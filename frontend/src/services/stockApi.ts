@@ -1,4 +1,5 @@
 import axios from 'axios';
+import type { AnalysisChartData } from '../components/AnalysisChart';
 import { SERVER_URL } from '../utils/utils';
 import { 
   StockPrice, 
@@ -19,6 +20,13 @@ export interface StockAnalysisResponse {
     holdout_pred: string | null;
     future_forecast: string | null;
   };
+  // Downsampled chart data (default "data" output; images are only sent for output = "png")
+  charts?: {
+    price_history: AnalysisChartData | null;
+    daily_returns: AnalysisChartData | null;
+    holdout_pred: AnalysisChartData | null;
+    future_forecast: AnalysisChartData | null;
+  };
   error?: string;
 }
 
@@ -9,6 +9,7 @@
  * Chat message interface for the AI chatbot
  */
 export interface Message {
+  id?: string; // Server-assigned; used as the chat history pagination cursor
   type: 'user' | 'bot';
   content: string | string[];
   timestamp: Date;
@@ -141,6 +141,96 @@ export const clearAIChatHistory = async (clerkUserId: string): Promise<boolean>
   }
 };
 
+interface ChatHistoryPageResponse {
+  success: boolean;
+  messages?: Message[];
+  cursors?: { before: string | null; after: string | null };
+  hasOlder?: boolean;
+  hasNewer?: boolean;
+  total?: number;
+  lastUpdated?: string;
+  error?: string;
+}
+
+export interface ChatHistoryPage {
+  messages: Message[];
+  beforeCursor: string | null;
+  hasOlder: boolean;
+}
+
+/**
+ * ✅ Fetch one page of AI Advisor chat history (newest page by default)
+ * 
+ * @param clerkUserId - User's Clerk ID
+ * @param before - Message id cursor; returns messages older than it
+ * @param limit - Page size (max 100)
+ * @returns Page of messages plus the cursor for the next older page
+ */
+export const fetchAIChatHistoryPage = async (
+  clerkUserId: string,
+  before?: string | null,
+  limit: number = 30
+): Promise<ChatHistoryPage> => {
+  try {
+    const response = await axios.get<ChatHistoryPageResponse>(
+      `${SERVER_URL}/api/chat/ai-advisor/history/messages`,
+      {
+        params: { clerkUserId, limit, ...(before ? { before } : {}) },
+        timeout: 10000
+      }
+    );
+    
+    if (response.data.success && response.data.messages) {
+      console.log(`✅ Loaded ${response.data.messages.length} of ${response.data.total} messages from MongoDB`);
+      return {
+        messages: response.data.messages,
+        beforeCursor: response.data.cursors?.before ?? null,
+        hasOlder: Boolean(response.data.hasOlder)
+      };
+    }
+    
+    return { messages: [], beforeCursor: null, hasOlder: false };
+    
+  } catch (error: any) {
+    console.error('❌ Error fetching AI chat history page:', error.message);
+    return { messages: [], beforeCursor: null, hasOlder: false };
+  }
+};
+
+/**
+ * ✅ Append only new AI Advisor messages to MongoDB
+ * 
+ * @param clerkUserId - User's Clerk ID
+ * @param messages - Messages not yet persisted
+ * @returns Success boolean
+ */
+export const appendAIChatMessages = async (
+  clerkUserId: string,
+  messages: Message[]
+): Promise<boolean> => {
+  if (messages.length === 0) return true;
+  
+  try {
+    const response = await axios.post<SaveResponse>(
+      `${SERVER_URL}/api/chat/ai-advisor/history/messages`,
+      { clerkUserId, messages },
+      { timeout: 10000 }
+    );
+    
+    if (response.data.success) {
+      console.log(`✅ Appended ${messages.length} message(s) to MongoDB`);
+      return true;
+    }
+    
+    console.error('❌ Failed to append chat messages:', response.data.error);
+    return false;
+    
+  } catch (error: any) {
+    console.error('❌ Error appending AI chat messages:', error.message);
+    return false;
+  }
+};
+
 // ===========================================================================================================
 //                           FINANCIAL PATH HISTORY FUNCTIONS
 // ===========================================================================================================